@@ -8,18 +8,16 @@ architecture for processing Google Voice Takeout exports.
 
 import logging
 import sys
-import tarfile
 from pathlib import Path
 from typing import Optional, List
 
 import click
-import dateutil.parser
-from bs4 import BeautifulSoup
+
+# Heavy dependencies (bs4, tarfile, sms.py, pipeline stages) are imported inside
+# the commands that use them so --help and lightweight commands start fast.
 
 # Import our new configuration system
 from core.processing_config import ProcessingConfig, ConfigurationBuilder
-from core.configuration_manager import get_configuration_manager, set_global_configuration
-from core.sms_patch import patch_sms_module, unpatch_sms_module, is_sms_module_patched
 # Performance constants imported where needed
 
 # Import the main conversion logic from sms.py - moved to avoid circular import
@@ -72,45 +70,6 @@ def setup_logging(config: ProcessingConfig) -> None:
     logger.info("=" * 60)
 
 
-def patch_sms_module_with_config(config: ProcessingConfig) -> None:
-    """Patch the SMS module with the new configuration system.
-    
-    This function uses our new SMS module patcher to integrate the configuration
-    system with the existing sms.py module.
-    """
-    logger = logging.getLogger(__name__)
-    
-    try:
-        # Check if module is already patched
-        if is_sms_module_patched():
-            logger.warning("⚠️  SMS module is already patched - unpatching first")
-            # Get the configuration manager to find active patchers
-            manager = get_configuration_manager()
-            active_patchers = manager.get_active_patchers()
-            for patcher in active_patchers:
-                unpatch_sms_module(patcher)
-        
-        # Patch the module with new configuration
-        logger.info("🔧 Patching SMS module with new configuration system...")
-        patcher = patch_sms_module(config)
-        
-        # Set as global configuration
-        set_global_configuration(config)
-        
-        logger.info("✅ SMS module successfully patched with new configuration")
-        logger.info(f"  Processing directory: {config.processing_dir}")
-        logger.info(f"  Output format: {config.output_format}")
-        logger.info(f"  Test mode: {config.test_mode}")
-        if config.test_mode:
-            logger.info(f"  Test limit: {config.test_limit}")
-        
-        return patcher
-        
-    except Exception as e:
-        logger.error(f"❌ Failed to patch SMS module: {e}")
-        raise
-
-
 def validate_and_setup(config: ProcessingConfig) -> bool:
     """Validate configuration and set up processing paths."""
     logger = logging.getLogger(__name__)
@@ -291,6 +250,40 @@ def validate_and_setup(config: ProcessingConfig) -> bool:
     default=False,
     help="Filter out commercial/spam conversations (those with only STOP/UNSUBSCRIBE responses and optional confirmation). This helps remove marketing messages and automated notifications (default: disabled)"
 )
+@click.option(
+    '--build-search-index/--no-build-search-index',
+    default=False,
+    help="Build a full-text search index (search_index.db) during convert or html-generation for the 'search' command (default: disabled)"
+)
+@click.option(
+    '--paginate-messages',
+    type=click.IntRange(min=0),
+    default=20000,
+    help="Split conversations with more messages than this into pages linked from a table of contents at the conversation's usual file; also the most messages per page (0 disables, default: 20000)"
+)
+@click.option(
+    '--paginate-bytes',
+    type=click.IntRange(min=0),
+    default=0,
+    help="Also split conversations whose message rows exceed this many bytes, and keep pages under it (0 disables, default: 0)"
+)
+@click.option(
+    '--paginate-by',
+    type=click.Choice(['year', 'size']),
+    default='year',
+    help="Page split of large conversations: one page per year (years over the limits are split further) or fixed-size pages (default: year)"
+)
+@click.option(
+    '--merge-source', 'merge_sources',
+    multiple=True,
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Another Takeout directory to merge into the same output (repeatable). Messages already present in the processing directory or an earlier --merge-source are dropped, and duplicate rates are reported per source (convert only)"
+)
+@click.option(
+    '--update-from',
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    help="Previous output to update from a newer Takeout drop: only new or changed files are parsed and only the conversations they touch are rewritten. Copied to the output directory first if it is elsewhere (convert only)"
+)
 @click.option(
     '--phone-lookup-file',
     type=click.Path(path_type=Path),
@@ -324,7 +317,6 @@ def cli(ctx, **kwargs):
         final_config = ProcessingConfig.from_dict(config_dict)
         
         ctx.obj['config'] = final_config
-        ctx.obj['patcher'] = None  # Will be set during conversion
         
     except Exception as e:
         click.echo(f"Configuration error: {e}", err=True)
@@ -348,6 +340,8 @@ def _extract_conversations_from_index(index_path: Path) -> List[str]:
     if not index_path.exists():
         return []
 
+    from bs4 import BeautifulSoup
+
     try:
         html_content = index_path.read_text(encoding='utf-8')
         soup = BeautifulSoup(html_content, 'html.parser')
@@ -378,6 +372,8 @@ def _extract_attachments_from_conversation(conversation_file: Path) -> List[str]
     if not conversation_file.exists():
         return []
 
+    from bs4 import BeautifulSoup
+
     try:
         html_content = conversation_file.read_text(encoding='utf-8')
         soup = BeautifulSoup(html_content, 'html.parser')
@@ -416,57 +412,62 @@ def _create_distribution_tarball(
     conversations_dir: Path,
     output_path: Path,
     conversations: List[str],
-    attachments: List[str]
+    attachments: List[str],
+    workers: Optional[int] = None
 ) -> bool:
     """Create a tarball containing conversations and their attachments.
 
+    Compression runs on a thread pool (see core.distribution_archive) and
+    already-compressed media is stored without recompression.
+
     Args:
         conversations_dir: Path to conversations directory
         output_path: Path where tarball should be created
         conversations: List of conversation filenames to include
         attachments: List of attachment paths to include
+        workers: Compression threads (default: CPU count)
 
     Returns:
         True if successful, False otherwise
     """
+    from core.distribution_archive import write_distribution_tarball
+
     logger = logging.getLogger(__name__)
 
     try:
-        with tarfile.open(output_path, 'w:gz') as tar:
-            # Always include index.html
-            index_path = conversations_dir / "index.html"
-            if index_path.exists():
-                tar.add(
-                    index_path,
-                    arcname="conversations/index.html"
-                )
-                logger.info(f"✅ Added index.html")
+        entries = []
+
+        # Always include index.html
+        index_path = conversations_dir / "index.html"
+        if index_path.exists():
+            entries.append((index_path, "conversations/index.html"))
+        else:
+            logger.warning("⚠️  index.html not found, skipping")
+
+        # Add conversation files
+        for conv_file in conversations:
+            conv_path = conversations_dir / conv_file
+            if conv_path.exists():
+                entries.append((conv_path, f"conversations/{conv_file}"))
             else:
-                logger.warning("⚠️  index.html not found, skipping")
+                logger.warning(f"⚠️  Conversation not found: {conv_file}")
 
-            # Add conversation files
-            for conv_file in conversations:
-                conv_path = conversations_dir / conv_file
-                if conv_path.exists():
-                    tar.add(
-                        conv_path,
-                        arcname=f"conversations/{conv_file}"
-                    )
-                else:
-                    logger.warning(f"⚠️  Conversation not found: {conv_file}")
-
-            # Add attachment files
-            for att_path in attachments:
-                full_att_path = conversations_dir / att_path
-                if full_att_path.exists():
-                    tar.add(
-                        full_att_path,
-                        arcname=f"conversations/{att_path}"
-                    )
-                else:
-                    logger.warning(f"⚠️  Attachment not found: {att_path}")
+        # Add attachment files
+        for att_path in attachments:
+            full_att_path = conversations_dir / att_path
+            if full_att_path.exists():
+                entries.append((full_att_path, f"conversations/{att_path}"))
+            else:
+                logger.warning(f"⚠️  Attachment not found: {att_path}")
+
+        stats = write_distribution_tarball(output_path, entries, workers=workers)
 
         logger.info(f"✅ Tarball created: {output_path}")
+        logger.info(
+            f"📦 {stats['files']} files, {stats['bytes_in'] / (1024 * 1024):.1f} MB in, "
+            f"{stats['bytes_out'] / (1024 * 1024):.1f} MB out "
+            f"({stats['bytes_stored'] / (1024 * 1024):.1f} MB stored without recompression)"
+        )
         return True
 
     except Exception as e:
@@ -1005,6 +1006,76 @@ def attachment_copying(ctx):
         ctx.exit(1)
 
 
+@cli.command()
+@click.option('--max-size', type=int, default=320, show_default=True,
+              help='Longest side of a preview, in pixels')
+@click.option('--workers', type=int, default=None,
+              help='Worker processes for resizing (default: CPU count)')
+@click.option('--quality', type=int, default=75, show_default=True,
+              help='JPEG/WebP preview quality')
+@click.pass_context
+def thumbnail_generation(ctx, max_size, workers, quality):
+    """Generate previews for image attachments (optional; requires attachment-copying and Pillow)."""
+    try:
+        config = ctx.obj['config']
+
+        # Set up logging
+        setup_logging(config)
+
+        # Import pipeline components
+        from core.pipeline import PipelineManager
+        from core.pipeline.stages import (
+            AttachmentMappingStage, AttachmentCopyingStage, ThumbnailGenerationStage
+        )
+
+        # Create pipeline manager
+        manager = PipelineManager(
+            processing_dir=config.processing_dir,
+            output_dir=config.processing_dir / "conversations"
+        )
+
+        # thumbnail_generation depends on attachment_copying, which depends on attachment_mapping
+        manager.register_stage(AttachmentMappingStage())
+        manager.register_stage(AttachmentCopyingStage())
+        manager.register_stage(ThumbnailGenerationStage(max_size=max_size, workers=workers, quality=quality))
+
+        click.echo("🖼️  Starting thumbnail generation pipeline...")
+
+        results = manager.execute_pipeline(config=config)
+
+        result = results["thumbnail_generation"]
+        if result.success:
+            metadata = result.metadata
+            click.echo("✅ Thumbnail generation completed!")
+            if not metadata.get('pillow_available', True):
+                click.echo("   ⏭️  Pillow is not installed; no previews generated (pip install Pillow)")
+            else:
+                click.echo(f"   🖼️  Generated: {metadata['total_generated']} "
+                           f"({metadata['images_per_second']:.1f} images/s)")
+                click.echo(f"   ⏭️  Unchanged: {metadata['total_skipped']}, reused: {metadata['total_reused']}")
+                click.echo(f"   💾 Bytes saved: {metadata['bytes_saved']:,}")
+                click.echo(f"   ⚠️  Errors: {metadata['total_errors']}")
+
+            if result.errors:
+                click.echo(f"\n⚠️  Warnings:")
+                for error in result.errors[:5]:  # Show first 5
+                    click.echo(f"   {error}")
+                if len(result.errors) > 5:
+                    click.echo(f"   ... and {len(result.errors) - 5} more")
+        else:
+            click.echo("❌ Thumbnail generation failed:")
+            for error in result.errors:
+                click.echo(f"   {error}")
+            ctx.exit(1)
+
+    except Exception as e:
+        click.echo(f"❌ Thumbnail generation failed: {e}")
+        if ctx.obj.get('debug'):
+            import traceback
+            traceback.print_exc()
+        ctx.exit(1)
+
+
 @cli.command()
 @click.pass_context
 def html_generation(ctx):
@@ -1020,18 +1091,25 @@ def html_generation(ctx):
         from core.pipeline.stages import (
             AttachmentMappingStage,
             AttachmentCopyingStage,
-            HtmlGenerationStage
+            HtmlGenerationStage,
+            ThumbnailGenerationStage
         )
+        from core.thumbnails import thumbnail_index_path
 
         # Create pipeline manager
+        output_dir = config.processing_dir / "conversations"
         manager = PipelineManager(
             processing_dir=config.processing_dir,
-            output_dir=config.processing_dir / "conversations"
+            output_dir=output_dir
         )
 
         # Register all three stages (html_generation depends on both attachment stages)
         manager.register_stage(AttachmentMappingStage())
         manager.register_stage(AttachmentCopyingStage())
+        # Previews are optional: once thumbnail-generation has run, keep them current
+        # before rendering (registration order puts it ahead of html_generation)
+        if thumbnail_index_path(output_dir).exists():
+            manager.register_stage(ThumbnailGenerationStage())
         manager.register_stage(HtmlGenerationStage())
 
         click.echo("📝 Starting HTML generation pipeline...")
@@ -1093,18 +1171,24 @@ def index_generation(ctx):
             AttachmentMappingStage,
             AttachmentCopyingStage,
             HtmlGenerationStage,
-            IndexGenerationStage
+            IndexGenerationStage,
+            ThumbnailGenerationStage
         )
+        from core.thumbnails import thumbnail_index_path
 
         # Create pipeline manager
+        output_dir = config.processing_dir / "conversations"
         manager = PipelineManager(
             processing_dir=config.processing_dir,
-            output_dir=config.processing_dir / "conversations"
+            output_dir=output_dir
         )
 
         # Register all stages (index_generation depends on html_generation)
         manager.register_stage(AttachmentMappingStage())
         manager.register_stage(AttachmentCopyingStage())
+        # Optional previews, refreshed before html_generation as in html-generation
+        if thumbnail_index_path(output_dir).exists():
+            manager.register_stage(ThumbnailGenerationStage())
         manager.register_stage(HtmlGenerationStage())
         manager.register_stage(IndexGenerationStage())
 
@@ -1173,52 +1257,21 @@ def convert(ctx):
             logger.error("Setup failed - cannot proceed with conversion")
             sys.exit(1)
         
-        # Initialize processing paths BEFORE patching to avoid recursion
-        logger.info("🔧 Initializing processing paths...")
-        from sms import setup_processing_paths
-        setup_processing_paths(
-            config.processing_dir,
-            enable_phone_prompts=config.enable_phone_prompts,
-            # buffer_size is now hardcoded in shared_constants.py
-            # batch_size is now hardcoded in shared_constants.py
-            # cache_size is now hardcoded in shared_constants.py
-            large_dataset=config.large_dataset,
-            phone_lookup_file=config.phone_lookup_file
-        )
-        logger.info("✅ Processing paths initialized successfully")
-        
-        # Patch SMS module with new configuration system
-        patcher = patch_sms_module_with_config(config)
-        ctx.obj['patcher'] = patcher
-        
-        # Run the main conversion
+        # One context per run: sms.main reads paths and filters from it, not
+        # from module globals, so no sms module setup or patching is needed
         logger.info("🚀 Starting conversion process...")
         from sms import main as sms_main
         from core.processing_context import create_processing_context
-        
-        # Create processing context
+        from core.run_context import build_run_context
+
         context = create_processing_context(config)
-        sms_main(config, context)
-        
-        # Clean up patching
-        if patcher:
-            logger.info("🔄 Cleaning up SMS module patches...")
-            unpatch_sms_module(patcher)
-            ctx.obj['patcher'] = None
-        
+        run_context = build_run_context(config, context)
+        sms_main(config, context, run_context)
+
         logger.info("✅ Conversion completed successfully")
         
     except Exception as e:
         logger.error(f"Conversion failed: {e}")
-        
-        # Clean up patching on error
-        if ctx.obj.get('patcher'):
-            try:
-                unpatch_sms_module(ctx.obj['patcher'])
-                ctx.obj['patcher'] = None
-            except Exception as cleanup_error:
-                logger.warning(f"Failed to cleanup patches: {cleanup_error}")
-        
         sys.exit(1)
 
 
@@ -1809,8 +1862,14 @@ def clear_cache(ctx, attachment, pipeline, clear_all):
     default=False,
     help='Extract tarball to temp directory and show structure (paranoia check before distribution)'
 )
+@click.option(
+    '--compression-workers',
+    type=click.IntRange(min=1),
+    default=None,
+    help='Threads used to compress the tarball (default: CPU count)'
+)
 @click.pass_context
-def create_distribution_tarball(ctx, output, verify, verify_extraction):
+def create_distribution_tarball(ctx, output, verify, verify_extraction, compression_workers):
     """Create a clean distribution tarball of conversations for external sharing.
 
     This command creates a tarball containing only conversations referenced in
@@ -1835,6 +1894,8 @@ def create_distribution_tarball(ctx, output, verify, verify_extraction):
         # Create distribution tarball
         python cli.py create-distribution-tarball --output lawyers_archive.tar.gz
     """
+    import tarfile
+
     try:
         config = ctx.obj['config']
 
@@ -1877,14 +1938,41 @@ def create_distribution_tarball(ctx, output, verify, verify_extraction):
         click.echo(f"   ✅ Found {len(conversations)} conversations")
 
         # Step 2: Extract attachments from conversations
+        # (from conversations.manifest.jsonl when it still matches the file)
         click.echo("\n📎 Step 2: Extracting attachments from conversations...")
+        from core.conversation_manifest import get_valid_record, load_manifest
+
+        from core.conversation_pages import page_links
+
+        manifest = load_manifest(conversations_dir)
         all_attachments = set()
+        parsed_count = 0
+        page_files = []  # pages of paginated conversations, behind their table of contents
         for conv_file in conversations:
             conv_path = conversations_dir / conv_file
-            attachments = _extract_attachments_from_conversation(conv_path)
+            record = get_valid_record(manifest, conv_path)
+            if record is not None:
+                attachments = record.get('attachments', [])
+                page_files.extend(record.get('pages', []))
+            else:
+                attachments = _extract_attachments_from_conversation(conv_path)
+                if conv_path.exists():
+                    pages = page_links(conv_path.read_text(encoding='utf-8'))
+                    for page in pages:
+                        attachments.extend(_extract_attachments_from_conversation(conversations_dir / page))
+                    page_files.extend(pages)
+                parsed_count += 1
             all_attachments.update(attachments)
 
         logger.info(f"Found {len(all_attachments)} unique attachments")
+        if manifest:
+            logger.info(f"Used manifest for {len(conversations) - parsed_count} conversations, parsed {parsed_count}")
+
+        # Previews shown in place of linked images (see thumbnail-generation)
+        from core.thumbnails import load_thumbnail_map
+
+        thumbnails = load_thumbnail_map(conversations_dir)
+        all_attachments.update([thumbnails[a] for a in all_attachments if a in thumbnails])
         click.echo(f"   ✅ Found {len(all_attachments)} unique attachments")
 
         # Step 3: Create tarball
@@ -1892,8 +1980,9 @@ def create_distribution_tarball(ctx, output, verify, verify_extraction):
         success = _create_distribution_tarball(
             conversations_dir,
             output_path,
-            conversations,
-            sorted(list(all_attachments))
+            conversations + page_files,
+            sorted(list(all_attachments)),
+            workers=compression_workers
         )
 
         if not success:
@@ -1926,7 +2015,10 @@ def create_distribution_tarball(ctx, output, verify, verify_extraction):
                     click.echo("   ✅ No .archived.html files (clean)")
 
                 # Show summary
-                conversation_count = sum(1 for m in members if m.endswith('.html') and not m.endswith('index.html'))
+                conversation_count = sum(
+                    1 for m in members
+                    if m.endswith('.html') and not m.endswith('index.html') and not m.startswith('conversations/pages/')
+                )
                 attachment_count = sum(1 for m in members if 'attachments/' in m)
 
                 click.echo(f"   ✅ {conversation_count} conversations")
@@ -2004,6 +2096,86 @@ def create_distribution_tarball(ctx, output, verify, verify_extraction):
         ctx.exit(1)
 
 
+@cli.command()
+@click.option('--workers', type=click.IntRange(min=1), default=None,
+              help='Compression threads (default: CPU count)')
+@click.option('--brotli/--no-brotli', 'use_brotli', default=None,
+              help='Also write .br files (default: when the brotli package is installed)')
+@click.pass_context
+def precompress(ctx, workers, use_brotli):
+    """Write .gz (and .br) copies of generated pages for the serve command.
+
+    Run after html-generation / index-generation. Pages whose content has not
+    changed since the last run are skipped.
+    """
+    import time
+    from core.precompress import precompress_directory
+
+    config = ctx.obj['config']
+    setup_logging(config)
+    conversations_dir = config.output_dir
+    if not conversations_dir.exists():
+        click.echo(f"❌ Conversations directory not found: {conversations_dir}")
+        ctx.exit(1)
+
+    try:
+        start = time.time()
+        stats = precompress_directory(conversations_dir, workers=workers, use_brotli=use_brotli)
+        elapsed = time.time() - start
+    except Exception as e:
+        click.echo(f"❌ Precompression failed: {e}")
+        if ctx.obj.get('debug'):
+            import traceback
+            traceback.print_exc()
+        ctx.exit(1)
+
+    click.echo(f"✅ Precompressed {stats['compressed']} files in {elapsed:.2f}s "
+               f"({stats['skipped']} unchanged, {stats['removed']} removed)")
+    if stats['bytes_in']:
+        click.echo(f"   📄 Pages: {stats['bytes_in'] / (1024 * 1024):.1f} MB")
+        click.echo(f"   🗜️  gzip: {stats['bytes_gzip'] / (1024 * 1024):.1f} MB "
+                   f"({stats['bytes_gzip'] / stats['bytes_in']:.0%})")
+        if stats['bytes_br']:
+            click.echo(f"   🗜️  brotli: {stats['bytes_br'] / (1024 * 1024):.1f} MB "
+                       f"({stats['bytes_br'] / stats['bytes_in']:.0%})")
+
+
+@cli.command()
+@click.option('--host', default='127.0.0.1', show_default=True, help='Interface to listen on')
+@click.option('--port', type=int, default=8000, show_default=True, help='Port to listen on')
+@click.pass_context
+def serve(ctx, host, port):
+    """Serve the conversations directory over HTTP for browsing.
+
+    Precompressed pages written by the precompress command are sent when the
+    browser accepts them; media supports range requests (seeking).
+    """
+    from core.static_server import create_server
+
+    config = ctx.obj['config']
+    setup_logging(config)
+    conversations_dir = config.output_dir
+    if not (conversations_dir / "index.html").exists():
+        click.echo(f"❌ index.html not found in {conversations_dir}")
+        click.echo("   Run 'python cli.py index-generation' first")
+        ctx.exit(1)
+
+    try:
+        server = create_server(conversations_dir, host, port)
+    except OSError as e:
+        click.echo(f"❌ Could not listen on {host}:{port}: {e}")
+        ctx.exit(1)
+
+    bound_host, bound_port = server.server_address[:2]
+    click.echo(f"🌐 Serving {conversations_dir} at http://{bound_host}:{bound_port}/ (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        click.echo("\n👋 Stopped")
+    finally:
+        server.server_close()
+
+
 @cli.command()
 @click.option(
     '--conversations-dir',
@@ -2096,6 +2268,10 @@ def generate_summaries(conversations_dir, output_file, overwrite, timeout):
     output_path = conversations_dir / output_file
     existing = {} if overwrite else generator.load_summaries(output_path)
 
+    # Content hashes from conversations.manifest.jsonl identify stale summaries
+    from core.conversation_manifest import get_valid_record, load_manifest
+    manifest = load_manifest(conversations_dir)
+
     if existing and not overwrite:
         click.echo(f"📝 Found {len(existing)} existing summaries (will merge)")
     elif overwrite and output_path.exists():
@@ -2105,6 +2281,7 @@ def generate_summaries(conversations_dir, output_file, overwrite, timeout):
     summaries = existing.copy()
     failed = []
     skipped = 0
+    stale = 0
 
     # Quota detection and model tracking
     current_model = 'gemini-2.5-pro'  # Start with Pro
@@ -2121,11 +2298,17 @@ def generate_summaries(conversations_dir, output_file, overwrite, timeout):
     ) as bar:
         for html_file in bar:
             conv_id = html_file.stem
+            record = get_valid_record(manifest, html_file)
+            content_hash = record['sha256'] if record else None
 
-            # Skip if already exists and not overwriting
+            # Skip if already exists and not overwriting, unless the conversation
+            # changed since the summary was generated
             if conv_id in existing and not overwrite:
-                skipped += 1
-                continue
+                summarized_hash = existing[conv_id].get('content_hash')
+                if not (content_hash and summarized_hash and content_hash != summarized_hash):
+                    skipped += 1
+                    continue
+                stale += 1
 
             # Generate with current model
             result = generator.generate_summary(html_file, model=current_model)
@@ -2143,6 +2326,8 @@ def generate_summaries(conversations_dir, output_file, overwrite, timeout):
 
             # Track results
             if result:
+                if content_hash:
+                    result['content_hash'] = content_hash
                 summaries[conv_id] = result
                 if result['model'] == 'gemini-2.5-flash':
                     flash_count += 1
@@ -2175,6 +2360,8 @@ def generate_summaries(conversations_dir, output_file, overwrite, timeout):
 
     if skipped > 0:
         click.echo(f"\n⏭️  Skipped: {skipped} (already exist, use --overwrite to regenerate)")
+    if stale > 0:
+        click.echo(f"🔄 Regenerated: {stale} (conversation changed since last summary)")
 
     if failed:
         click.echo(f"\n⚠️  Failed: {len(failed)} conversations")
@@ -2190,5 +2377,79 @@ def generate_summaries(conversations_dir, output_file, overwrite, timeout):
     click.echo(f"   (This will regenerate index.html with AI summaries displayed)")
 
 
+@cli.command()
+@click.argument('query', nargs=-1, required=True)
+@click.option('--phrase', is_flag=True, help='Match the words as one exact phrase')
+@click.option('--prefix', is_flag=True, help='Prefix match (e.g. "resta" finds "restaurant")')
+@click.option('--since', type=click.DateTime(formats=['%Y-%m-%d']), help='Only messages on or after this date (YYYY-MM-DD)')
+@click.option('--until', type=click.DateTime(formats=['%Y-%m-%d']), help='Only messages on or before this date (YYYY-MM-DD)')
+@click.option('--participant', help='Only conversations or senders containing this text (name or phone number)')
+@click.option('--sort', type=click.Choice(['relevance', 'date']), default='relevance', help='Result order (default: relevance)')
+@click.option('--limit', type=int, default=50, help='Maximum number of results (default: 50)')
+@click.pass_context
+def search(ctx, query, phrase, prefix, since, until, participant, sort, limit):
+    """Search converted conversations using the full-text search index.
+
+    The index (search_index.db in the conversations directory) is built during
+    convert or html-generation when --build-search-index is enabled.
+
+    Examples:
+        # Messages containing both words
+        python cli.py search dinner friday
+
+        # Exact phrase within a date range
+        python cli.py search --phrase "see you soon" --since 2023-01-01 --until 2023-12-31
+
+        # Prefix search within one participant's conversations
+        python cli.py search --prefix resta --participant "Susan"
+    """
+    import time
+    from datetime import timedelta
+    from core.search_index import SEARCH_INDEX_FILENAME, SearchIndex
+
+    config = ctx.obj['config']
+    index_path = config.output_dir / SEARCH_INDEX_FILENAME
+    if not index_path.exists():
+        click.echo(f"❌ Search index not found: {index_path}")
+        click.echo("   Run 'python cli.py --build-search-index convert' (or html-generation) first")
+        ctx.exit(1)
+
+    try:
+        index = SearchIndex(index_path)
+    except RuntimeError as e:
+        click.echo(f"❌ {e}")
+        ctx.exit(1)
+
+    try:
+        start = time.time()
+        hits = index.search(
+            ' '.join(query),
+            phrase=phrase,
+            prefix=prefix,
+            since=since,
+            # --until is inclusive of the whole day
+            until=until + timedelta(days=1) if until else None,
+            participant=participant,
+            limit=limit,
+            order_by_date=(sort == 'date'),
+        )
+        elapsed_ms = (time.time() - start) * 1000
+    except ValueError as e:
+        click.echo(f"❌ {e}")
+        ctx.exit(1)
+    finally:
+        index.close()
+
+    if not hits:
+        click.echo(f"🔍 No matches ({elapsed_ms:.1f} ms)")
+        return
+
+    for hit in hits:
+        click.echo(f"{hit.formatted_time}  {hit.conversation_id}.html  {hit.sender}")
+        click.echo(f"   {hit.snippet}")
+    click.echo(f"\n🔍 {len(hits)} result(s) in {elapsed_ms:.1f} ms"
+               + (f" (limited to {limit})" if len(hits) == limit else ""))
+
+
 if __name__ == '__main__':
     cli()
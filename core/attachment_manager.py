@@ -10,11 +10,12 @@ import shutil
 import logging
 import time
 import json
-import hashlib
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
+from .attachment_store import AttachmentStore, cached_hashes
+from .directory_snapshot import get_directory_snapshot
 from .path_manager import PathManager, PathValidationError, PathContext
 
 logger = logging.getLogger(__name__)
@@ -41,21 +42,21 @@ def build_file_location_index(filenames: List[str], path_manager: PathManager) -
             logger.info(f"✅ Using cached attachment index with {len(cached_index)} files")
             return cached_index
         
-        # Cache miss or invalid - build fresh index
+        # Cache miss or invalid - build fresh index from the directory snapshot,
+        # which only re-lists directories that changed since the last run
         filename_set = set(filenames)
         file_index = {}
         
-        # Single directory tree walk to find all files
-        logger.info("Scanning directory tree for file locations...")
-        for root, dirs, files in os.walk(path_manager.processing_dir):
-            for file in files:
-                if file in filename_set:
-                    source_file = Path(root) / file
-                    if source_file.exists():
-                        file_index[file] = source_file.resolve()
-                        
-                        if len(file_index) % 1000 == 0:
-                            logger.info(f"Indexed {len(file_index)}/{len(filenames)} files...")
+        logger.info("Indexing file locations from directory snapshot...")
+        snapshot = get_directory_snapshot(path_manager.processing_dir)
+        root = snapshot.root
+        for relative_path in snapshot.iter_files():
+            file = relative_path.rsplit("/", 1)[-1]
+            if file in filename_set:
+                file_index[file] = root / relative_path
+                
+                if len(file_index) % 1000 == 0:
+                    logger.info(f"Indexed {len(file_index)}/{len(filenames)} files...")
         
         logger.info(f"✅ File location index completed: {len(file_index)}/{len(filenames)} files found")
         
@@ -152,6 +153,10 @@ def _compute_directory_hash(processing_dir: Path) -> str:
     """
     Compute a hash of the directory structure for cache validation.
     
+    Uses the shared directory snapshot: one stat per directory, re-listing
+    only directories whose mtime changed, so files added or removed anywhere
+    in the tree change the hash without walking every file.
+    
     Args:
         processing_dir: Directory to hash
         
@@ -159,20 +164,7 @@ def _compute_directory_hash(processing_dir: Path) -> str:
         Hash string representing directory state
     """
     try:
-        # Use directory modification time, size, and file count for cache validation
-        # Including file count ensures cache is invalidated when files are added/removed
-        dir_stat = processing_dir.stat()
-        calls_dir = processing_dir / "Calls"
-        calls_stat = calls_dir.stat() if calls_dir.exists() else None
-
-        # Count files in processing directory and Calls subdirectory
-        file_count = sum(1 for _ in processing_dir.rglob("*") if _.is_file())
-
-        hash_input = f"{dir_stat.st_mtime}_{dir_stat.st_size}_{file_count}"
-        if calls_stat:
-            hash_input += f"_{calls_stat.st_mtime}_{calls_stat.st_size}"
-
-        return hashlib.md5(hash_input.encode()).hexdigest()[:16]  # Short hash for performance
+        return get_directory_snapshot(processing_dir).digest()[:16]  # Short hash for performance
         
     except Exception:
         # If hashing fails, return random hash to force cache invalidation
@@ -206,6 +198,9 @@ def copy_mapped_attachments(
     
     copied_count = 0
     failed_count = 0
+    # Identical content is linked into attachments/.objects/ instead of copied again
+    store = AttachmentStore(path_manager.attachments_dir)
+    placed = set()
     
     for src, (filename, source_path) in valid_mappings.items():
         try:
@@ -232,8 +227,14 @@ def copy_mapped_attachments(
                 copied_count += 1
                 continue
             
-            # Copy file using absolute paths
-            shutil.copy2(source_path, dest_path)
+            # Several src references can name the same file
+            if dest_path in placed:
+                copied_count += 1
+                continue
+            
+            # Copy file using absolute paths (or link to identical content)
+            store.place(source_path, dest_path, cached_hashes(source_path, None))
+            placed.add(dest_path)
             copied_count += 1
             
             if copied_count % 100 == 0:
@@ -244,6 +245,8 @@ def copy_mapped_attachments(
             failed_count += 1
     
     logger.info(f"✅ Attachment copying completed. Successfully copied {copied_count}, failed {failed_count}")
+    if store.files_linked:
+        logger.info(f"🔗 Deduplicated {store.files_linked} attachments ({store.bytes_saved:,} bytes saved)")
 
 
 def build_attachment_mapping_with_progress(
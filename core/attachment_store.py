@@ -0,0 +1,250 @@
+"""
+Content-addressed attachment store.
+
+Takeout exports contain the same photo many times (forwarded images, group
+MMS fan-out, repeated exports). Instead of writing every copy, attachments
+whose content is already present are linked to one object stored under
+``attachments/.objects/<sha256>``.
+
+Hashing is done in two steps so unique files are never read in full:
+
+1. a pre-hash of the size plus the first and last 64 KB; a file whose
+   (size, pre-hash) has not been seen cannot be a duplicate and is copied
+   straight to its destination
+2. only when the pre-hash collides are the files fully hashed; the first
+   copy is then moved into the store and both paths become links to it
+
+Links are hardlinks, falling back to relative symlinks on filesystems
+without hardlink support and to a plain copy if neither works.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+OBJECTS_DIRNAME = ".objects"
+PREHASH_CHUNK = 64 * 1024
+_READ_CHUNK = 1024 * 1024
+
+# Per-file hash fields kept in HASH_CACHE_FILENAME so reruns can skip hashing
+HASH_FIELDS = ("size", "mtime_ns", "prehash", "sha256")
+
+# Hash cache of the attachment copying stage, next to attachment_mapping.json
+HASH_CACHE_FILENAME = "attachment_hashes.json"
+
+
+def compute_prehash(path: Path, size: int) -> str:
+    """Hash the size and the first and last 64 KB of a file."""
+    digest = hashlib.sha256(str(size).encode("ascii"))
+    with open(path, "rb") as f:
+        digest.update(f.read(PREHASH_CHUNK))
+        if size > 2 * PREHASH_CHUNK:
+            f.seek(-PREHASH_CHUNK, os.SEEK_END)
+            digest.update(f.read(PREHASH_CHUNK))
+        elif size > PREHASH_CHUNK:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def compute_sha256(path: Path) -> str:
+    """Hash the full content of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_hash_cache(output_dir: Path) -> Dict[str, Dict]:
+    """
+    Load the recorded hash fields of copied attachments.
+
+    Returns:
+        Dict mapping attachment filename (e.g. "Calls/photo.jpg") to its
+        hash fields; empty if the cache is missing or unreadable
+    """
+    try:
+        with open(Path(output_dir) / HASH_CACHE_FILENAME, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def save_hash_cache(output_dir: Path, cache: Dict[str, Dict]) -> None:
+    """Write the hash cache atomically (failures are logged, not raised)."""
+    path = Path(output_dir) / HASH_CACHE_FILENAME
+    temp_path = path.with_suffix(".json.tmp")
+    try:
+        with open(temp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f, sort_keys=True)
+        temp_path.replace(path)
+    except OSError as e:
+        logger.warning(f"Could not save attachment hashes to {path}: {e}")
+
+
+def cached_hashes(path: Path, cache: Optional[Dict]) -> Dict:
+    """
+    Return the hash fields for ``path``, reusing ``cache`` if size and mtime match.
+
+    Args:
+        path: File to describe
+        cache: Previously recorded fields (see HASH_FIELDS), or None
+
+    Returns:
+        Dict with size and mtime_ns, plus prehash and sha256 when still valid
+    """
+    stat = path.stat()
+    fields = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if cache and cache.get("size") == stat.st_size and cache.get("mtime_ns") == stat.st_mtime_ns:
+        for key in ("prehash", "sha256"):
+            if cache.get(key):
+                fields[key] = cache[key]
+    return fields
+
+
+class AttachmentStore:
+    """
+    Place attachments into an attachments directory, deduplicating by content.
+
+    Not thread-safe; one store is used by one copying pass.
+    """
+
+    def __init__(self, attachments_dir: Path):
+        """
+        Args:
+            attachments_dir: Output attachments directory; objects go in its .objects/
+        """
+        self.attachments_dir = Path(attachments_dir)
+        self.objects_dir = self.attachments_dir / OBJECTS_DIRNAME
+        # (size, prehash) -> destination of the first file placed with that key
+        self._first_by_prehash: Dict[Tuple[int, str], Path] = {}
+        # Destinations whose content has been fully hashed -> sha256, and back
+        self._sha_by_dest: Dict[Path, str] = {}
+        self._dest_by_sha: Dict[str, Path] = {}
+        self.files_copied = 0
+        self.files_linked = 0
+        self.full_hashes = 0
+        self.bytes_saved = 0
+
+    def object_path(self, sha256: str) -> Path:
+        return self.objects_dir / sha256
+
+    def known_sha256(self, dest: Path) -> Optional[str]:
+        """Full hash of a placed destination, if one was computed or registered."""
+        return self._sha_by_dest.get(dest)
+
+    def register_existing(self, dest: Path, fields: Dict) -> None:
+        """
+        Make an attachment placed by an earlier run available for deduplication.
+
+        Args:
+            dest: Existing destination file
+            fields: Its hash fields; prehash is required, sha256 optional
+        """
+        if not fields.get("prehash"):
+            return
+        self._first_by_prehash.setdefault((fields["size"], fields["prehash"]), dest)
+        if fields.get("sha256"):
+            self._sha_by_dest[dest] = fields["sha256"]
+            self._dest_by_sha.setdefault(fields["sha256"], dest)
+
+    def place(self, source: Path, dest: Path, fields: Dict) -> str:
+        """
+        Copy ``source`` to ``dest``, or link it to identical content already placed.
+
+        Args:
+            source: Source attachment
+            dest: Destination path inside attachments_dir
+            fields: Hash fields from cached_hashes(); prehash and sha256 are
+                filled in when computed
+
+        Returns:
+            "copied" or "linked"
+        """
+        size = fields["size"]
+        if not fields.get("prehash"):
+            fields["prehash"] = compute_prehash(source, size)
+        key = (size, fields["prehash"])
+
+        first = self._first_by_prehash.get(key)
+        if first is None or not first.exists():
+            # Pre-hash not seen before: cannot be a duplicate
+            shutil.copy2(source, dest)
+            self._first_by_prehash[key] = dest
+            if fields.get("sha256"):
+                self._sha_by_dest[dest] = fields["sha256"]
+                self._dest_by_sha.setdefault(fields["sha256"], dest)
+            self.files_copied += 1
+            return "copied"
+
+        sha256 = self._full_hash(source, fields)
+        if first not in self._sha_by_dest:
+            self._sha_by_dest[first] = compute_sha256(first)
+            self.full_hashes += 1
+            self._dest_by_sha.setdefault(self._sha_by_dest[first], first)
+
+        obj = self.object_path(sha256)
+        if not obj.exists():
+            existing = self._dest_by_sha.get(sha256)
+            if existing is None or not existing.exists():
+                # Same pre-hash, different content
+                shutil.copy2(source, dest)
+                self._sha_by_dest[dest] = sha256
+                self._dest_by_sha[sha256] = dest
+                self.files_copied += 1
+                return "copied"
+            # Move the earlier copy into the store and link it back
+            self.objects_dir.mkdir(parents=True, exist_ok=True)
+            self._adopt(existing, obj)
+
+        self._link(obj, dest)
+        self._sha_by_dest[dest] = sha256
+        self.bytes_saved += size
+        self.files_linked += 1
+        return "linked"
+
+    def _full_hash(self, source: Path, fields: Dict) -> str:
+        if not fields.get("sha256"):
+            fields["sha256"] = compute_sha256(source)
+            self.full_hashes += 1
+        return fields["sha256"]
+
+    def _adopt(self, path: Path, obj: Path) -> None:
+        """Make ``obj`` hold the content of ``path`` and turn ``path`` into a link to it."""
+        if path.is_symlink():
+            shutil.copy2(path, obj)
+            self._link(obj, path)
+            return
+        try:
+            os.link(path, obj)  # Same inode; path already is a hardlink to obj
+        except OSError:
+            os.replace(path, obj)
+            self._link(obj, path)
+
+    def _link(self, obj: Path, dest: Path) -> None:
+        if dest.exists() or dest.is_symlink():
+            dest.unlink()
+        try:
+            os.link(obj, dest)
+            return
+        except OSError:
+            pass
+        try:
+            os.symlink(os.path.relpath(obj, dest.parent), dest)
+        except OSError:
+            shutil.copy2(obj, dest)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "files_copied": self.files_copied,
+            "files_linked": self.files_linked,
+            "full_hashes": self.full_hashes,
+            "bytes_saved": self.bytes_saved,
+        }
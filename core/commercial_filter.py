@@ -12,7 +12,9 @@ consists primarily of:
 
 This follows a post-processing approach: conversations are analyzed after all
 messages have been collected, allowing for accurate pattern detection with full
-conversation context.
+conversation context. CommercialClassifier reaches the same verdict
+incrementally, so callers can feed messages as they are written instead of
+re-scanning the whole conversation.
 
 Author: Claude Code
 Date: 2025-10-21
@@ -20,7 +22,7 @@ Date: 2025-10-21
 
 import re
 import logging
-from typing import List, Dict, Set
+from typing import Any, List, Dict, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +58,9 @@ CONFIRMATION_PATTERNS: List[str] = [
     r'unsubscribe\s+successful',
 ]
 
+# All confirmation patterns as one regex, searched once per message
+_CONFIRMATION_REGEX = re.compile("|".join(f"(?:{pattern})" for pattern in CONFIRMATION_PATTERNS))
+
 
 def is_unsubscribe_word(text: str) -> bool:
     """
@@ -111,14 +116,7 @@ def is_confirmation_message(text: str) -> bool:
     if not text:
         return False
 
-    text_lower = text.lower()
-
-    # Check if any confirmation pattern matches
-    for pattern in CONFIRMATION_PATTERNS:
-        if re.search(pattern, text_lower):
-            return True
-
-    return False
+    return _CONFIRMATION_REGEX.search(text.lower()) is not None
 
 
 def is_commercial_conversation(messages: List[Dict], my_identifier: str) -> bool:
@@ -244,3 +242,87 @@ def is_commercial_conversation(messages: List[Dict], my_identifier: str) -> bool
         f"{len(messages_after)} confirmation message(s)"
     )
     return True
+
+
+class CommercialClassifier:
+    """
+    Incremental version of is_commercial_conversation().
+
+    Messages are fed one at a time, in any order, and the verdict is read
+    once the conversation is complete. Instead of keeping the messages the
+    classifier keeps a fixed amount of state, using the rules that
+    is_commercial_conversation() applies after sorting:
+
+    - the user sends exactly one message, and it is only an unsubscribe word
+    - at least one message from the other party comes before it
+    - every message from the other party after it is a confirmation
+
+    "Before" and "after" compare (timestamp, arrival order), matching the
+    stable sort of the batch function.
+
+    Example:
+        classifier = CommercialClassifier("Me")
+        classifier.feed(1000, "+15551234567", "Sale!")
+        classifier.feed(2000, "Me", "STOP")
+        classifier.is_commercial  # True
+    """
+
+    __slots__ = (
+        "my_identifier", "_count", "_user_key", "_excluded",
+        "_first_other_key", "_last_non_confirmation_key",
+    )
+
+    def __init__(self, my_identifier: str = "Me"):
+        self.my_identifier = my_identifier
+        self._count = 0
+        # (timestamp, arrival) of the user's only message
+        self._user_key: Optional[Tuple[Any, int]] = None
+        # Set once the conversation can no longer be commercial
+        self._excluded = False
+        self._first_other_key: Optional[Tuple[Any, int]] = None
+        self._last_non_confirmation_key: Optional[Tuple[Any, int]] = None
+
+    @property
+    def excluded(self) -> bool:
+        """True once later messages can no longer make the conversation commercial."""
+        return self._excluded
+
+    def feed(self, timestamp: Any, sender: str, text: Optional[str]) -> None:
+        """
+        Add one message.
+
+        Args:
+            timestamp: Message timestamp (Unix milliseconds)
+            sender: Sender identifier
+            text: Message text
+        """
+        key = (timestamp, self._count)
+        self._count += 1
+        if self._excluded:
+            return
+
+        if sender == self.my_identifier:
+            if self._user_key is not None or not is_unsubscribe_word(text):
+                # A second user message, or a real reply
+                self._excluded = True
+                return
+            self._user_key = key
+            return
+
+        if self._first_other_key is None or key < self._first_other_key:
+            self._first_other_key = key
+        last = self._last_non_confirmation_key
+        # Only the latest non-confirmation matters, so earlier messages skip the regex
+        if (last is None or key > last) and not is_confirmation_message(text):
+            self._last_non_confirmation_key = key
+
+    @property
+    def is_commercial(self) -> bool:
+        """Verdict for the messages fed so far."""
+        user_key = self._user_key
+        if self._excluded or user_key is None:
+            return False
+        if self._first_other_key is None or self._first_other_key > user_key:
+            return False
+        last = self._last_non_confirmation_key
+        return last is None or last < user_key
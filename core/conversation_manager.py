@@ -5,18 +5,97 @@ This module handles the creation and management of conversation files
 for different senders/groups during SMS/MMS conversion.
 """
 
+import heapq
+import html
 import logging
+import re
+import shutil
 import threading
 import hashlib
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Union, TYPE_CHECKING
-from templates.loader import format_conversation_template
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Union, TYPE_CHECKING
+from templates.loader import (
+    get_template_loader,
+    render_conversation_contents_to,
+    render_conversation_page_to,
+    render_conversation_template_to,
+    render_index_template_to,
+)
+from core.commercial_filter import CommercialClassifier
+from core.thumbnails import load_thumbnail_map
+from core.conversation_manifest import (
+    DigestWriter,
+    build_manifest_record,
+    get_valid_record,
+    load_manifest,
+    merge_manifest_records,
+    write_manifest,
+)
+from core.conversation_pages import (
+    DEFAULT_PAGINATE_BY,
+    DEFAULT_PAGINATE_MESSAGES,
+    PagePlan,
+    contents_rows,
+    install_pages,
+    navigation_html,
+    needs_pagination,
+    page_links,
+    page_path,
+    pages_dir,
+    plan_pages,
+    remove_pages,
+)
+from core.incremental_update import row_time, split_rows
+from utils.hot_path_logging import CounterRegistry, LazyLogger
 
 if TYPE_CHECKING:
     from core.processing_config import ProcessingConfig
 
 logger = logging.getLogger(__name__)
+hot_log = LazyLogger(logger)
+
+DEFAULT_LOCK_SHARDS = 16
+
+# How the user is identified in the sender field (see sms.py)
+MY_IDENTIFIER = "Me"
+
+# href of the attachment links produced for MMS images in sms.py
+_ATTACHMENT_HREF_RE = re.compile(r"""href=['"](attachments/[^'"]+)['"]""")
+
+# Conversation link of an index.html row (see _build_conversation_row)
+_INDEX_ROW_HREF_RE = re.compile(r"<a href='([^']+)' class='file-link'>")
+
+# Index summary counts, in the order of the stats cards
+_INDEX_COUNT_KEYS = ("num_sms", "num_calls", "num_voicemails", "num_img", "num_vcf")
+
+
+class QueuedMessage(NamedTuple):
+    """One message handed to ConversationManager.write_batch()."""
+    timestamp: int  # Unix timestamp in milliseconds
+    sender: str
+    message: str
+    attachments: Optional[list] = None
+    message_type: str = "sms"
+
+
+class _AllShardsLock:
+    """Context manager holding every shard lock, for whole-manager operations."""
+
+    def __init__(self, locks: List[threading.RLock]):
+        self._locks = locks
+
+    def __enter__(self):
+        # Always in index order, so two whole-manager callers cannot deadlock
+        for lock in self._locks:
+            lock.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for lock in reversed(self._locks):
+            lock.release()
+        return False
 
 
 class StringBuilder:
@@ -83,6 +162,7 @@ class ConversationManager:
         batch_size: int = 1000,
         large_dataset: bool = False,
         output_format: str = "html",
+        lock_shards: int = DEFAULT_LOCK_SHARDS,
     ):
         # Validate parameters
         if not isinstance(output_dir, Path):
@@ -97,6 +177,8 @@ class ConversationManager:
             raise ValueError(f"batch_size must be a positive integer, got {batch_size}")
         if not isinstance(output_format, str) or output_format != "html":
             raise ValueError(f"output_format must be 'html', got {output_format}")
+        if not isinstance(lock_shards, int) or lock_shards <= 0:
+            raise ValueError(f"lock_shards must be a positive integer, got {lock_shards}")
 
         self.output_dir = output_dir
         # Create output directory if it doesn't exist
@@ -106,13 +188,18 @@ class ConversationManager:
         )  # Maps conversation_id to file handle and message count
         self.conversation_stats = {}  # Maps conversation_id to statistics
         self.conversation_content_types = {}  # Maps conversation_id to content type tracking
+        self.event_counters = CounterRegistry()  # Per-message events, summarized at finalize
         self.write_buffer_size = (
             buffer_size  # Configurable buffer size for efficient I/O
         )
         self.message_buffer = {}  # Buffer messages before writing to reduce I/O
 
-        # Thread-safety for concurrent writes and file creation
-        self._lock = threading.RLock()
+        # Thread-safety for concurrent writes and file creation. Per-conversation
+        # state is guarded by one of lock_shards locks (chosen by conversation id
+        # hash), so workers writing different conversations rarely contend;
+        # _lock takes all shards for operations spanning every conversation.
+        self._shard_locks = [threading.RLock() for _ in range(lock_shards)]
+        self._lock = _AllShardsLock(self._shard_locks)
 
         # Pre-allocate common data structures for better performance
         self._empty_list = []
@@ -126,6 +213,21 @@ class ConversationManager:
 
         self.output_format = output_format
 
+        # Lazily loaded conversations.manifest.jsonl (reset after each finalize)
+        self._manifest: Optional[Dict[str, Dict]] = None
+
+        # Optional full-text index fed with every written message (see core.search_index)
+        self.search_index = None
+
+        # Optional cross-export fingerprint set for merged runs (see core.message_dedup)
+        self.deduplicator = None
+
+        # Lazily loaded attachment -> preview map (see core.thumbnails)
+        self._thumbnails: Optional[Dict[str, str]] = None
+
+        # Optional pages of an output being updated in place (see core.incremental_update)
+        self.prior_output = None
+
     def get_conversation_id(
         self, participants: List[str], is_group: bool = False, phone_lookup_manager=None
     ) -> str:
@@ -228,6 +330,12 @@ class ConversationManager:
             filename = self.get_conversation_filename(conversation_id)
             # Ensure the output directory exists
             filename.parent.mkdir(parents=True, exist_ok=True)
+            # An existing page being updated is replaced only once its merged
+            # version is complete
+            replaces = None
+            if self.prior_output is not None and self.prior_output.page(conversation_id) is not None:
+                replaces = filename
+                filename = filename.with_name(filename.name + ".partial")
             file_handle = open(
                 filename, "w", encoding="utf-8", buffering=self.write_buffer_size
             )
@@ -238,7 +346,11 @@ class ConversationManager:
                 "buffer_size": 0,
                 "max_buffer_size": self.write_buffer_size
                 * 2,  # Allow buffer to grow up to 2x
+                # Fed as messages arrive so finalize needs no extra pass
+                "commercial": CommercialClassifier(MY_IDENTIFIER),
             }
+            if replaces is not None:
+                self.conversation_files[conversation_id]["replaces"] = replaces
 
             # Initialize conversation stats with consistent keys
             self.conversation_stats[conversation_id] = {
@@ -250,9 +362,13 @@ class ConversationManager:
                 "latest_message_time": "No messages"
             }
 
+    def _shard_lock(self, conversation_id: str) -> threading.RLock:
+        """Lock guarding the state of one conversation."""
+        return self._shard_locks[hash(conversation_id) % len(self._shard_locks)]
+
     def write_message(self, conversation_id: str, message_content: str, timestamp: int, config: Optional["ProcessingConfig"] = None):
         """Write a message to the conversation file with optimized buffering."""
-        with self._lock:
+        with self._shard_lock(conversation_id):
             # Ensure the conversation file is open
             if conversation_id not in self.conversation_files:
                 self._open_conversation_file(conversation_id, config)
@@ -279,81 +395,163 @@ class ConversationManager:
         config: Optional["ProcessingConfig"] = None,  # Add config for date filtering
     ):
         """Write a message to a conversation file with content."""
-        with self._lock:
-            # 1. Apply date filtering at message write time
-            if self._should_skip_by_date_filter(timestamp, config):
-                logger.debug(f"Skipping message due to date filter: timestamp={timestamp}")
-                return  # Don't write the message
-            
-            # 2. Track conversation content types for call-only filtering
-            logger.debug(f"🔍 CALL-ONLY DEBUG: write_message_with_content - config={config is not None}, message_type={message_type}, conversation_id={conversation_id}")
-            if config:
-                self._track_conversation_content_type(conversation_id, message_type, message, attachments)
-            else:
-                logger.debug(f"🔍 CALL-ONLY DEBUG: Config is None - content tracking SKIPPED for {conversation_id}")
-            
-            # 3. NEW: Check if conversation should be created (EARLY FILTERING)
-            if not self._should_create_conversation_file(conversation_id, config):
-                logger.debug(f"Early filtering: Skipping message for filtered conversation: {conversation_id}")
-                return  # Don't create file or write message
-            
-            # 4. Ensure the conversation file is open
-            if conversation_id not in self.conversation_files:
-                self._open_conversation_file(conversation_id, config)
+        with self._shard_lock(conversation_id):
+            self._write_message_locked(
+                conversation_id, timestamp, sender, message, attachments, message_type, config
+            )
 
-            file_info = self.conversation_files.get(conversation_id)
-            if not file_info:
-                logger.error(f"Failed to get file_info for {conversation_id} after opening.")
-                return
+    def write_batch(
+        self,
+        conversation_id: str,
+        messages: Iterable[QueuedMessage],
+        config: Optional["ProcessingConfig"] = None,
+        stats: Optional[Dict[str, int]] = None,
+    ) -> int:
+        """
+        Write several messages of one conversation under a single lock acquisition.
 
-            # Convert timestamp to formatted string for display
-            formatted_time = self._format_timestamp(timestamp)
-            
-            # Append the message to the internal buffer with actual timestamp
-            message_data = {
-                "text": message,
-                "attachments": attachments or [],
-                "sender": sender,
-                "formatted_time": formatted_time,
-                "raw_content": None,  # Not needed for HTML output
+        Equivalent to calling write_message_with_content() and
+        update_latest_timestamp() for each message, then update_stats() once.
+
+        Args:
+            conversation_id: Conversation receiving every message
+            messages: QueuedMessage tuples, in the order they were read
+            config: Processing configuration (date and call-only filtering)
+            stats: Counts to add with update_stats(), if any
+
+        Returns:
+            Number of messages written (after filtering)
+        """
+        written = 0
+        with self._shard_lock(conversation_id):
+            for queued in messages:
+                if self._write_message_locked(
+                    conversation_id,
+                    queued.timestamp,
+                    queued.sender,
+                    queued.message,
+                    queued.attachments,
+                    queued.message_type,
+                    config,
+                ):
+                    written += 1
+                self._update_latest_timestamp_locked(conversation_id, queued.timestamp)
+            if stats:
+                self._update_stats_locked(conversation_id, stats)
+        return written
+
+    def _write_message_locked(
+        self,
+        conversation_id: str,
+        timestamp: int,
+        sender: str,
+        message: str,
+        attachments: Optional[list],
+        message_type: str,
+        config: Optional["ProcessingConfig"],
+    ) -> bool:
+        """Body of write_message_with_content(); the caller holds the conversation's shard lock."""
+        # 1. Apply date filtering at message write time
+        if self._should_skip_by_date_filter(timestamp, config):
+            self.event_counters.increment("date_filter.skipped")
+            return False  # Don't write the message
+
+        # 1b. Drop messages already written from an earlier merged source
+        if self.deduplicator is not None and self.deduplicator.is_duplicate(
+            conversation_id, timestamp, sender, message, attachments, message_type
+        ):
+            self.event_counters.increment("dedup.dropped")
+            return False
+
+        # 1c. Drop messages already on the page being updated (--update-from)
+        if self.prior_output is not None and self.prior_output.is_on_page(
+            conversation_id,
+            self._build_message_row(
+                self._format_timestamp(timestamp), sender, message, self._build_attachments_html(attachments or [])
+            ),
+            message_type,
+            attachments,
+        ):
+            self.event_counters.increment("update.already_on_page")
+            return False
+        
+        # 2. Track conversation content types for call-only filtering
+        if config:
+            self._track_conversation_content_type(conversation_id, message_type, message, attachments)
+        else:
+            self.event_counters.increment("content_tracking.skipped_no_config")
+        
+        # 3. NEW: Check if conversation should be created (EARLY FILTERING)
+        if not self._should_create_conversation_file(conversation_id, config):
+            logger.debug(f"Early filtering: Skipping message for filtered conversation: {conversation_id}")
+            return False  # Don't create file or write message
+        
+        # 4. Ensure the conversation file is open
+        if conversation_id not in self.conversation_files:
+            self._open_conversation_file(conversation_id, config)
+
+        file_info = self.conversation_files.get(conversation_id)
+        if not file_info:
+            logger.error(f"Failed to get file_info for {conversation_id} after opening.")
+            return False
+
+        # Convert timestamp to formatted string for display
+        formatted_time = self._format_timestamp(timestamp)
+        
+        # Append the message to the internal buffer with actual timestamp
+        message_data = {
+            "text": message,
+            "attachments": attachments or [],
+            "sender": sender,
+            "formatted_time": formatted_time,
+            "raw_content": None,  # Not needed for HTML output
+        }
+        file_info["messages"].append((timestamp, message_data))  # Use actual timestamp
+        file_info["buffer_size"] += len(message)
+        classifier = file_info.get("commercial")
+        if classifier is not None:
+            classifier.feed(timestamp, sender, message)
+
+        # Update conversation statistics based on message type
+        # Ensure stats are initialized (defensive programming)
+        if conversation_id not in self.conversation_stats:
+            self.conversation_stats[conversation_id] = {
+                "sms_count": 0,
+                "calls_count": 0,
+                "voicemails_count": 0,
+                "attachments_count": 0,
+                "latest_timestamp": 0,
+                "latest_message_time": "No messages"
             }
-            file_info["messages"].append((timestamp, message_data))  # Use actual timestamp
-            file_info["buffer_size"] += len(message)
-
-            # Update conversation statistics based on message type
-            # Ensure stats are initialized (defensive programming)
-            if conversation_id not in self.conversation_stats:
-                self.conversation_stats[conversation_id] = {
-                    "sms_count": 0,
-                    "calls_count": 0,
-                    "voicemails_count": 0,
-                    "attachments_count": 0,
-                    "latest_timestamp": 0,
-                    "latest_message_time": "No messages"
-                }
-            
-            # Track different message types separately
-            if message_type == "sms":
-                self.conversation_stats[conversation_id]['sms_count'] += 1
-                pass  # SMS count incremented
-            elif message_type == "call":
-                self.conversation_stats[conversation_id]['calls_count'] += 1
-            elif message_type == "voicemail":
-                self.conversation_stats[conversation_id]['voicemails_count'] += 1
-            else:
-                # Default to SMS for unknown types
-                self.conversation_stats[conversation_id]['sms_count'] += 1
-            
-            # Count attachments if present
-            if attachments:
-                self.conversation_stats[conversation_id]['attachments_count'] += len(attachments)
-            
-            # Update latest message info
+        
+        # Track different message types separately
+        if message_type == "sms":
+            self.conversation_stats[conversation_id]['sms_count'] += 1
+            pass  # SMS count incremented
+        elif message_type == "call":
+            self.conversation_stats[conversation_id]['calls_count'] += 1
+        elif message_type == "voicemail":
+            self.conversation_stats[conversation_id]['voicemails_count'] += 1
+        else:
+            # Default to SMS for unknown types
+            self.conversation_stats[conversation_id]['sms_count'] += 1
+        
+        # Count attachments if present
+        if attachments:
+            self.conversation_stats[conversation_id]['attachments_count'] += len(attachments)
+        
+        # Update latest message info (files arrive in any order, so keep the newest)
+        latest = self.conversation_stats[conversation_id].get('latest_timestamp', 0)
+        if type(timestamp) is not type(latest) or timestamp >= latest:
             self.conversation_stats[conversation_id]['latest_timestamp'] = timestamp
             self.conversation_stats[conversation_id]['latest_message_time'] = formatted_time
 
-            # Memory-only buffering: No premature flushing to files
-            # All messages are kept in memory until finalization
+        if self.search_index is not None:
+            self.search_index.add_message(conversation_id, sender, timestamp, message)
+
+        # Memory-only buffering: No premature flushing to files
+        # All messages are kept in memory until finalization
+        return True
 
     # _flush_buffer_to_file method removed - using memory-only buffering
     # Messages are kept in memory until finalization to ensure clean HTML output
@@ -389,6 +587,8 @@ class ConversationManager:
                             except Exception as e:
                                 # Log file close errors instead of silently swallowing them
                                 logger.warning(f"Failed to close file for {conversation_id}: {e}")
+                        if "replaces" in file_info:
+                            Path(file_info["file"].name).unlink(missing_ok=True)
                         # Remove from tracking
                         del self.conversation_files[conversation_id]
 
@@ -401,6 +601,9 @@ class ConversationManager:
                 commercial_conversations = []
                 # THREAD-SAFETY FIX: Create snapshot to prevent "dictionary changed size" error
                 for conversation_id, file_info in list(self.conversation_files.items()):
+                    # A page being updated was judged on all its messages before
+                    if "replaces" in file_info:
+                        continue
                     if self._is_commercial_conversation(conversation_id, file_info, config):
                         commercial_conversations.append(conversation_id)
                         logger.debug(f"Removing commercial conversation: {conversation_id}")
@@ -431,6 +634,7 @@ class ConversationManager:
                                 logger.debug(f"Deleted commercial conversation file: {filename}")
                             except Exception as e:
                                 logger.warning(f"Failed to delete file {filename}: {e}")
+                        remove_pages(self.output_dir, conversation_id)
 
                         # Remove from tracking
                         del self.conversation_files[conversation_id]
@@ -439,16 +643,30 @@ class ConversationManager:
                     if conversation_id in self.conversation_stats:
                         del self.conversation_stats[conversation_id]
 
+                    if self.search_index is not None:
+                        self.search_index.remove_conversation(conversation_id)
+
             # Process all remaining conversation files (call-only filtering already handled)
             # THREAD-SAFETY FIX: Create snapshot to prevent "dictionary changed size" error
+            manifest_records = {}
             for conversation_id, file_info in list(self.conversation_files.items()):
                 try:
                     # Sort messages by timestamp (using tuple unpacking for better performance)
                     sorted_messages = sorted(file_info["messages"], key=lambda x: x[0])
 
-                    self._finalize_html_file(
-                        file_info, sorted_messages, conversation_id
+                    prior_page = None
+                    if "replaces" in file_info:
+                        prior_page = self.prior_output.page(conversation_id)
+
+                    record = self._finalize_html_file(
+                        file_info, sorted_messages, conversation_id, prior_page, config
                     )
+                    if "replaces" in file_info:
+                        self._replace_prior_page(file_info, conversation_id, record)
+                    if record:
+                        manifest_records[conversation_id] = record
+                        if self.prior_output is not None:
+                            self.prior_output.rewritten.add(conversation_id)
 
                 except Exception as e:
                     logger.error(
@@ -460,6 +678,19 @@ class ConversationManager:
             # Clear the conversation files dictionary
             self.conversation_files.clear()
 
+            if self.search_index is not None:
+                self.search_index.flush()
+
+            self.event_counters.log_summary(logger, "Conversation content tracking")
+
+            # Record per-conversation stats so later steps need not re-parse the HTML
+            if manifest_records:
+                try:
+                    write_manifest(self.output_dir, manifest_records)
+                    self._manifest = None
+                except OSError as e:
+                    logger.warning(f"Failed to write conversation manifest: {e}")
+
     def generate_index_html(self, stats: Dict[str, int], elapsed_time: float):
         """Generate an index.html file with summary stats and conversation file links."""
         try:
@@ -473,13 +704,6 @@ class ConversationManager:
     def _generate_index_html_with_template(self, stats: Dict[str, int], elapsed_time: float):
         """Generate index.html using the template (preferred method)."""
         try:
-            # Load the index template
-            template_path = Path(__file__).parent.parent / "templates" / "index.html"
-            if not template_path.exists():
-                raise FileNotFoundError(f"Index template not found: {template_path}")
-            
-            template_content = template_path.read_text()
-            
             # Get conversation files (exclude index.html and .archived.html files)
             conversation_files = []
             for file_path in self.output_dir.glob("*.html"):
@@ -498,9 +722,6 @@ class ConversationManager:
                 logger.info("Using internal ConversationManager stats for index generation")
                 effective_stats = internal_stats
             
-            # Build conversation rows
-            conversation_rows = self._build_conversation_rows(conversation_files)
-            
             # Calculate total messages
             total_messages = (
                 effective_stats.get("num_sms", 0) + 
@@ -518,16 +739,15 @@ class ConversationManager:
                 'num_img': effective_stats.get('num_img', 0),
                 'num_vcf': effective_stats.get('num_vcf', 0),
                 'total_messages': total_messages,
-                'conversation_rows': conversation_rows,
+                # Streamed row by row into the file
+                'conversation_rows': self._iter_conversation_rows(conversation_files),
                 'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             }
             
-            # Replace template variables
-            html_content = template_content.format(**template_vars)
-            
             # Write the index file
             index_file = self.output_dir / "index.html"
-            index_file.write_text(html_content, encoding='utf-8')
+            with open(index_file, "w", encoding="utf-8", buffering=self.write_buffer_size) as f:
+                render_index_template_to(f, **template_vars)
             
             logger.info(f"Generated index.html with {len(conversation_files)} conversations using template")
             return
@@ -536,12 +756,95 @@ class ConversationManager:
             logger.error(f"Template-based index generation failed: {e}")
             raise
     
+    def update_index_html(
+        self, stats: Dict[str, int], elapsed_time: float, conversation_ids: Iterable[str]
+    ) -> bool:
+        """
+        Patch index.html after an incremental update.
+
+        Rows of the given conversations are rebuilt, added or (if their page
+        is gone) removed; every other row is kept as written. The summary
+        counts grow by stats.
+
+        Args:
+            stats: Counts of the messages added by this run
+            elapsed_time: Duration of this run in seconds
+            conversation_ids: Conversations whose pages were written or removed
+
+        Returns:
+            False if there is no index.html this can patch; call
+            generate_index_html() instead
+        """
+        index_file = self.output_dir / "index.html"
+        try:
+            slots = get_template_loader().get_compiled_template("index").parse(
+                index_file.read_text(encoding="utf-8")
+            )
+            counts = {key: int(slots[key]) + stats.get(key, 0) for key in _INDEX_COUNT_KEYS}
+        except (OSError, ValueError) as e:
+            logger.info(f"index.html cannot be patched ({e}); regenerating it")
+            return False
+
+        rows = {}
+        for row in split_rows(slots["conversation_rows"]):
+            match = _INDEX_ROW_HREF_RE.search(row)
+            if match:
+                rows[match.group(1)] = row
+
+        summaries = None
+        patched = 0
+        for conversation_id in conversation_ids:
+            file_path = self.get_conversation_filename(conversation_id)
+            if not file_path.exists():
+                rows.pop(file_path.name, None)
+                continue
+            if summaries is None:
+                summaries = self._load_summaries()
+            rows[file_path.name] = self._build_conversation_row(file_path, summaries)
+            patched += 1
+
+        ordered = [rows[name] for name in sorted(rows)]
+        with open(index_file, "w", encoding="utf-8", buffering=self.write_buffer_size) as f:
+            render_index_template_to(
+                f,
+                elapsed_time=f"{elapsed_time:.2f}",
+                total_conversations=len(ordered),
+                total_messages=counts["num_sms"] + counts["num_calls"] + counts["num_voicemails"],
+                conversation_rows="\n".join(ordered) if ordered else
+                "<tr><td colspan='9'><em>No conversation files found</em></td></tr>",
+                timestamp=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                **counts,
+            )
+
+        logger.info(f"Patched {patched} of {len(ordered)} rows in index.html")
+        return True
+
     def _build_conversation_rows(self, conversation_files: List[Path]) -> str:
         """Build HTML table rows for conversation files with AI summaries."""
+        return "".join(self._iter_conversation_rows(conversation_files))
+
+    def _iter_conversation_rows(self, conversation_files: List[Path]) -> Iterator[str]:
+        """Yield the index table rows for conversation files, newline-separated."""
         if not conversation_files:
-            return "<tr><td colspan='9'><em>No conversation files found</em></td></tr>"
+            yield "<tr><td colspan='9'><em>No conversation files found</em></td></tr>"
+            return
+
+        summaries = self._load_summaries()
+
+        first = True
+        for file_path in conversation_files:
+            try:
+                row = self._build_conversation_row(file_path, summaries)
+            except Exception as e:
+                logger.warning(f"Failed to build row for {file_path.name}: {e}")
+                continue
+            if not first:
+                yield "\n"
+            first = False
+            yield row
 
-        # Load AI summaries from JSON if available
+    def _load_summaries(self) -> Dict[str, Dict]:
+        """Load AI summaries from summaries.json, if available."""
         summaries = {}
         summaries_path = self.output_dir / 'summaries.json'
         if summaries_path.exists():
@@ -555,26 +858,25 @@ class ConversationManager:
                 logger.warning(f"Could not load summaries.json: {e}")
         else:
             logger.info("No summaries.json found - AI summaries column will show 'No AI summary available'")
+        return summaries
 
-        rows = []
-        for file_path in conversation_files:
-            try:
-                # Get file stats
-                file_size = file_path.stat().st_size
-                file_size_str = f"{file_size / 1024:.1f} KB" if file_size > 0 else "0 KB"
-
-                # Get conversation stats if available
-                conversation_id = file_path.stem
-                conv_stats = self._get_conversation_stats_accurate(conversation_id)
-                # Debug info removed for cleaner output
-
-                # Get AI summary (full text, no truncation)
-                summary_text = "No AI summary available"
-                if conversation_id in summaries:
-                    summary_text = summaries[conversation_id]['summary']
-
-                # Build row with 9 columns (added AI summary column)
-                row = f"""
+    def _build_conversation_row(self, file_path: Path, summaries: Dict[str, Dict]) -> str:
+        """Build the index table row of one conversation file."""
+        # Get file stats
+        file_size = file_path.stat().st_size
+        file_size_str = f"{file_size / 1024:.1f} KB" if file_size > 0 else "0 KB"
+
+        # Get conversation stats if available
+        conversation_id = file_path.stem
+        conv_stats = self._get_conversation_stats_accurate(conversation_id)
+
+        # Get AI summary (full text, no truncation)
+        summary_text = "No AI summary available"
+        if conversation_id in summaries:
+            summary_text = summaries[conversation_id]['summary']
+
+        # Build row with 9 columns (added AI summary column)
+        return f"""
                 <tr>
                     <td><a href='{file_path.name}' class='file-link'>{conversation_id}</a></td>
                     <td>HTML</td>
@@ -586,12 +888,6 @@ class ConversationManager:
                     <td class='metadata'>{conv_stats.get('latest_message_time', 'No messages')}</td>
                     <td class='summary-cell'>{summary_text}</td>
                 </tr>"""
-                rows.append(row)
-            except Exception as e:
-                logger.warning(f"Failed to build row for {file_path.name}: {e}")
-                continue
-
-        return "\n".join(rows)
     
     def _generate_index_html_manual(self, stats: Dict[str, int], elapsed_time: float):
         """Generate index.html manually (fallback method)."""
@@ -936,12 +1232,29 @@ class ConversationManager:
                     "latest_message_time": stats.get("latest_message_time", "No messages")
                 }
 
+            # Then the manifest written at finalize time
+            record = get_valid_record(self._get_manifest(), file_path)
+            if record:
+                return {
+                    "sms_count": record.get("sms_count", 0),
+                    "calls_count": record.get("call_count", 0),
+                    "voicemails_count": record.get("voicemail_count", 0),
+                    "attachments_count": record.get("attachment_count", 0),
+                    "latest_message_time": record.get("latest_message_time", "No messages"),
+                }
+
             # Fallback to file parsing if needed
             return self._parse_file_for_stats(file_path)
         except Exception as e:
             logger.error(f"Failed to extract stats from {file_path}: {e}")
             return self._get_default_stats()
 
+    def _get_manifest(self) -> Dict[str, Dict]:
+        """Load conversations.manifest.jsonl once per finalize."""
+        if self._manifest is None:
+            self._manifest = load_manifest(self.output_dir)
+        return self._manifest
+
     def _parse_file_for_stats(self, file_path: Path) -> Dict[str, Union[int, str]]:
         """Parse file content to extract statistics (fallback method)."""
         try:
@@ -949,6 +1262,11 @@ class ConversationManager:
             with open(file_path, "r", encoding="utf-8") as f:
                 content = f.read()
 
+            # The messages of a paginated conversation are on its pages
+            links = page_links(content)
+            if links:
+                content = "".join((file_path.parent / link).read_text(encoding="utf-8") for link in links)
+
             # Use HTML parser for HTML files
             from bs4 import BeautifulSoup
             soup = BeautifulSoup(content, "html.parser")
@@ -1041,9 +1359,31 @@ class ConversationManager:
 
 
     def _finalize_html_file(
-        self, file_info: dict, sorted_messages: list, conversation_id: str
-    ):
-        """Finalize an HTML conversation file."""
+        self,
+        file_info: dict,
+        sorted_messages: list,
+        conversation_id: str,
+        prior_page: Optional[Dict] = None,
+        config: Optional["ProcessingConfig"] = None,
+    ) -> Optional[Dict]:
+        """
+        Finalize an HTML conversation file.
+
+        A conversation over the pagination threshold is written as a table of
+        contents, with its messages on pages under pages/<conversation_id>/
+        (see core.conversation_pages).
+
+        Args:
+            file_info: Open conversation file and buffered messages
+            sorted_messages: (timestamp, message_data) tuples in time order
+            conversation_id: Conversation ID
+            prior_page: Page being updated (see core.incremental_update); its
+                rows are merged with the new messages
+            config: Processing configuration (pagination thresholds)
+
+        Returns:
+            Manifest record for the written file, or None if an error page was written
+        """
         try:
             # Validate message data
             valid_messages = [msg for msg in sorted_messages if self._validate_message_data(msg[1])]
@@ -1051,46 +1391,189 @@ class ConversationManager:
             if not valid_messages:
                 logger.warning(f"No valid messages found for conversation {conversation_id}")
                 self._write_error_page(file_info, conversation_id, "No valid messages found")
-                return
+                return None
 
-            # Build message rows from sorted messages
-            message_rows = []
-            for timestamp, message_data in valid_messages:
-                # Extract message content from dictionary (HTML output only)
-                text = message_data.get('text', '')
-                attachments = message_data.get('attachments', [])
-                sender = message_data.get('sender', 'Unknown')
-                
-                # Use pre-formatted timestamp from message data
-                formatted_time = message_data.get('formatted_time', self._format_timestamp(timestamp))
-                
-                # Build attachments HTML
-                attachments_html = self._build_attachments_html(attachments)
-                
-                # Create message row
-                row = self._build_message_row(formatted_time, sender, text, attachments_html)
-                message_rows.append(row)
-            
             # Get conversation metadata
             date_range = self._get_conversation_date_range(valid_messages)
-            
-            # Build HTML using template
-            html_content = format_conversation_template(
-                conversation_id=conversation_id,
-                total_messages=len(valid_messages),
-                message_rows="\n".join(message_rows),
-                date_range=date_range
-            )
-            
-            # Write and close file
-            file_info["file"].write(html_content)
+            total_messages = len(valid_messages)
+
+            prior_rows = prior_page["rows"] if prior_page else []
+            if prior_rows:
+                # Merge into the time-ordered rows already on the page
+                first = min(row_time(prior_rows[0]), self._format_timestamp(valid_messages[0][0]))[:10]
+                last = max(row_time(prior_rows[-1]), self._format_timestamp(valid_messages[-1][0]))[:10]
+                date_range = first if first == last else f"{first} to {last}"
+                total_messages += len(prior_rows)
+
+            pages = self._plan_pages(valid_messages, prior_rows, config)
+
+            # Stream the page: message rows go straight into the buffered file
+            writer = DigestWriter(file_info["file"])
+            if pages:
+                self._write_pages(conversation_id, pages, self._conversation_rows(valid_messages, prior_rows))
+                render_conversation_contents_to(
+                    writer,
+                    conversation_id=conversation_id,
+                    total_messages=total_messages,
+                    date_range=date_range,
+                    page_count=len(pages),
+                    page_rows=contents_rows(conversation_id, pages),
+                )
+            else:
+                remove_pages(self.output_dir, conversation_id)
+                render_conversation_template_to(
+                    writer,
+                    conversation_id=conversation_id,
+                    total_messages=total_messages,
+                    message_rows=self._separated_rows(self._conversation_rows(valid_messages, prior_rows)),
+                    date_range=date_range
+                )
             file_info["file"].close()
             
-            logger.info(f"Successfully finalized conversation {conversation_id} with {len(valid_messages)} messages")
+            on_pages = f" on {len(pages)} pages" if pages else ""
+            logger.info(f"Successfully finalized conversation {conversation_id} with {total_messages} messages{on_pages}")
+
+            record = build_manifest_record(
+                conversation_id,
+                timestamps=[timestamp for timestamp, _ in valid_messages],
+                senders=(message_data.get('sender', '') for _, message_data in valid_messages),
+                attachments=(
+                    href
+                    for _, message_data in valid_messages
+                    for href in self._attachment_hrefs(message_data.get('attachments', []))
+                ),
+                stats=self.conversation_stats.get(conversation_id, {}),
+                content_digest=writer.digest,
+            )
+            if prior_page:
+                record = merge_manifest_records(
+                    prior_page["record"] or {"message_count": len(prior_rows)}, record
+                )
+            if pages:
+                record["pages"] = [page_path(conversation_id, page.name) for page in pages]
+            return record
             
         except Exception as e:
             logger.error(f"ERROR: Failed to finalize HTML file for {conversation_id}: {e}")
             self._write_error_page(file_info, conversation_id, str(e))
+            return None
+
+    def _plan_pages(
+        self, valid_messages: list, prior_rows: List[str], config: Optional["ProcessingConfig"]
+    ) -> List[PagePlan]:
+        """Pages to split a conversation into, or [] to write it as a single page."""
+        if config is None:
+            max_messages, max_bytes, by = DEFAULT_PAGINATE_MESSAGES, 0, DEFAULT_PAGINATE_BY
+        else:
+            max_messages = getattr(config, "paginate_messages", DEFAULT_PAGINATE_MESSAGES)
+            max_bytes = getattr(config, "paginate_bytes", 0)
+            by = getattr(config, "paginate_by", DEFAULT_PAGINATE_BY)
+
+        total_messages = len(valid_messages) + len(prior_rows)
+        if not max_bytes and not needs_pagination(total_messages, 0, max_messages, 0):
+            return []
+
+        sizes = None
+        if max_bytes:
+            # Rendering sizes take one extra pass over the rows
+            times, sizes = [], []
+            for row in self._conversation_rows(valid_messages, prior_rows):
+                times.append(row_time(row))
+                sizes.append(len(row.encode("utf-8")) + 1)
+            if not needs_pagination(total_messages, sum(sizes), max_messages, max_bytes):
+                return []
+        else:
+            new_times = (
+                message_data.get('formatted_time') or self._format_timestamp(timestamp)
+                for timestamp, message_data in valid_messages
+            )
+            times = list(heapq.merge((row_time(row) for row in prior_rows), new_times))
+
+        return plan_pages(times, by, max_messages, max_bytes, sizes)
+
+    def _conversation_rows(self, valid_messages: list, prior_rows: List[str]) -> Iterator[str]:
+        """Message rows of a conversation in time order, merged with the rows of a page being updated."""
+        if prior_rows:
+            return heapq.merge(prior_rows, self._message_rows(valid_messages), key=row_time)
+        return self._message_rows(valid_messages)
+
+    def _write_pages(self, conversation_id: str, pages: List[PagePlan], rows: Iterator[str]):
+        """
+        Stream the rows of a paginated conversation into its pages, one page at a time.
+
+        Pages are written to a staging directory that replaces the
+        conversation's previous pages once all are complete.
+        """
+        target = pages_dir(self.output_dir, conversation_id)
+        staging = target.with_name(target.name + ".partial")
+        shutil.rmtree(staging, ignore_errors=True)
+        staging.mkdir(parents=True)
+        try:
+            rows = iter(rows)
+            for index, page in enumerate(pages):
+                page_file = staging / f"{page.name}.html"
+                with open(page_file, "w", encoding="utf-8", buffering=self.write_buffer_size) as f:
+                    render_conversation_page_to(
+                        f,
+                        conversation_id=conversation_id,
+                        page_label=page.label,
+                        total_messages=page.count,
+                        date_range=page.date_range,
+                        navigation=navigation_html(conversation_id, pages, index),
+                        message_rows=self._separated_rows(islice(rows, page.count)),
+                    )
+            install_pages(staging, target)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+    def _replace_prior_page(self, file_info: dict, conversation_id: str, record: Optional[Dict]):
+        """Move a merged page over the page it updates, or drop it if finalizing failed."""
+        partial = Path(file_info["file"].name)
+        if record is None:
+            partial.unlink(missing_ok=True)
+            logger.warning(f"Kept the previous page of {conversation_id}; merging new messages failed")
+            return
+        partial.replace(file_info["replaces"])
+
+        # Index rows describe the whole page, not only this run's messages
+        self.conversation_stats.setdefault(conversation_id, {}).update({
+            "sms_count": record["sms_count"],
+            "calls_count": record["call_count"],
+            "voicemails_count": record["voicemail_count"],
+            "attachments_count": record["attachment_count"],
+            "latest_message_time": record["latest_message_time"],
+        })
+
+    def _iter_message_rows(self, valid_messages: list) -> Iterator[str]:
+        """Yield the message rows of a conversation page, newline-separated."""
+        return self._separated_rows(self._message_rows(valid_messages))
+
+    @staticmethod
+    def _separated_rows(rows: Iterable[str]) -> Iterator[str]:
+        """Yield rows newline-separated."""
+        for index, row in enumerate(rows):
+            if index:
+                yield "\n"
+            yield row
+
+    def _message_rows(self, valid_messages: list) -> Iterator[str]:
+        """Yield the message rows of a conversation page."""
+        for timestamp, message_data in valid_messages:
+            # Extract message content from dictionary (HTML output only)
+            text = message_data.get('text', '')
+            attachments = message_data.get('attachments', [])
+            sender = message_data.get('sender', 'Unknown')
+            
+            # Use pre-formatted timestamp from message data (format only when missing)
+            formatted_time = message_data.get('formatted_time')
+            if formatted_time is None:
+                formatted_time = self._format_timestamp(timestamp)
+            
+            # Build attachments HTML
+            attachments_html = self._build_attachments_html(attachments)
+            
+            yield self._build_message_row(formatted_time, sender, text, attachments_html)
 
     # _extract_message_content function removed - only HTML output supported
 
@@ -1133,12 +1616,40 @@ class ConversationManager:
         attachment_links = []
         for attachment in attachments:
             if isinstance(attachment, dict) and 'filename' in attachment:
-                attachment_links.append(f'<a href="{attachment["filename"]}" class="attachment">📎 {attachment["filename"]}</a>')
+                preview = self._build_thumbnail_html(attachment["filename"])
+                attachment_links.append(
+                    preview or f'<a href="{attachment["filename"]}" class="attachment">📎 {attachment["filename"]}</a>'
+                )
             elif isinstance(attachment, str) and attachment:
-                attachment_links.append(f'<span class="attachment">📎 {attachment}</span>')
+                match = _ATTACHMENT_HREF_RE.search(attachment)
+                preview = self._build_thumbnail_html(match.group(1)) if match else None
+                attachment_links.append(preview or f'<span class="attachment">📎 {attachment}</span>')
         
         return "<br>".join(attachment_links) if attachment_links else ""
 
+    @staticmethod
+    def _attachment_hrefs(attachments: list) -> Iterator[str]:
+        """Yield the attachment paths linked from a message (dict filenames or sms.py's <a href> strings)."""
+        for attachment in attachments:
+            if isinstance(attachment, dict):
+                if attachment.get('filename'):
+                    yield attachment['filename']
+            elif isinstance(attachment, str):
+                match = _ATTACHMENT_HREF_RE.search(attachment)
+                if match:
+                    yield match.group(1)
+
+    def _build_thumbnail_html(self, href: str) -> Optional[str]:
+        """Lazily loaded preview linking to the original, if one was generated."""
+        if self._thumbnails is None:
+            self._thumbnails = load_thumbnail_map(self.output_dir)
+        thumbnail = self._thumbnails.get(href)
+        if not thumbnail:
+            return None
+        href = html.escape(href)
+        return (f'<a href="{href}" class="attachment" target="_blank">'
+                f'<img loading="lazy" src="{html.escape(thumbnail)}" alt="{href}"></a>')
+
     def _build_message_row(self, formatted_time: str, sender: str, text: str, attachments_html: str) -> str:
         """Build a single message row HTML."""
         # Escape HTML characters in text
@@ -1219,8 +1730,7 @@ class ConversationManager:
 
     def _track_conversation_content_type(self, conversation_id: str, message_type: str, message: str, attachments: list = None):
         """Track what types of content exist in each conversation for call-only filtering."""
-        logger.debug(f"🔍 CALL-ONLY DEBUG: Tracking content for {conversation_id}, type={message_type}, message='{message[:50]}{'...' if len(message) > 50 else ''}'")
-
+        count = self.event_counters.increment
         # THREAD-SAFETY FIX: Use setdefault() for atomic initialization (prevents check-then-act race)
         content = self.conversation_content_types.setdefault(conversation_id, {
             "has_sms": False,
@@ -1231,33 +1741,32 @@ class ConversationManager:
             "call_count": 0
         })
 
-        # Log only if this was a new initialization
         if content["total_messages"] == 0:
-            logger.debug(f"🔍 CALL-ONLY DEBUG: Initialized content tracking for {conversation_id}")
+            count("content_tracking.conversations")
         content["total_messages"] += 1
         
         if message_type == "sms":
             content["has_sms"] = True
             content["has_calls_only"] = False
-            logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} marked as SMS (has_calls_only=False)")
+            count("content_tracking.sms")
         elif message_type == "mms" or (attachments and len(attachments) > 0):
             content["has_mms"] = True
             content["has_calls_only"] = False
-            logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} marked as MMS (has_calls_only=False)")
+            count("content_tracking.mms")
         elif message_type == "voicemail":
             # Check if voicemail has actual transcription content
             if message and message.strip() and message != "[Voicemail entry]":
                 content["has_voicemail_with_text"] = True
                 content["has_calls_only"] = False
-                logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} marked as voicemail with text (has_calls_only=False)")
+                count("content_tracking.voicemail_with_text")
             else:
-                logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} voicemail without text (has_calls_only unchanged)")
+                count("content_tracking.voicemail_without_text")
         elif message_type == "call":
             content["call_count"] += 1
-            logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} call added (call_count={content['call_count']}, has_calls_only={content['has_calls_only']})")
+            count("content_tracking.call")
             # Calls don't change has_calls_only status
         else:
-            logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} unknown message type: {message_type}")
+            count("content_tracking.unknown_type")
 
     def _should_create_conversation_file(self, conversation_id: str, config: Optional["ProcessingConfig"]) -> bool:
         """
@@ -1268,11 +1777,15 @@ class ConversationManager:
         """
         if not config:
             return True  # No filtering without config
+
+        # A page being updated passed the filters on all of its messages
+        if self.prior_output is not None and self.prior_output.page(conversation_id) is not None:
+            return True
         
         # Check call-only filtering
         if not config.include_call_only_conversations:
             if self._is_call_only_conversation(conversation_id):
-                logger.debug(f"Early filtering: Skipping call-only conversation {conversation_id}")
+                self.event_counters.increment("early_filter.call_only_skipped")
                 return False
         
         return True
@@ -1290,7 +1803,6 @@ class ConversationManager:
         if conversation_id not in self.conversation_content_types:
             # If we haven't tracked content yet, assume it's not call-only
             # This handles the case where the first message is being processed
-            logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} not in content_types, returning False")
             return False
         
         content = self.conversation_content_types[conversation_id]
@@ -1311,7 +1823,7 @@ class ConversationManager:
             has_call_or_voicemail_content
         )
         
-        logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} analysis: has_calls_only={content['has_calls_only']}, has_sms={content['has_sms']}, has_mms={content['has_mms']}, has_voicemail_with_text={content['has_voicemail_with_text']}, call_count={content['call_count']}, total_messages={content['total_messages']} -> is_call_only={is_call_only}")
+        hot_log.debug("🔍 CALL-ONLY DEBUG: %s analysis: %s -> is_call_only=%s", conversation_id, content, is_call_only)
 
         return is_call_only
 
@@ -1319,10 +1831,11 @@ class ConversationManager:
         self, conversation_id: str, file_info: Dict, config: Optional["ProcessingConfig"]
     ) -> bool:
         """
-        Determine if a conversation is commercial/spam using post-processing analysis.
+        Determine if a conversation is commercial/spam.
 
-        This method is called during finalization when we have access to the full
-        conversation context, allowing accurate pattern detection.
+        The verdict comes from the CommercialClassifier fed by
+        write_message_with_content(); the buffered messages are only
+        scanned when the conversation has no classifier.
 
         Args:
             conversation_id: The conversation identifier
@@ -1332,36 +1845,23 @@ class ConversationManager:
         Returns:
             True if conversation appears to be commercial/spam, False otherwise
         """
-        from core.commercial_filter import is_commercial_conversation
-
-        # Extract messages from file_info
         # Message format: (timestamp, message_data)
         # where message_data = {"text": str, "sender": str, "attachments": list, ...}
         raw_messages = file_info.get("messages", [])
-
         if not raw_messages:
             return False
 
-        # Convert to format expected by commercial_filter
-        messages_for_analysis = []
-        for timestamp, msg_data in raw_messages:
-            messages_for_analysis.append({
-                "timestamp": timestamp,
-                "sender": msg_data.get("sender", ""),
-                "text": msg_data.get("text", ""),
-            })
-
-        # Determine user identifier (typically "Me")
-        # The user is identified as "Me" in sender field (see sms.py:3773)
-        my_identifier = "Me"
-
-        # Call the commercial filter
-        is_commercial = is_commercial_conversation(messages_for_analysis, my_identifier)
+        classifier = file_info.get("commercial")
+        if classifier is None:
+            classifier = CommercialClassifier(MY_IDENTIFIER)
+            for timestamp, msg_data in raw_messages:
+                classifier.feed(timestamp, msg_data.get("sender", ""), msg_data.get("text", ""))
 
+        is_commercial = classifier.is_commercial
         if is_commercial:
             logger.info(
                 f"Commercial conversation detected: {conversation_id} "
-                f"({len(messages_for_analysis)} messages)"
+                f"({len(raw_messages)} messages)"
             )
 
         return is_commercial
@@ -1406,6 +1906,10 @@ class ConversationManager:
 
     def update_stats(self, conversation_id: str, stats: Dict[str, int]):
         """Update statistics for a conversation with enhanced attachment tracking."""
+        with self._shard_lock(conversation_id):
+            self._update_stats_locked(conversation_id, stats)
+
+    def _update_stats_locked(self, conversation_id: str, stats: Dict[str, int]):
         if conversation_id not in self.conversation_stats:
             # Initialize conversation stats with proper structure
             self.conversation_stats[conversation_id] = {
@@ -1438,6 +1942,10 @@ class ConversationManager:
 
     def update_latest_timestamp(self, conversation_id: str, timestamp: int):
         """Update the latest message timestamp for a conversation."""
+        with self._shard_lock(conversation_id):
+            self._update_latest_timestamp_locked(conversation_id, timestamp)
+
+    def _update_latest_timestamp_locked(self, conversation_id: str, timestamp: int):
         if conversation_id not in self.conversation_stats:
             # Initialize conversation stats if not exists
             self.conversation_stats[conversation_id] = {
@@ -0,0 +1,251 @@
+"""
+Per-conversation stats manifest.
+
+ConversationManager already knows every conversation's counts, date range,
+senders and attachments when finalize_conversation_files() runs, so it writes
+them to ``conversations.manifest.jsonl`` next to the HTML files: one JSON
+record per line, keyed by conversation_id, with the byte size and SHA-256 of
+the generated file.
+
+Index generation, create-distribution-tarball, generate-summaries and the
+analysis tools read the manifest instead of re-parsing the HTML output. A
+record is only trusted while its ``bytes`` still match the file on disk;
+anything else falls back to the old parsing path.
+"""
+
+import hashlib
+import json
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = "conversations.manifest.jsonl"
+MANIFEST_VERSION = 1
+
+
+def _format_ms(timestamp: int) -> str:
+    return datetime.fromtimestamp(timestamp / 1000).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class DigestWriter:
+    """Text file wrapper that tracks the UTF-8 size and SHA-256 of what is written."""
+
+    __slots__ = ("_file", "_sha256", "bytes_written")
+
+    def __init__(self, fileobj: TextIO):
+        self._file = fileobj
+        self._sha256 = hashlib.sha256()
+        self.bytes_written = 0
+
+    def write(self, text: str) -> int:
+        data = text.encode("utf-8")
+        self._sha256.update(data)
+        self.bytes_written += len(data)
+        return self._file.write(text)
+
+    @property
+    def digest(self) -> Tuple[int, str]:
+        """(byte size, SHA-256 hex digest) of everything written so far."""
+        return self.bytes_written, self._sha256.hexdigest()
+
+
+def build_manifest_record(
+    conversation_id: str,
+    timestamps: List[int],
+    senders: Iterable[str],
+    attachments: Iterable[str],
+    stats: Dict,
+    content: Optional[bytes] = None,
+    content_digest: Optional[Tuple[int, str]] = None,
+) -> Dict:
+    """
+    Build the manifest record for one finalized conversation.
+
+    Args:
+        conversation_id: Conversation ID (file stem)
+        timestamps: Message timestamps in Unix milliseconds
+        senders: Sender display names of the written messages
+        attachments: Attachment hrefs linked from the conversation page
+        stats: ConversationManager.conversation_stats entry for the conversation
+        content: Exact bytes written to the conversation file
+        content_digest: (byte size, SHA-256) of the file, e.g. from a
+            DigestWriter, instead of content
+
+    Returns:
+        Manifest record dictionary
+    """
+    if content_digest is None:
+        content_digest = (len(content), hashlib.sha256(content).hexdigest())
+    first_ts = min(timestamps) if timestamps else None
+    last_ts = max(timestamps) if timestamps else None
+    return {
+        "v": MANIFEST_VERSION,
+        "conversation_id": conversation_id,
+        "file": f"{conversation_id}.html",
+        "message_count": len(timestamps),
+        # ConversationManager has used both key families over time
+        "sms_count": stats.get("sms_count", 0) or stats.get("num_sms", 0),
+        "call_count": stats.get("calls_count", 0) or stats.get("num_calls", 0),
+        "voicemail_count": stats.get("voicemails_count", 0) or stats.get("num_voicemails", 0),
+        "attachment_count": stats.get("attachments_count", 0) or stats.get("real_attachments", 0),
+        "first_timestamp": first_ts,
+        "last_timestamp": last_ts,
+        "first_message_time": _format_ms(first_ts) if first_ts is not None else None,
+        "latest_message_time": _format_ms(last_ts) if last_ts is not None else "No messages",
+        "participants": sorted({s for s in senders if s and s != "Me"}),
+        "attachments": sorted(set(attachments)),
+        "bytes": content_digest[0],
+        "sha256": content_digest[1],
+    }
+
+
+def merge_manifest_records(previous: Optional[Dict], update: Dict) -> Dict:
+    """
+    Combine the record of a page's earlier messages with that of messages merged into it.
+
+    Counts add up, the date range and participant/attachment lists widen,
+    and the size and hash come from update (the rewritten file).
+
+    Args:
+        previous: Record of the page before the update (None if unknown)
+        update: Record built from the newly merged messages and the new file
+
+    Returns:
+        Record describing the whole rewritten page
+    """
+    if not previous:
+        return update
+    merged = dict(update)
+    for key in ("message_count", "sms_count", "call_count", "voicemail_count", "attachment_count"):
+        merged[key] = previous.get(key, 0) + update.get(key, 0)
+
+    firsts = [r["first_timestamp"] for r in (previous, update) if r.get("first_timestamp") is not None]
+    lasts = [r["last_timestamp"] for r in (previous, update) if r.get("last_timestamp") is not None]
+    if firsts:
+        merged["first_timestamp"] = min(firsts)
+        merged["first_message_time"] = _format_ms(merged["first_timestamp"])
+    if lasts:
+        merged["last_timestamp"] = max(lasts)
+        merged["latest_message_time"] = _format_ms(merged["last_timestamp"])
+
+    merged["participants"] = sorted(set(previous.get("participants", [])) | set(update.get("participants", [])))
+    merged["attachments"] = sorted(set(previous.get("attachments", [])) | set(update.get("attachments", [])))
+    return merged
+
+
+def get_manifest_path(output_dir: Path) -> Path:
+    """Return the manifest path for a conversations directory."""
+    return Path(output_dir) / MANIFEST_FILENAME
+
+
+def load_manifest(output_dir: Path) -> Dict[str, Dict]:
+    """
+    Load the manifest of a conversations directory.
+
+    Args:
+        output_dir: Conversations output directory
+
+    Returns:
+        Dictionary mapping conversation_id to its record (empty if missing)
+    """
+    manifest_path = get_manifest_path(output_dir)
+    records: Dict[str, Dict] = {}
+    if not manifest_path.exists():
+        return records
+
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Skipping malformed manifest line {line_number} in {manifest_path}")
+                    continue
+                if record.get("v") == MANIFEST_VERSION and "conversation_id" in record:
+                    records[record["conversation_id"]] = record
+    except OSError as e:
+        logger.warning(f"Could not read conversation manifest: {e}")
+        return {}
+
+    return records
+
+
+def write_manifest(output_dir: Path, records: Dict[str, Dict], merge: bool = True) -> Path:
+    """
+    Write the manifest atomically.
+
+    With merge=True, records from a previous run are kept as long as their
+    conversation file still exists, so incremental runs extend the manifest.
+
+    Args:
+        output_dir: Conversations output directory
+        records: Records to write, keyed by conversation_id
+        merge: Keep existing records not superseded by records
+
+    Returns:
+        Path of the written manifest
+    """
+    output_dir = Path(output_dir)
+    manifest_path = get_manifest_path(output_dir)
+
+    merged: Dict[str, Dict] = {}
+    if merge:
+        for conversation_id, record in load_manifest(output_dir).items():
+            if (output_dir / record.get("file", f"{conversation_id}.html")).exists():
+                merged[conversation_id] = record
+    merged.update(records)
+
+    temp_path = manifest_path.with_suffix(".tmp")
+    with open(temp_path, "w", encoding="utf-8") as f:
+        for conversation_id in sorted(merged):
+            f.write(json.dumps(merged[conversation_id], ensure_ascii=False, sort_keys=True))
+            f.write("\n")
+    temp_path.replace(manifest_path)
+
+    logger.debug(f"Wrote conversation manifest: {len(merged)} conversations")
+    return manifest_path
+
+
+def get_valid_record(manifest: Dict[str, Dict], file_path: Path) -> Optional[Dict]:
+    """
+    Return the manifest record for a conversation file if it still matches.
+
+    Args:
+        manifest: Loaded manifest
+        file_path: Conversation HTML file
+
+    Returns:
+        The record, or None if missing or the file size no longer matches
+    """
+    record = manifest.get(file_path.stem)
+    if record is None:
+        return None
+    try:
+        if file_path.stat().st_size != record.get("bytes"):
+            return None
+    except OSError:
+        return None
+    return record
+
+
+def manifest_covers(manifest: Dict[str, Dict], conversation_files: Iterable[Path]) -> bool:
+    """Return True if the manifest has a record for every conversation file."""
+    return all(f.stem in manifest for f in conversation_files)
+
+
+def manifest_digest(manifest: Dict[str, Dict], conversation_files: Iterable[Path]) -> str:
+    """
+    Hash the content hashes of the given conversation files.
+
+    Callers must check manifest_covers() first.
+    """
+    hasher = hashlib.sha256()
+    for file_path in sorted(conversation_files, key=lambda x: x.name):
+        hasher.update(file_path.name.encode("utf-8"))
+        hasher.update(manifest[file_path.stem]["sha256"].encode("ascii"))
+    return hasher.hexdigest()
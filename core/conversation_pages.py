@@ -0,0 +1,201 @@
+"""
+Pagination of very large conversations.
+
+Long-running threads can reach 100k+ messages, which makes a single page
+slow to write and unusable in a browser. finalize_conversation_files()
+splits a conversation with more messages (or rendered bytes) than the
+configured threshold: its ``<id>.html`` becomes a table of contents, and the
+messages are streamed into ``pages/<id>/``, one page per calendar year or per
+fixed-size chunk, each linking to the previous and next page.
+
+The conversation keeps its single ``<id>.html``, so index.html, the manifest
+and everything that lists ``*.html`` in the output directory see it as
+before. The manifest record lists the page files under ``"pages"``.
+"""
+
+import html
+import re
+import shutil
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import quote, unquote
+
+PAGES_DIRNAME = "pages"
+PAGINATE_MODES = ("year", "size")
+
+# Used when ConversationManager is finalized without a ProcessingConfig
+# (keep in sync with the ProcessingConfig defaults)
+DEFAULT_PAGINATE_MESSAGES = 20000
+DEFAULT_PAGINATE_BY = "year"
+
+# Page link of a table of contents row (see contents_rows)
+_PAGE_HREF_RE = re.compile(r"<a href='([^']+)' class='page-link'>")
+
+
+@dataclass
+class PagePlan:
+    """One page of a paginated conversation."""
+
+    name: str  # File stem under pages/<conversation_id>/
+    label: str  # Shown in the page title, navigation and table of contents
+    start: int  # Index of the page's first message in the conversation
+    count: int
+    first_time: str
+    last_time: str
+
+    @property
+    def date_range(self) -> str:
+        return format_date_range(self.first_time, self.last_time)
+
+
+def format_date_range(first_time: str, last_time: str) -> str:
+    """Date range of two formatted times, as the conversation header shows it."""
+    first, last = first_time[:10], last_time[:10]
+    return first if first == last else f"{first} to {last}"
+
+
+def needs_pagination(message_count: int, byte_size: int, max_messages: int, max_bytes: int) -> bool:
+    """Check a conversation against the thresholds (0 disables a threshold)."""
+    return bool(max_messages and message_count > max_messages) or bool(max_bytes and byte_size > max_bytes)
+
+
+def plan_pages(
+    times: Sequence[str],
+    by: str = DEFAULT_PAGINATE_BY,
+    max_messages: int = DEFAULT_PAGINATE_MESSAGES,
+    max_bytes: int = 0,
+    sizes: Optional[Sequence[int]] = None,
+) -> List[PagePlan]:
+    """
+    Split a time-ordered conversation into pages.
+
+    Args:
+        times: Formatted time ("YYYY-MM-DD HH:MM:SS") of every message, in order
+        by: "year" for a page per calendar year, "size" for fixed-size pages
+        max_messages: Most messages on a page (0 for no limit)
+        max_bytes: Most rendered bytes on a page (0 for no limit)
+        sizes: Rendered byte size of every message (required with max_bytes)
+
+    Returns:
+        Pages in order. With by="year", years over the limits are split
+        further into parts.
+
+    Raises:
+        ValueError: If by is not one of PAGINATE_MODES
+    """
+    if by not in PAGINATE_MODES:
+        raise ValueError(f"Unknown pagination mode '{by}', expected one of {PAGINATE_MODES}")
+
+    if by == "year":
+        groups = []
+        start = 0
+        for index in range(1, len(times) + 1):
+            if index == len(times) or times[index][:4] != times[start][:4]:
+                groups.append((times[start][:4], start, index))
+                start = index
+    else:
+        groups = [("", 0, len(times))]
+
+    chunked = [(key, _chunk(start, end, max_messages, max_bytes, sizes)) for key, start, end in groups]
+    page_count = sum(len(chunks) for _, chunks in chunked)
+
+    plans: List[PagePlan] = []
+    for key, chunks in chunked:
+        for part, (start, end) in enumerate(chunks, 1):
+            if not key:
+                name, label = f"page-{len(plans) + 1}", f"Page {len(plans) + 1} of {page_count}"
+            elif len(chunks) == 1:
+                name, label = key, key
+            else:
+                name, label = f"{key}-{part}", f"{key}, part {part} of {len(chunks)}"
+            plans.append(PagePlan(name, label, start, end - start, times[start], times[end - 1]))
+    return plans
+
+
+def _chunk(
+    start: int, end: int, max_messages: int, max_bytes: int, sizes: Optional[Sequence[int]]
+) -> List[Tuple[int, int]]:
+    """Split rows [start, end) into (start, end) runs within the limits."""
+    chunks = []
+    chunk_start, chunk_bytes = start, 0
+    for index in range(start, end):
+        size = sizes[index] if max_bytes else 0
+        if index > chunk_start and (
+            (max_messages and index - chunk_start >= max_messages)
+            or (max_bytes and chunk_bytes + size > max_bytes)
+        ):
+            chunks.append((chunk_start, index))
+            chunk_start, chunk_bytes = index, 0
+        chunk_bytes += size
+    if end > chunk_start:
+        chunks.append((chunk_start, end))
+    return chunks
+
+
+def pages_dir(output_dir: Path, conversation_id: str) -> Path:
+    """Directory holding the pages of a conversation."""
+    return Path(output_dir) / PAGES_DIRNAME / conversation_id
+
+
+def page_path(conversation_id: str, name: str) -> str:
+    """Path of a page relative to the output directory (as recorded in the manifest)."""
+    return f"{PAGES_DIRNAME}/{conversation_id}/{name}.html"
+
+
+def page_links(contents_html: str) -> List[str]:
+    """
+    Pages linked from a table of contents, in order.
+
+    Returns:
+        Paths relative to the output directory ([] for an ordinary conversation page)
+    """
+    return [unquote(href) for href in _PAGE_HREF_RE.findall(contents_html)]
+
+
+def navigation_html(conversation_id: str, plans: Sequence[PagePlan], index: int) -> str:
+    """Previous/contents/next links of a page (hrefs resolve from the output directory)."""
+    links = []
+    if index > 0:
+        previous = plans[index - 1]
+        links.append(f"<a href='{quote(page_path(conversation_id, previous.name))}' rel='prev'>← {previous.label}</a>")
+    else:
+        links.append("<span class='disabled'>← Previous</span>")
+    links.append(f"<a href='{quote(conversation_id + '.html')}'>Contents</a>")
+    if index + 1 < len(plans):
+        following = plans[index + 1]
+        links.append(f"<a href='{quote(page_path(conversation_id, following.name))}' rel='next'>{following.label} →</a>")
+    else:
+        links.append("<span class='disabled'>Next →</span>")
+    links.append("<a href='index.html'>All conversations</a>")
+    return f"<div class='page-nav'>{''.join(links)}</div>"
+
+
+def contents_rows(conversation_id: str, plans: Iterable[PagePlan]) -> Iterator[str]:
+    """Yield the table of contents rows of a paginated conversation, newline-separated."""
+    for index, plan in enumerate(plans):
+        if index:
+            yield "\n"
+        yield f"""
+                <tr>
+                    <td><a href='{quote(page_path(conversation_id, plan.name))}' class='page-link'>{html.escape(plan.label)}</a></td>
+                    <td class='metadata'>{plan.date_range}</td>
+                    <td>{plan.count}</td>
+                </tr>"""
+
+
+def install_pages(staging: Path, target: Path) -> None:
+    """Move freshly written pages over a conversation's previous pages."""
+    previous = target.with_name(target.name + ".old")
+    if target.exists():
+        shutil.rmtree(previous, ignore_errors=True)
+        target.rename(previous)
+    staging.rename(target)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def remove_pages(output_dir: Path, conversation_id: str) -> None:
+    """Remove pages left by an earlier run (the conversation is now a single page or gone)."""
+    directory = pages_dir(output_dir, conversation_id)
+    if directory.is_dir():
+        shutil.rmtree(directory, ignore_errors=True)
@@ -0,0 +1,243 @@
+"""
+Directory snapshot cache for the processing directory.
+
+The attachment caches used to validate themselves by walking the whole
+processing directory and counting files, which costs about as much as
+rebuilding them. A DirectorySnapshot instead records, for every directory,
+its mtime and its listing (files, subdirectories, entry count). Validating
+it is one stat() per directory; only directories whose mtime moved are
+re-listed, and a directory only counts as changed when its listing differs.
+
+One snapshot per processing directory is persisted to
+``.cache/directory_snapshot.json`` and shared by the attachment location
+index, the optimized attachment mapping cache and the attachment_mapping
+pipeline stage.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_CACHE_DIR = ".cache"
+SNAPSHOT_FILENAME = "directory_snapshot.json"
+SNAPSHOT_VERSION = 1
+
+# Generated output that lives inside the processing directory by default
+SNAPSHOT_EXCLUDED_DIRS = frozenset({"conversations"})
+
+
+@dataclass
+class DirectoryRecord:
+    """Listing of one directory at a given mtime."""
+    mtime_ns: int
+    files: List[str] = field(default_factory=list)
+    subdirs: List[str] = field(default_factory=list)
+
+    @property
+    def entry_count(self) -> int:
+        return len(self.files) + len(self.subdirs)
+
+
+def _list_directory(path: Path, excluded_dirs: frozenset, is_root: bool) -> Tuple[List[str], List[str]]:
+    """List visible files and subdirectories of one directory."""
+    files: List[str] = []
+    subdirs: List[str] = []
+    with os.scandir(path) as entries:
+        for entry in entries:
+            name = entry.name
+            if name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if not (is_root and name in excluded_dirs):
+                        subdirs.append(name)
+                elif entry.is_file():
+                    files.append(name)
+            except OSError:
+                continue
+    files.sort()
+    subdirs.sort()
+    return files, subdirs
+
+
+class DirectorySnapshot:
+    """Per-directory mtimes and listings for a directory tree."""
+
+    def __init__(self, root: Path, excluded_dirs: frozenset = SNAPSHOT_EXCLUDED_DIRS):
+        self.root = Path(root)
+        self.excluded_dirs = frozenset(excluded_dirs)
+        self.directories: Dict[str, DirectoryRecord] = {}
+        self._digest: Optional[str] = None
+
+    def refresh(self) -> Set[str]:
+        """
+        Bring the snapshot up to date with the filesystem.
+
+        Stats every known directory and re-lists only those whose mtime
+        changed; new subdirectories are listed as they are discovered.
+
+        Returns:
+            Relative paths of directories whose listing changed (added,
+            removed or modified); "" is the root
+        """
+        changed: Set[str] = set()
+        seen: Set[str] = set()
+        stack = [""]
+
+        while stack:
+            rel = stack.pop()
+            path = self.root / rel if rel else self.root
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            seen.add(rel)
+
+            record = self.directories.get(rel)
+            if record is None or record.mtime_ns != mtime_ns:
+                try:
+                    files, subdirs = _list_directory(path, self.excluded_dirs, rel == "")
+                except OSError as e:
+                    logger.debug(f"Cannot list {path}: {e}")
+                    continue
+                if record is None or record.files != files or record.subdirs != subdirs:
+                    changed.add(rel)
+                record = DirectoryRecord(mtime_ns, files, subdirs)
+                self.directories[rel] = record
+
+            stack.extend(f"{rel}/{name}" if rel else name for name in record.subdirs)
+
+        for rel in set(self.directories) - seen:
+            del self.directories[rel]
+            changed.add(rel)
+
+        if changed:
+            self._digest = None
+        return changed
+
+    def iter_files(self) -> Iterator[str]:
+        """Yield every file path relative to the root, using '/' separators."""
+        for rel in sorted(self.directories):
+            prefix = f"{rel}/" if rel else ""
+            for name in self.directories[rel].files:
+                yield prefix + name
+
+    def file_count(self, suffix: Optional[str] = None) -> int:
+        """Count files, optionally only those ending with suffix (case-insensitive)."""
+        if suffix is None:
+            return sum(len(record.files) for record in self.directories.values())
+        suffix = suffix.lower()
+        return sum(
+            1 for record in self.directories.values()
+            for name in record.files if name.lower().endswith(suffix)
+        )
+
+    def digest(self) -> str:
+        """Stable hash of the tree's listings (independent of mtimes)."""
+        if self._digest is None:
+            hasher = hashlib.sha256()
+            for rel in sorted(self.directories):
+                record = self.directories[rel]
+                hasher.update(f"{rel}\0{record.entry_count}\0".encode("utf-8"))
+                hasher.update("\0".join(record.files).encode("utf-8"))
+                hasher.update(b"\1")
+                hasher.update("\0".join(record.subdirs).encode("utf-8"))
+                hasher.update(b"\n")
+            self._digest = hasher.hexdigest()
+        return self._digest
+
+    def to_dict(self) -> Dict:
+        return {
+            "version": SNAPSHOT_VERSION,
+            "root": str(self.root),
+            "directories": {
+                rel: {
+                    "mtime_ns": record.mtime_ns,
+                    "entry_count": record.entry_count,
+                    "files": record.files,
+                    "subdirs": record.subdirs,
+                }
+                for rel, record in self.directories.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, root: Path, data: Dict) -> Optional["DirectorySnapshot"]:
+        """Rebuild a snapshot; returns None if the data is stale or malformed."""
+        if data.get("version") != SNAPSHOT_VERSION or data.get("root") != str(root):
+            return None
+        snapshot = cls(root)
+        try:
+            for rel, entry in data["directories"].items():
+                snapshot.directories[rel] = DirectoryRecord(
+                    int(entry["mtime_ns"]), list(entry["files"]), list(entry["subdirs"])
+                )
+        except (KeyError, TypeError, ValueError):
+            return None
+        return snapshot
+
+    def save(self, path: Path) -> None:
+        """Write the snapshot atomically."""
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+        temp_path.write_text(json.dumps(self.to_dict()))
+        temp_path.replace(path)
+
+
+_snapshots: Dict[Path, DirectorySnapshot] = {}
+_snapshots_lock = threading.Lock()
+
+
+def get_directory_snapshot(root: Path, persist: bool = True) -> DirectorySnapshot:
+    """
+    Return an up-to-date snapshot of root, reusing in-process and on-disk state.
+
+    Args:
+        root: Directory to snapshot (normally the processing directory)
+        persist: Save the refreshed snapshot to root/.cache when it changed
+
+    Returns:
+        DirectorySnapshot reflecting the current directory listings
+    """
+    root = Path(root).resolve()
+    cache_path = root / SNAPSHOT_CACHE_DIR / SNAPSHOT_FILENAME
+
+    with _snapshots_lock:
+        snapshot = _snapshots.get(root)
+        if snapshot is None and cache_path.exists():
+            try:
+                snapshot = DirectorySnapshot.from_dict(root, json.loads(cache_path.read_text()))
+            except (OSError, json.JSONDecodeError) as e:
+                logger.debug(f"Ignoring unreadable directory snapshot: {e}")
+        if snapshot is None:
+            snapshot = DirectorySnapshot(root)
+
+        if persist and root.is_dir():
+            # Create the cache directory first so it does not bump the root's mtime later
+            cache_path.parent.mkdir(exist_ok=True)
+
+        changed = snapshot.refresh()
+        _snapshots[root] = snapshot
+
+        if changed:
+            logger.debug(f"Directory snapshot: {len(changed)} directories changed under {root}")
+        if persist and changed and root.is_dir():
+            try:
+                snapshot.save(cache_path)
+            except OSError as e:
+                logger.debug(f"Failed to save directory snapshot: {e}")
+
+        return snapshot
+
+
+def clear_snapshot_memo() -> None:
+    """Forget in-process snapshots (the on-disk cache is left alone)."""
+    with _snapshots_lock:
+        _snapshots.clear()
@@ -0,0 +1,147 @@
+"""
+Discovery-time date pre-filter for Takeout HTML files.
+
+Date filters (--older-than / --newer-than) are otherwise applied per message,
+after each file has been parsed. Most files can be ruled out much earlier:
+
+- Takeout filenames encode a UTC timestamp, e.g.
+  ``Name - Text - 2019-03-04T10_11_12Z.html``: the call time for call and
+  voicemail files, the first message for text conversations
+- messages are written in order, so the last ``<abbr class="dt">`` near the
+  end of a conversation file is its newest message
+
+A file is skipped only when its whole span lies outside the window; files
+whose span cannot be determined are always kept.
+"""
+
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple, Union, TYPE_CHECKING
+
+from core.filtering_service import FilteringService
+
+if TYPE_CHECKING:
+    from core.processing_config import ProcessingConfig
+    from core.run_context import RunContext
+
+logger = logging.getLogger(__name__)
+
+# Strict: " - " then YYYY-MM-DDTHH_MM_SSZ, an optional "-N" duplicate suffix and .html
+_FILENAME_TIMESTAMP_PATTERN = re.compile(
+    r" - (\d{4})-(\d{2})-(\d{2})T(\d{2})_(\d{2})_(\d{2})Z(?:-\d+)?\.html\Z"
+)
+_DT_PATTERN = re.compile(rb'<abbr class="dt" title="([^"]+)"')
+_SINGLE_EVENT_TYPES = (" - Missed - ", " - Placed - ", " - Received - ", " - Voicemail - ", " - Recorded - ")
+TAIL_SIZES = (8 * 1024, 64 * 1024)
+
+
+def filename_timestamp(filename: str) -> Optional[int]:
+    """
+    Parse the UTC timestamp encoded in a Takeout filename.
+
+    Returns:
+        Unix timestamp in milliseconds, or None if the name does not match
+    """
+    match = _FILENAME_TIMESTAMP_PATTERN.search(filename)
+    if not match:
+        return None
+    try:
+        moment = datetime(*(int(part) for part in match.groups()), tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return int(moment.timestamp() * 1000)
+
+
+def _parse_dt_title(value: str) -> Optional[int]:
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        return None
+
+
+def last_message_timestamp(path: Path, size: int) -> Optional[int]:
+    """
+    Read the newest message time from the file tail.
+
+    Reads the last 8 KB, then the last 64 KB if no timestamp was found.
+
+    Returns:
+        Unix timestamp in milliseconds, or None
+    """
+    try:
+        with open(path, "rb") as f:
+            for tail_size in TAIL_SIZES:
+                f.seek(max(0, size - tail_size))
+                matches = _DT_PATTERN.findall(f.read(tail_size))
+                if matches:
+                    return _parse_dt_title(matches[-1].decode("utf-8", "ignore"))
+                if tail_size >= size:
+                    break
+    except OSError as e:
+        logger.debug(f"Could not read tail of {path}: {e}")
+    return None
+
+
+def file_time_span(path: Path, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Return (oldest, newest) message time of a file, in milliseconds.
+
+    Returns:
+        The span, or None if it cannot be determined cheaply
+    """
+    name = path.name
+    start = filename_timestamp(name)
+    if start is not None and any(kind in name for kind in _SINGLE_EVENT_TYPES):
+        return start, start
+    newest = last_message_timestamp(path, size)
+    if start is None or newest is None:
+        return None
+    return min(start, newest), max(start, newest)
+
+
+def prefilter_files_by_date(
+    files: Iterable[Path], config: Optional[Union["ProcessingConfig", "RunContext"]]
+) -> Tuple[List[Path], Dict[str, int]]:
+    """
+    Drop files whose messages all fall outside the configured date window.
+
+    Args:
+        files: Discovered HTML files
+        config: Settings with exclude_older_than / exclude_newer_than
+            (ProcessingConfig, or the RunContext built from it)
+
+    Returns:
+        (files to process, stats with skipped_files, skipped_bytes, undetermined)
+    """
+    files = list(files)
+    stats = {"skipped_files": 0, "skipped_bytes": 0, "undetermined": 0}
+    if config is None or (config.exclude_older_than is None and config.exclude_newer_than is None):
+        return files, stats
+
+    filtering_service = FilteringService(config)
+    kept = []
+    for path in files:
+        try:
+            size = os.stat(path).st_size
+        except OSError:
+            kept.append(path)
+            continue
+        span = file_time_span(path, size)
+        if span is None:
+            stats["undetermined"] += 1
+            kept.append(path)
+        elif filtering_service.should_skip_by_date_span(*span):
+            stats["skipped_files"] += 1
+            stats["skipped_bytes"] += size
+        else:
+            kept.append(path)
+
+    if stats["skipped_files"]:
+        logger.info(
+            f"📅 Date pre-filter skipped {stats['skipped_files']:,} of {len(files):,} files "
+            f"({stats['skipped_bytes'] / (1024 * 1024):.1f} MB) before parsing"
+        )
+    return kept, stats
@@ -66,6 +66,36 @@ class FilteringService:
         
         return False
     
+    def should_skip_by_date_span(self, oldest_timestamp: int, newest_timestamp: int) -> bool:
+        """
+        Determine if every message in a time span is excluded by the date filters.
+        
+        Args:
+            oldest_timestamp: Unix timestamp in milliseconds of the oldest message
+            newest_timestamp: Unix timestamp in milliseconds of the newest message
+            
+        Returns:
+            bool: True only if the whole span is before exclude_older_than or
+            after exclude_newer_than
+        """
+        if self.config is None:
+            return False
+        
+        try:
+            if self.config.exclude_older_than and (
+                datetime.fromtimestamp(newest_timestamp / 1000.0) < self.config.exclude_older_than
+            ):
+                return True
+            
+            if self.config.exclude_newer_than and (
+                datetime.fromtimestamp(oldest_timestamp / 1000.0) > self.config.exclude_newer_than
+            ):
+                return True
+        except (ValueError, OSError) as e:
+            logger.warning(f"Invalid timestamp span {oldest_timestamp}-{newest_timestamp}: {e}")
+        
+        return False
+    
     def should_skip_by_phone(self, phone_number: Union[str, int], phone_lookup_manager) -> bool:
         """
         Determine if a message should be skipped based on phone filtering settings.
@@ -0,0 +1,294 @@
+"""
+Incremental update of an existing output from a newer Takeout drop.
+
+A new Google Voice export repeats almost everything in the previous one.
+Every conversion records the size, mtime and SHA-256 of each Calls/ HTML
+file it parsed in ``source_files.manifest.json`` next to the pages; an
+update run (``--update-from``) compares the new drop with that record and
+parses only the files that are new or changed.
+
+Only the conversations those files touch are rewritten. The rows already on
+a page are read back through the conversation template instead of
+re-parsing the old export; a message whose row is already on the page (an
+old message of a changed file) is dropped before it is counted, and the new
+rows are merged into the page's time-ordered sequence. A paginated
+conversation (see core.conversation_pages) is read back from all its pages
+and paginated again. index.html is patched the same way: rows of rewritten
+conversations are rebuilt, the rest are kept as written.
+
+Rows carry their time to the second, so a new message sharing a second with
+an existing row is placed after it.
+"""
+
+import heapq
+import json
+import logging
+import re
+import shutil
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from core.conversation_manifest import get_valid_record, load_manifest
+from core.conversation_pages import page_links
+from core.message_dedup import count_dropped
+from core.pipeline.fingerprint import file_checksum, fingerprint_config
+from templates.loader import get_template_loader
+
+logger = logging.getLogger(__name__)
+
+SOURCE_MANIFEST_FILENAME = "source_files.manifest.json"
+SOURCE_MANIFEST_VERSION = 1
+
+# A table row as ConversationManager writes it: newline, indentation, <tr>...</tr>
+_ROW_RE = re.compile(r"\n[ \t]*<tr>.*?</tr>", re.DOTALL)
+_ROW_TIME_RE = re.compile(r'<td class="timestamp">([^<]*)</td>')
+
+# Heading of the page ConversationManager writes when finalizing fails
+_ERROR_PAGE_MARKER = "<h1>Error Generating Conversation</h1>"
+
+
+def list_source_files(processing_dir: Path) -> List[Path]:
+    """Calls/ HTML files of a Takeout directory, as process_html_files_param() finds them."""
+    calls_dir = Path(processing_dir) / "Calls"
+    if not calls_dir.exists():
+        return []
+    return sorted(calls_dir.rglob("*.html"))
+
+
+def scan_source_files(
+    processing_dir: Path,
+    files: Iterable[Path],
+    previous: Optional[Dict[str, Dict]] = None,
+) -> Dict[str, Dict]:
+    """
+    Fingerprint source files.
+
+    The hash of a file whose size and mtime still match its previous entry
+    is reused instead of reading the file again.
+
+    Args:
+        processing_dir: Takeout directory the files belong to
+        files: Files to fingerprint
+        previous: Entries from an earlier scan of the same directory
+
+    Returns:
+        Dictionary of path relative to processing_dir to size, mtime_ns and sha256
+    """
+    processing_dir = Path(processing_dir)
+    previous = previous or {}
+    records: Dict[str, Dict] = {}
+    for path in files:
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        key = path.relative_to(processing_dir).as_posix()
+        old = previous.get(key)
+        if old and old.get("size") == stat.st_size and old.get("mtime_ns") == stat.st_mtime_ns:
+            sha256 = old.get("sha256")
+        else:
+            sha256 = file_checksum(path)
+        if sha256 is None:
+            continue
+        records[key] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": sha256}
+    return records
+
+
+def diff_source_files(previous: Dict[str, Dict], current: Dict[str, Dict]) -> Tuple[List[str], List[str]]:
+    """
+    Compare two scans by content hash.
+
+    Returns:
+        (new or changed paths, paths no longer present), both sorted
+    """
+    changed = [key for key, record in current.items() if previous.get(key, {}).get("sha256") != record["sha256"]]
+    removed = [key for key in previous if key not in current]
+    return sorted(changed), sorted(removed)
+
+
+def source_config_fingerprint(config) -> Dict:
+    """ProcessingConfig fields that decide which messages reach the pages."""
+    from core.pipeline.stages.html_generation import OUTPUT_CONFIG_FIELDS
+
+    return fingerprint_config(config, OUTPUT_CONFIG_FIELDS)
+
+
+def load_source_manifest(output_dir: Path) -> Optional[Dict]:
+    """
+    Load the source file record of an output directory.
+
+    Returns:
+        Dictionary with "files" and "config", or None if missing or unreadable
+    """
+    path = Path(output_dir) / SOURCE_MANIFEST_FILENAME
+    if not path.exists():
+        return None
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not read {SOURCE_MANIFEST_FILENAME}: {e}")
+        return None
+    if data.get("v") != SOURCE_MANIFEST_VERSION:
+        return None
+    return data
+
+
+def write_source_manifest(output_dir: Path, files: Dict[str, Dict], config=None) -> Path:
+    """
+    Write the source file record atomically.
+
+    Args:
+        output_dir: Conversations output directory
+        files: Entries from scan_source_files()
+        config: ProcessingConfig of the run
+
+    Returns:
+        Path of the written record
+    """
+    path = Path(output_dir) / SOURCE_MANIFEST_FILENAME
+    temp_path = path.with_suffix(".tmp")
+    data = {"v": SOURCE_MANIFEST_VERSION, "config": source_config_fingerprint(config), "files": files}
+    with open(temp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, sort_keys=True)
+    temp_path.replace(path)
+    return path
+
+
+def seed_output(prior_output: Path, output_dir: Path) -> None:
+    """Copy a prior output into a different output directory so it can be updated there."""
+    logger.info(f"📋 Copying {prior_output} into {output_dir}")
+    shutil.copytree(prior_output, output_dir, dirs_exist_ok=True)
+
+
+def split_rows(rows_html: str) -> List[str]:
+    """Split the rows slot of a page into rows, each as ConversationManager built it."""
+    return _ROW_RE.findall(rows_html)
+
+
+def row_time(row: str) -> str:
+    """Formatted timestamp of a message row ("" if it has none)."""
+    match = _ROW_TIME_RE.search(row)
+    return match.group(1) if match else ""
+
+
+def merge_rows(existing: List[str], new_rows: Iterable[str]) -> Iterator[str]:
+    """
+    Merge two time-ordered message row sequences, newline-separated.
+
+    Existing rows come first when times are equal.
+    """
+    for index, row in enumerate(heapq.merge(existing, new_rows, key=row_time)):
+        if index:
+            yield "\n"
+        yield row
+
+
+class PriorOutput:
+    """
+    Conversation pages of the output being updated, read back on demand.
+
+    Attached to ConversationManager.prior_output for an update run. A page
+    is read the first time a message of its conversation is written, before
+    the page is replaced at finalize time.
+    """
+
+    def __init__(self, output_dir: Path):
+        """
+        Args:
+            output_dir: Conversations directory being updated
+        """
+        self.output_dir = Path(output_dir)
+        self.manifest = load_manifest(self.output_dir)
+        self._pages: Dict[str, Optional[Dict]] = {}
+        self._lock = threading.Lock()
+        self.dropped = Counter()  # processing stats keys -> messages already on a page
+        self.already_on_page = 0
+        self.rewritten: Set[str] = set()  # conversations whose page was written this run
+
+    def page(self, conversation_id: str) -> Optional[Dict]:
+        """
+        Rows, remaining row counts and manifest record of a conversation's page.
+
+        Returns:
+            None if the conversation has no page yet
+
+        Raises:
+            ValueError: If the page was not written with the current template
+        """
+        with self._lock:
+            if conversation_id not in self._pages:
+                self._pages[conversation_id] = self._read_page(conversation_id)
+            return self._pages[conversation_id]
+
+    def _read_page(self, conversation_id: str) -> Optional[Dict]:
+        path = self.output_dir / f"{conversation_id}.html"
+        if not path.exists():
+            return None
+        text = path.read_text(encoding="utf-8")
+        try:
+            slots = get_template_loader().get_compiled_template("conversation").parse(text)
+            rows = split_rows(slots["message_rows"])
+        except ValueError:
+            links = page_links(text)
+            if links:
+                rows = self._read_paginated_rows(links)
+            elif _ERROR_PAGE_MARKER in text:
+                return None  # nothing worth keeping
+            else:
+                raise ValueError(f"{path.name} does not match the conversation template; run a full conversion")
+
+        record = get_valid_record(self.manifest, path)
+        if record is None:
+            logger.warning(f"⚠️  No manifest record matches {path.name}; its counts will cover new messages only")
+        return {"rows": rows, "remaining": Counter(rows), "record": record}
+
+    def _read_paginated_rows(self, links: List[str]) -> List[str]:
+        """Rows of a paginated conversation, from each page its table of contents links to."""
+        template = get_template_loader().get_compiled_template("conversation_page")
+        rows: List[str] = []
+        for link in links:
+            try:
+                slots = template.parse((self.output_dir / link).read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                raise ValueError(f"Cannot read back {link} ({e}); run a full conversion")
+            rows.extend(split_rows(slots["message_rows"]))
+        return rows
+
+    def is_on_page(
+        self,
+        conversation_id: str,
+        row: str,
+        message_type: str = "sms",
+        attachments: Optional[list] = None,
+    ) -> bool:
+        """
+        Check a message's rendered row against its conversation's page.
+
+        Each row on the page absorbs one matching message, so a message that
+        legitimately repeats is kept as often as it is new.
+
+        Returns:
+            True if the message is already on the page and should be dropped
+        """
+        page = self.page(conversation_id)
+        if page is None:
+            return False
+        with self._lock:
+            remaining = page["remaining"]
+            if remaining[row] <= 0:
+                return False
+            remaining[row] -= 1
+            self.already_on_page += 1
+            count_dropped(self.dropped, message_type, attachments)
+            return True
+
+    def adjust_stats(self, stats: Dict[str, int]) -> Dict[str, int]:
+        """Subtract messages already on a page from processing stats."""
+        for key, count in self.dropped.items():
+            if key in stats:
+                stats[key] = max(0, stats[key] - count)
+        return stats
@@ -20,6 +20,35 @@ import logging
 logger = logging.getLogger(__name__)
 
 
+def _trie_regex(words: List[str]) -> str:
+    """
+    Build an alternation regex for ``words`` shaped as a prefix trie.
+
+    ``re`` tries the branches of a flat alternation one by one at every
+    position; with shared prefixes factored out it fails after a few
+    characters instead, which behaves much like an Aho-Corasick automaton.
+    At each node longer continuations are tried first.
+    """
+    trie: Dict[str, Any] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True  # end of word
+
+    def build(node: Dict[str, Any]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        optional = "" in node
+        if len(branches) == 1 and not optional:
+            return branches[0]
+        body = "(?:" + "|".join(branches) + ")"
+        return body + "?" if optional else body
+
+    return build(trie)
+
+
 class KeywordProtection:
     """
     Protects conversations matching keywords from being archived.
@@ -30,6 +59,12 @@ class KeywordProtection:
     - Regular expression patterns
     - Category-based organization
 
+    All keywords are compiled once into a single alternation regex (with word
+    boundaries for exact matching), and group-free regex patterns into
+    another, so is_protected() scans the conversation text once per matcher.
+    Only on a hit are keywords and patterns checked one by one, in file
+    order, to report the same match as checking them individually.
+
     Example:
         protection = KeywordProtection(Path("protected_keywords.json"))
         is_protected, keyword = protection.is_protected(messages)
@@ -55,6 +90,12 @@ class KeywordProtection:
         self.match_partial: bool = True
         self.categories: Dict[str, List[str]] = {}
 
+        # Built by _compile_matchers()
+        self._keyword_pattern: Optional[re.Pattern] = None
+        self._word_patterns: Dict[str, re.Pattern] = {}
+        self._combined_regex: Optional[re.Pattern] = None
+        self._separate_regexes: List[re.Pattern] = []
+
         self._load_keywords()
 
         logger.info(
@@ -124,6 +165,48 @@ class KeywordProtection:
                 f"Keyword protection is effectively disabled."
             )
 
+        self._compile_matchers()
+
+    def _compile_matchers(self) -> None:
+        """
+        Compile keywords and regex patterns into as few regexes as possible.
+
+        Each combined regex matches a text exactly when one of its members
+        would: partial matching searches lowercased text for the lowercased
+        keywords (cheaper than IGNORECASE over a large alternation), exact
+        matching wraps the alternation in ``\\b`` and uses the same flags as
+        the per-keyword check in _keyword_matches().
+        """
+        normalized = list(dict.fromkeys(
+            keyword if self.case_sensitive else keyword.lower() for keyword in self.keywords
+        ))
+        self._word_patterns = {}
+        if normalized:
+            alternation = _trie_regex(normalized)
+            if self.match_partial:
+                self._keyword_pattern = re.compile(alternation)
+            else:
+                self._keyword_pattern = re.compile(
+                    r'\b(?:' + alternation + r')\b', 0 if self.case_sensitive else re.IGNORECASE
+                )
+        else:
+            self._keyword_pattern = None
+
+        # Patterns with groups keep their own regex (combining would renumber backreferences)
+        self._combined_regex = None
+        self._separate_regexes = list(self.regex_patterns)
+        group_free = [pattern for pattern in self.regex_patterns if pattern.groups == 0]
+        if len(group_free) > 1:
+            try:
+                self._combined_regex = re.compile(
+                    "|".join(f"(?:{pattern.pattern})" for pattern in group_free),
+                    0 if self.case_sensitive else re.IGNORECASE
+                )
+                self._separate_regexes = [pattern for pattern in self.regex_patterns if pattern.groups > 0]
+            except re.error:
+                # e.g. inline global flags that are only valid at the start
+                pass
+
     def is_protected(
         self,
         messages: List[Dict[str, Any]],
@@ -164,13 +247,19 @@ class KeywordProtection:
         if not full_text.strip():
             return False, None
 
-        # Check simple keywords
-        for keyword in self.keywords:
-            if self._keyword_matches(keyword, full_text):
-                return True, keyword
-
-        # Check regex patterns
-        for pattern in self.regex_patterns:
+        # Check simple keywords (one combined scan, then the first in file order)
+        if self._keyword_pattern is not None:
+            search_text = full_text.lower() if self.match_partial and not self.case_sensitive else full_text
+            if self._keyword_pattern.search(search_text):
+                for keyword in self.keywords:
+                    if self._keyword_matches(keyword, full_text):
+                        return True, keyword
+
+        # Check regex patterns (group-free ones are skipped at once if the combined scan misses)
+        candidates = self.regex_patterns
+        if self._combined_regex is not None and not self._combined_regex.search(full_text):
+            candidates = self._separate_regexes
+        for pattern in candidates:
             match = pattern.search(full_text)
             if match:
                 matched_text = match.group(0)
@@ -197,10 +286,13 @@ class KeywordProtection:
         else:
             # Exact match - keyword must be a complete word
             # Use word boundaries to match whole words only
-            pattern = re.compile(
-                r'\b' + re.escape(search_keyword) + r'\b',
-                0 if self.case_sensitive else re.IGNORECASE
-            )
+            pattern = self._word_patterns.get(search_keyword)
+            if pattern is None:
+                pattern = re.compile(
+                    r'\b' + re.escape(search_keyword) + r'\b',
+                    0 if self.case_sensitive else re.IGNORECASE
+                )
+                self._word_patterns[search_keyword] = pattern
             return pattern.search(text) is not None
 
     def get_stats(self) -> Dict[str, Any]:
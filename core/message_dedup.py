@@ -0,0 +1,200 @@
+"""
+Cross-export message deduplication.
+
+Google Voice exports taken months apart overlap: every message of the older
+export is usually in the newer one too. When several processing directories
+are merged into one output (``--merge-source``), each message is reduced to
+a fingerprint before it reaches a conversation, and messages already written
+from an earlier source are dropped.
+
+The fingerprint covers the conversation (its normalized participants), the
+timestamp in ms, the sender, the message type, a hash of the whitespace-
+normalized text and the attachment file names. Fingerprints are kept as
+16-byte keys in a SQLite table rather than in memory, so merging large
+archives does not grow the process.
+
+A message repeated within one export is kept, as a single-export run would
+keep it; only repeats across sources are dropped.
+"""
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_DB_FILENAME = "message_fingerprints.db"
+FINGERPRINT_BYTES = 16
+COMMIT_EVERY = 10_000
+
+_CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS message_fingerprints (
+    fingerprint BLOB PRIMARY KEY,
+    source INTEGER NOT NULL
+) WITHOUT ROWID
+"""
+_SELECT_SQL = "SELECT source FROM message_fingerprints WHERE fingerprint = ?"
+_INSERT_SQL = "INSERT INTO message_fingerprints (fingerprint, source) VALUES (?, ?)"
+_NEXT_SOURCE_SQL = "SELECT COALESCE(MAX(source) + 1, 0) FROM message_fingerprints"
+
+_HREF_RE = re.compile(r"""href=['"]([^'"]+)['"]""")
+
+# message_type -> processing stats key
+_TYPE_STATS_KEYS = {"sms": "num_sms", "call": "num_calls", "voicemail": "num_voicemails"}
+
+
+def _normalize(value: str) -> str:
+    return " ".join(str(value or "").split()).casefold()
+
+
+def _attachment_name(attachment: Union[str, Dict]) -> str:
+    """File name of an attachment, from a dict or an MMS attachment link."""
+    if isinstance(attachment, dict):
+        name = str(attachment.get("filename", ""))
+    else:
+        match = _HREF_RE.search(str(attachment))
+        name = match.group(1) if match else str(attachment)
+    return name.rsplit("/", 1)[-1]
+
+
+def count_dropped(dropped: Counter, message_type: str, attachments: Optional[Iterable] = None) -> None:
+    """Add one dropped message to processing stats counts (num_sms, num_img, ...)."""
+    dropped[_TYPE_STATS_KEYS.get(message_type, "num_sms")] += 1
+    for attachment in attachments or ():
+        if "📷" in str(attachment):
+            dropped["num_img"] += 1
+        elif "📇" in str(attachment):
+            dropped["num_vcf"] += 1
+
+
+def message_fingerprint(
+    participants: str,
+    timestamp: int,
+    sender: str,
+    text: str,
+    attachments: Optional[Iterable] = None,
+    message_type: str = "sms",
+) -> bytes:
+    """
+    Stable fingerprint of one message.
+
+    Args:
+        participants: Conversation id (normalized participant names/numbers)
+        timestamp: Unix timestamp in milliseconds
+        sender: Sender display name or number
+        text: Message text
+        attachments: Attachment dicts or MMS attachment HTML strings
+        message_type: "sms", "call" or "voicemail"
+
+    Returns:
+        bytes: FINGERPRINT_BYTES-byte digest
+    """
+    text_hash = hashlib.sha256(" ".join((text or "").split()).encode("utf-8")).hexdigest()
+    names = "\x1e".join(sorted(_attachment_name(a) for a in attachments or ()))
+    key = "\x1f".join((
+        _normalize(participants), str(int(timestamp)), _normalize(sender), message_type, text_hash, names,
+    ))
+    return hashlib.sha256(key.encode("utf-8")).digest()[:FINGERPRINT_BYTES]
+
+
+class MessageDeduplicator:
+    """On-disk fingerprint set shared by the sources of one merged run."""
+
+    def __init__(self, db_path: Path, reset: bool = True):
+        """
+        Open the fingerprint database.
+
+        Args:
+            db_path: SQLite file for the fingerprint set
+            reset: Start from an empty set (a fresh merged run)
+        """
+        self.db_path = Path(db_path)
+        if reset:
+            for suffix in ("", "-wal", "-shm"):
+                Path(str(self.db_path) + suffix).unlink(missing_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(_CREATE_SQL)
+        self._first_source = self._conn.execute(_NEXT_SOURCE_SQL).fetchone()[0]
+        self._lock = threading.Lock()
+        self._sources: List[Dict] = []
+        self._pending = 0
+        self.dropped = Counter()  # processing stats keys -> dropped counts
+        self.added = Counter()  # processing stats keys -> messages new in a later source
+
+    def begin_source(self, label: Union[str, Path]) -> None:
+        """Start counting messages of the next source."""
+        with self._lock:
+            self._sources.append({"source": str(label), "messages": 0, "duplicates": 0})
+
+    def is_duplicate(
+        self,
+        conversation_id: str,
+        timestamp: int,
+        sender: str,
+        message: str,
+        attachments: Optional[list] = None,
+        message_type: str = "sms",
+    ) -> bool:
+        """
+        Record a message and report whether an earlier source already had it.
+
+        Returns:
+            True if the message should be dropped
+        """
+        fingerprint = message_fingerprint(conversation_id, timestamp, sender, message, attachments, message_type)
+        with self._lock:
+            if not self._sources:
+                self._sources.append({"source": "default", "messages": 0, "duplicates": 0})
+            counts = self._sources[-1]
+            source = self._first_source + len(self._sources) - 1
+            counts["messages"] += 1
+
+            row = self._conn.execute(_SELECT_SQL, (fingerprint,)).fetchone()
+            if row is None:
+                self._conn.execute(_INSERT_SQL, (fingerprint, source))
+                self._pending += 1
+                if self._pending >= COMMIT_EVERY:
+                    self._conn.commit()
+                    self._pending = 0
+            if row is None or row[0] == source:
+                if len(self._sources) > 1:
+                    count_dropped(self.added, message_type, attachments)
+                return False
+
+            counts["duplicates"] += 1
+            count_dropped(self.dropped, message_type, attachments)
+            return True
+
+    def adjust_stats(self, stats: Dict[str, int]) -> Dict[str, int]:
+        """Subtract dropped messages from summed per-source processing stats."""
+        for key, count in self.dropped.items():
+            if key in stats:
+                stats[key] = max(0, stats[key] - count)
+        return stats
+
+    def add_merged_stats(self, stats: Dict[str, int]) -> Dict[str, int]:
+        """Add the messages later sources wrote (not dropped) to the first source's processing stats."""
+        for key, count in self.added.items():
+            stats[key] = stats.get(key, 0) + count
+        return stats
+
+    def source_report(self) -> List[Dict]:
+        """Per-source message and duplicate counts with the duplicate rate."""
+        with self._lock:
+            return [
+                {**counts, "duplicate_rate": counts["duplicates"] / counts["messages"] if counts["messages"] else 0.0}
+                for counts in self._sources
+            ]
+
+    def close(self) -> None:
+        """Commit and close the fingerprint database."""
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
@@ -8,13 +8,14 @@ with caching, parallel processing, and memory efficiency improvements.
 import os
 import json
 import time
-import hashlib
 import logging
 from pathlib import Path
 from typing import Dict, List, Set, Optional, Tuple
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from functools import lru_cache
 
+from core.directory_snapshot import get_directory_snapshot
+
 logger = logging.getLogger(__name__)
 
 
@@ -30,10 +31,8 @@ class AttachmentCache:
     def get_directory_hash(self, directory: Path) -> str:
         """Generate a hash of directory structure for cache validation."""
         try:
-            # Use directory modification time and file count for fast hashing
-            stat = directory.stat()
-            file_count = sum(1 for _ in directory.rglob("*") if _.is_file())
-            return hashlib.md5(f"{stat.st_mtime}_{file_count}".encode()).hexdigest()
+            # Shared snapshot: O(directories) stat sweep instead of a full rglob
+            return get_directory_snapshot(directory).digest()
         except Exception:
             return "unknown"
     
@@ -159,12 +158,13 @@ def build_attachment_mapping_optimized(
     if cache:
         cached_mapping = cache.load_attachment_cache(processing_dir)
         if cached_mapping:
-            # Convert cached mapping back to expected format
+            # The cache was validated against the directory snapshot, so check
+            # membership in its listing instead of stat-ing every cached path
+            known_files = set(get_directory_snapshot(processing_dir).iter_files())
             result = {}
             for src, filename in cached_mapping.items():
-                file_path = processing_dir / filename
-                if file_path.exists():
-                    result[src] = (filename, file_path)
+                if filename.replace(os.sep, "/") in known_files:
+                    result[src] = (filename, processing_dir / filename)
             
             if result:
                 logger.info(f"✅ Using cached attachment mapping ({len(result)} entries) in {time.time() - start_time:.2f}s")
@@ -182,7 +182,15 @@ def build_attachment_mapping_optimized(
     }
     
     scan_start = time.time()
-    attachment_files = scan_directory_optimized(processing_dir, attachment_extensions)
+    if use_cache:
+        # Reuse the directory snapshot (re-lists only changed directories)
+        snapshot = get_directory_snapshot(processing_dir)
+        attachment_files = [
+            f for f in snapshot.iter_files()
+            if '.' in f and f[f.rfind('.'):].lower() in attachment_extensions
+        ]
+    else:
+        attachment_files = scan_directory_optimized(processing_dir, attachment_extensions)
     scan_time = time.time() - scan_start
     logger.info(f"✅ Directory scan completed: {len(attachment_files)} files in {scan_time:.2f}s")
     
@@ -12,7 +12,26 @@ from pathlib import Path
 from typing import Dict, List, Optional
 from bs4 import BeautifulSoup
 
+from utils.hot_path_logging import LazyLogger
+
 logger = logging.getLogger(__name__)
+hot_log = LazyLogger(logger)
+
+# Generic phrases that should not be used as aliases
+GENERIC_ALIAS_PHRASES = {
+    "me",
+    "unknown",
+    "placed call to",
+    "received call from",
+    "missed call from",
+    "call placed to",
+    "call received from",
+    "call missed from",
+    "voicemail from",
+    "voicemail received from",
+    "text message from",
+    "message from",
+}
 
 
 class PhoneLookupManager:
@@ -233,22 +252,6 @@ class PhoneLookupManager:
             Optional[str]: Extracted alias or None if not found
         """
         try:
-            # Define generic phrases that should not be used as aliases
-            generic_phrases = {
-                "me",
-                "unknown",
-                "placed call to",
-                "received call from",
-                "missed call from",
-                "call placed to",
-                "call received from",
-                "call missed from",
-                "voicemail from",
-                "voicemail received from",
-                "text message from",
-                "message from",
-            }
-
             # Look for vCard entries with the phone number
             # Pattern: <a class="tel" href="tel:+1234567890"><span class="fn">Name</span></a>
             tel_links = soup.select('a[class*="tel"][href^="tel:"]')
@@ -261,13 +264,13 @@ class PhoneLookupManager:
                         fn_element = link.find(["span", "abbr"], class_="fn")
                         if fn_element:
                             name = fn_element.get_text(strip=True)
-                            if name and name.lower() not in generic_phrases:
+                            if name and name.lower() not in GENERIC_ALIAS_PHRASES:
                                 return self.sanitize_alias(name)
 
                         # If no fn class, try to get the name directly from the tel link text
                         # This handles cases like: <a class="tel" href="tel:+1234567890">Name</a>
                         link_text = link.get_text(strip=True)
-                        if link_text and link_text.lower() not in generic_phrases:
+                        if link_text and link_text.lower() not in GENERIC_ALIAS_PHRASES:
                             return self.sanitize_alias(link_text)
 
             # Look for other patterns where phone numbers and names are associated
@@ -281,7 +284,7 @@ class PhoneLookupManager:
                         link_phone = href.split(":", 1)[-1]
                         if link_phone == phone_number:
                             name = tel_link.get_text(strip=True)
-                            if name and name.lower() not in generic_phrases:
+                            if name and name.lower() not in GENERIC_ALIAS_PHRASES:
                                 return self.sanitize_alias(name)
 
             # Look for general name elements near phone numbers
@@ -289,7 +292,7 @@ class PhoneLookupManager:
             fn_elements = soup.select('span[class*="fn"], abbr[class*="fn"]')
             for fn in fn_elements:
                 name = fn.get_text(strip=True)
-                if name and name.lower() not in generic_phrases:
+                if name and name.lower() not in GENERIC_ALIAS_PHRASES:
                     # Check if this name element is near a phone number
                     # Look for tel links in the same container or nearby
                     container = fn.find_parent(["div", "span", "cite"])
@@ -308,32 +311,41 @@ class PhoneLookupManager:
             logger.debug(f"Failed to extract alias from HTML for {phone_number}: {e}")
             return None
 
-    def get_alias(self, phone_number: str, soup: Optional[BeautifulSoup] = None) -> str:
-        """Get alias for a phone number, prompting user if not found and prompts are enabled."""
+    def get_alias(
+        self,
+        phone_number: str,
+        soup: Optional[BeautifulSoup] = None,
+        alias_hint: Optional[str] = None,
+    ) -> str:
+        """Get alias for a phone number, prompting user if not found and prompts are enabled.
+
+        alias_hint is a contact name already extracted by the caller (e.g. the
+        single-pass call parser); it is used like an alias found in soup.
+        """
         # THREAD-SAFETY FIX: Protect dictionary reads
         with self._dict_lock:
-            logger.debug(f"Looking up alias for phone number: '{phone_number}'")
-            logger.debug(f"Available aliases: {list(self.phone_aliases.keys())}")
-
-            if phone_number in self.phone_aliases:
-                logger.debug(
-                    f"Found existing alias for {phone_number}: {self.phone_aliases[phone_number]}"
-                )
-                return self.phone_aliases[phone_number]
+            alias = self.phone_aliases.get(phone_number)
+            if alias is not None:
+                hot_log.debug("Found existing alias for %s: %s", phone_number, alias)
+                return alias
+            hot_log.debug("No alias for %s among %d aliases", phone_number, len(self.phone_aliases))
 
         if not self.enable_prompts:
             # Try to automatically extract alias from HTML if provided
+            extracted_alias = None
             if soup:
                 extracted_alias = self.extract_alias_from_html(soup, phone_number)
-                if extracted_alias:
-                    # Store the automatically extracted alias
-                    with self._dict_lock:  # THREAD-SAFETY FIX: Protect dictionary write
-                        self.phone_aliases[phone_number] = extracted_alias
-                    self.save_aliases_batched()
-                    logger.info(
-                        f"Automatically extracted alias '{extracted_alias}' for {phone_number}"
-                    )
-                    return extracted_alias
+            elif alias_hint and alias_hint.lower() not in GENERIC_ALIAS_PHRASES:
+                extracted_alias = self.sanitize_alias(alias_hint)
+            if extracted_alias:
+                # Store the automatically extracted alias
+                with self._dict_lock:  # THREAD-SAFETY FIX: Protect dictionary write
+                    self.phone_aliases[phone_number] = extracted_alias
+                self.save_aliases_batched()
+                logger.info(
+                    f"Automatically extracted alias '{extracted_alias}' for {phone_number}"
+                )
+                return extracted_alias
 
             return phone_number
 
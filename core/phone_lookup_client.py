@@ -0,0 +1,310 @@
+"""
+Concurrent, rate-limited phone lookup client.
+
+Shared by the phone_lookup pipeline stage and the tools/ lookup scripts.
+Lookups run concurrently on an asyncio event loop (the blocking urllib call
+is pushed to a worker thread), are throttled by a token bucket so provider
+quotas are never exceeded, retry transient failures with exponential
+backoff, and are cached on disk with a TTL so re-runs do not spend quota on
+numbers that were already looked up.
+"""
+
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default SQLITE_MAX_VARIABLE_NUMBER is 999 on older builds
+_SQLITE_IN_CHUNK = 500
+
+# HTTP status codes worth retrying: rate limited or server-side failures
+_RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+class TokenBucket:
+    """
+    Async token bucket rate limiter.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    acquire() waits until a token is available, so bursts are bounded by
+    capacity and the long-run rate never exceeds ``rate``.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        if rate <= 0:
+            raise ValueError(f"Rate must be positive, got {rate}")
+        if capacity < 1:
+            raise ValueError(f"Capacity must be at least 1, got {capacity}")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._last_refill = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last_refill) * self.rate)
+        self._last_refill = now
+
+    async def acquire(self) -> None:
+        """Wait for and consume one token."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class LookupResponseCache:
+    """
+    On-disk cache of raw provider responses keyed by (provider, phone number).
+
+    Entries older than ``ttl_seconds`` are treated as missing. The cache is a
+    single SQLite file so it survives between runs and can be shared by the
+    pipeline stage and the tools.
+    """
+
+    def __init__(self, cache_path: Path, ttl_seconds: float = 30 * 24 * 3600):
+        self.cache_path = Path(cache_path)
+        self.ttl_seconds = ttl_seconds
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS lookup_cache (
+                provider TEXT NOT NULL,
+                phone_number TEXT NOT NULL,
+                response TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (provider, phone_number)
+            )
+        """)
+        self._conn.commit()
+
+    def get_many(self, provider: str, phone_numbers: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        """Return fresh cached responses for the given numbers."""
+        numbers = list(dict.fromkeys(phone_numbers))
+        cutoff = time.time() - self.ttl_seconds
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            for i in range(0, len(numbers), _SQLITE_IN_CHUNK):
+                chunk = numbers[i:i + _SQLITE_IN_CHUNK]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT phone_number, response FROM lookup_cache "
+                    f"WHERE provider = ? AND fetched_at >= ? AND phone_number IN ({placeholders})",
+                    (provider, cutoff, *chunk),
+                ).fetchall()
+                for phone_number, response in rows:
+                    try:
+                        found[phone_number] = json.loads(response)
+                    except json.JSONDecodeError:
+                        continue
+        return found
+
+    def put(self, provider: str, phone_number: str, response: Dict[str, Any]) -> None:
+        """Store one provider response."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO lookup_cache (provider, phone_number, response, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (provider, phone_number, json.dumps(response), time.time()),
+            )
+            self._conn.commit()
+
+    def purge_expired(self) -> int:
+        """Delete expired entries and return how many were removed."""
+        cutoff = time.time() - self.ttl_seconds
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM lookup_cache WHERE fetched_at < ?", (cutoff,))
+            self._conn.commit()
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+@dataclass
+class LookupOutcome:
+    """Result of looking up one phone number."""
+    phone_number: str
+    response: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    from_cache: bool = False
+    attempts: int = 0
+
+    @property
+    def success(self) -> bool:
+        return self.response is not None and self.error is None
+
+
+class PhoneLookupClient:
+    """
+    Concurrent lookup client for HTTP/JSON phone lookup providers.
+
+    Provider specifics are injected: ``url_builder`` turns a phone number into
+    a request URL and the optional ``is_cacheable`` predicate decides whether
+    a decoded response may be cached (e.g. to avoid caching quota errors that
+    some providers return with HTTP 200). The optional ``on_request`` callback
+    receives each phone number just before its first request is sent.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        url_builder: Callable[[str], str],
+        requests_per_minute: float = 60.0,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        backoff_base: float = 1.0,
+        timeout: float = 10.0,
+        cache: Optional[LookupResponseCache] = None,
+        is_cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        on_request: Optional[Callable[[str], None]] = None,
+    ):
+        if max_concurrency < 1:
+            raise ValueError(f"max_concurrency must be at least 1, got {max_concurrency}")
+        self.provider = provider
+        self.url_builder = url_builder
+        self.requests_per_minute = requests_per_minute
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.cache = cache
+        self.is_cacheable = is_cacheable or (lambda response: True)
+        self.on_request = on_request
+
+        self.stats = {"requests": 0, "cache_hits": 0, "retries": 0, "failures": 0}
+
+    def lookup_many(self, phone_numbers: Iterable[str]) -> Dict[str, LookupOutcome]:
+        """Synchronous entry point; runs lookup_many_async on a fresh event loop."""
+        return asyncio.run(self.lookup_many_async(phone_numbers))
+
+    async def lookup_many_async(self, phone_numbers: Iterable[str]) -> Dict[str, LookupOutcome]:
+        """
+        Look up phone numbers concurrently.
+
+        Args:
+            phone_numbers: Numbers to look up (duplicates are collapsed)
+
+        Returns:
+            Mapping of phone number to LookupOutcome, in input order
+        """
+        numbers = list(dict.fromkeys(phone_numbers))
+        outcomes: Dict[str, LookupOutcome] = {}
+
+        if self.cache is not None:
+            for phone_number, response in self.cache.get_many(self.provider, numbers).items():
+                outcomes[phone_number] = LookupOutcome(phone_number, response, from_cache=True)
+            self.stats["cache_hits"] += len(outcomes)
+
+        pending = [n for n in numbers if n not in outcomes]
+        if pending:
+            logger.info(
+                f"Looking up {len(pending)} numbers via {self.provider} "
+                f"({len(outcomes)} cached, {self.max_concurrency} concurrent, "
+                f"{self.requests_per_minute:g} req/min)"
+            )
+            bucket = TokenBucket(self.requests_per_minute / 60.0)
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            results = await asyncio.gather(
+                *(self._lookup_one(n, bucket, semaphore) for n in pending)
+            )
+            for outcome in results:
+                outcomes[outcome.phone_number] = outcome
+
+        return {n: outcomes[n] for n in numbers}
+
+    async def _lookup_one(self, phone_number: str, bucket: TokenBucket,
+                          semaphore: asyncio.Semaphore) -> LookupOutcome:
+        outcome = LookupOutcome(phone_number)
+        url = self.url_builder(phone_number)
+
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await bucket.acquire()
+                if attempt == 0 and self.on_request is not None:
+                    self.on_request(phone_number)
+                outcome.attempts = attempt + 1
+                self.stats["requests"] += 1
+                retry_after: Optional[float] = None
+                try:
+                    outcome.response = await asyncio.to_thread(self._fetch, url)
+                    outcome.error = None
+                    break
+                except urllib.error.HTTPError as e:
+                    outcome.error = f"HTTP {e.code}: {e.reason}"
+                    if e.code not in _RETRYABLE_STATUS:
+                        break
+                    retry_after = _parse_retry_after(e.headers.get("Retry-After") if e.headers else None)
+                except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+                    outcome.error = f"Request failed: {e}"
+                except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                    outcome.error = f"Invalid response: {e}"
+                    break
+
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    delay = retry_after if retry_after is not None else self.backoff_base * (2 ** attempt)
+                    logger.debug(f"Retrying {phone_number} in {delay:.2f}s ({outcome.error})")
+                    await asyncio.sleep(delay)
+
+        if outcome.success:
+            if self.cache is not None and self.is_cacheable(outcome.response):
+                self.cache.put(self.provider, phone_number, outcome.response)
+        else:
+            self.stats["failures"] += 1
+            logger.warning(f"Lookup failed for {phone_number}: {outcome.error}")
+        return outcome
+
+    def _fetch(self, url: str) -> Dict[str, Any]:
+        with urllib.request.urlopen(url, timeout=self.timeout) as response:
+            return json.loads(response.read().decode("utf-8"))
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a numeric Retry-After header (HTTP-date values are ignored)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+def fetch_known_numbers(db_path: Path, phone_numbers: Iterable[str]) -> Set[str]:
+    """
+    Return the subset of phone_numbers already present in phone_directory.
+
+    Uses one connection and chunked IN queries instead of one connection and
+    query per number.
+    """
+    numbers: List[str] = list(dict.fromkeys(phone_numbers))
+    known: Set[str] = set()
+    if not numbers or not Path(db_path).exists():
+        return known
+
+    with sqlite3.connect(str(db_path)) as conn:
+        for i in range(0, len(numbers), _SQLITE_IN_CHUNK):
+            chunk = numbers[i:i + _SQLITE_IN_CHUNK]
+            placeholders = ",".join("?" * len(chunk))
+            rows = conn.execute(
+                f"SELECT phone_number FROM phone_directory WHERE phone_number IN ({placeholders})",
+                chunk,
+            )
+            known.update(row[0] for row in rows)
+    return known
@@ -0,0 +1,306 @@
+"""
+Inverted phone-number index over converted conversations.
+
+The analysis tools in ``tools/`` repeatedly ask "which conversations mention
+which number". Instead of substring-searching every conversation file for
+every number (files x numbers), PhoneMentionIndex scans each file once with a
+single phone-shape regex, normalizes every match to E.164 digits and stores
+
+    number -> {conversation_id, count, first_seen, last_seen}
+
+in ``phone_index.db`` (SQLite) next to the HTML output. Lookups are then
+primary-key queries, so cost grows with corpus size only, not with the size
+of the number list being checked. Files whose size and mtime are unchanged
+since the last build are not rescanned. A paginated conversation (see
+core.conversation_pages) is scanned across its table of contents and pages.
+"""
+
+import logging
+import re
+import sqlite3
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from core.conversation_pages import page_links, pages_dir
+
+logger = logging.getLogger(__name__)
+
+PHONE_INDEX_FILENAME = "phone_index.db"
+NON_CONVERSATION_FILES = {"index.html", "search.html"}
+
+_LOOKUP_CHUNK_SIZE = 500
+
+# One pass over the HTML: timestamp cells set the current message time, phone
+# matches are attributed to it. NANP numbers may be formatted; anything else
+# must be written as +<digits>.
+_SCAN_PATTERN = re.compile(
+    r'<td class="timestamp">(?P<ts>[^<]+)</td>'
+    r'|(?<![\d+])(?P<nanp>(?:\+?1[\s.-]?)?\(?[2-9]\d{2}\)?[\s.-]?[2-9]\d{2}[\s.-]?\d{4})(?!\d)'
+    r'|(?<![\d+])(?P<intl>\+\d{7,15})(?!\d)'
+)
+_NON_DIGITS = re.compile(r"\D")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS mentions (
+    number TEXT NOT NULL,
+    conversation_id TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    first_seen TEXT,
+    last_seen TEXT,
+    PRIMARY KEY (number, conversation_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_mentions_conversation ON mentions(conversation_id);
+CREATE TABLE IF NOT EXISTS files (
+    conversation_id TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+"""
+
+
+def normalize_phone_number(text: str) -> Optional[str]:
+    """
+    Normalize a phone number to the +<digits> form used as index key.
+
+    Ten-digit numbers are assumed to be NANP (+1).
+
+    Args:
+        text: Phone number in any common format
+
+    Returns:
+        Normalized number, or None if it does not look like a phone number
+    """
+    digits = _NON_DIGITS.sub("", text)
+    if text.strip().startswith("+") and 7 <= len(digits) <= 15:
+        return "+" + digits
+    if len(digits) == 10:
+        return "+1" + digits
+    if len(digits) == 11 and digits.startswith("1"):
+        return "+" + digits
+    return None
+
+
+def scan_conversation_file(file_path: Path) -> Dict[str, List]:
+    """
+    Find every phone number mentioned in one conversation file.
+
+    Args:
+        file_path: Conversation HTML file
+
+    Returns:
+        Dictionary mapping normalized number to [count, first_seen, last_seen]
+        (times are the message timestamps, None for mentions outside messages)
+    """
+    content = Path(file_path).read_text(encoding="utf-8", errors="replace")
+    mentions: Dict[str, List] = {}
+    current_time = None
+    for match in _SCAN_PATTERN.finditer(content):
+        timestamp = match.group("ts")
+        if timestamp is not None:
+            current_time = timestamp.strip()
+            continue
+        number = normalize_phone_number(match.group("nanp") or match.group("intl"))
+        if number is None:
+            continue
+        entry = mentions.get(number)
+        if entry is None:
+            mentions[number] = [1, current_time, current_time]
+            continue
+        entry[0] += 1
+        if current_time is not None:
+            if entry[1] is None or current_time < entry[1]:
+                entry[1] = current_time
+            if entry[2] is None or current_time > entry[2]:
+                entry[2] = current_time
+    return mentions
+
+
+def merge_mentions(into: Dict[str, List], mentions: Dict[str, List]) -> None:
+    """Add the mentions of another file (e.g. a page of the same conversation) to into."""
+    for number, (count, first_seen, last_seen) in mentions.items():
+        entry = into.get(number)
+        if entry is None:
+            into[number] = [count, first_seen, last_seen]
+            continue
+        entry[0] += count
+        if first_seen is not None and (entry[1] is None or first_seen < entry[1]):
+            entry[1] = first_seen
+        if last_seen is not None and (entry[2] is None or last_seen > entry[2]):
+            entry[2] = last_seen
+
+
+def conversation_files(conversations_dir: Path, file_path: Path) -> List[Path]:
+    """
+    Files holding one conversation's messages: its page, plus the pages its
+    table of contents links to when it is paginated.
+    """
+    if not pages_dir(conversations_dir, file_path.stem).is_dir():
+        return [file_path]
+    contents = file_path.read_text(encoding="utf-8", errors="replace")
+    return [file_path] + [conversations_dir / link for link in page_links(contents)]
+
+
+def _files_signature(paths: List[Path]) -> Tuple[int, int]:
+    """Total size and latest mtime of a conversation's files (raises OSError if one is missing)."""
+    stats = [path.stat() for path in paths]
+    return sum(st.st_size for st in stats), max(st.st_mtime_ns for st in stats)
+
+
+@dataclass
+class PhoneMention:
+    """Mentions of one number in one conversation."""
+    number: str
+    conversation_id: str
+    count: int
+    first_seen: Optional[str]
+    last_seen: Optional[str]
+
+    @property
+    def file(self) -> str:
+        return f"{self.conversation_id}.html"
+
+
+class PhoneMentionIndex:
+    """SQLite inverted index from phone number to the conversations mentioning it."""
+
+    def __init__(self, db_path: Path):
+        """
+        Open (and create if needed) a phone mention index.
+
+        Args:
+            db_path: Path to the SQLite database
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.db_path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    @classmethod
+    def for_conversations(cls, conversations_dir: Path, update: bool = True) -> "PhoneMentionIndex":
+        """
+        Open the index stored in a conversations directory, refreshing it first.
+
+        Args:
+            conversations_dir: Conversations output directory
+            update: Rescan new and changed conversation files
+
+        Returns:
+            Open PhoneMentionIndex
+        """
+        index = cls(Path(conversations_dir) / PHONE_INDEX_FILENAME)
+        if update:
+            index.update(conversations_dir)
+        return index
+
+    def update(self, conversations_dir: Path) -> Dict[str, int]:
+        """
+        Bring the index in line with the conversation files on disk.
+
+        Args:
+            conversations_dir: Conversations output directory
+
+        Returns:
+            Counts of scanned, unchanged and removed conversation files
+        """
+        conversations_dir = Path(conversations_dir)
+        files = {
+            f.stem: f for f in sorted(conversations_dir.glob("*.html"))
+            if f.name not in NON_CONVERSATION_FILES
+        }
+        known = {
+            row[0]: (row[1], row[2])
+            for row in self._conn.execute("SELECT conversation_id, size, mtime_ns FROM files")
+        }
+        stats = {"scanned": 0, "unchanged": 0, "removed": 0}
+
+        with self._conn:
+            for conversation_id in known.keys() - files.keys():
+                self._conn.execute("DELETE FROM mentions WHERE conversation_id = ?", (conversation_id,))
+                self._conn.execute("DELETE FROM files WHERE conversation_id = ?", (conversation_id,))
+                stats["removed"] += 1
+
+            for conversation_id, file_path in files.items():
+                try:
+                    paths = conversation_files(conversations_dir, file_path)
+                    signature = _files_signature(paths)
+                    if known.get(conversation_id) == signature:
+                        stats["unchanged"] += 1
+                        continue
+                    mentions: Dict[str, List] = {}
+                    for path in paths:
+                        merge_mentions(mentions, scan_conversation_file(path))
+                except OSError as e:
+                    logger.warning(f"Could not scan {file_path}: {e}")
+                    continue
+
+                self._conn.execute("DELETE FROM mentions WHERE conversation_id = ?", (conversation_id,))
+                self._conn.executemany(
+                    "INSERT INTO mentions (number, conversation_id, count, first_seen, last_seen) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(number, conversation_id, *entry) for number, entry in mentions.items()],
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO files (conversation_id, size, mtime_ns) VALUES (?, ?, ?)",
+                    (conversation_id, *signature),
+                )
+                stats["scanned"] += 1
+
+        logger.info(
+            f"📇 Phone index: {stats['scanned']} scanned, {stats['unchanged']} unchanged, "
+            f"{stats['removed']} removed"
+        )
+        return stats
+
+    def lookup(self, numbers: Iterable[str]) -> Dict[str, List[PhoneMention]]:
+        """
+        Find the conversations mentioning each number.
+
+        Args:
+            numbers: Phone numbers in any format accepted by normalize_phone_number
+
+        Returns:
+            Dictionary mapping each input number that has mentions to its
+            PhoneMention list (ordered by conversation_id)
+        """
+        by_normalized: Dict[str, List[str]] = {}
+        for number in numbers:
+            normalized = normalize_phone_number(number)
+            if normalized is not None:
+                by_normalized.setdefault(normalized, []).append(number)
+
+        results: Dict[str, List[PhoneMention]] = {}
+        keys = list(by_normalized)
+        for start in range(0, len(keys), _LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + _LOOKUP_CHUNK_SIZE]
+            rows = self._conn.execute(
+                "SELECT number, conversation_id, count, first_seen, last_seen FROM mentions "
+                f"WHERE number IN ({','.join('?' * len(chunk))}) ORDER BY number, conversation_id",
+                chunk,
+            )
+            for row in rows:
+                mention = PhoneMention(*row)
+                for original in by_normalized[mention.number]:
+                    results.setdefault(original, []).append(mention)
+        return results
+
+    def conversations_for(self, number: str) -> List[PhoneMention]:
+        """Return the conversations mentioning one number."""
+        return self.lookup([number]).get(number, [])
+
+    def numbers_in(self, conversation_id: str) -> List[PhoneMention]:
+        """Return every number mentioned in one conversation."""
+        rows = self._conn.execute(
+            "SELECT number, conversation_id, count, first_seen, last_seen FROM mentions "
+            "WHERE conversation_id = ? ORDER BY number",
+            (conversation_id,),
+        )
+        return [PhoneMention(*row) for row in rows]
+
+    def close(self) -> None:
+        """Close the database."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
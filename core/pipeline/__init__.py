@@ -6,6 +6,7 @@ Each stage can be executed independently, with state persistence between stages.
 """
 
 from .base import PipelineStage, PipelineContext, StageResult
+from .connection import SQLiteConnectionManager
 from .manager import PipelineManager
 from .state import StateManager
 
@@ -14,5 +15,6 @@ __all__ = [
     'PipelineContext', 
     'StageResult',
     'PipelineManager',
-    'StateManager'
+    'StateManager',
+    'SQLiteConnectionManager'
 ]
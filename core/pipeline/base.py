@@ -45,6 +45,7 @@ class PipelineContext:
     config: Optional[Any] = None  # ProcessingConfig - avoiding circular import
     stage_state: Dict[str, Any] = field(default_factory=dict)
     pipeline_start_time: datetime = field(default_factory=datetime.now)
+    state_manager: Optional[Any] = None  # StateManager, for per-item progress
     
     def get_stage_data(self, stage_name: str) -> Optional[Dict[str, Any]]:
         """Get data stored by a previous stage."""
@@ -91,7 +92,24 @@ class PipelineStage(ABC):
             bool: True if stage can be skipped
         """
         return context.has_stage_completed(self.name)
-    
+
+    def get_input_fingerprint(self, context: PipelineContext) -> Optional[Dict[str, Any]]:
+        """
+        Describe the inputs this stage's output depends on.
+
+        Stages that return a dictionary (file listings, config subset, ...)
+        opt in to content-addressed skipping: the manager adds upstream output
+        checksums and skips the stage when nothing changed since its last
+        successful run. Returning None keeps the can_skip() heuristics.
+
+        Args:
+            context: Pipeline context
+
+        Returns:
+            Optional[Dict[str, Any]]: JSON-serializable fingerprint parts, or None
+        """
+        return None
+
     def validate_prerequisites(self, context: PipelineContext) -> bool:
         """
         Validate that prerequisites for this stage are met.
@@ -0,0 +1,104 @@
+"""
+Shared SQLite connections for pipeline state.
+
+Opening a connection per call costs a file open, schema load and (without
+WAL) a journal file per transaction. SQLiteConnectionManager keeps one
+long-lived connection per thread instead:
+
+- WAL journal with synchronous=NORMAL: commits append to the WAL without an
+  fsync each, and readers do not block the writer
+- a large statement cache, so the fixed SQL strings used by callers are
+  prepared once per connection and reused
+- transaction() and execute_batched() for grouping many writes per commit
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List, Sequence
+
+logger = logging.getLogger(__name__)
+
+STATEMENT_CACHE_SIZE = 256
+BUSY_TIMEOUT_SECONDS = 30.0
+
+
+class SQLiteConnectionManager:
+    """One WAL-mode connection per thread for a SQLite database file."""
+
+    def __init__(self, db_path: Path):
+        """
+        Initialize the connection manager.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=BUSY_TIMEOUT_SECONDS,
+                cached_statements=STATEMENT_CACHE_SIZE,
+                # Used only by this thread; close() may run on another one
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+            if mode.lower() != "wal":
+                logger.debug(f"WAL not available for {self.db_path}, using {mode} journal")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Run a block in one transaction: commit on success, roll back on error."""
+        conn = self.connection()
+        with conn:
+            yield conn
+
+    def execute(self, sql: str, parameters: Sequence[Any] = ()) -> sqlite3.Cursor:
+        """Execute a read statement on this thread's connection."""
+        return self.connection().execute(sql, parameters)
+
+    def execute_batched(self, sql: str, rows: Iterable[Sequence[Any]], batch_size: int) -> int:
+        """
+        Execute a statement for many rows, committing every batch_size rows.
+
+        Args:
+            sql: Statement with ? placeholders
+            rows: Parameter tuples
+            batch_size: Rows per transaction
+
+        Returns:
+            int: Number of rows written
+        """
+        rows = iter(rows)
+        total = 0
+        while True:
+            batch = list(islice(rows, max(1, batch_size)))
+            if not batch:
+                return total
+            with self.transaction() as conn:
+                conn.executemany(sql, batch)
+            total += len(batch)
+
+    def close(self) -> None:
+        """Close every connection opened by this manager."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
@@ -11,6 +11,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Set
 
 from .base import PipelineContext, PipelineStage, StageResult
+from .fingerprint import combine_fingerprint
 from .state import StateManager
 
 logger = logging.getLogger(__name__)
@@ -160,7 +161,8 @@ class PipelineManager:
         context = PipelineContext(
             processing_dir=self.processing_dir,
             output_dir=self.output_dir,
-            config=config
+            config=config,
+            state_manager=self.state_manager
         )
         
         # Populate context with completed stage information
@@ -177,6 +179,72 @@ class PipelineManager:
         
         return context
         
+    def compute_input_fingerprint(self, stage_name: str, context: PipelineContext) -> Optional[str]:
+        """
+        Compute the input fingerprint digest for a stage.
+        
+        Combines the stage's declared fingerprint with the signature of the
+        last successful run of each dependency, so any upstream change
+        invalidates everything downstream of it.
+        
+        Args:
+            stage_name: Name of the stage
+            context: Pipeline context
+            
+        Returns:
+            Digest string, or None if the stage does not declare a fingerprint
+        """
+        stage = self.stages[stage_name]
+        declared = stage.get_input_fingerprint(context)
+        if declared is None:
+            return None
+            
+        upstream = {
+            dep: self._upstream_signature(dep)
+            for dep in sorted(stage.get_dependencies())
+        }
+        return combine_fingerprint({'stage': declared, 'upstream': upstream})
+        
+    def _upstream_signature(self, stage_name: str) -> Optional[object]:
+        """
+        Identify what a dependency last produced.
+        
+        Prefers the recorded output checksums; stages without recorded outputs
+        fall back to their input fingerprint, then to the execution ID.
+        """
+        last_execution = self.state_manager.get_last_successful_execution(stage_name)
+        if not last_execution:
+            return None
+            
+        checksums = self.state_manager.get_output_checksums(last_execution['id'])
+        if checksums:
+            return sorted(checksums.values(), key=str)
+        if last_execution.get('input_fingerprint'):
+            return last_execution['input_fingerprint']
+        return f"execution:{last_execution['id']}"
+        
+    def _inputs_unchanged(self, stage_name: str, fingerprint: str) -> Optional[bool]:
+        """
+        Compare a fingerprint with the stage's last successful run.
+        
+        Returns:
+            True if inputs and outputs are unchanged, False if the stage must
+            run, None if the last run predates fingerprinting
+        """
+        last_execution = self.state_manager.get_last_successful_execution(stage_name)
+        if not last_execution:
+            return False
+        previous = last_execution.get('input_fingerprint')
+        if previous is None:
+            return None
+        if previous != fingerprint:
+            logger.info(f"Stage '{stage_name}' inputs changed since last run")
+            return False
+        if not self.state_manager.outputs_intact(last_execution['id']):
+            logger.info(f"Stage '{stage_name}' outputs changed since last run")
+            return False
+        return True
+        
     def execute_stage(self, stage_name: str, context: PipelineContext, force: bool = False) -> StageResult:
         """
         Execute a single pipeline stage.
@@ -193,16 +261,28 @@ class PipelineManager:
             raise ValueError(f"Unknown stage: {stage_name}")
             
         stage = self.stages[stage_name]
+        fingerprint = self.compute_input_fingerprint(stage_name, context)
         
-        # Check if stage can be skipped
-        if not force and stage.can_skip(context):
-            logger.info(f"Skipping stage '{stage_name}' - already completed")
-            return StageResult(
-                success=True,
-                execution_time=0.0,
-                records_processed=0,
-                metadata={'skipped': True}
-            )
+        # Check if stage can be skipped: declared fingerprints are authoritative,
+        # stages without one (or without a fingerprinted run yet) use can_skip()
+        if not force:
+            unchanged = self._inputs_unchanged(stage_name, fingerprint) if fingerprint else None
+            if unchanged:
+                logger.info(f"Skipping stage '{stage_name}' - inputs unchanged")
+                return StageResult(
+                    success=True,
+                    execution_time=0.0,
+                    records_processed=0,
+                    metadata={'skipped': True, 'reason': 'inputs_unchanged'}
+                )
+            if unchanged is None and stage.can_skip(context):
+                logger.info(f"Skipping stage '{stage_name}' - already completed")
+                return StageResult(
+                    success=True,
+                    execution_time=0.0,
+                    records_processed=0,
+                    metadata={'skipped': True}
+                )
             
         # Validate prerequisites
         if not stage.validate_prerequisites(context):
@@ -258,7 +338,7 @@ class PipelineManager:
             )
             
         # Record stage result
-        self.state_manager.record_stage_result(execution_id, result)
+        self.state_manager.record_stage_result(execution_id, result, fingerprint)
         
         return result
         
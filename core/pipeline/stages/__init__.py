@@ -2,38 +2,45 @@
 Pipeline Stages
 
 Individual pipeline stages for the modular SMS processing system.
+
+Stage classes are resolved lazily from _STAGE_MODULES on first access, so
+importing one stage (e.g. IndexGenerationStage for the index-generation
+command) does not pay for BeautifulSoup or the lookup client pulled in by
+the others.
 """
 
-# Phase 2: Phone Processing Stages
-from .phone_discovery import PhoneDiscoveryStage
-from .phone_lookup import PhoneLookupStage
-
-# Phase 3: File Discovery & Content Extraction Stages
-from .file_discovery import FileDiscoveryStage
-from .content_extraction import ContentExtractionStage
-
-# Phase 1: Attachment Processing (Option A implementation)
-from .attachment_mapping import AttachmentMappingStage
-# Phase 2: Attachment Copying
-from .attachment_copying import AttachmentCopyingStage
-# Phase 3a: HTML Generation
-from .html_generation import HtmlGenerationStage
-# Phase 4: Index Generation
-from .index_generation import IndexGenerationStage
-
-__all__ = [
-    # Phase 2: Phone Processing
-    'PhoneDiscoveryStage',
-    'PhoneLookupStage',
-    # Phase 3: File Discovery & Content Extraction
-    'FileDiscoveryStage',
-    'ContentExtractionStage',
-    # Phase 1: Attachment Processing
-    'AttachmentMappingStage',
+import importlib
+
+_STAGE_MODULES = {
+    # Phase 2: Phone Processing Stages
+    'PhoneDiscoveryStage': '.phone_discovery',
+    'PhoneLookupStage': '.phone_lookup',
+    # Phase 3: File Discovery & Content Extraction Stages
+    'FileDiscoveryStage': '.file_discovery',
+    'ContentExtractionStage': '.content_extraction',
+    # Phase 1: Attachment Processing (Option A implementation)
+    'AttachmentMappingStage': '.attachment_mapping',
     # Phase 2: Attachment Copying
-    'AttachmentCopyingStage',
+    'AttachmentCopyingStage': '.attachment_copying',
+    # Optional: previews for image attachments
+    'ThumbnailGenerationStage': '.thumbnail_generation',
     # Phase 3a: HTML Generation
-    'HtmlGenerationStage',
+    'HtmlGenerationStage': '.html_generation',
     # Phase 4: Index Generation
-    'IndexGenerationStage',
-]
+    'IndexGenerationStage': '.index_generation',
+}
+
+__all__ = list(_STAGE_MODULES)
+
+
+def __getattr__(name):
+    module_name = _STAGE_MODULES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    stage_class = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = stage_class
+    return stage_class
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -10,6 +10,9 @@ Features:
 - Implements resumability (skips already-copied files)
 - Tracks copied files for idempotency
 - Handles errors gracefully (missing files, permissions, disk space)
+- Deduplicates identical content into attachments/.objects/<sha256>
+  (see core.attachment_store); hash fields are kept in
+  attachment_hashes.json so reruns do not re-hash unchanged files
 
 Dependencies: attachment_mapping stage (requires attachment_mapping.json)
 
@@ -19,11 +22,11 @@ Date: 2025-10-20
 
 import json
 import logging
-import shutil
 import time
 from pathlib import Path
-from typing import Dict, List, Set
+from typing import List, Set
 
+from core.attachment_store import HASH_FIELDS, AttachmentStore, cached_hashes, load_hash_cache, save_hash_cache
 from core.pipeline.base import PipelineStage, PipelineContext, StageResult
 
 logger = logging.getLogger(__name__)
@@ -179,6 +182,10 @@ class AttachmentCopyingStage(PipelineStage):
             copied_files: List[str] = []
             skipped_files: List[str] = []
             errors: List[str] = []
+            store = AttachmentStore(attachments_dir)
+            # attachment_mapping.json belongs to the mapping stage; hashes live in a sidecar
+            hash_cache = load_hash_cache(context.output_dir)
+            cache_changed = False
 
             # Copy each file
             for src_ref, file_info in mappings.items():
@@ -188,8 +195,9 @@ class AttachmentCopyingStage(PipelineStage):
                 # Destination path preserves directory structure
                 dest_path = attachments_dir / filename
 
-                # Skip if already copied
+                # Skip if already copied (its recorded hashes still feed deduplication)
                 if dest_path.exists():
+                    store.register_existing(dest_path, hash_cache.get(filename, {}))
                     skipped_files.append(filename)
                     continue
 
@@ -205,9 +213,14 @@ class AttachmentCopyingStage(PipelineStage):
                         errors.append(error_msg)
                         continue
 
-                    # Copy with metadata preservation
-                    shutil.copy2(source_path, dest_path)
+                    # Copy with metadata preservation, or link to identical content
+                    cached = hash_cache.get(filename, {})
+                    fields = cached_hashes(source_path, cached)
+                    store.place(source_path, dest_path, fields)
                     copied_files.append(filename)
+                    if any(cached.get(key) != fields.get(key) for key in HASH_FIELDS):
+                        hash_cache[filename] = {key: fields[key] for key in HASH_FIELDS if key in fields}
+                        cache_changed = True
 
                 except PermissionError as e:
                     error_msg = f"Permission denied copying {filename}: {e}"
@@ -224,6 +237,16 @@ class AttachmentCopyingStage(PipelineStage):
                     logger.error(f"   ❌ {error_msg}")
                     errors.append(error_msg)
 
+            # Record full hashes computed for earlier files when a pre-hash collided
+            for file_info in mappings.values():
+                cached = hash_cache.get(file_info['filename'])
+                sha256 = store.known_sha256(attachments_dir / file_info['filename'])
+                if sha256 and cached and cached.get('sha256') != sha256 and 'size' in cached:
+                    cached['sha256'] = sha256
+                    cache_changed = True
+            if cache_changed:
+                save_hash_cache(context.output_dir, hash_cache)
+
             # Calculate totals
             total_copied = len(copied_files)
             total_skipped = len(skipped_files)
@@ -236,6 +259,7 @@ class AttachmentCopyingStage(PipelineStage):
             logger.info(f"   📊 Total processed: {total_processed}")
             logger.info(f"   📋 Copied: {total_copied}")
             logger.info(f"   ⏭️  Skipped: {total_skipped}")
+            logger.info(f"   🔗 Deduplicated: {store.files_linked} ({store.bytes_saved:,} bytes saved)")
             logger.info(f"   ⚠️  Errors: {total_errors}")
             logger.info(f"   💾 Output: {attachments_dir}")
 
@@ -244,6 +268,8 @@ class AttachmentCopyingStage(PipelineStage):
                 'total_copied': total_copied,
                 'total_skipped': total_skipped,
                 'total_errors': total_errors,
+                'total_linked': store.files_linked,
+                'bytes_saved': store.bytes_saved,
                 'output_dir': str(attachments_dir),
                 'copied_files': copied_files
             }
@@ -10,7 +10,6 @@ This stage implements smart caching (Option A):
 - Integrates with both attachment cache and pipeline state
 """
 
-import hashlib
 import json
 import logging
 import os
@@ -18,7 +17,10 @@ import time
 from pathlib import Path
 from typing import Dict, Tuple
 
+from core.directory_snapshot import get_directory_snapshot
+
 from ..base import PipelineStage, PipelineContext, StageResult
+from ..fingerprint import fingerprint_directory
 
 logger = logging.getLogger(__name__)
 
@@ -27,8 +29,8 @@ def compute_directory_hash(processing_dir: Path) -> str:
     """
     Compute a hash of the directory structure for validation.
 
-    Uses directory modification time, size, and file count to detect changes.
-    This is faster than hashing all file contents.
+    Uses the shared directory snapshot, so only directories whose mtime
+    changed are re-listed. This is faster than hashing all file contents.
 
     Args:
         processing_dir: Directory to hash
@@ -37,19 +39,7 @@ def compute_directory_hash(processing_dir: Path) -> str:
         Hash string representing directory state
     """
     try:
-        # Use directory stats for quick validation
-        dir_stat = processing_dir.stat()
-        calls_dir = processing_dir / "Calls"
-        calls_stat = calls_dir.stat() if calls_dir.exists() else None
-
-        # Count HTML files (faster than counting all files)
-        file_count = sum(1 for _ in processing_dir.glob("**/*.html"))
-
-        hash_input = f"{dir_stat.st_mtime}_{dir_stat.st_size}_{file_count}"
-        if calls_stat:
-            hash_input += f"_{calls_stat.st_mtime}_{calls_stat.st_size}"
-
-        return hashlib.md5(hash_input.encode()).hexdigest()[:16]
+        return get_directory_snapshot(processing_dir).digest()[:16]
 
     except Exception as e:
         logger.debug(f"Failed to compute directory hash: {e}")
@@ -68,7 +58,7 @@ def count_files_in_directory(processing_dir: Path) -> int:
         Number of HTML files found
     """
     try:
-        return sum(1 for _ in processing_dir.glob("**/*.html"))
+        return get_directory_snapshot(processing_dir).file_count(".html")
     except Exception:
         return 0
 
@@ -240,6 +230,18 @@ class AttachmentMappingStage(PipelineStage):
         logger.info(f"Skipping {self.name}: output valid and directory unchanged")
         return True
 
+    def get_input_fingerprint(self, context: PipelineContext) -> Dict:
+        """
+        Fingerprint every file under Calls/ (HTML and attachments).
+
+        Args:
+            context: Pipeline context
+
+        Returns:
+            Fingerprint parts for content-addressed skipping
+        """
+        return {'calls': fingerprint_directory(context.processing_dir / "Calls")}
+
     def get_dependencies(self) -> list:
         """
         No dependencies - can run independently.
@@ -3,6 +3,10 @@ Content Extraction Stage
 
 Extracts structured data from HTML files, parsing messages, timestamps,
 participants, and attachments into normalized data structures.
+
+When the pipeline provides a StateManager, each extracted conversation is
+appended to extracted_content.partial.jsonl and the file is logged with
+record_items, so an interrupted run resumes at file granularity.
 """
 
 import json
@@ -19,13 +23,16 @@ from ..base import PipelineStage, PipelineContext, StageResult
 
 logger = logging.getLogger(__name__)
 
+PARTIAL_OUTPUT_FILENAME = "extracted_content.partial.jsonl"
+
 
 class ContentExtractionStage(PipelineStage):
     """Extracts structured content from HTML files."""
     
-    def __init__(self, max_files_per_batch: int = 1000):
+    def __init__(self, max_files_per_batch: int = 1000, progress_batch_size: int = 100):
         super().__init__("content_extraction")
         self.max_files_per_batch = max_files_per_batch
+        self.progress_batch_size = progress_batch_size
         
         # Regex patterns for data extraction
         self.timestamp_patterns = [
@@ -68,6 +75,11 @@ class ContentExtractionStage(PipelineStage):
             
             with open(output_file, 'w') as f:
                 json.dump(extracted_content, f, indent=2, default=str)
+
+            # Complete: the next run starts from scratch
+            if context.state_manager is not None:
+                context.state_manager.clear_recorded_items(self.name)
+            (context.output_dir / PARTIAL_OUTPUT_FILENAME).unlink(missing_ok=True)
                 
             execution_time = time.time() - start_time
             
@@ -133,6 +145,37 @@ class ContentExtractionStage(PipelineStage):
             "extraction_errors": []
         }
         
+        state_manager = context.state_manager
+        resumed = self._load_resumed_conversations(files_to_process, context) if state_manager else {}
+        if resumed:
+            logger.info(f"Resuming: {len(resumed)} files already extracted")
+        partial_file = None
+        if state_manager is not None:
+            context.output_dir.mkdir(parents=True, exist_ok=True)
+            # Keep the partial output only when resuming from it
+            mode = 'a' if resumed else 'w'
+            partial_file = open(context.output_dir / PARTIAL_OUTPUT_FILENAME, mode, encoding='utf-8')
+        pending_items: List[str] = []
+
+        def flush_progress():
+            if partial_file is not None and pending_items:
+                partial_file.flush()
+                state_manager.record_items(self.name, pending_items, batch_size=self.progress_batch_size)
+                pending_items.clear()
+
+        try:
+            self._extract_files(files_to_process, resumed, extracted_content, partial_file, pending_items, flush_progress)
+        finally:
+            flush_progress()
+            if partial_file is not None:
+                partial_file.close()
+
+        return extracted_content
+
+    def _extract_files(self, files_to_process: List[Dict[str, Any]], resumed: Dict[str, Optional[Dict[str, Any]]],
+                       extracted_content: Dict[str, Any], partial_file, pending_items: List[str],
+                       flush_progress) -> None:
+        """Extract each file, reusing conversations resumed from an interrupted run."""
         processed_count = 0
         error_count = 0
         
@@ -140,6 +183,13 @@ class ContentExtractionStage(PipelineStage):
             if processed_count >= self.max_files_per_batch:
                 logger.info(f"Reached batch limit of {self.max_files_per_batch} files")
                 break
+
+            path_key = str(file_info.get("path"))
+            if path_key in resumed:
+                if resumed[path_key]:
+                    extracted_content["conversations"].append(resumed[path_key])
+                processed_count += 1
+                continue
                 
             try:
                 file_path = Path(file_info["path"])
@@ -162,6 +212,13 @@ class ContentExtractionStage(PipelineStage):
                     
                 if conversation:
                     extracted_content["conversations"].append(conversation)
+                if partial_file is not None:
+                    partial_file.write(json.dumps(
+                        {"path": path_key, "conversation": conversation}, default=str
+                    ) + "\n")
+                    pending_items.append(path_key)
+                    if len(pending_items) >= self.progress_batch_size:
+                        flush_progress()
                     
                 processed_count += 1
                 
@@ -180,8 +237,38 @@ class ContentExtractionStage(PipelineStage):
                 
         extracted_content["extraction_metadata"]["files_processed"] = processed_count
         extracted_content["extraction_metadata"]["extraction_errors"] = error_count
+
+    def _load_resumed_conversations(self, files_to_process: List[Dict[str, Any]],
+                                    context: PipelineContext) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Load conversations extracted by an interrupted run.
         
-        return extracted_content
+        Only files recorded as done, whose size is unchanged, are reused.
+        
+        Returns:
+            Dict mapping file path to its conversation (None if it had none)
+        """
+        done = context.state_manager.get_recorded_items(self.name)
+        partial_path = context.output_dir / PARTIAL_OUTPUT_FILENAME
+        if not done or not partial_path.exists():
+            return {}
+
+        sizes = {str(info.get("path")): info.get("size_bytes", 0) for info in files_to_process}
+        resumed = {}
+        with open(partial_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Torn final line
+                path_key = entry.get("path")
+                if path_key not in done or path_key not in sizes:
+                    continue
+                conversation = entry.get("conversation")
+                if conversation and conversation["metadata"].get("file_size", 0) != sizes[path_key]:
+                    continue
+                resumed[path_key] = conversation
+        return resumed
         
     def _extract_sms_mms_content(self, file_path: Path, file_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Extract content from SMS/MMS HTML files."""
@@ -375,6 +462,10 @@ class ContentExtractionStage(PipelineStage):
                     
         return message
         
+    def get_input_fingerprint(self, context: PipelineContext) -> Dict[str, Any]:
+        """Inputs are the file inventory (tracked as an upstream output) and batch size."""
+        return {'max_files_per_batch': self.max_files_per_batch}
+        
     def get_dependencies(self) -> List[str]:
         """Content extraction depends on file discovery."""
         return ["file_discovery"]
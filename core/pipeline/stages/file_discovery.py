@@ -16,6 +16,7 @@ from typing import Dict, List, Set, Any, Tuple
 from bs4 import BeautifulSoup
 
 from ..base import PipelineStage, PipelineContext, StageResult
+from ..fingerprint import fingerprint_files
 
 logger = logging.getLogger(__name__)
 
@@ -303,6 +304,10 @@ class FileDiscoveryStage(PipelineStage):
             
         return metadata
         
+    def get_input_fingerprint(self, context: PipelineContext) -> Dict[str, Any]:
+        """Fingerprint the HTML files that would be cataloged."""
+        return {'html_files': fingerprint_files(self._discover_html_files(context.processing_dir))}
+        
     def get_dependencies(self) -> List[str]:
         """File discovery has no dependencies."""
         return []
@@ -7,12 +7,17 @@ Implements file-level resumability (simpler approach).
 Features:
 - Processes HTML files from processing_dir/Calls/
 - Generates conversation HTML files in output_dir
-- Tracks which files have been processed (file-level state)
+- Tracks which files have been processed (file-level state, also logged to
+  the pipeline StateManager when one is available)
 - Skips already-processed files on resume
+- Re-renders every conversation when the output-affecting config,
+  phone_lookup.txt or the thumbnail index changes
 - Accumulates statistics across runs
 - Finalizes all conversations at end (same as current behavior)
+- Optionally indexes written messages into search_index.db (build_search_index)
 
-Dependencies: attachment_mapping, attachment_copying stages
+Dependencies: attachment_mapping, attachment_copying stages (and
+thumbnail_generation when registered before it: previews are fingerprinted)
 
 Author: Claude Code
 Date: 2025-10-20
@@ -25,9 +30,35 @@ from pathlib import Path
 from typing import Dict, List, Optional, Set
 
 from core.pipeline.base import PipelineStage, PipelineContext, StageResult
+from core.pipeline.fingerprint import (
+    combine_fingerprint,
+    file_checksum,
+    fingerprint_config,
+    fingerprint_directory,
+)
 
 logger = logging.getLogger(__name__)
 
+# ProcessingConfig fields that change which conversations are written
+OUTPUT_CONFIG_FIELDS = (
+    'skip_filtered_contacts',
+    'include_service_codes',
+    'filter_numbers_without_aliases',
+    'filter_non_phone_numbers',
+    'filter_groups_with_all_filtered',
+    'include_call_only_conversations',
+    'filter_commercial_conversations',
+    'build_search_index',
+    'paginate_messages',
+    'paginate_bytes',
+    'paginate_by',
+    'exclude_older_than',
+    'exclude_newer_than',
+    'include_date_range',
+    'test_mode',
+    'test_limit',
+)
+
 
 class HtmlGenerationStage(PipelineStage):
     """
@@ -46,6 +77,8 @@ class HtmlGenerationStage(PipelineStage):
     Resumability:
         - Tracks processed files in html_processing_state.json
         - Skips already-processed files on rerun
+        - Starts over when the rendering inputs (config, phone_lookup.txt,
+          thumbnail index) differ from the ones recorded in the state
         - Accumulates statistics across runs
         - Can resume after interruption
     """
@@ -58,6 +91,38 @@ class HtmlGenerationStage(PipelineStage):
         """Return list of stage names this stage depends on."""
         return ["attachment_mapping", "attachment_copying"]
 
+    def get_input_fingerprint(self, context: PipelineContext) -> Dict:
+        """
+        Fingerprint the Calls/ HTML files and the inputs every page is rendered with.
+
+        Args:
+            context: Pipeline context
+
+        Returns:
+            Fingerprint parts for content-addressed skipping
+        """
+        return {
+            'calls': fingerprint_directory(context.processing_dir / "Calls", "**/*.html"),
+            **self._render_inputs(context),
+        }
+
+    def _render_inputs(self, context: PipelineContext) -> Dict:
+        """
+        Fingerprint the inputs that affect every conversation, not just new files.
+
+        New Calls/ files are processed incrementally, but a change here
+        makes execute() re-render all conversations.
+        """
+        from core.thumbnails import thumbnail_index_path
+
+        return {
+            'config': fingerprint_config(context.config, OUTPUT_CONFIG_FIELDS),
+            # Saved again by every PhoneLookupManager (at exit too), so by content
+            'phone_lookup': file_checksum(context.processing_dir / "phone_lookup.txt"),
+            # Previews shown in place of image links (rewritten on every thumbnail run, so by content)
+            'thumbnails': file_checksum(thumbnail_index_path(context.output_dir)),
+        }
+
     def validate_prerequisites(self, context: PipelineContext) -> bool:
         """
         Validate that prerequisites are met.
@@ -171,7 +236,18 @@ class HtmlGenerationStage(PipelineStage):
             state_file = context.output_dir / "html_processing_state.json"
             state = self._load_state(state_file)
 
+            render_fingerprint = combine_fingerprint(self._render_inputs(context))
+            if state.get('render_fingerprint', render_fingerprint) != render_fingerprint:
+                logger.info("🔄 Config, phone lookup or previews changed - re-rendering all conversations")
+                self._remove_previous_outputs(context)
+                state = {'files_processed': [], 'stats': {}}
+                if context.state_manager is not None:
+                    context.state_manager.clear_recorded_items(self.name)
+
             processed_files_set = set(state.get('files_processed', []))
+            if context.state_manager is not None:
+                # Files whose conversations were finalized, per the pipeline's progress log
+                processed_files_set |= context.state_manager.get_recorded_items(self.name)
             previous_stats = state.get('stats', {
                 'num_sms': 0,
                 'num_img': 0,
@@ -201,7 +277,8 @@ class HtmlGenerationStage(PipelineStage):
                 self._save_state(state_file, {
                     'files_processed': list(processed_files_set),
                     'stats': previous_stats,
-                    'conversations': state.get('conversations', {})  # Preserve existing
+                    'conversations': state.get('conversations', {}),  # Preserve existing
+                    'render_fingerprint': render_fingerprint
                 })
 
                 return StageResult(
@@ -216,6 +293,7 @@ class HtmlGenerationStage(PipelineStage):
                         'files_processed': 0,
                         'files_skipped': 0
                     },
+                    output_files=self._output_files(context, state.get('conversations', {})),
                     execution_time=time.time() - start_time
                 )
 
@@ -247,6 +325,7 @@ class HtmlGenerationStage(PipelineStage):
                         'files_processed': 0,
                         'files_skipped': files_skipped
                     },
+                    output_files=self._output_files(context, state.get('conversations', {})),
                     execution_time=time.time() - start_time
                 )
 
@@ -260,6 +339,10 @@ class HtmlGenerationStage(PipelineStage):
                 output_format="html"
             )
 
+            # Optional full-text index, extended incrementally on every run
+            search_index = self._open_search_index(context)
+            conversation_manager.search_index = search_index
+
             # Initialize phone lookup manager (disable prompts for pipeline)
             phone_lookup_file = context.processing_dir / "phone_lookup.txt"
             phone_lookup_manager = PhoneLookupManager(
@@ -308,6 +391,9 @@ class HtmlGenerationStage(PipelineStage):
             # 8. Finalize all conversations
             logger.info("   Finalizing conversations...")
             conversation_manager.finalize_conversation_files(config=context.config)
+            if search_index is not None:
+                search_index.close()
+                logger.info(f"   Search index: {search_index.messages_added:,} new messages indexed")
 
             # 9. Generate index.html
             logger.info("   Generating index...")
@@ -328,13 +414,20 @@ class HtmlGenerationStage(PipelineStage):
             conversation_stats = self._extract_conversation_stats(conversation_manager)
             logger.info(f"   Extracted stats for {len(conversation_stats)} conversations")
 
-            # 11. Update state
+            # 11. Update state (only now are the new files' conversations finalized)
             processed_files_set.update(str(f) for f in files_to_process)
+            if context.state_manager is not None:
+                context.state_manager.record_items(self.name, (str(f) for f in files_to_process))
 
+            # Write phone_lookup.txt in its saved form now, so the save at exit
+            # leaves the fingerprint below unchanged
+            phone_lookup_manager.save_aliases()
             self._save_state(state_file, {
                 'files_processed': list(processed_files_set),
                 'stats': total_stats,
-                'conversations': conversation_stats  # NEW: Per-conversation stats
+                'conversations': conversation_stats,  # NEW: Per-conversation stats
+                # Taken again: processing may have created or extended phone_lookup.txt
+                'render_fingerprint': combine_fingerprint(self._render_inputs(context))
             })
 
             logger.info(f"✅ HTML generation completed in {elapsed_time:.2f}s")
@@ -355,6 +448,7 @@ class HtmlGenerationStage(PipelineStage):
                     'files_skipped': files_skipped,
                     'total_files_ever_processed': len(processed_files_set)
                 },
+                output_files=self._output_files(context, conversation_stats),
                 execution_time=elapsed_time
             )
 
@@ -372,6 +466,39 @@ class HtmlGenerationStage(PipelineStage):
                 execution_time=time.time() - start_time
             )
 
+    def _open_search_index(self, context: PipelineContext):
+        """
+        Open the search index if enabled in the configuration.
+
+        Returns:
+            SearchIndex, or None if disabled or FTS5 is unavailable
+        """
+        from core.search_index import open_search_index
+
+        return open_search_index(context.config, context.output_dir)
+
+    def _output_files(self, context: PipelineContext, conversations: Dict[str, Dict]) -> List[Path]:
+        """
+        Files to checksum for this run: the conversation pages and the state file.
+
+        index.html is left out because index_generation rewrites it.
+        """
+        files = [context.output_dir / "html_processing_state.json"]
+        for info in conversations.values():
+            path = context.output_dir / info.get('file_path', '')
+            if path.is_file():
+                files.append(path)
+        return files
+
+    def _remove_previous_outputs(self, context: PipelineContext) -> None:
+        """Delete the conversations of earlier runs so filtered-out ones do not linger."""
+        from core.conversation_manifest import load_manifest
+        from core.conversation_pages import remove_pages
+
+        for conversation_id in load_manifest(context.output_dir):
+            (context.output_dir / f"{conversation_id}.html").unlink(missing_ok=True)
+            remove_pages(context.output_dir, conversation_id)
+
     def _load_state(self, state_file: Path) -> Dict:
         """Load processing state from JSON file."""
         if not state_file.exists():
@@ -22,10 +22,19 @@ import hashlib
 import logging
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterator, List, Optional, Set
 from datetime import datetime
 
+from core.conversation_manifest import (
+    MANIFEST_FILENAME,
+    get_valid_record,
+    load_manifest,
+    manifest_covers,
+    manifest_digest,
+)
 from core.pipeline.base import PipelineStage, PipelineContext, StageResult
+from core.pipeline.fingerprint import fingerprint_files
+from templates.loader import CompiledTemplate
 
 logger = logging.getLogger(__name__)
 
@@ -85,6 +94,36 @@ class IndexGenerationStage(PipelineStage):
 
         return True
 
+    def get_input_fingerprint(self, context: PipelineContext) -> Dict:
+        """
+        Fingerprint the conversation files and the files merged into the index.
+
+        Args:
+            context: Pipeline context
+
+        Returns:
+            Fingerprint parts for content-addressed skipping
+        """
+        output_dir = context.output_dir
+        conv_files = [
+            f for f in output_dir.glob("*.html")
+            if f.name != "index.html" and not f.name.endswith(".archived.html")
+        ]
+        extras = [
+            f for f in (output_dir / "html_processing_state.json", output_dir / "summaries.json")
+            if f.exists()
+        ]
+        # Content hashes from the manifest avoid a stat() per conversation file
+        manifest = load_manifest(output_dir)
+        if manifest and manifest_covers(manifest, conv_files):
+            conversations = manifest_digest(manifest, conv_files)
+        else:
+            conversations = fingerprint_files(conv_files, root=output_dir)
+        return {
+            'conversations': conversations,
+            'extras': fingerprint_files(extras, root=output_dir),
+        }
+
     def can_skip(self, context: PipelineContext) -> bool:
         """
         Determine if stage can be skipped (smart caching).
@@ -130,7 +169,7 @@ class IndexGenerationStage(PipelineStage):
             return True
 
         # 4. Compute hash of current files
-        current_hash = self._compute_files_hash(current_files)
+        current_hash = self._compute_files_hash(current_files, load_manifest(context.output_dir))
         cached_hash = cache.get("conversation_files_hash", "")
 
         if current_hash != cached_hash:
@@ -188,9 +227,12 @@ class IndexGenerationStage(PipelineStage):
                     execution_time=time.time() - start_time
                 )
 
-            # 2. Load metadata cache
+            # 2. Load metadata cache and the manifest written at finalize time
             cache_file = context.output_dir / "conversation_metadata.json"
             cached_metadata = self._load_metadata_cache(cache_file)
+            manifest = load_manifest(context.output_dir)
+            if manifest:
+                logger.info(f"   Loaded {MANIFEST_FILENAME} ({len(manifest)} conversations)")
 
             # 3. Load statistics from HTML generation stage
             html_state_file = context.output_dir / "html_processing_state.json"
@@ -231,7 +273,8 @@ class IndexGenerationStage(PipelineStage):
             metadata = self._build_conversation_metadata(
                 conv_files,
                 cached_metadata.get('conversations', {}),
-                conversation_stats  # NEW: Pass per-conversation stats
+                conversation_stats,  # NEW: Pass per-conversation stats
+                manifest
             )
 
             # 5. Generate index.html (use displayed_stats instead of global stats)
@@ -243,7 +286,7 @@ class IndexGenerationStage(PipelineStage):
             )
 
             # 6. Save metadata cache
-            files_hash = self._compute_files_hash(conv_files)
+            files_hash = self._compute_files_hash(conv_files, manifest)
             self._save_metadata_cache(cache_file, metadata, files_hash)
 
             elapsed_time = time.time() - start_time
@@ -255,6 +298,7 @@ class IndexGenerationStage(PipelineStage):
             return StageResult(
                 success=True,
                 records_processed=len(conv_files),
+                output_files=[context.output_dir / "index.html", cache_file],
                 metadata={
                     'total_conversations': len(conv_files),
                     'files_skipped': 0
@@ -352,7 +396,8 @@ class IndexGenerationStage(PipelineStage):
         self,
         conv_files: List[Path],
         cached_metadata: Dict,
-        conversation_stats: Dict  # NEW parameter
+        conversation_stats: Dict,  # NEW parameter
+        manifest: Optional[Dict] = None
     ) -> Dict:
         """
         Build metadata for all conversation files.
@@ -364,11 +409,13 @@ class IndexGenerationStage(PipelineStage):
             conv_files: List of conversation HTML file paths
             cached_metadata: Previously cached metadata
             conversation_stats: Per-conversation stats from HTML generation stage
+            manifest: Records from conversations.manifest.jsonl (optional)
 
         Returns:
             Dictionary mapping conversation ID to metadata
         """
         metadata = {}
+        manifest = manifest or {}
 
         for file_path in conv_files:
             conversation_id = file_path.stem
@@ -385,17 +432,17 @@ class IndexGenerationStage(PipelineStage):
                     if isinstance(cached_mtime, str):
                         # Skip comparison for string timestamps (legacy format)
                         # Always re-extract to ensure consistent format
-                        file_meta = self._extract_file_metadata(file_path)
+                        file_meta = self._extract_file_metadata(file_path, manifest)
                     elif abs(float(cached_mtime) - current_mtime) < 1.0:
                         file_meta = cached
                     else:
-                        file_meta = self._extract_file_metadata(file_path)
+                        file_meta = self._extract_file_metadata(file_path, manifest)
                 except (ValueError, TypeError):
                     # Invalid cached timestamp, re-extract
-                    file_meta = self._extract_file_metadata(file_path)
+                    file_meta = self._extract_file_metadata(file_path, manifest)
             else:
                 # Extract metadata from file
-                file_meta = self._extract_file_metadata(file_path)
+                file_meta = self._extract_file_metadata(file_path, manifest)
 
             # Merge with per-conversation stats from Phase 3a
             conv_stats = conversation_stats.get(conversation_id, {})
@@ -412,27 +459,32 @@ class IndexGenerationStage(PipelineStage):
 
         return metadata
 
-    def _extract_file_metadata(self, file_path: Path) -> Dict:
+    def _extract_file_metadata(self, file_path: Path, manifest: Optional[Dict] = None) -> Dict:
         """
         Extract metadata from a conversation HTML file.
 
+        Counts come from the manifest record when it still matches the file;
+        otherwise they are left at zero rather than re-parsing the HTML.
+
         Args:
             file_path: Path to conversation HTML file
+            manifest: Records from conversations.manifest.jsonl (optional)
 
         Returns:
             Dictionary with file metadata
         """
         try:
             stat = file_path.stat()
+            record = get_valid_record(manifest or {}, file_path) or {}
 
             return {
                 'file_path': file_path.name,
                 'file_size': stat.st_size,
-                'sms_count': 0,  # Would need to parse HTML to get accurate counts
-                'call_count': 0,
-                'voicemail_count': 0,
-                'attachment_count': 0,
-                'latest_message_timestamp': None,
+                'sms_count': record.get('sms_count', 0),
+                'call_count': record.get('call_count', 0),
+                'voicemail_count': record.get('voicemail_count', 0),
+                'attachment_count': record.get('attachment_count', 0),
+                'latest_message_timestamp': record.get('latest_message_time'),
                 'last_modified': stat.st_mtime
             }
         except OSError as e:
@@ -465,10 +517,7 @@ class IndexGenerationStage(PipelineStage):
         if not template_path.exists():
             raise FileNotFoundError(f"Index template not found: {template_path}")
 
-        template_content = template_path.read_text()
-
-        # Build conversation rows (pass output_dir for summaries.json)
-        conversation_rows = self._build_conversation_rows(conv_files, metadata, output_dir)
+        template = CompiledTemplate(template_path.read_text())
 
         # Use statistics from HTML generation stage
         total_sms = stats.get('num_sms', 0)
@@ -488,16 +537,15 @@ class IndexGenerationStage(PipelineStage):
             'num_img': total_img,
             'num_vcf': total_vcf,
             'total_messages': total_messages,
-            'conversation_rows': conversation_rows,
+            # Rows are streamed into the file (pass output_dir for summaries.json)
+            'conversation_rows': self._iter_conversation_rows(conv_files, metadata, output_dir),
             'timestamp': datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         }
 
-        # Replace template variables
-        html_content = template_content.format(**template_vars)
-
         # Write index file
         index_file = output_dir / "index.html"
-        index_file.write_text(html_content, encoding='utf-8')
+        with open(index_file, 'w', encoding='utf-8', buffering=1024 * 1024) as f:
+            template.render_to(f, **template_vars)
 
         logger.info(f"Generated index.html with {len(conv_files)} conversations")
 
@@ -513,8 +561,13 @@ class IndexGenerationStage(PipelineStage):
         Returns:
             HTML string with table rows
         """
+        return "".join(self._iter_conversation_rows(conv_files, metadata, output_dir))
+
+    def _iter_conversation_rows(self, conv_files: List[Path], metadata: Dict, output_dir: Path) -> Iterator[str]:
+        """Yield the rows built by _build_conversation_rows, newline-separated."""
         if not conv_files:
-            return "<tr><td colspan='9'><em>No conversation files found</em></td></tr>"
+            yield "<tr><td colspan='9'><em>No conversation files found</em></td></tr>"
+            return
 
         # Load AI summaries if available
         summaries_path = output_dir / 'summaries.json'
@@ -528,8 +581,7 @@ class IndexGenerationStage(PipelineStage):
             except Exception as e:
                 logger.warning(f"Could not load summaries.json: {e}")
 
-        rows = []
-        for file_path in conv_files:
+        for index, file_path in enumerate(conv_files):
             conversation_id = file_path.stem
             meta = metadata.get(conversation_id, {})
 
@@ -553,9 +605,9 @@ class IndexGenerationStage(PipelineStage):
                     <td>{meta.get('latest_message_timestamp', 'N/A')}</td>
                     <td class='summary-cell'>{summary_text}</td>
                 </tr>"""
-            rows.append(row)
-
-        return "\n".join(rows)
+            if index:
+                yield "\n"
+            yield row
 
     def _generate_empty_index(self, output_dir: Path):
         """Generate index.html for empty conversation directory."""
@@ -587,18 +639,23 @@ class IndexGenerationStage(PipelineStage):
         index_file = output_dir / "index.html"
         index_file.write_text(html_content, encoding='utf-8')
 
-    def _compute_files_hash(self, files: List[Path]) -> str:
+    def _compute_files_hash(self, files: List[Path], manifest: Optional[Dict] = None) -> str:
         """
         Compute hash of conversation files for change detection.
 
-        Uses file paths and modification times to detect changes.
+        Uses the manifest's content hashes when it covers every file, and
+        file paths and modification times otherwise.
 
         Args:
             files: List of file paths
+            manifest: Records from conversations.manifest.jsonl (optional)
 
         Returns:
             Hash string
         """
+        if manifest and manifest_covers(manifest, files):
+            return manifest_digest(manifest, files)
+
         hasher = hashlib.md5()
 
         for file_path in sorted(files, key=lambda x: x.name):
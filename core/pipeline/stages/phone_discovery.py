@@ -15,6 +15,7 @@ from typing import Dict, List, Set, Any
 from bs4 import BeautifulSoup
 
 from ..base import PipelineStage, PipelineContext, StageResult
+from ..fingerprint import fingerprint_files
 
 logger = logging.getLogger(__name__)
 
@@ -251,6 +252,17 @@ class PhoneDiscoveryStage(PipelineStage):
                 
         return known_numbers
         
+    def get_input_fingerprint(self, context: PipelineContext) -> Dict[str, Any]:
+        """Fingerprint the scanned HTML files and the phone lookup files."""
+        lookup_files = [
+            context.processing_dir / "phone_lookup.txt",
+            context.processing_dir.parent / "phone_lookup.txt",
+        ]
+        return {
+            'html_files': fingerprint_files(self._find_html_files(context.processing_dir)),
+            'phone_lookup': fingerprint_files(f for f in lookup_files if f.exists()),
+        }
+        
     def get_dependencies(self) -> List[str]:
         """Phone discovery has no dependencies."""
         return []
@@ -12,11 +12,13 @@ import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Any
-import urllib.request
-import urllib.parse
-import urllib.error
 
 from ..base import PipelineStage, PipelineContext, StageResult
+from core.phone_lookup_client import (
+    LookupResponseCache,
+    PhoneLookupClient,
+    fetch_known_numbers,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,10 +26,15 @@ logger = logging.getLogger(__name__)
 class PhoneLookupStage(PipelineStage):
     """Performs phone number lookup and enrichment."""
     
-    def __init__(self, api_provider: str = "ipqualityscore", api_key: Optional[str] = None):
+    def __init__(self, api_provider: str = "ipqualityscore", api_key: Optional[str] = None,
+                 max_concurrency: int = 4, cache_ttl_days: float = 30.0,
+                 base_url: Optional[str] = None):
         super().__init__("phone_lookup")
         self.api_provider = api_provider.lower()
         self.api_key = api_key
+        self.max_concurrency = max_concurrency
+        self.cache_ttl_days = cache_ttl_days
+        self.base_url_override = base_url
         
         # API configurations
         self.api_configs = {
@@ -180,7 +187,7 @@ class PhoneLookupStage(PipelineStage):
             """)
             
     def _perform_api_lookups(self, phone_numbers: List[str], db_path: Path) -> List[Dict[str, Any]]:
-        """Perform API lookups for phone numbers."""
+        """Perform concurrent, rate-limited API lookups for phone numbers."""
         results = []
         
         # Check if we have API key when required
@@ -189,77 +196,78 @@ class PhoneLookupStage(PipelineStage):
             logger.error(f"API key required for {self.api_provider} but not provided")
             return results
             
-        for phone_number in phone_numbers:
-            try:
-                # Check if we already have this number in the database
-                if self._is_number_in_database(phone_number, db_path):
-                    logger.debug(f"Skipping {phone_number} - already in database")
-                    continue
-                    
-                # Perform API lookup
-                if self.api_provider == "ipqualityscore":
-                    lookup_result = self._lookup_ipqualityscore(phone_number)
-                elif self.api_provider == "truecaller":
-                    lookup_result = self._lookup_truecaller(phone_number)
-                else:
-                    logger.warning(f"Unknown API provider: {self.api_provider}")
-                    continue
-                    
-                if lookup_result:
-                    results.append(lookup_result)
-                    logger.debug(f"Lookup completed for {phone_number}")
-                    
-                # Respect rate limits
-                time.sleep(1)  # Basic rate limiting
-                
-            except Exception as e:
-                logger.warning(f"Lookup failed for {phone_number}: {e}")
-                continue
-                
-        return results
-        
-    def _is_number_in_database(self, phone_number: str, db_path: Path) -> bool:
-        """Check if phone number already exists in database."""
-        with sqlite3.connect(db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT 1 FROM phone_directory WHERE phone_number = ?
-            """, (phone_number,))
-            return cursor.fetchone() is not None
+        # One bulk query instead of a connection per number
+        known_numbers = fetch_known_numbers(db_path, phone_numbers)
+        pending = [n for n in phone_numbers if n not in known_numbers]
+        if known_numbers:
+            logger.info(f"Skipping {len(known_numbers)} numbers already in phone directory")
+        if not pending:
+            return results
             
-    def _lookup_ipqualityscore(self, phone_number: str) -> Optional[Dict[str, Any]]:
-        """Perform lookup using IPQualityScore API."""
-        if not self.api_key:
-            return None
+        if self.api_provider == "truecaller":
+            return [r for r in (self._lookup_truecaller(n) for n in pending) if r]
+        if self.api_provider != "ipqualityscore":
+            logger.warning(f"Unknown API provider: {self.api_provider}")
+            return results
             
+        cache = LookupResponseCache(
+            db_path.parent / "phone_lookup_cache.sqlite",
+            ttl_seconds=self.cache_ttl_days * 24 * 3600,
+        )
         try:
-            # Format phone number for API (remove + and any formatting)
-            clean_number = phone_number.replace('+', '').replace('-', '').replace(' ', '')
-            
-            url = f"https://ipqualityscore.com/api/json/phone/{self.api_key}/{clean_number}"
+            client = PhoneLookupClient(
+                provider=self.api_provider,
+                url_builder=self._ipqualityscore_url,
+                requests_per_minute=config["rate_limit"],
+                max_concurrency=self.max_concurrency,
+                cache=cache,
+                is_cacheable=lambda data: data.get("success", True) is not False,
+            )
+            outcomes = client.lookup_many(pending)
+        finally:
+            cache.close()
             
-            with urllib.request.urlopen(url, timeout=10) as response:
-                data = json.loads(response.read().decode())
+        for phone_number, outcome in outcomes.items():
+            if not outcome.success:
+                continue
+            lookup_result = self._parse_ipqualityscore(phone_number, outcome.response)
+            if lookup_result:
+                results.append(lookup_result)
                 
-            # Parse IPQualityScore response
-            return {
-                "phone_number": phone_number,
-                "display_name": None,
-                "source": "api",
-                "is_spam": data.get("fraud_score", 0) > 75,
-                "spam_confidence": data.get("fraud_score", 0) / 100.0,
-                "line_type": data.get("line_type", "unknown").lower(),
-                "carrier": data.get("carrier", ""),
-                "location": f"{data.get('city', '')}, {data.get('region', '')}, {data.get('country', '')}".strip(', '),
-                "lookup_date": datetime.now().isoformat(),
-                "api_provider": "ipqualityscore",
-                "api_response": json.dumps(data)
-            }
+        logger.info(
+            f"API lookups: {len(results)} succeeded, {client.stats['cache_hits']} from cache, "
+            f"{client.stats['requests']} requests, {client.stats['retries']} retries, "
+            f"{client.stats['failures']} failed"
+        )
+        return results
+        
+    def _ipqualityscore_url(self, phone_number: str) -> str:
+        """Build the IPQualityScore request URL for a phone number."""
+        # Format phone number for API (remove + and any formatting)
+        clean_number = phone_number.replace('+', '').replace('-', '').replace(' ', '')
+        base_url = self.base_url_override or self.api_configs["ipqualityscore"]["base_url"]
+        return f"{base_url.rstrip('/')}/{self.api_key}/{clean_number}"
             
-        except Exception as e:
-            logger.error(f"IPQualityScore lookup failed for {phone_number}: {e}")
+    def _parse_ipqualityscore(self, phone_number: str, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Convert an IPQualityScore response into a phone directory record."""
+        if data.get("success") is False:
+            logger.error(f"IPQualityScore lookup failed for {phone_number}: {data.get('message', 'unknown error')}")
             return None
             
+        return {
+            "phone_number": phone_number,
+            "display_name": None,
+            "source": "api",
+            "is_spam": data.get("fraud_score", 0) > 75,
+            "spam_confidence": data.get("fraud_score", 0) / 100.0,
+            "line_type": (data.get("line_type") or "unknown").lower(),
+            "carrier": data.get("carrier", ""),
+            "location": f"{data.get('city', '')}, {data.get('region', '')}, {data.get('country', '')}".strip(', '),
+            "lookup_date": datetime.now().isoformat(),
+            "api_provider": "ipqualityscore",
+            "api_response": json.dumps(data)
+        }
+            
     def _lookup_truecaller(self, phone_number: str) -> Optional[Dict[str, Any]]:
         """Perform lookup using Truecaller API."""
         # Placeholder for Truecaller implementation
@@ -272,27 +280,30 @@ class PhoneLookupStage(PipelineStage):
         if not lookup_results:
             return
             
+        updated_at = datetime.now().isoformat()
+        rows = [(
+            result["phone_number"],
+            result.get("display_name"),
+            result["source"], 
+            result.get("is_spam", False),
+            result.get("spam_confidence", 0.0),
+            result.get("line_type"),
+            result.get("carrier"),
+            result.get("location"),
+            result["lookup_date"],
+            result.get("api_provider"),
+            result.get("api_response"),
+            updated_at
+        ) for result in lookup_results]
+
+        # One prepared statement for all rows, in one transaction
         with sqlite3.connect(db_path) as conn:
-            for result in lookup_results:
-                conn.execute("""
-                    INSERT OR REPLACE INTO phone_directory 
-                    (phone_number, display_name, source, is_spam, spam_confidence,
-                     line_type, carrier, location, lookup_date, api_provider, api_response, updated_at)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    result["phone_number"],
-                    result.get("display_name"),
-                    result["source"], 
-                    result.get("is_spam", False),
-                    result.get("spam_confidence", 0.0),
-                    result.get("line_type"),
-                    result.get("carrier"),
-                    result.get("location"),
-                    result["lookup_date"],
-                    result.get("api_provider"),
-                    result.get("api_response"),
-                    datetime.now().isoformat()
-                ))
+            conn.executemany("""
+                INSERT OR REPLACE INTO phone_directory 
+                (phone_number, display_name, source, is_spam, spam_confidence,
+                 line_type, carrier, location, lookup_date, api_provider, api_response, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
                 
         logger.info(f"Updated phone directory with {len(lookup_results)} entries")
         
@@ -347,6 +358,10 @@ class PhoneLookupStage(PipelineStage):
                 
         return csv_path
         
+    def get_input_fingerprint(self, context: PipelineContext) -> Dict[str, Any]:
+        """Inputs are the phone inventory (tracked as an upstream output) and provider."""
+        return {'api_provider': self.api_provider}
+        
     def get_dependencies(self) -> List[str]:
         """Phone lookup depends on phone discovery."""
         return ["phone_discovery"]
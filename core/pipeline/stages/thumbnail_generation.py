@@ -0,0 +1,266 @@
+"""
+Thumbnail Generation Stage - Optional stage after Attachment Copying
+
+This stage writes bounded-size previews of copied image attachments so
+conversation pages can show a small lazily loaded image that links to the
+original instead of the full-resolution file.
+
+Features:
+- Resizes images in a process pool (Pillow is CPU-bound and holds the GIL)
+- One preview per distinct content, keyed by SHA-256, so duplicate photos
+  share a thumbnail
+- Incremental: attachments whose size and mtime are unchanged since the
+  last run are skipped without hashing, unless the preview was made with
+  another format, size or quality
+- WebP output when Pillow supports it, JPEG otherwise
+- Without Pillow installed the stage succeeds without doing anything
+- Settings not given explicitly are those of the previous run, so running it
+  again from html-generation keeps previews made with --max-size/--quality
+
+Dependencies: attachment_copying stage (requires output_dir/attachments/)
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from core.attachment_store import OBJECTS_DIRNAME, compute_sha256
+from core.pipeline.base import PipelineStage, PipelineContext, StageResult
+from core.thumbnails import (
+    DEFAULT_MAX_SIZE,
+    DEFAULT_QUALITY,
+    IMAGE_EXTENSIONS,
+    THUMBNAILS_DIRNAME,
+    load_thumbnail_entries,
+    load_thumbnail_settings,
+    make_thumbnail,
+    pillow_available,
+    preferred_format,
+    save_thumbnail_entries,
+    thumbnail_relpath,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class ThumbnailGenerationStage(PipelineStage):
+    """
+    Pipeline stage that generates previews for image attachments.
+
+    Input:
+        - Copied attachments in output_dir/attachments/
+
+    Output:
+        - Previews in output_dir/attachments/.thumbnails/
+        - attachments/.thumbnails/index.json mapping attachments to previews
+    """
+
+    def __init__(self, max_size: Optional[int] = None, workers: Optional[int] = None,
+                 quality: Optional[int] = None):
+        """
+        Initialize the thumbnail generation stage.
+
+        Args:
+            max_size: Longest side of a preview, in pixels (default: as last
+                run, or DEFAULT_MAX_SIZE)
+            workers: Worker processes (default: CPU count; 1 runs in-process)
+            quality: JPEG/WebP quality (default: as last run, or DEFAULT_QUALITY)
+        """
+        super().__init__("thumbnail_generation")
+        self.max_size = max_size
+        self.workers = workers or os.cpu_count() or 1
+        self.quality = quality
+
+    def get_dependencies(self) -> List[str]:
+        """Return list of stage names this stage depends on."""
+        return ["attachment_copying"]
+
+    def validate_prerequisites(self, context: PipelineContext) -> bool:
+        """
+        Validate that prerequisites are met.
+
+        Required:
+            - attachments directory exists in output_dir
+
+        Args:
+            context: Pipeline context with processing and output directories
+
+        Returns:
+            True if prerequisites met, False otherwise
+        """
+        attachments_dir = context.output_dir / "attachments"
+        if not attachments_dir.exists():
+            logger.error(f"❌ Prerequisite failed: {attachments_dir} does not exist")
+            logger.error("   Run 'attachment-copying' stage first")
+            return False
+        return True
+
+    def can_skip(self, context: PipelineContext) -> bool:
+        """
+        Never skip: execute() is itself incremental and only stats files
+        that have not changed.
+        """
+        return False
+
+    def execute(self, context: PipelineContext) -> StageResult:
+        """
+        Execute thumbnail generation.
+
+        Process:
+            1. Find image attachments (excluding the dedup store and previews)
+            2. Skip those unchanged since the last run
+            3. Hash the rest and reuse any preview with the same content
+            4. Resize the remaining distinct images in the process pool
+            5. Save the index and report throughput and bytes saved
+
+        Args:
+            context: Pipeline context
+
+        Returns:
+            StageResult with counts, images per second and bytes saved
+        """
+        start_time = time.time()
+        logger.info("🔍 Starting thumbnail generation...")
+
+        if not pillow_available():
+            logger.info("   ⏭️  Pillow is not installed; skipping thumbnails (pip install Pillow)")
+            return StageResult(
+                success=True,
+                records_processed=0,
+                metadata={'pillow_available': False, 'total_generated': 0},
+                execution_time=time.time() - start_time
+            )
+
+        try:
+            output_dir = context.output_dir
+            fmt = preferred_format()
+            recorded = load_thumbnail_settings(output_dir)
+            settings = {
+                'max_size': self.max_size or recorded.get('max_size') or DEFAULT_MAX_SIZE,
+                'quality': self.quality or recorded.get('quality') or DEFAULT_QUALITY,
+            }
+            previous = load_thumbnail_entries(output_dir)
+            entries: Dict[str, Dict] = {}
+            pending: Dict[str, Dict] = {}  # sha256 -> job
+            errors: List[str] = []
+            total_skipped = 0
+            total_reused = 0
+
+            for image_path in self._find_images(output_dir / "attachments"):
+                rel_path = image_path.relative_to(output_dir).as_posix()
+                stat = image_path.stat()
+                cached = previous.get(rel_path)
+                if (cached and cached.get('size') == stat.st_size
+                        and cached.get('mtime_ns') == stat.st_mtime_ns
+                        and cached.get('thumbnail') == thumbnail_relpath(cached.get('sha256', ''), fmt, **settings)
+                        and (output_dir / cached['thumbnail']).exists()):
+                    entries[rel_path] = cached
+                    total_skipped += 1
+                    continue
+
+                sha256 = compute_sha256(image_path)
+                thumbnail = thumbnail_relpath(sha256, fmt, **settings)
+                entry = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns,
+                         'sha256': sha256, 'thumbnail': thumbnail}
+                thumbnail_path = output_dir / thumbnail
+                if sha256 not in pending and thumbnail_path.exists():
+                    entry['thumbnail_bytes'] = thumbnail_path.stat().st_size
+                    entries[rel_path] = entry
+                    total_reused += 1
+                    continue
+
+                job = pending.setdefault(sha256, {'source': str(image_path), 'dest': str(thumbnail_path),
+                                                  'entries': []})
+                job['entries'].append((rel_path, entry))
+
+            resize_start = time.time()
+            bytes_saved = 0
+            total_generated = 0
+            for job, thumbnail_bytes in zip(pending.values(), self._run_jobs(list(pending.values()), fmt, settings)):
+                if thumbnail_bytes is None:
+                    errors.append(f"Could not make thumbnail for {job['source']}")
+                    continue
+                total_generated += 1
+                for rel_path, entry in job['entries']:
+                    entry['thumbnail_bytes'] = thumbnail_bytes
+                    entries[rel_path] = entry
+                    bytes_saved += max(0, entry['size'] - thumbnail_bytes)
+            resize_time = time.time() - resize_start
+            images_per_second = total_generated / resize_time if resize_time > 0 else 0.0
+
+            save_thumbnail_entries(output_dir, entries, settings)
+
+            elapsed_time = time.time() - start_time
+            logger.info(f"✅ Thumbnail generation completed in {elapsed_time:.2f}s")
+            logger.info(f"   🖼️  Generated: {total_generated} ({images_per_second:.1f} images/s, "
+                        f"{self.workers} workers, {fmt})")
+            logger.info(f"   ⏭️  Unchanged: {total_skipped}, reused: {total_reused}")
+            logger.info(f"   💾 Bytes saved: {bytes_saved:,}")
+            if errors:
+                logger.info(f"   ⚠️  Errors: {len(errors)}")
+
+            metadata = {
+                'pillow_available': True,
+                'format': fmt,
+                'max_size': settings['max_size'],
+                'quality': settings['quality'],
+                'total_generated': total_generated,
+                'total_skipped': total_skipped,
+                'total_reused': total_reused,
+                'total_errors': len(errors),
+                'images_per_second': round(images_per_second, 2),
+                'bytes_saved': bytes_saved,
+                'total_thumbnails': len(entries),
+            }
+
+            return StageResult(
+                success=True,
+                records_processed=total_generated + total_skipped + total_reused,
+                metadata=metadata,
+                errors=errors,
+                execution_time=elapsed_time
+            )
+
+        except Exception as e:
+            error_msg = f"Thumbnail generation failed: {e}"
+            logger.error(f"❌ {error_msg}")
+            return StageResult(
+                success=False,
+                records_processed=0,
+                metadata={},
+                errors=[error_msg],
+                execution_time=time.time() - start_time
+            )
+
+    def _find_images(self, attachments_dir: Path) -> List[Path]:
+        """List image attachments, skipping the dedup store and previews."""
+        images = []
+        for root, dirs, files in os.walk(attachments_dir):
+            dirs[:] = sorted(d for d in dirs if d not in (OBJECTS_DIRNAME, THUMBNAILS_DIRNAME))
+            for name in sorted(files):
+                if Path(name).suffix.lower() in IMAGE_EXTENSIONS:
+                    images.append(Path(root) / name)
+        return images
+
+    def _run_jobs(self, jobs: List[Dict], fmt: str, settings: Dict[str, int]) -> List[Optional[int]]:
+        """Resize every job's source, returning each preview's size (None on failure)."""
+        if not jobs:
+            return []
+        sources = [job['source'] for job in jobs]
+        dests = [job['dest'] for job in jobs]
+        sizes = [settings['max_size']] * len(jobs)
+        formats = [fmt] * len(jobs)
+        qualities = [settings['quality']] * len(jobs)
+
+        if self.workers == 1 or len(jobs) == 1:
+            results = map(make_thumbnail, sources, dests, sizes, formats, qualities)
+            return [size for _, size in results]
+
+        chunksize = max(1, len(jobs) // (self.workers * 4))
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            results = executor.map(make_thumbnail, sources, dests, sizes, formats, qualities,
+                                   chunksize=chunksize)
+            return [size for _, size in results]
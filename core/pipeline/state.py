@@ -2,19 +2,62 @@
 State management for pipeline stages.
 
 Handles persistence of stage state and results using a hybrid SQLite/JSON approach.
+The database is reached through one long-lived WAL connection per thread (see
+connection.py), and stages can log per-item progress with record_items.
 """
 
 import json
 import logging
-import sqlite3
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Set
 
 from .base import StageResult
+from .connection import SQLiteConnectionManager
+from .fingerprint import file_checksum
 
 logger = logging.getLogger(__name__)
 
+# Rows per transaction for record_items
+DEFAULT_ITEM_BATCH_SIZE = 500
+
+_INSERT_EXECUTION = """
+    INSERT INTO stage_executions
+    (stage_name, execution_start, success)
+    VALUES (?, ?, ?)
+"""
+_UPDATE_EXECUTION = """
+    UPDATE stage_executions
+    SET execution_end = ?,
+        success = ?,
+        records_processed = ?,
+        execution_time = ?,
+        error_count = ?,
+        metadata = ?,
+        input_fingerprint = ?
+    WHERE id = ?
+"""
+_INSERT_OUTPUT = """
+    INSERT INTO stage_outputs
+    (execution_id, output_file, file_size, checksum)
+    VALUES (?, ?, ?, ?)
+"""
+_SELECT_LAST_SUCCESS = """
+    SELECT * FROM stage_executions
+    WHERE stage_name = ? AND success = 1
+    ORDER BY execution_end DESC
+    LIMIT 1
+"""
+_SELECT_OUTPUTS = """
+    SELECT output_file, checksum FROM stage_outputs
+    WHERE execution_id = ?
+    ORDER BY output_file
+"""
+_UPSERT_ITEM = """
+    INSERT OR REPLACE INTO stage_items (stage_name, item, status, updated_at)
+    VALUES (?, ?, ?, ?)
+"""
+
 
 class StateManager:
     """Manages persistent state for pipeline stages."""
@@ -31,6 +74,7 @@ class StateManager:
         
         # SQLite database for stage execution tracking
         self.db_path = self.state_dir / "pipeline_state.db"
+        self.db = SQLiteConnectionManager(self.db_path)
         self.init_database()
         
         # JSON files for lightweight state
@@ -38,7 +82,7 @@ class StateManager:
         
     def init_database(self) -> None:
         """Initialize the SQLite database for stage tracking."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS stage_executions (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -65,6 +109,11 @@ class StateManager:
                 )
             """)
             
+            # Databases created before content-addressed skipping lack this column
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(stage_executions)")}
+            if 'input_fingerprint' not in columns:
+                conn.execute("ALTER TABLE stage_executions ADD COLUMN input_fingerprint TEXT")
+
             conn.execute("""
                 CREATE INDEX IF NOT EXISTS idx_stage_name 
                 ON stage_executions(stage_name)
@@ -74,6 +123,17 @@ class StateManager:
                 CREATE INDEX IF NOT EXISTS idx_execution_start 
                 ON stage_executions(execution_start)
             """)
+
+            # Per-item progress (e.g. input files) for resuming a stage
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS stage_items (
+                    stage_name TEXT NOT NULL,
+                    item TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    updated_at TIMESTAMP,
+                    PRIMARY KEY (stage_name, item)
+                )
+            """)
             
     def record_stage_start(self, stage_name: str) -> int:
         """
@@ -85,56 +145,45 @@ class StateManager:
         Returns:
             int: Execution ID for tracking
         """
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO stage_executions 
-                (stage_name, execution_start, success)
-                VALUES (?, ?, ?)
-            """, (stage_name, datetime.now(), False))
+        with self.db.transaction() as conn:
+            cursor = conn.execute(_INSERT_EXECUTION, (stage_name, datetime.now(), False))
             return cursor.lastrowid
             
-    def record_stage_result(self, execution_id: int, result: StageResult) -> None:
+    def record_stage_result(self, execution_id: int, result: StageResult,
+                            input_fingerprint: Optional[str] = None) -> None:
         """
         Record the result of a stage execution.
         
         Args:
             execution_id: ID from record_stage_start
             result: Stage execution result
+            input_fingerprint: Digest of the stage inputs for this run, if declared
         """
-        with sqlite3.connect(self.db_path) as conn:
+        # Checksum outputs before opening the transaction
+        outputs = []
+        for output_file in result.output_files:
+            output_file = Path(output_file)
+            if output_file.exists():
+                outputs.append((execution_id, str(output_file), output_file.stat().st_size,
+                                file_checksum(output_file)))
+            else:
+                outputs.append((execution_id, str(output_file), 0, None))
+
+        with self.db.transaction() as conn:
             # Update main execution record
-            conn.execute("""
-                UPDATE stage_executions
-                SET execution_end = ?,
-                    success = ?,
-                    records_processed = ?,
-                    execution_time = ?,
-                    error_count = ?,
-                    metadata = ?
-                WHERE id = ?
-            """, (
+            conn.execute(_UPDATE_EXECUTION, (
                 datetime.now(),
                 result.success,
                 result.records_processed,
                 result.execution_time,
                 len(result.errors),
                 json.dumps(result.metadata),
+                input_fingerprint,
                 execution_id
             ))
             
-            # Record output files
-            for output_file in result.output_files:
-                if output_file.exists():
-                    file_size = output_file.stat().st_size
-                else:
-                    file_size = 0
-                    
-                conn.execute("""
-                    INSERT INTO stage_outputs
-                    (execution_id, output_file, file_size)
-                    VALUES (?, ?, ?)
-                """, (execution_id, str(output_file), file_size))
+            # Record output files with content checksums
+            conn.executemany(_INSERT_OUTPUT, outputs)
                 
     def get_last_successful_execution(self, stage_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -146,22 +195,40 @@ class StateManager:
         Returns:
             Dict with execution details or None if no successful execution
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        row = self.db.execute(_SELECT_LAST_SUCCESS, (stage_name,)).fetchone()
+        if row:
+            return dict(row)
+        return None
             
-            cursor.execute("""
-                SELECT * FROM stage_executions
-                WHERE stage_name = ? AND success = 1
-                ORDER BY execution_end DESC
-                LIMIT 1
-            """, (stage_name,))
+    def get_output_checksums(self, execution_id: int) -> Dict[str, Optional[str]]:
+        """
+        Get the recorded output files and checksums of an execution.
+        
+        Args:
+            execution_id: ID of the stage execution
             
-            row = cursor.fetchone()
-            if row:
-                return dict(row)
-            return None
+        Returns:
+            Dict mapping output file path to checksum (None if it was missing)
+        """
+        cursor = self.db.execute(_SELECT_OUTPUTS, (execution_id,))
+        return {row[0]: row[1] for row in cursor.fetchall()}
             
+    def outputs_intact(self, execution_id: int) -> bool:
+        """
+        Check that an execution's recorded outputs still exist unchanged.
+        
+        Args:
+            execution_id: ID of the stage execution
+            
+        Returns:
+            bool: True if every recorded output file matches its checksum
+        """
+        for output_file, checksum in self.get_output_checksums(execution_id).items():
+            if checksum is None or file_checksum(Path(output_file)) != checksum:
+                logger.debug(f"Output changed or missing: {output_file}")
+                return False
+        return True
+        
     def is_stage_completed(self, stage_name: str) -> bool:
         """
         Check if a stage has completed successfully.
@@ -181,31 +248,81 @@ class StateManager:
         Returns:
             Dict with pipeline execution status
         """
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
-            cursor = conn.cursor()
+        # Get latest execution for each stage
+        cursor = self.db.execute("""
+            SELECT stage_name,
+                   MAX(execution_end) as last_execution,
+                   success,
+                   records_processed,
+                   error_count
+            FROM stage_executions
+            WHERE execution_end IS NOT NULL
+            GROUP BY stage_name
+            ORDER BY last_execution DESC
+        """)
+        
+        stages = []
+        for row in cursor.fetchall():
+            stages.append(dict(row))
+            
+        return {
+            'stages': stages,
+            'last_update': datetime.now().isoformat()
+        }
+
+    def record_items(self, stage_name: str, items: Iterable[str], status: str = "done",
+                     batch_size: int = DEFAULT_ITEM_BATCH_SIZE) -> int:
+        """
+        Record per-item progress for a stage, batch_size rows per transaction.
+        
+        Recording an item again replaces its status.
+        
+        Args:
+            stage_name: Name of the stage
+            items: Item identifiers, e.g. input file paths
+            status: Status to record for every item
+            batch_size: Rows committed per transaction
             
-            # Get latest execution for each stage
-            cursor.execute("""
-                SELECT stage_name,
-                       MAX(execution_end) as last_execution,
-                       success,
-                       records_processed,
-                       error_count
-                FROM stage_executions
-                WHERE execution_end IS NOT NULL
-                GROUP BY stage_name
-                ORDER BY last_execution DESC
-            """)
+        Returns:
+            int: Number of items recorded
+        """
+        now = datetime.now()
+        return self.db.execute_batched(
+            _UPSERT_ITEM,
+            ((stage_name, str(item), status, now) for item in items),
+            batch_size,
+        )
+
+    def get_recorded_items(self, stage_name: str, status: Optional[str] = "done") -> Set[str]:
+        """
+        Get the items recorded for a stage.
+        
+        Args:
+            stage_name: Name of the stage
+            status: Only return items with this status (None for all)
             
-            stages = []
-            for row in cursor.fetchall():
-                stages.append(dict(row))
-                
-            return {
-                'stages': stages,
-                'last_update': datetime.now().isoformat()
-            }
+        Returns:
+            Set of item identifiers
+        """
+        if status is None:
+            cursor = self.db.execute(
+                "SELECT item FROM stage_items WHERE stage_name = ?", (stage_name,)
+            )
+        else:
+            cursor = self.db.execute(
+                "SELECT item FROM stage_items WHERE stage_name = ? AND status = ?", (stage_name, status)
+            )
+        return {row[0] for row in cursor.fetchall()}
+
+    def clear_recorded_items(self, stage_name: str) -> None:
+        """
+        Forget the per-item progress of a stage.
+        
+        Args:
+            stage_name: Name of the stage
+        """
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM stage_items WHERE stage_name = ?", (stage_name,))
             
     def save_json_state(self, data: Dict[str, Any]) -> None:
         """
@@ -240,35 +357,33 @@ class StateManager:
         Args:
             stage_name: Name of the stage to clear
         """
-        with sqlite3.connect(self.db_path) as conn:
-            # Get execution IDs for this stage
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id FROM stage_executions WHERE stage_name = ?
-            """, (stage_name,))
-            
-            execution_ids = [row[0] for row in cursor.fetchall()]
-            
+        with self.db.transaction() as conn:
             # Delete output records
-            for exec_id in execution_ids:
-                conn.execute("""
-                    DELETE FROM stage_outputs WHERE execution_id = ?
-                """, (exec_id,))
+            conn.execute("""
+                DELETE FROM stage_outputs WHERE execution_id IN
+                (SELECT id FROM stage_executions WHERE stage_name = ?)
+            """, (stage_name,))
                 
-            # Delete execution records
+            # Delete execution records and per-item progress
             conn.execute("""
                 DELETE FROM stage_executions WHERE stage_name = ?
             """, (stage_name,))
+            conn.execute("DELETE FROM stage_items WHERE stage_name = ?", (stage_name,))
             
         logger.info(f"Cleared state for stage: {stage_name}")
         
     def clear_all_state(self) -> None:
         """Clear all pipeline state."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             conn.execute("DELETE FROM stage_outputs")
             conn.execute("DELETE FROM stage_executions")
+            conn.execute("DELETE FROM stage_items")
             
         if self.json_state_path.exists():
             self.json_state_path.unlink()
             
         logger.info("Cleared all pipeline state")
+
+    def close(self) -> None:
+        """Close the database connections held by this manager."""
+        self.db.close()
@@ -0,0 +1,172 @@
+"""
+Precompressed siblings for generated pages.
+
+Conversation pages and index.html are mostly repetitive markup, so gzip and
+brotli shrink them several times over. precompress_directory() writes
+``page.html.gz`` (and ``page.html.br`` when the optional ``brotli`` package is
+installed) next to each page, so core.static_server can send them as-is
+with a Content-Encoding header instead of compressing on every request.
+
+Compression runs on a thread pool (zlib and brotli release the GIL). Each
+source's SHA-256 is recorded in ``.precompressed.json``; unchanged pages are
+skipped, and siblings of pages that no longer exist are removed. Siblings get
+the source's mtime so the server can tell when one is stale.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:  # brotli is optional
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILENAME = ".precompressed.json"
+MANIFEST_VERSION = 1
+PRECOMPRESS_SUFFIXES = frozenset({".html", ".css", ".js", ".svg"})
+MIN_SIZE = 1024  # smaller files gain little and cost a stat per request
+GZIP_LEVEL = 9
+BROTLI_QUALITY = 11
+
+# Content-Encoding -> sibling suffix, in server preference order
+ENCODING_SUFFIXES = (("br", ".br"), ("gzip", ".gz"))
+
+
+def brotli_available() -> bool:
+    """Whether the optional brotli package is installed."""
+    return brotli is not None
+
+
+def find_precompressible(root: Path) -> List[Path]:
+    """List pages under root worth precompressing (skips hidden directories)."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for name in sorted(filenames):
+            if Path(name).suffix.lower() in PRECOMPRESS_SUFFIXES:
+                found.append(Path(dirpath) / name)
+    return found
+
+
+def _compress_file(path: Path, use_brotli: bool) -> Dict[str, int]:
+    """Write the compressed siblings of one file; returns bytes per encoding."""
+    data = path.read_bytes()
+    stat = path.stat()
+    variants = {"gzip": gzip.compress(data, compresslevel=GZIP_LEVEL, mtime=0)}
+    if use_brotli:
+        variants["br"] = brotli.compress(data, quality=BROTLI_QUALITY)
+
+    sizes = {}
+    for encoding, suffix in ENCODING_SUFFIXES:
+        target = path.with_name(path.name + suffix)
+        compressed = variants.get(encoding)
+        if compressed is None or len(compressed) >= len(data):
+            target.unlink(missing_ok=True)
+            continue
+        temp = target.with_name(target.name + ".tmp")
+        temp.write_bytes(compressed)
+        os.utime(temp, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        temp.replace(target)
+        sizes[encoding] = len(compressed)
+    return sizes
+
+
+def _touch_siblings(path: Path) -> None:
+    """Give existing siblings the source's mtime (content already matches)."""
+    stat = path.stat()
+    for _, suffix in ENCODING_SUFFIXES:
+        target = path.with_name(path.name + suffix)
+        if target.exists() and target.stat().st_mtime_ns != stat.st_mtime_ns:
+            os.utime(target, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def _remove_siblings(path: Path) -> None:
+    for _, suffix in ENCODING_SUFFIXES:
+        path.with_name(path.name + suffix).unlink(missing_ok=True)
+
+
+def _load_manifest(root: Path) -> Dict[str, Dict]:
+    try:
+        with open(root / MANIFEST_FILENAME, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data.get("files", {}) if data.get("version") == MANIFEST_VERSION else {}
+
+
+def _save_manifest(root: Path, files: Dict[str, Dict]) -> None:
+    temp = root / (MANIFEST_FILENAME + ".tmp")
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "files": files}, f, indent=1, sort_keys=True)
+    temp.replace(root / MANIFEST_FILENAME)
+
+
+def precompress_directory(root: Path, workers: Optional[int] = None,
+                          use_brotli: Optional[bool] = None) -> Dict[str, int]:
+    """
+    Write .gz (and .br) siblings for the pages under root.
+
+    Args:
+        root: Conversations directory
+        workers: Compression threads (default: CPU count)
+        use_brotli: Also write .br (default: when brotli is installed)
+
+    Returns:
+        Dict with files, compressed, skipped, removed, bytes_in, bytes_gzip
+        and bytes_br
+    """
+    root = Path(root)
+    if use_brotli is None:
+        use_brotli = brotli_available()
+    elif use_brotli and not brotli_available():
+        logger.warning("⚠️  brotli is not installed; writing .gz only (pip install brotli)")
+        use_brotli = False
+
+    previous = _load_manifest(root)
+    files: Dict[str, Dict] = {}
+    pending: List[Tuple[str, Path, str, int]] = []
+    stats = {"files": 0, "compressed": 0, "skipped": 0, "removed": 0,
+             "bytes_in": 0, "bytes_gzip": 0, "bytes_br": 0}
+
+    for path in find_precompressible(root):
+        size = path.stat().st_size
+        if size < MIN_SIZE:
+            _remove_siblings(path)
+            continue
+        rel_path = path.relative_to(root).as_posix()
+        sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        stats["files"] += 1
+        stats["bytes_in"] += size
+        cached = previous.get(rel_path)
+        if (cached and cached.get("sha256") == sha256 and cached.get("brotli", False) == use_brotli
+                and all(path.with_name(path.name + suffix).exists()
+                        for encoding, suffix in ENCODING_SUFFIXES if encoding in cached.get("sizes", {}))):
+            _touch_siblings(path)
+            files[rel_path] = cached
+            stats["skipped"] += 1
+        else:
+            pending.append((rel_path, path, sha256, size))
+
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+        results = executor.map(lambda job: _compress_file(job[1], use_brotli), pending)
+        for (rel_path, _, sha256, _), sizes in zip(pending, results):
+            files[rel_path] = {"sha256": sha256, "brotli": use_brotli, "sizes": sizes}
+            stats["compressed"] += 1
+
+    for rel_path in previous.keys() - files.keys():
+        _remove_siblings(root / rel_path)
+        stats["removed"] += 1
+
+    for entry in files.values():
+        stats["bytes_gzip"] += entry["sizes"].get("gzip", 0)
+        stats["bytes_br"] += entry["sizes"].get("br", 0)
+    _save_manifest(root, files)
+    return stats
@@ -10,7 +10,7 @@ import logging
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Literal, Optional, Union
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +28,12 @@ class ProcessingConfig:
     # Core Processing Settings
     processing_dir: Path
     output_dir: Optional[Path] = None
+    # Further Takeout directories merged into the same output, deduplicated
+    # against processing_dir and each other (see core.message_dedup)
+    merge_sources: Tuple[Path, ...] = ()
+    # Earlier output to update with only the new or changed files of
+    # processing_dir (see core.incremental_update)
+    update_from: Optional[Path] = None
     output_format: Literal["html"] = "html"
     
     # Performance Settings (optimized defaults - no configuration needed)
@@ -52,6 +58,14 @@ class ProcessingConfig:
     include_call_only_conversations: bool = False  # Default: filter out call-only conversations
     filter_commercial_conversations: bool = False  # Default: disabled (filter STOP/unsubscribe spam)
 
+    # Output Settings
+    build_search_index: bool = False  # Default: disabled (SQLite FTS5 index for the search command)
+    # Conversations over either threshold (0 disables it) are split into pages
+    # behind a table of contents (see core.conversation_pages)
+    paginate_messages: int = 20000
+    paginate_bytes: int = 0
+    paginate_by: Literal["year", "size"] = "year"
+
     # Date Filtering (Clear naming for intuitive usage)
     exclude_older_than: Optional[datetime] = None  # Exclude messages before this date
     exclude_newer_than: Optional[datetime] = None  # Exclude messages after this date
@@ -102,6 +116,12 @@ class ProcessingConfig:
     def _validate_numeric_constraints(self) -> None:
         """Validate numeric configuration values."""
         # Performance settings are now hardcoded in shared_constants.py for optimal defaults
+        if self.paginate_messages < 0:
+            raise ValueError(f"paginate_messages must be 0 or positive, got {self.paginate_messages}")
+        if self.paginate_bytes < 0:
+            raise ValueError(f"paginate_bytes must be 0 or positive, got {self.paginate_bytes}")
+        if self.paginate_by not in ("year", "size"):
+            raise ValueError(f"paginate_by must be 'year' or 'size', got {self.paginate_by}")
     
     def _validate_date_ranges(self) -> None:
         """Validate date filtering logic."""
@@ -172,6 +192,8 @@ class ProcessingConfig:
                 
             if isinstance(field_value, Path):
                 config_dict[field_name] = str(field_value)
+            elif field_name == "merge_sources":
+                config_dict[field_name] = [str(path) for path in field_value]
             elif isinstance(field_value, datetime):
                 config_dict[field_name] = field_value.isoformat()
             else:
@@ -191,6 +213,12 @@ class ProcessingConfig:
         
         if "phone_lookup_file" in config_dict and config_dict["phone_lookup_file"]:
             config_dict["phone_lookup_file"] = Path(config_dict["phone_lookup_file"])
+
+        if config_dict.get("update_from"):
+            config_dict["update_from"] = Path(config_dict["update_from"])
+
+        if config_dict.get("merge_sources"):
+            config_dict["merge_sources"] = tuple(Path(path) for path in config_dict["merge_sources"])
         
         # Convert string dates back to datetime objects (new clear options)
         if "exclude_older_than" in config_dict and config_dict["exclude_older_than"]:
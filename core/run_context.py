@@ -0,0 +1,214 @@
+"""
+Immutable per-run context for SMS/MMS conversion.
+
+A RunContext carries everything the file-processing functions in sms.py read
+while converting one export: paths, filter settings, the user's own number, a
+snapshot of the phone aliases and the attachment index. It is built once per
+run from ProcessingConfig (and ProcessingContext when available), by the
+convert command or sms.main, is frozen, and pickles cleanly, so:
+
+- two conversions can run in one process without sharing module globals
+- a spawned worker can be started from the context alone (see create_managers)
+
+Managers (ConversationManager, PhoneLookupManager) hold open files and locks,
+so they are passed alongside the context rather than stored in it.
+"""
+
+from collections.abc import Mapping
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from core.conversation_manager import ConversationManager
+    from core.phone_lookup import PhoneLookupManager
+    from core.processing_config import ProcessingConfig
+    from core.processing_context import ProcessingContext
+
+
+class FrozenMapping(Mapping):
+    """Read-only, picklable dict wrapper used for the snapshots in RunContext."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Optional[Mapping] = None):
+        object.__setattr__(self, "_data", dict(data or {}))
+
+    def __getitem__(self, key: Any) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        return self._data.get(key, default)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError("FrozenMapping is read-only")
+
+    def __reduce__(self):
+        return (FrozenMapping, (self._data,))
+
+    def __repr__(self) -> str:
+        return f"FrozenMapping({len(self._data)} items)"
+
+
+# Filter settings copied from ProcessingConfig: name -> legacy sms.py global
+_FILTER_FIELDS = {
+    "include_service_codes": "INCLUDE_SERVICE_CODES",
+    "filter_non_phone_numbers": "FILTER_NON_PHONE_NUMBERS",
+    "filter_numbers_without_aliases": "FILTER_NUMBERS_WITHOUT_ALIASES",
+    "skip_filtered_contacts": "SKIP_FILTERED_CONTACTS",
+    "filter_groups_with_all_filtered": "FILTER_GROUPS_WITH_ALL_FILTERED",
+}
+
+
+@dataclass(frozen=True)
+class RunContext:
+    """Frozen settings and snapshots for one conversion run."""
+
+    processing_dir: Path
+    output_dir: Path
+    config: Optional["ProcessingConfig"] = None
+
+    # Filtering
+    exclude_older_than: Optional[datetime] = None
+    exclude_newer_than: Optional[datetime] = None
+    include_service_codes: bool = False
+    filter_non_phone_numbers: bool = False
+    filter_numbers_without_aliases: bool = False
+    skip_filtered_contacts: bool = True
+    filter_groups_with_all_filtered: bool = True
+
+    # Per-run data
+    own_number: Optional[str] = None
+    phone_aliases: FrozenMapping = field(default_factory=FrozenMapping)
+    attachment_index: FrozenMapping = field(default_factory=FrozenMapping)
+
+    @property
+    def calls_dir(self) -> Path:
+        return self.processing_dir / "Calls"
+
+    @property
+    def attachments_dir(self) -> Path:
+        return self.output_dir / "attachments"
+
+    def with_own_number(self, own_number: Optional[str]) -> "RunContext":
+        """Return a copy with the user's own number set."""
+        return replace(self, own_number=own_number)
+
+    def with_attachment_index(self, src_filename_map: Optional[Mapping]) -> "RunContext":
+        """Return a copy holding a snapshot of the attachment mapping built during the run."""
+        return replace(self, attachment_index=FrozenMapping(src_filename_map))
+
+    def create_managers(
+        self, enable_prompts: bool = False
+    ) -> Tuple["ConversationManager", "PhoneLookupManager"]:
+        """
+        Build fresh managers for this run, e.g. inside a spawned worker.
+
+        The phone lookup manager is seeded with the alias snapshot, so a worker
+        sees the same aliases as the parent at the time the context was built.
+
+        Args:
+            enable_prompts: Whether the phone lookup manager may prompt
+
+        Returns:
+            (ConversationManager, PhoneLookupManager)
+        """
+        from core.conversation_manager import ConversationManager
+        from core.phone_lookup import PhoneLookupManager
+
+        output_format = getattr(self.config, "output_format", "html")
+        lookup_file = getattr(self.config, "phone_lookup_file", None)
+        if not isinstance(lookup_file, Path):
+            lookup_file = self.processing_dir / "phone_lookup.txt"
+
+        conversation_manager = ConversationManager(self.output_dir, output_format=output_format)
+        phone_lookup_manager = PhoneLookupManager(
+            lookup_file, enable_prompts=enable_prompts, skip_filtered_contacts=self.skip_filtered_contacts
+        )
+        phone_lookup_manager.phone_aliases.update(self.phone_aliases)
+        return conversation_manager, phone_lookup_manager
+
+
+def _config_value(config: Any, name: str, default: Any, kind: type) -> Any:
+    """Read a setting from config, keeping ``default`` when it is missing or mistyped."""
+    value = getattr(config, name, default) if config is not None else default
+    return value if isinstance(value, kind) else default
+
+
+def build_run_context(
+    config: Optional["ProcessingConfig"] = None,
+    context: Optional["ProcessingContext"] = None,
+    processing_dir: Optional[Path] = None,
+    src_filename_map: Optional[Dict[str, Any]] = None,
+    phone_lookup_manager: Optional["PhoneLookupManager"] = None,
+    own_number: Optional[str] = None,
+) -> RunContext:
+    """
+    Build the RunContext for one conversion.
+
+    Settings come from ``config`` (or ``context.config``). Settings missing
+    from it fall back to the legacy module-level defaults in
+    core.shared_constants, which keeps callers that pass no config working.
+
+    Args:
+        config: Processing configuration
+        context: Processing context; supplies config and managers when given
+        processing_dir: Processing directory, overriding the config's
+        src_filename_map: Attachment index to snapshot
+        phone_lookup_manager: Manager whose aliases are snapshotted
+        own_number: The user's own phone number, if already known
+
+    Returns:
+        RunContext
+    """
+    from core import shared_constants
+    from core.processing_config import ProcessingConfig
+
+    if config is None and context is not None:
+        config = getattr(context, "config", None)
+    if phone_lookup_manager is None and context is not None:
+        phone_lookup_manager = getattr(context, "phone_lookup_manager", None)
+
+    if processing_dir is None:
+        processing_dir = _config_value(config, "processing_dir", None, Path)
+        if processing_dir is None and context is not None:
+            processing_dir = _config_value(context, "processing_dir", None, Path)
+        if processing_dir is None:
+            processing_dir = shared_constants.PROCESSING_DIRECTORY
+    processing_dir = Path(processing_dir)
+
+    output_dir = _config_value(config, "output_dir", None, Path)
+    if output_dir is None:
+        output_dir = processing_dir / "conversations"
+
+    filters = {}
+    for name, legacy_name in _FILTER_FIELDS.items():
+        default = getattr(shared_constants, legacy_name, RunContext.__dataclass_fields__[name].default)
+        filters[name] = _config_value(config, name, default, bool)
+
+    aliases = getattr(phone_lookup_manager, "phone_aliases", None)
+    return RunContext(
+        processing_dir=processing_dir,
+        output_dir=Path(output_dir),
+        config=config if isinstance(config, ProcessingConfig) else None,
+        exclude_older_than=_config_value(
+            config, "exclude_older_than", shared_constants.DATE_FILTER_OLDER_THAN, datetime
+        ),
+        exclude_newer_than=_config_value(
+            config, "exclude_newer_than", shared_constants.DATE_FILTER_NEWER_THAN, datetime
+        ),
+        own_number=own_number,
+        phone_aliases=FrozenMapping(aliases if isinstance(aliases, dict) else None),
+        attachment_index=FrozenMapping(src_filename_map),
+        **filters,
+    )
@@ -0,0 +1,281 @@
+"""
+Full-text search index over converted conversations.
+
+ConversationManager feeds every message it writes into a SearchIndex, which
+stores it in ``search_index.db`` (SQLite) next to the HTML output:
+
+- ``messages``: conversation_id, sender, timestamp (Unix ms) and text, with a
+  unique per-message key so re-running html_generation never duplicates rows
+- ``messages_fts``: an FTS5 external-content table over ``messages.text``,
+  kept in sync by triggers
+
+Rows are buffered and inserted in bulk transactions. Search supports term,
+phrase and prefix queries plus date-range and participant filters.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+SEARCH_INDEX_FILENAME = "search_index.db"
+DEFAULT_BATCH_SIZE = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY,
+    msg_key INTEGER NOT NULL UNIQUE,
+    conversation_id TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    text TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation ON messages(conversation_id);
+CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+    text, content='messages', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS messages_ai AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts(rowid, text) VALUES (new.id, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_ad AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts(messages_fts, rowid, text) VALUES ('delete', old.id, old.text);
+END;
+"""
+
+
+def fts5_available() -> bool:
+    """Return True if this Python's SQLite was built with FTS5."""
+    try:
+        conn = sqlite3.connect(":memory:")
+        try:
+            conn.execute("CREATE VIRTUAL TABLE probe USING fts5(text)")
+        finally:
+            conn.close()
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+
+def _message_key(conversation_id: str, sender: str, timestamp: int, text: str) -> int:
+    digest = hashlib.blake2b(
+        f"{conversation_id}\0{sender}\0{timestamp}\0{text}".encode("utf-8"), digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _quote(term: str) -> str:
+    return '"' + term.replace('"', '""') + '"'
+
+
+def build_match_expression(query: str, phrase: bool = False, prefix: bool = False) -> str:
+    """
+    Turn user input into an FTS5 MATCH expression.
+
+    Terms are quoted so FTS5 operators in the input are matched literally.
+
+    Args:
+        query: Search text
+        phrase: Match the words as one exact phrase
+        prefix: Treat the last word (phrase) or every word (terms) as a prefix
+
+    Returns:
+        FTS5 query string
+
+    Raises:
+        ValueError: If the query has no searchable words
+    """
+    terms = query.split()
+    if not terms:
+        raise ValueError("Search query is empty")
+    suffix = "*" if prefix else ""
+    if phrase:
+        return _quote(" ".join(terms)) + suffix
+    return " ".join(_quote(term) + suffix for term in terms)
+
+
+def date_to_unix_ms(value: datetime) -> int:
+    """Convert a naive local datetime to the Unix milliseconds stored in the index."""
+    return int(time.mktime(value.timetuple()) * 1000)
+
+
+@dataclass
+class SearchHit:
+    """One matching message."""
+    conversation_id: str
+    sender: str
+    timestamp: int
+    text: str
+    snippet: str
+
+    @property
+    def formatted_time(self) -> str:
+        return datetime.fromtimestamp(self.timestamp / 1000).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class SearchIndex:
+    """SQLite FTS5 index of conversation messages."""
+
+    def __init__(self, db_path: Path, batch_size: int = DEFAULT_BATCH_SIZE):
+        """
+        Open (and create if needed) a search index.
+
+        Args:
+            db_path: Path to the SQLite database
+            batch_size: Buffered messages per bulk insert transaction
+
+        Raises:
+            RuntimeError: If SQLite lacks FTS5 support
+        """
+        if not fts5_available():
+            raise RuntimeError("SQLite FTS5 extension is not available in this Python build")
+
+        self.db_path = Path(db_path)
+        self.batch_size = batch_size
+        self._pending: List[Tuple[int, str, str, int, str]] = []
+        self._lock = threading.Lock()
+        self.messages_added = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        # Messages arrive from processing worker threads; access is serialized by _lock
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+
+    def add_message(self, conversation_id: str, sender: str, timestamp: int, text: str) -> None:
+        """Buffer one message; flushes automatically every batch_size messages."""
+        if not text:
+            return
+        row = (_message_key(conversation_id, sender, timestamp, text), conversation_id, sender, timestamp, text)
+        with self._lock:
+            self._pending.append(row)
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self) -> None:
+        """Write buffered messages in one transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        with self._conn:
+            cursor = self._conn.executemany(
+                "INSERT OR IGNORE INTO messages (msg_key, conversation_id, sender, timestamp, text) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            # rowcount excludes trigger changes and ignored duplicates
+            self.messages_added += max(cursor.rowcount, 0)
+
+    def remove_conversation(self, conversation_id: str) -> None:
+        """Drop every message of a conversation (e.g. one filtered out at finalize)."""
+        with self._lock:
+            self._pending = [row for row in self._pending if row[1] != conversation_id]
+            with self._conn:
+                self._conn.execute("DELETE FROM messages WHERE conversation_id = ?", (conversation_id,))
+
+    def optimize(self) -> None:
+        """Merge FTS5 segments after a large build."""
+        with self._lock:
+            self._flush_locked()
+            with self._conn:
+                self._conn.execute("INSERT INTO messages_fts(messages_fts) VALUES ('optimize')")
+
+    def count(self) -> int:
+        """Return the number of indexed messages."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def search(
+        self,
+        query: str,
+        phrase: bool = False,
+        prefix: bool = False,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        participant: Optional[str] = None,
+        limit: int = 50,
+        order_by_date: bool = False,
+    ) -> List[SearchHit]:
+        """
+        Search indexed messages.
+
+        Args:
+            query: Search text
+            phrase: Match the words as one exact phrase
+            prefix: Prefix matching (see build_match_expression)
+            since: Only messages at or after this local time
+            until: Only messages before this local time
+            participant: Case-insensitive substring of the conversation ID or sender
+            limit: Maximum number of hits
+            order_by_date: Newest first instead of by relevance
+
+        Returns:
+            Matching messages
+        """
+        sql = [
+            "SELECT m.conversation_id, m.sender, m.timestamp, m.text,",
+            "       snippet(messages_fts, 0, '[', ']', '…', 12)",
+            "FROM messages_fts JOIN messages m ON m.id = messages_fts.rowid",
+            "WHERE messages_fts MATCH ?",
+        ]
+        params: list = [build_match_expression(query, phrase, prefix)]
+        if since is not None:
+            sql.append("AND m.timestamp >= ?")
+            params.append(date_to_unix_ms(since))
+        if until is not None:
+            sql.append("AND m.timestamp < ?")
+            params.append(date_to_unix_ms(until))
+        if participant:
+            sql.append("AND (m.conversation_id LIKE ? OR m.sender LIKE ?)")
+            pattern = f"%{participant}%"
+            params.extend([pattern, pattern])
+        sql.append("ORDER BY m.timestamp DESC" if order_by_date else "ORDER BY rank")
+        sql.append("LIMIT ?")
+        params.append(limit)
+
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute("\n".join(sql), params).fetchall()
+        return [SearchHit(*row) for row in rows]
+
+    def close(self) -> None:
+        """Flush pending messages and close the database."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._flush_locked()
+            self._conn.close()
+            self._conn = None
+
+
+def open_search_index(config, output_dir: Path) -> Optional[SearchIndex]:
+    """
+    Open the search index of an output directory if the configuration enables it.
+
+    Args:
+        config: Processing configuration (reads build_search_index)
+        output_dir: Conversations directory holding search_index.db
+
+    Returns:
+        SearchIndex, or None if disabled or FTS5 is unavailable
+    """
+    if not getattr(config, "build_search_index", False):
+        return None
+    try:
+        return SearchIndex(Path(output_dir) / SEARCH_INDEX_FILENAME)
+    except (RuntimeError, sqlite3.Error) as e:
+        logger.warning(f"⚠️  Search index disabled: {e}")
+        return None
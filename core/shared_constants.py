@@ -58,6 +58,9 @@ MIN_PROGRESS_INTERVAL = 100
 # Performance monitoring configuration
 ENABLE_PERFORMANCE_MONITORING = True
 PERFORMANCE_LOG_INTERVAL = 1000  # milliseconds or operation count, depending on usage
+# Background resource sampler (utils.memory_monitor.ResourceSampler)
+PERFORMANCE_SAMPLE_INTERVAL = float(os.environ.get('GVOICE_PERF_SAMPLE_INTERVAL', '0.5'))  # seconds
+PERFORMANCE_SAMPLE_BUFFER_SIZE = 7200  # samples kept in the ring buffer (1 hour at 0.5s)
 
 # Test mode configuration
 TEST_MODE = False
@@ -0,0 +1,220 @@
+"""
+Static file server for browsing a generated archive.
+
+Built on the standard library's http.server with one thread per connection
+and HTTP/1.1 keep-alive. On top of SimpleHTTPRequestHandler it adds:
+
+- precompressed variants: ``page.html.br`` / ``page.html.gz`` written by
+  core.precompress are sent with the matching Content-Encoding when the
+  client accepts it and the sibling is not older than the page
+- ETag / If-None-Match revalidation (304 Not Modified)
+- single byte-range requests (206 Partial Content), so audio and video
+  attachments can be seeked without downloading them whole
+"""
+
+import logging
+import os
+import re
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Tuple
+
+from core.precompress import ENCODING_SUFFIXES
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8000
+COPY_CHUNK = 256 * 1024
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def accepted_encodings(header: Optional[str]) -> set:
+    """Codings the client accepts (q > 0) from an Accept-Encoding header."""
+    accepted = set()
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        name, _, value = params.strip().partition("=")
+        if name.strip() == "q":
+            try:
+                q = float(value)
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(coding)
+    return accepted
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single byte range.
+
+    Returns:
+        Inclusive (start, end), None if there is no usable Range header
+        (serve the whole file)
+
+    Raises:
+        ValueError: If the range cannot be satisfied for this size
+    """
+    match = _RANGE_RE.match((header or "").strip())
+    if not match:
+        return None  # absent, multi-range or other units: ignore per RFC 9110
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:  # suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            raise ValueError("empty suffix range")
+        return max(0, size - length), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError("range not satisfiable")
+    return start, end
+
+
+class PrecompressedRequestHandler(SimpleHTTPRequestHandler):
+    """SimpleHTTPRequestHandler with precompressed variants, ETags and ranges."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and a small body go out in separate writes; with Nagle enabled a
+    # keep-alive client waits on delayed ACKs (~40 ms) for the body
+    disable_nagle_algorithm = True
+
+    def send_head(self):
+        self._send_length = None
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?", 1)[0].endswith("/") or not os.path.isfile(index):
+                return super().send_head()  # redirect or directory listing
+            path = index
+        if not os.path.isfile(path):
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        encoding, served_path, has_variants = self._select_variant(path)
+        try:
+            f = open(served_path, "rb")
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            stat = os.fstat(f.fileno())
+            size = stat.st_size
+            etag = f'"{stat.st_mtime_ns:x}-{size:x}{"-" + encoding if encoding else ""}"'
+            if self._etag_matches(etag):
+                f.close()
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", etag)
+                if has_variants:
+                    self.send_header("Vary", "Accept-Encoding")
+                self.end_headers()
+                return None
+
+            byte_range = None
+            if encoding is None:
+                try:
+                    byte_range = parse_range(self.headers.get("Range"), size)
+                except ValueError:
+                    f.close()
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header("Content-Range", f"bytes */{size}")
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return None
+
+            if byte_range:
+                start, end = byte_range
+                f.seek(start)
+                self._send_length = end - start + 1
+                self.send_response(HTTPStatus.PARTIAL_CONTENT)
+                self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+            else:
+                self._send_length = size
+                self.send_response(HTTPStatus.OK)
+
+            self.send_header("Content-Type", self.guess_type(path))
+            self.send_header("Content-Length", str(self._send_length))
+            self.send_header("Last-Modified", self.date_time_string(stat.st_mtime))
+            self.send_header("ETag", etag)
+            if encoding:
+                self.send_header("Content-Encoding", encoding)
+            else:
+                self.send_header("Accept-Ranges", "bytes")
+            if has_variants:
+                self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return f
+        except Exception:
+            f.close()
+            raise
+
+    def _select_variant(self, path: str) -> Tuple[Optional[str], str, bool]:
+        """Pick the best precompressed sibling the client accepts and that is fresh."""
+        accepted = accepted_encodings(self.headers.get("Accept-Encoding"))
+        source_mtime = os.stat(path).st_mtime_ns
+        has_variants = False
+        chosen = None
+        for encoding, suffix in ENCODING_SUFFIXES:
+            try:
+                variant_mtime = os.stat(path + suffix).st_mtime_ns
+            except OSError:
+                continue
+            if variant_mtime < source_mtime:
+                continue  # page rewritten since it was precompressed
+            has_variants = True
+            if chosen is None and encoding in accepted:
+                chosen = (encoding, path + suffix)
+        if chosen:
+            return chosen[0], chosen[1], True
+        return None, path, has_variants
+
+    def _etag_matches(self, etag: str) -> bool:
+        header = self.headers.get("If-None-Match")
+        if not header:
+            return False
+        tags = {tag.strip() for tag in header.split(",")}
+        return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+    def copyfile(self, source, outputfile):
+        remaining = getattr(self, "_send_length", None)
+        if remaining is None:
+            return super().copyfile(source, outputfile)
+        while remaining > 0:
+            chunk = source.read(min(COPY_CHUNK, remaining))
+            if not chunk:
+                break
+            outputfile.write(chunk)
+            remaining -= len(chunk)
+
+    def log_message(self, format, *args):
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+
+def create_server(directory: Path, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """
+    Create (but do not start) a threading server for a directory.
+
+    Args:
+        directory: Directory to serve (usually the conversations directory)
+        host: Interface to bind
+        port: Port to bind (0 picks a free one)
+
+    Returns:
+        ThreadingHTTPServer; call serve_forever() to run it
+    """
+    handler = partial(PrecompressedRequestHandler, directory=str(Path(directory)))
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
@@ -0,0 +1,155 @@
+"""
+Bounded-size previews for image attachments.
+
+Conversation pages otherwise embed every photo at full resolution. The
+thumbnail_generation pipeline stage writes one preview per distinct image
+content and size/quality setting to
+``attachments/.thumbnails/<sha256[:2]>/<sha256>-<max_size>q<quality>.<ext>`` and
+records them in ``attachments/.thumbnails/index.json``, keyed by the
+attachment path relative to the conversations directory. ConversationManager
+reads that index to show a lazily loaded preview linking to the original.
+
+Pillow is optional: without it no previews are made and pages keep plain
+links.
+"""
+
+import json
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # Pillow is optional
+    Image = None
+    ImageOps = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAILS_DIRNAME = ".thumbnails"
+INDEX_FILENAME = "index.json"
+INDEX_VERSION = 1
+IMAGE_EXTENSIONS = frozenset({".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp", ".tif", ".tiff"})
+DEFAULT_MAX_SIZE = 320
+DEFAULT_QUALITY = 75
+
+
+def pillow_available() -> bool:
+    """Whether Pillow is installed."""
+    return Image is not None
+
+
+def preferred_format() -> str:
+    """WebP when this Pillow build can write it, otherwise JPEG."""
+    if Image is None:
+        return "jpeg"
+    Image.init()
+    return "webp" if "WEBP" in Image.SAVE else "jpeg"
+
+
+def thumbnails_dir(output_dir: Path) -> Path:
+    """Directory holding previews for a conversations directory."""
+    return Path(output_dir) / "attachments" / THUMBNAILS_DIRNAME
+
+
+def thumbnail_relpath(sha256: str, fmt: str, max_size: int = DEFAULT_MAX_SIZE,
+                      quality: int = DEFAULT_QUALITY) -> str:
+    """
+    Preview path for a content hash, relative to the conversations directory.
+
+    The size and quality are part of the name, so previews made with other
+    settings are never mistaken for current ones.
+    """
+    extension = "webp" if fmt == "webp" else "jpg"
+    return f"attachments/{THUMBNAILS_DIRNAME}/{sha256[:2]}/{sha256}-{max_size}q{quality}.{extension}"
+
+
+def make_thumbnail(source: str, dest: str, max_size: int, fmt: str, quality: int) -> Tuple[str, Optional[int]]:
+    """
+    Write a preview of source no larger than max_size on either side.
+
+    Runs in worker processes, so it takes and returns plain values.
+
+    Returns:
+        (source, bytes written), with None instead of a size if Pillow is
+        missing or the file cannot be decoded
+    """
+    if Image is None:
+        return source, None
+    try:
+        with Image.open(source) as image:
+            image = ImageOps.exif_transpose(image)
+            image.thumbnail((max_size, max_size))
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            Path(dest).parent.mkdir(parents=True, exist_ok=True)
+            temp = f"{dest}.tmp"
+            image.save(temp, format=fmt.upper(), quality=quality)
+        Path(temp).replace(dest)
+        return source, Path(dest).stat().st_size
+    except Exception as e:
+        logger.debug(f"Could not make thumbnail for {source}: {e}")
+        return source, None
+
+
+def thumbnail_index_path(output_dir: Path) -> Path:
+    """Path of the thumbnail index (it only exists once previews were generated)."""
+    return thumbnails_dir(output_dir) / INDEX_FILENAME
+
+
+def _load_index(output_dir: Path) -> Dict:
+    index_path = thumbnail_index_path(output_dir)
+    if not index_path.exists():
+        return {}
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Could not read thumbnail index {index_path}: {e}")
+        return {}
+    if data.get("version") != INDEX_VERSION:
+        return {}
+    return data
+
+
+def load_thumbnail_entries(output_dir: Path) -> Dict[str, Dict]:
+    """Load the per-attachment entries of the thumbnail index (empty if none)."""
+    return _load_index(output_dir).get("entries", {})
+
+
+def load_thumbnail_settings(output_dir: Path) -> Dict[str, int]:
+    """Load the max_size and quality the previews were last made with (empty if unknown)."""
+    return _load_index(output_dir).get("settings", {})
+
+
+def save_thumbnail_entries(output_dir: Path, entries: Dict[str, Dict],
+                           settings: Optional[Dict[str, int]] = None) -> Path:
+    """Write the thumbnail index atomically."""
+    index_path = thumbnail_index_path(output_dir)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    data = {"version": INDEX_VERSION, "entries": entries}
+    if settings:
+        data["settings"] = settings
+    temp = index_path.with_suffix(".json.tmp")
+    with open(temp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=1, sort_keys=True)
+    temp.replace(index_path)
+    return index_path
+
+
+def load_thumbnail_map(output_dir: Path) -> Dict[str, str]:
+    """
+    Map attachment hrefs to preview hrefs for conversation pages.
+
+    Only previews that exist on disk are included.
+
+    Returns:
+        Dict like {"attachments/Calls/photo.jpg": "attachments/.thumbnails/ab/ab….webp"}
+    """
+    output_dir = Path(output_dir)
+    thumbnails = {}
+    for attachment, entry in load_thumbnail_entries(output_dir).items():
+        thumbnail = entry.get("thumbnail")
+        if thumbnail and (output_dir / thumbnail).exists():
+            thumbnails[attachment] = thumbnail
+    return thumbnails
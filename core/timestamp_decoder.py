@@ -0,0 +1,201 @@
+"""
+Fast timestamp decoding for Google Voice Takeout files.
+
+get_time_unix() is called more than once per message, and its filename
+strategy used to run dateutil's fuzzy parser on the same filename substring
+for every message in a file. This module decodes the two layouts Takeout
+actually produces with fixed-layout parsers:
+
+- filename form:  ``... - Text - 2025-08-13T12_08_52Z.html``
+- abbr.dt title:  ``2014-10-25T18:10:03.123-04:00``
+
+Filename results are memoized per filename, and dateutil is used only as a
+counted last resort, so the fallback rate can be monitored.
+
+Results are bit-for-bit identical to the previous dateutil path: the wall
+clock fields are passed to time.mktime() exactly as dateutil's datetimes
+were (aware values with tm_isdst=0, naive values with tm_isdst=-1).
+"""
+
+import logging
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import dateutil.parser
+
+logger = logging.getLogger(__name__)
+
+# Separators that precede the timestamp in Takeout filenames, in the order
+# get_time_unix has always tried them
+_FILENAME_MARKERS = (" - Text -", " - Voicemail -", " - Received -", " - Placed -", " - Missed -")
+
+# YYYY-MM-DDTHH_MM_SSZ (underscores already converted to colons), optionally
+# preceded by the record kind when a "Phone - Kind - Date" name was split on
+# its first " - "
+_FILENAME_LAYOUT = re.compile(
+    r"\s*(?:(?:Text|Voicemail|Received|Placed|Missed) - )?"
+    r"(\d{4})-(\d{2})-(\d{2})T(\d{2}):(\d{2}):(\d{2})Z\s*\Z"
+)
+
+# ISO 8601 as written in abbr.dt titles; 3 or 6 fractional digits only, so
+# datetime.fromisoformat and dateutil.isoparse agree on every accepted value
+_ISO_LAYOUT = re.compile(
+    r"\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(?:\.\d{3}|\.\d{6})?(?:Z|[+-]\d{2}:\d{2})?\Z"
+)
+
+_MISSING = object()
+
+
+def _to_unix_ms(dt: datetime) -> int:
+    """Convert the way get_time_unix always has: wall clock through time.mktime."""
+    return int(time.mktime(dt.timetuple()) * 1000 + dt.microsecond // 1000)
+
+
+def _wall_clock_ms(year: int, month: int, day: int, hour: int, minute: int,
+                   second: int, microsecond: int, aware: bool) -> int:
+    # dateutil's tzutc/tzoffset report dst() == 0, so their timetuples carry
+    # tm_isdst=0; naive datetimes carry -1
+    struct = (year, month, day, hour, minute, second, 0, 0, 0 if aware else -1)
+    return int(time.mktime(struct) * 1000 + microsecond // 1000)
+
+
+def extract_filename_timestamp_part(filename: str) -> Optional[str]:
+    """
+    Return the timestamp portion of a Takeout filename, colon-separated.
+
+    Mirrors the filename strategy of get_time_unix: the text after the first
+    matching marker (or after the first " - " for "Phone - Date.html" names),
+    without the .html suffix and with underscores turned into colons.
+
+    Args:
+        filename: Takeout HTML filename
+
+    Returns:
+        Timestamp text, or None if the filename carries no timestamp marker
+    """
+    if " - Text -" in filename:
+        part = filename.split(" - Text -")[1]
+    elif " - " in filename and "T" in filename and "Z" in filename:
+        part = filename.split(" - ", 1)[1]
+    else:
+        for marker in _FILENAME_MARKERS[1:]:
+            if marker in filename:
+                part = filename.split(marker)[1]
+                break
+        else:
+            return None
+
+    if not part:
+        return None
+    if part.endswith(".html"):
+        part = part[:-5]
+    return part.replace("_", ":")
+
+
+class TimestampDecoder:
+    """
+    Memoizing decoder with fixed-layout fast paths and a counted fuzzy fallback.
+
+    Thread-safe: the memo is a plain dict (atomic get/set under the GIL) and
+    counters are updated under a lock.
+    """
+
+    def __init__(self, max_memo_size: int = 100_000):
+        self.max_memo_size = max_memo_size
+        self._filename_memo: Dict[str, Optional[int]] = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            "filename_fast": 0,
+            "filename_memo_hits": 0,
+            "iso_fast": 0,
+            "fuzzy_fallbacks": 0,
+            "failures": 0,
+        }
+
+    def _count(self, key: str) -> None:
+        with self._lock:
+            self.stats[key] += 1
+
+    def decode_filename(self, filename: str) -> Optional[int]:
+        """
+        Decode the timestamp embedded in a Takeout filename.
+
+        Args:
+            filename: Takeout HTML filename
+
+        Returns:
+            Unix milliseconds, or None if the filename has no parseable timestamp
+        """
+        cached = self._filename_memo.get(filename, _MISSING)
+        if cached is not _MISSING:
+            self._count("filename_memo_hits")
+            return cached
+
+        result = self._decode_filename_uncached(filename)
+        if len(self._filename_memo) >= self.max_memo_size:
+            self._filename_memo.clear()
+        self._filename_memo[filename] = result
+        return result
+
+    def _decode_filename_uncached(self, filename: str) -> Optional[int]:
+        part = extract_filename_timestamp_part(filename)
+        if part is None:
+            return None
+
+        match = _FILENAME_LAYOUT.match(part)
+        if match:
+            self._count("filename_fast")
+            return _wall_clock_ms(*map(int, match.groups()), 0, aware=True)
+
+        try:
+            self._count("fuzzy_fallbacks")
+            return _to_unix_ms(dateutil.parser.parse(part, fuzzy=True))
+        except Exception as e:
+            self._count("failures")
+            logger.debug(f"Failed to parse timestamp from filename '{filename}': {e}")
+            return None
+
+    def decode_iso(self, value: str) -> int:
+        """
+        Decode an ISO 8601 timestamp such as an abbr.dt title.
+
+        Args:
+            value: ISO 8601 string
+
+        Returns:
+            Unix milliseconds
+
+        Raises:
+            ValueError: If the value is not a valid ISO 8601 timestamp
+        """
+        if _ISO_LAYOUT.match(value):
+            try:
+                dt = datetime.fromisoformat(value[:-1] + "+00:00" if value.endswith("Z") else value)
+            except ValueError:
+                # e.g. hour 24, which isoparse accepts as midnight of the next day
+                dt = None
+            if dt is not None:
+                self._count("iso_fast")
+                return _wall_clock_ms(dt.year, dt.month, dt.day, dt.hour, dt.minute,
+                                      dt.second, dt.microsecond, aware=dt.tzinfo is not None)
+
+        self._count("fuzzy_fallbacks")
+        return _to_unix_ms(dateutil.parser.isoparse(value))
+
+    def clear(self) -> None:
+        """Drop memoized results and reset counters."""
+        self._filename_memo.clear()
+        with self._lock:
+            for key in self.stats:
+                self.stats[key] = 0
+
+
+_decoder = TimestampDecoder()
+
+
+def get_timestamp_decoder() -> TimestampDecoder:
+    """Return the process-wide decoder used by sms.get_time_unix."""
+    return _decoder
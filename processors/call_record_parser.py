@@ -0,0 +1,216 @@
+"""
+Single-pass parser for Google Voice call and voicemail files.
+
+Call logs are a large share of a Takeout export and each file is tiny, so
+building a BeautifulSoup tree (and, in places, re-reading the file) costs far
+more than the data inside. Their layout is fixed::
+
+    <title>Missed call from Alice</title>
+    <div class="haudio">
+      <a class="tel" href="tel:+15551234567"><span class="fn">Alice</span></a>
+      <abbr class="published" title="2020-01-01T10:00:00.000-05:00">...</abbr>
+      <abbr class="duration" title="PT1M2S">(00:01:02)</abbr>
+      <span class="full-text">Voicemail transcription</span>
+    </div>
+
+parse_call_record() reads the file once, scans it with one regex and returns
+a compact CallRecord. Files that do not match the layout return None so the
+caller can fall back to the BeautifulSoup extractors in sms.py.
+"""
+
+import html
+import logging
+import re
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+_CALL_PATTERN = re.compile(
+    r'<title>(?P<title>[^<]*)</title>'
+    r'|class="haudio"'
+    r'|<a class="tel" href="tel:(?P<tel>[^"]*)"[^>]*>(?P<tel_text>.*?)</a>'
+    r'|<abbr class="published" title="(?P<published>[^"]+)"'
+    r'|<abbr class="duration" title="(?P<duration_title>[^"]*)"[^>]*>(?P<duration_text>[^<]*)</abbr>'
+    r'|<span class="full-text">(?P<transcription>.*?)</span>',
+    re.DOTALL,
+)
+_FN_PATTERN = re.compile(r'<span class="fn">(.*?)</span>', re.DOTALL)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_TEL_NUMBER_PATTERN = re.compile(r"[+\d\s\-\(\)]+")
+_ISO_DURATION_PATTERN = re.compile(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?\Z")
+
+# Link texts that describe the call rather than name the contact
+GENERIC_CONTACT_TEXTS = {
+    "unknown",
+    "me",
+    "placed call to",
+    "received call from",
+    "missed call from",
+}
+
+
+def format_iso_duration(value: str) -> str:
+    """
+    Format an ISO 8601 duration the way sms.parse_iso_duration does.
+
+    Args:
+        value: Duration such as "PT4S" or "PT1H2M3S"
+
+    Returns:
+        "4s", "02:03" or "01:02:03"; the input unchanged if it does not parse
+    """
+    match = _ISO_DURATION_PATTERN.match(value)
+    if not match:
+        return value
+    hours, minutes, seconds = (int(group) if group else 0 for group in match.groups())
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+    if minutes > 0:
+        return f"{minutes:02d}:{seconds:02d}"
+    return f"{seconds}s"
+
+
+def _text(fragment: str) -> str:
+    return html.unescape(_TAG_PATTERN.sub("", fragment)).strip()
+
+
+def _published_to_ms(value: str) -> Optional[int]:
+    try:
+        return int(datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp() * 1000)
+    except ValueError:
+        import dateutil.parser
+
+        try:
+            return int(dateutil.parser.parse(value).timestamp() * 1000)
+        except (ValueError, OverflowError):
+            return None
+
+
+@dataclass(frozen=True)
+class CallRecord:
+    """Everything the conversation writer needs from one call or voicemail file."""
+    kind: str  # "call" or "voicemail"
+    call_type: str  # "Missed", "Placed", "Received" or "Unknown"
+    phone_number: str
+    contact_name: str
+    timestamp: int
+    duration: str
+    transcription: str
+    filename: str
+
+    def message_text(self, alias: str) -> str:
+        """
+        Build the conversation text, matching the BeautifulSoup path.
+
+        Args:
+            alias: Display name resolved for phone_number (used by voicemails)
+        """
+        if self.kind == "voicemail":
+            text = f"🎙️ Voicemail from {alias}"
+            if self.duration:
+                text += f" (Duration: {self.duration})"
+            if self.transcription:
+                text += f"\n\nTranscription:\n{self.transcription}"
+            return text
+
+        name = self.contact_name or "Unknown"
+        if self.call_type == "Missed":
+            text = f"📞 Missed call from {name}"
+        elif self.call_type == "Placed":
+            text = f"📞 Outgoing call to {name}"
+        elif self.call_type == "Received":
+            text = f"📞 Incoming call from {name}"
+        else:
+            text = f"📞 Call from {name}"
+        if self.duration:
+            text += f" (Duration: {self.duration})"
+        return text
+
+
+def parse_call_record(html_file: Path, kind: str, content: Optional[str] = None) -> Optional[CallRecord]:
+    """
+    Parse a call or voicemail file in one pass.
+
+    Args:
+        html_file: Call or voicemail HTML file
+        kind: "call" or "voicemail" (from get_file_type)
+        content: File content if already read
+
+    Returns:
+        CallRecord, or None if the file does not have the standard layout
+        (no haudio block, tel: link or published time)
+    """
+    if content is None:
+        try:
+            with open(html_file, "r", encoding="utf-8", errors="ignore") as f:
+                content = f.read()
+        except OSError as e:
+            logger.debug(f"Could not read call file {html_file}: {e}")
+            return None
+
+    title = ""
+    has_haudio = False
+    phone_number = None
+    contact_name = ""
+    published = None
+    duration = ""
+    transcription = ""
+
+    for match in _CALL_PATTERN.finditer(content):
+        group = match.lastgroup
+        if group == "title":
+            title = match.group("title")
+        elif group is None:
+            has_haudio = True
+        elif group == "tel_text":
+            if phone_number is None:
+                number = _TEL_NUMBER_PATTERN.match(match.group("tel"))
+                if number:
+                    phone_number = number.group(0)
+                    fn = _FN_PATTERN.search(match.group("tel_text"))
+                    name = _text(fn.group(1) if fn else match.group("tel_text"))
+                    if fn or name.lower() not in GENERIC_CONTACT_TEXTS:
+                        contact_name = name
+        elif group == "published":
+            if published is None:
+                published = match.group("published")
+        elif group == "duration_text":
+            if not duration:
+                duration_title = match.group("duration_title")
+                duration = (
+                    format_iso_duration(duration_title) if duration_title
+                    else match.group("duration_text").strip().strip("()")
+                )
+        elif group == "transcription":
+            if not transcription:
+                transcription = _text(match.group("transcription"))
+
+    if not (has_haudio and phone_number and published):
+        return None
+    timestamp = _published_to_ms(published)
+    if timestamp is None:
+        return None
+
+    title_lower = title.lower()
+    if "missed" in title_lower:
+        call_type = "Missed"
+    elif "placed" in title_lower:
+        call_type = "Placed"
+    elif "received" in title_lower:
+        call_type = "Received"
+    else:
+        call_type = "Unknown"
+
+    return CallRecord(
+        kind=kind,
+        call_type=call_type,
+        phone_number=phone_number,
+        contact_name=contact_name,
+        timestamp=timestamp,
+        duration=duration,
+        transcription=transcription,
+        filename=Path(html_file).name,
+    )
@@ -10,15 +10,18 @@ from pathlib import Path
 from typing import Dict, Union, Optional, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from core.processing_config import ProcessingConfig
     from core.processing_context import ProcessingContext
+    from core.run_context import RunContext
 from bs4 import BeautifulSoup
 
+from .call_record_parser import CallRecord, parse_call_record
 from .html_processor import (
     parse_html_file,
     get_file_type,
     should_skip_file,
 )
-from core.conversation_manager import ConversationManager
+from core.conversation_manager import ConversationManager, QueuedMessage
 from core.phone_lookup import PhoneLookupManager
 
 logger = logging.getLogger(__name__)
@@ -32,6 +35,7 @@ def process_single_html_file(
     phone_lookup_manager: PhoneLookupManager,
     config: Optional["ProcessingConfig"] = None,
     context: Optional["ProcessingContext"] = None,
+    run_context: Optional["RunContext"] = None,
 ) -> Dict[str, Union[int, str]]:
     """
     Process a single HTML file and return statistics.
@@ -42,17 +46,34 @@ def process_single_html_file(
         own_number: User's own phone number
         conversation_manager: Manager for conversation handling
         phone_lookup_manager: Manager for phone number lookups
+        config: Processing configuration
+        context: Processing context
+        run_context: Per-run paths and filter settings
 
     Returns:
         Dictionary containing processing statistics
     """
     try:
-        # Parse the HTML file
-        soup = parse_html_file(html_file)
-
         # Determine file type
         file_type = get_file_type(html_file.name)
 
+        # Call logs and voicemails: one read and one regex scan when the file
+        # has the standard layout, BeautifulSoup otherwise
+        if file_type in ("call", "voicemail"):
+            record = parse_call_record(html_file, file_type)
+            if record is not None:
+                return process_call_record(
+                    record,
+                    own_number,
+                    conversation_manager,
+                    phone_lookup_manager,
+                    config=config,
+                    run_context=run_context,
+                )
+
+        # Parse the HTML file
+        soup = parse_html_file(html_file)
+
         # Process based on file type
         if file_type == "sms_mms":
             return process_sms_mms_file(
@@ -64,6 +85,7 @@ def process_single_html_file(
                 phone_lookup_manager,
                 config=config,
                 context=context,
+                run_context=run_context,
             )
         elif file_type == "call":
             return process_call_file(
@@ -74,6 +96,7 @@ def process_single_html_file(
                 conversation_manager,
                 phone_lookup_manager,
                 config=config,
+                run_context=run_context,
             )
         elif file_type == "voicemail":
             return process_voicemail_file(
@@ -84,6 +107,7 @@ def process_single_html_file(
                 conversation_manager,
                 phone_lookup_manager,
                 config=config,
+                run_context=run_context,
             )
         else:
             logger.warning(f"Unknown file type '{file_type}' for {html_file.name}")
@@ -141,6 +165,7 @@ def process_sms_mms_file(
     phone_lookup_manager: PhoneLookupManager,
     config: Optional["ProcessingConfig"] = None,
     context: Optional["ProcessingContext"] = None,
+    run_context: Optional["RunContext"] = None,
 ) -> Dict[str, Union[int, str]]:
     """
     Process SMS/MMS files by calling the appropriate function from sms.py.
@@ -158,6 +183,7 @@ def process_sms_mms_file(
         phone_lookup_manager,
         config=config,
         context=context,
+        run_context=run_context,
     )
 
 
@@ -169,6 +195,7 @@ def process_call_file(
     conversation_manager: ConversationManager,
     phone_lookup_manager: PhoneLookupManager,
     config: Optional["ProcessingConfig"] = None,
+    run_context: Optional["RunContext"] = None,
 ) -> Dict[str, Union[int, str]]:
     """
     Process call files by extracting call info and writing to conversation files.
@@ -183,7 +210,9 @@ def process_call_file(
     processing_metrics = metrics_collector.start_processing(file_id, file_format="call")
 
     # Extract call information
-    call_info = extract_call_info(str(html_file), soup)
+    call_info = extract_call_info(
+        str(html_file), soup, run_context=run_context, phone_lookup_manager=phone_lookup_manager
+    )
 
     # If call info was extracted, write it to conversation files
     if call_info:
@@ -195,7 +224,8 @@ def process_call_file(
             soup=soup,
             conversation_manager=conversation_manager,
             phone_lookup_manager=phone_lookup_manager,
-            config=config  # Pass config for content tracking and date filtering
+            config=config,  # Pass config for content tracking and date filtering
+            run_context=run_context,
         )
         
         # Update metrics
@@ -231,6 +261,7 @@ def process_voicemail_file(
     conversation_manager: ConversationManager,
     phone_lookup_manager: PhoneLookupManager,
     config: Optional["ProcessingConfig"] = None,
+    run_context: Optional["RunContext"] = None,
 ) -> Dict[str, Union[int, str]]:
     """
     Process voicemail files by extracting voicemail info and writing to conversation files.
@@ -245,7 +276,9 @@ def process_voicemail_file(
     processing_metrics = metrics_collector.start_processing(file_id, file_format="voicemail")
 
     # Extract voicemail information
-    voicemail_info = extract_voicemail_info(str(html_file), soup)
+    voicemail_info = extract_voicemail_info(
+        str(html_file), soup, run_context=run_context, phone_lookup_manager=phone_lookup_manager
+    )
 
     # If voicemail info was extracted, write it to conversation files
     if voicemail_info:
@@ -257,7 +290,8 @@ def process_voicemail_file(
             soup=soup,
             conversation_manager=conversation_manager,
             phone_lookup_manager=phone_lookup_manager,
-            config=config  # Pass config for content tracking and date filtering
+            config=config,  # Pass config for content tracking and date filtering
+            run_context=run_context,
         )
         
         # Update metrics
@@ -285,6 +319,71 @@ def process_voicemail_file(
         }
 
 
+def process_call_record(
+    record: CallRecord,
+    own_number: Optional[str],
+    conversation_manager: ConversationManager,
+    phone_lookup_manager: PhoneLookupManager,
+    config: Optional["ProcessingConfig"] = None,
+    run_context: Optional["RunContext"] = None,
+) -> Dict[str, Union[int, str]]:
+    """
+    Write a call or voicemail parsed by parse_call_record to its conversation.
+
+    Produces the same entry as process_call_file / process_voicemail_file
+    without a BeautifulSoup tree.
+    """
+    import sms
+    from utils.enhanced_logging import get_metrics_collector
+
+    is_call = record.kind == "call"
+    stats = {
+        "num_sms": 0,
+        "num_img": 0,
+        "num_vcf": 0,
+        "num_calls": 0,
+        "num_voicemails": 0,
+        "own_number": own_number,
+    }
+    processing_metrics = get_metrics_collector().start_processing(record.filename, file_format=record.kind)
+
+    # PHONE FILTERING: numbers without aliases, service codes, exclusions
+    # (checked before get_alias, which would store the contact name as an alias)
+    filter_config = config if config is not None else (run_context.config if run_context else None)
+    if filter_config and sms.should_skip_message_by_phone_param(
+        record.phone_number, phone_lookup_manager, filter_config
+    ):
+        logger.debug(f"Skipping {record.kind} from {record.phone_number} - phone filtering criteria met")
+        processing_metrics.mark_failure("Filtered by phone number")
+        return stats
+
+    # NON-PHONE FILTERING: same rule as extract_call_info / extract_voicemail_info
+    filter_non_phone = run_context.filter_non_phone_numbers if run_context else sms.FILTER_NON_PHONE_NUMBERS
+    if filter_non_phone and not sms.is_valid_phone_number(
+        record.phone_number, filter_non_phone=True
+    ):
+        logger.debug(f"Skipping {record.kind} from {record.phone_number} - toll-free or non-US number filtered out")
+        processing_metrics.mark_failure("Filtered non-phone number")
+        return stats
+
+    alias = phone_lookup_manager.get_alias(record.phone_number, alias_hint=record.contact_name)
+    conversation_id = conversation_manager.get_conversation_id(
+        [record.phone_number], False, phone_lookup_manager
+    )
+    message_text = record.message_text(alias)
+    conversation_manager.write_batch(
+        conversation_id,
+        [QueuedMessage(record.timestamp, alias, message_text, message_type=record.kind)],
+        config=config,
+        stats={"num_calls": 1} if is_call else {"num_voicemails": 1},
+    )
+
+    processing_metrics.messages_processed = 1
+    processing_metrics.mark_success()
+    stats["num_calls" if is_call else "num_voicemails"] = 1
+    return stats
+
+
 def get_file_processing_stats(html_files: list) -> Dict[str, int]:
     """
     Get statistics about the types of files to be processed.
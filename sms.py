@@ -31,6 +31,10 @@ from utils.enhanced_logging import (
 from core.app_config import *
 from utils.utils import is_valid_phone_number, generate_unknown_number_hash
 from utils.utils import copy_attachments_sequential, copy_attachments_parallel, copy_chunk_parallel
+from utils.memory_monitor import mark_phase
+from utils.hot_path_logging import ProgressReporter
+from core.file_date_prefilter import prefilter_files_by_date
+from core.run_context import RunContext, build_run_context
 from core.attachment_manager import (
     build_attachment_mapping_with_progress,
     copy_mapped_attachments,
@@ -43,7 +47,8 @@ from processors.html_processor import (
     STRING_POOL,
 )
 from core.phone_lookup import PhoneLookupManager
-from core.conversation_manager import ConversationManager
+from core.conversation_manager import ConversationManager, QueuedMessage
+from core.timestamp_decoder import get_timestamp_decoder
 from bs4 import BeautifulSoup
 import phonenumbers
 import dateutil.parser
@@ -58,7 +63,7 @@ import time
 import threading
 from base64 import b64encode
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime, timedelta
 from functools import lru_cache
 from pathlib import Path
@@ -69,6 +74,7 @@ from core import shared_constants
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union, TYPE_CHECKING
 
 if TYPE_CHECKING:
+    from core.message_dedup import MessageDeduplicator
     from core.processing_config import ProcessingConfig
     from core.processing_context import ProcessingContext
 # ====================================================================
@@ -265,6 +271,9 @@ def validate_attachment_mapping_integrity(
 # Configure logger reference only; configure handlers/levels in __main__
 logger = logging.getLogger(__name__)
 
+# Per-message progress inside one file: at most one line every few seconds per worker
+_message_progress = ProgressReporter(logger)
+
 # Configuration constants are now imported directly from core.app_config
 # SUPPORTED_IMAGE_TYPES, SUPPORTED_VCARD_TYPES, SUPPORTED_EXTENSIONS
 # MMS_TYPE_SENT, MMS_TYPE_RECEIVED
@@ -705,18 +714,29 @@ def validate_configuration():
     logger.info("Configuration validation passed")
 
 
-def get_limited_file_list(limit: int) -> List[Path]:
+def close_search_index(conversation_manager: "ConversationManager") -> None:
+    """Close and detach the search index fed by a conversation manager, if any."""
+    search_index = conversation_manager.search_index
+    if search_index is None:
+        return
+    conversation_manager.search_index = None
+    search_index.close()
+    logger.info(f"🔎 Search index: {search_index.messages_added:,} new messages indexed")
+
+
+def get_limited_file_list(limit: int, processing_dir: Optional[Path] = None) -> List[Path]:
     """
     Get a limited list of HTML files for test mode, sorted by date (most recent first).
 
     Args:
         limit: Maximum number of files to return
+        processing_dir: Export directory to list (default: PROCESSING_DIRECTORY)
 
     Returns:
         List of Path objects for HTML files, limited to the specified count
     """
     html_files = []
-    calls_directory = PROCESSING_DIRECTORY / "Calls"
+    calls_directory = Path(processing_dir or PROCESSING_DIRECTORY) / "Calls"
     for root, dirs, files in os.walk(calls_directory):
         for file in files:
             if file.endswith(".html"):
@@ -786,8 +806,19 @@ def get_limited_file_list_param(processing_dir: Path, limit: int) -> List[Path]:
         f"🧪 TEST MODE: Limited file discovery to first {len(html_files)} HTML files")
     return html_files
 def main(config: Optional["ProcessingConfig"] = None,
-     context: Optional["ProcessingContext"] = None):
-    """Main conversion function with comprehensive progress logging and performance optimization."""
+     context: Optional["ProcessingContext"] = None,
+     run_context: Optional[RunContext] = None):
+    """
+    Main conversion function with comprehensive progress logging and performance optimization.
+
+    Paths, test mode and filters come from the arguments only; no module
+    globals are read or assigned, so conversions in one process stay apart.
+
+    Args:
+        config: Processing configuration
+        context: Processing context with the run's managers (built from config if omitted)
+        run_context: Per-run settings (built from config and context if omitted)
+    """
     start_time = time.time()
 
     # Create context if not provided
@@ -796,6 +827,10 @@ def main(config: Optional["ProcessingConfig"] = None,
             raise ValueError("Either config or context must be provided")
         from core.processing_context import create_processing_context
         context = create_processing_context(config)
+    if config is None:
+        config = context.config
+    if run_context is None:
+        run_context = build_run_context(config, context)
 
     # Initialize enhanced logging and metrics
     metrics_collector = get_metrics_collector()
@@ -808,27 +843,18 @@ def main(config: Optional["ProcessingConfig"] = None,
         logger.info(f"Processing directory: {context.processing_dir}")
         logger.info(f"Output directory: {context.output_dir}")
 
-        # THE FIX: Declare global variables at the start
-        global LIMITED_HTML_FILES, TEST_MODE, TEST_LIMIT
-        
         # Test mode indicator
         if context.test_mode:
             logger.info(
                 f"🧪 TEST MODE ENABLED - All operations limited to {context.test_limit} files")
             # Create limited file list for test mode
             context.limited_html_files = get_limited_file_list(
-                context.test_limit)
-            # THE FIX: Sync the global variables so process_html_files can use them
-            LIMITED_HTML_FILES = context.limited_html_files
-            TEST_MODE = True
-            TEST_LIMIT = context.test_limit
+                context.test_limit, run_context.processing_dir)
             logger.info(
                 f"🧪 TEST MODE: Created limited file list with {len(context.limited_html_files)} files")
         else:
             logger.info("🚀 FULL RUN MODE - Processing all files")
             context.limited_html_files = None
-            LIMITED_HTML_FILES = None
-            TEST_MODE = False
 
         # Critical validation: ensure context is properly initialized
         if context.output_dir is None:
@@ -856,18 +882,16 @@ def main(config: Optional["ProcessingConfig"] = None,
         logger.info(
             f"  Memory mapping threshold: {MMAP_THRESHOLD // (1024*1024)}MB")
 
-        # Initialize memory monitoring
+        # Initialize memory monitoring (background sampler, off the hot path)
         if ENABLE_PERFORMANCE_MONITORING:
             try:
-                from utils.memory_monitor import get_memory_monitor
-                memory_monitor = get_memory_monitor()
-                memory_monitor.take_snapshot("conversion_start", {
-                    "processing_dir": str(PROCESSING_DIRECTORY),
-                    "output_dir": str(OUTPUT_DIRECTORY),
-                    "max_workers": MAX_WORKERS,
-                    "chunk_size": CHUNK_SIZE_OPTIMAL
-                })
-                logger.info("✅ Memory monitoring initialized")
+                from utils.memory_monitor import start_resource_sampler
+                start_resource_sampler(
+                    interval=PERFORMANCE_SAMPLE_INTERVAL,
+                    capacity=PERFORMANCE_SAMPLE_BUFFER_SIZE,
+                ).mark_phase("setup")
+                logger.info(
+                    f"✅ Memory monitoring initialized (sampling every {PERFORMANCE_SAMPLE_INTERVAL:.2f}s)")
             except Exception as e:
                 logger.warning(
                     f"⚠️  Memory monitoring initialization failed: {e}")
@@ -877,14 +901,16 @@ def main(config: Optional["ProcessingConfig"] = None,
         validate_configuration()
 
         # Validate date range if both filters are set
-        if DATE_FILTER_NEWER_THAN is not None and DATE_FILTER_OLDER_THAN is not None:
+        older_than = run_context.exclude_older_than
+        newer_than = run_context.exclude_newer_than
+        if newer_than is not None and older_than is not None:
             # Quick check: scan a few files to see if any fall within the date
             # range
             logger.info("📅 Scanning files to validate date range coverage...")
 
-            if TEST_MODE:
+            if context.test_mode:
                 # In test mode, use the limited file list for date validation
-                sample_files = get_limited_file_list(min(10, TEST_LIMIT))
+                sample_files = get_limited_file_list(min(10, context.test_limit), run_context.processing_dir)
                 sample_files = [str(f) for f in sample_files]
                 logger.info(
                     f"🧪 TEST MODE: Date validation using limited file list ({len(sample_files)} files)")
@@ -896,7 +922,7 @@ def main(config: Optional["ProcessingConfig"] = None,
             else:
                 # In full mode, scan up to 10 files for date validation
                 sample_files = []
-                for root, dirs, files in os.walk(PROCESSING_DIRECTORY):
+                for root, dirs, files in os.walk(run_context.processing_dir):
                     for file in files:
                         if file.endswith(".html") and len(sample_files) < 10:
                             sample_files.append(os.path.join(root, file))
@@ -907,7 +933,7 @@ def main(config: Optional["ProcessingConfig"] = None,
 
             # Check if any sample files fall within the date range
             files_in_range = 0
-            if not TEST_MODE:  # Skip date validation loop in test mode
+            if not context.test_mode:  # Skip date validation loop in test mode
                 for file_path in sample_files:
                     try:
                         # Extract timestamp from filename (common pattern:
@@ -924,7 +950,7 @@ def main(config: Optional["ProcessingConfig"] = None,
                             file_date = dateutil.parser.parse(timestamp_str)
 
                             # Check if file falls within our valid range
-                            if DATE_FILTER_OLDER_THAN < file_date < DATE_FILTER_NEWER_THAN:
+                            if older_than < file_date < newer_than:
                                 files_in_range += 1
                     except Exception:
                         # Skip files we can't parse
@@ -935,7 +961,7 @@ def main(config: Optional["ProcessingConfig"] = None,
                     "⚠️  WARNING: No sample files found within the specified date range!"
                 )
                 logger.warning(
-                    f"   Date range: {DATE_FILTER_OLDER_THAN} to {DATE_FILTER_NEWER_THAN}"
+                    f"   Date range: {older_than} to {newer_than}"
                 )
                 logger.warning(
                     "   This may indicate no messages will be processed")
@@ -944,12 +970,12 @@ def main(config: Optional["ProcessingConfig"] = None,
                 )
 
                 # In test mode, bypass the date validation failure
-                if TEST_MODE:
+                if context.test_mode:
                     logger.info(
                         "🧪 TEST MODE: Bypassing date validation failure for test purposes")
                 else:
                     # Ask user if they want to continue
-                    if not FULL_RUN:
+                    if not context.full_run:
                         logger.error(
                             "❌ REFUSING TO CONTINUE: No files found in date range and not in full-run mode"
                         )
@@ -957,23 +983,38 @@ def main(config: Optional["ProcessingConfig"] = None,
                             "   Use --full-run to override this safety check")
                         sys.exit(1)
 
+        # Optional full-text index of every written message (--build-search-index)
+        from core.search_index import open_search_index
+
+        context.conversation_manager.search_index = open_search_index(config, context.output_dir)
+
+        # Incremental update: parse only new or changed files into an earlier output
+        update_from = getattr(config, "update_from", None)
+        if update_from is not None:
+            try:
+                run_incremental_update(Path(update_from), config, context, start_time, run_context)
+            finally:
+                close_search_index(context.conversation_manager)
+            return
+
         # Build attachment mapping
         logger.info("Building attachment mapping...")
+        mark_phase("attachment_mapping")
         mapping_start = time.time()
 
         # In test mode, limit attachment mapping to only process files that
         # will be used
-        if TEST_MODE:
+        if context.test_mode:
             logger.info(
-                f"🧪 TEST MODE: Limiting attachment mapping to support {TEST_LIMIT} HTML files")
-            # Use the global limited file list for attachment mapping
-            if LIMITED_HTML_FILES:
-                sample_html_files = [str(f) for f in LIMITED_HTML_FILES]
+                f"🧪 TEST MODE: Limiting attachment mapping to support {context.test_limit} HTML files")
+            # Use the run's limited file list for attachment mapping
+            if context.limited_html_files:
+                sample_html_files = [str(f) for f in context.limited_html_files]
                 logger.info(
-                    f"🧪 TEST MODE: Using global limited file list for attachment mapping")
+                    f"🧪 TEST MODE: Using the run's limited file list for attachment mapping")
             else:
                 # Fallback to creating a new limited list
-                sample_html_files = get_limited_file_list(TEST_LIMIT)
+                sample_html_files = get_limited_file_list(context.test_limit, run_context.processing_dir)
                 sample_html_files = [str(f) for f in sample_html_files]
 
             # Use optimized attachment mapping for better performance
@@ -1021,6 +1062,7 @@ def main(config: Optional["ProcessingConfig"] = None,
 
         # Copy all mapped attachments
         logger.info("Copying mapped attachments...")
+        mark_phase("attachment_copying")
         copy_start = time.time()
         # Ensure output directories exist before copying
         context.path_manager.ensure_output_directories()
@@ -1034,15 +1076,43 @@ def main(config: Optional["ProcessingConfig"] = None,
         # Process HTML files
         logger.info("Processing HTML files...")
         processing_start = time.time()
+        merge_sources = list(getattr(config, "merge_sources", None) or ())
+        deduplicator = None
+        if merge_sources:
+            from core.message_dedup import FINGERPRINT_DB_FILENAME, MessageDeduplicator
+
+            deduplicator = MessageDeduplicator(context.output_dir / FINGERPRINT_DB_FILENAME)
+            deduplicator.begin_source(context.processing_dir)
+            context.conversation_manager.deduplicator = deduplicator
+        run_context = run_context.with_attachment_index(src_filename_map)
         stats = process_html_files_param(
             processing_dir=context.processing_dir,
-            src_filename_map=src_filename_map,
+            src_filename_map=run_context.attachment_index,
             conversation_manager=context.conversation_manager,
             phone_lookup_manager=context.phone_lookup_manager,
             config=config,
             context=context,
-            limited_files=context.limited_html_files if context.test_mode else None
+            limited_files=context.limited_html_files if context.test_mode else None,
+            run_context=run_context,
+            # Merged sources add to the same conversations before one finalize below
+            finalize=not merge_sources,
         )
+        if deduplicator is not None:
+            try:
+                for source_dir in merge_sources:
+                    process_merge_source(source_dir, config, context, deduplicator, run_context)
+                # Count what later sources wrote, not what they parsed: a file
+                # skipped in every source would otherwise be counted again
+                deduplicator.add_merged_stats(stats)
+                logger.info("🔀 Merged sources (duplicates dropped):")
+                for row in deduplicator.source_report():
+                    logger.info(
+                        f"   {row['source']}: {row['messages']:,} messages, "
+                        f"{row['duplicates']:,} duplicates ({row['duplicate_rate']:.1%})"
+                    )
+            finally:
+                context.conversation_manager.deduplicator = None
+                deduplicator.close()
         processing_time = time.time() - processing_start
         logger.info(
             f"Processed {stats['num_sms']} SMS, {stats['num_img']} images, {stats['num_vcf']} vCards in {processing_time:.2f}s"
@@ -1050,18 +1120,34 @@ def main(config: Optional["ProcessingConfig"] = None,
 
         # Finalize conversation files
         logger.info("Finalizing conversation files...")
+        mark_phase("finalize_conversations")
         finalize_start = time.time()
         context.conversation_manager.finalize_conversation_files(config=config)
+        close_search_index(context.conversation_manager)
         finalize_time = time.time() - finalize_start
 
         # Calculate elapsed time and generate index
         elapsed_time = time.time() - start_time
+        mark_phase("index_generation")
         index_start = time.time()
         context.conversation_manager.generate_index_html(stats, elapsed_time)
         index_time = time.time() - index_start
 
+        # Record the parsed source files so a later --update-from can skip them
+        if not context.test_mode:
+            from core.incremental_update import list_source_files, scan_source_files, write_source_manifest
+
+            try:
+                write_source_manifest(
+                    context.output_dir,
+                    scan_source_files(context.processing_dir, list_source_files(context.processing_dir)),
+                    config,
+                )
+            except OSError as e:
+                logger.warning(f"⚠️  Could not record source files for --update-from: {e}")
+
         # Display final results
-        display_results(stats, elapsed_time)
+        display_results(stats, elapsed_time, context.output_dir)
 
         # Performance breakdown
         logger.info("Performance Breakdown:")
@@ -1088,7 +1174,15 @@ def main(config: Optional["ProcessingConfig"] = None,
         # Memory monitoring summary
         if ENABLE_PERFORMANCE_MONITORING:
             try:
-                from utils.memory_monitor import get_memory_summary, generate_memory_recommendations
+                from utils.memory_monitor import (
+                    get_resource_sampler, stop_resource_sampler,
+                    get_memory_summary, generate_memory_recommendations,
+                )
+
+                sampler = get_resource_sampler()
+                if sampler is not None:
+                    stop_resource_sampler()
+                    sampler.log_phase_report()
 
                 memory_summary = get_memory_summary()
                 if "error" not in memory_summary:
@@ -1110,7 +1204,7 @@ def main(config: Optional["ProcessingConfig"] = None,
                         logger.info("Memory Optimization Recommendations:")
                         for rec in recommendations:
                             logger.info(f"  • {rec}")
-                else:
+                elif sampler is None:
                     logger.warning(
                         f"⚠️  Memory monitoring summary unavailable: {memory_summary['error']}")
 
@@ -1120,7 +1214,7 @@ def main(config: Optional["ProcessingConfig"] = None,
         # Export Health Assessment
         try:
             logger.info("🔍 Export Health Assessment:")
-            export_health_summary = generate_export_health_summary()
+            export_health_summary = generate_export_health_summary(run_context.processing_dir)
 
             if "error" not in export_health_summary:
                 logger.info(
@@ -1240,13 +1334,14 @@ def format_elapsed_time(seconds: int) -> str:
         return f"{delta.seconds} seconds"
 
 
-def display_results(stats: Dict[str, int], elapsed_time: float):
+def display_results(stats: Dict[str, int], elapsed_time: float, output_dir: Optional[Path] = None):
     """
     Display conversion results and performance metrics.
 
     Args:
         stats: Dictionary containing conversion statistics
         elapsed_time: Total elapsed time in seconds
+        output_dir: Output directory of the run (default: OUTPUT_DIRECTORY)
     """
     logger.info("=" * 60)
     logger.info("CONVERSION RESULTS")
@@ -1268,7 +1363,7 @@ def display_results(stats: Dict[str, int], elapsed_time: float):
         logger.info(
             "Processing rate: Completed too quickly for accurate measurement")
 
-    logger.info(f"Output directory: {OUTPUT_DIRECTORY}")
+    logger.info(f"Output directory: {output_dir or OUTPUT_DIRECTORY}")
     logger.info("=" * 60)
 
 
@@ -2298,17 +2393,9 @@ def process_html_files(src_filename_map: Dict[str, str], config: Optional["Proce
     }
     own_number = None
     
-    # Memory monitoring for file processing
+    # Tag background resource samples with the current stage
     if ENABLE_PERFORMANCE_MONITORING:
-        try:
-            from utils.memory_monitor import monitor_memory_usage
-            monitor_memory_usage("html_processing_start", {
-                "src_filename_map_size": len(src_filename_map),
-                "processing_mode": "batch"
-            })
-        except Exception as e:
-            logger.warning(f"Memory monitoring for HTML processing start failed: {e}")
-            logger.info("Performance monitoring disabled for this HTML processing batch")
+        mark_phase("html_processing")
 
     # Get HTML files from the Calls subdirectory
     calls_directory = PROCESSING_DIRECTORY / "Calls"
@@ -2342,6 +2429,9 @@ def process_html_files(src_filename_map: Dict[str, str], config: Optional["Proce
         logger.error(f"No HTML files found in Calls directory: {calls_directory}")
         return stats
 
+    # Drop files entirely outside the date window before parsing them
+    html_files_list, _ = prefilter_files_by_date(html_files_list, config)
+
     # Process all files, not just SMS/MMS files
     all_files = html_files_list
     filtered_files = len(all_files)
@@ -2436,21 +2526,10 @@ def process_html_files(src_filename_map: Dict[str, str], config: Optional["Proce
     # Finalize conversation files
     if CONVERSATION_MANAGER:
         logger.info("Finalizing conversation files...")
+        if ENABLE_PERFORMANCE_MONITORING:
+            mark_phase("finalize_conversations")
         CONVERSATION_MANAGER.finalize_conversation_files(config=config)
     
-    # Memory monitoring for file processing completion
-    if ENABLE_PERFORMANCE_MONITORING:
-        try:
-            from utils.memory_monitor import monitor_memory_usage
-            monitor_memory_usage("html_processing_complete", {
-                "processed_files": filtered_files,
-                "final_stats": stats,
-                "processing_mode": "batch"
-            })
-        except Exception as e:
-            logger.warning(f"Memory monitoring for HTML processing completion failed: {e}")
-            logger.info("Performance monitoring summary incomplete for this batch")
-    
     return stats
 
 
@@ -2464,7 +2543,9 @@ def process_html_files_param(
     limited_files: Optional[List[Path]] = None,
     large_dataset_threshold: int = 5000,
     batch_size_optimal: int = 1000,
-    enable_performance_monitoring: bool = True
+    enable_performance_monitoring: bool = True,
+    run_context: Optional[RunContext] = None,
+    finalize: bool = True,
 ) -> Dict[str, int]:
     """
     Process all HTML files and return statistics (parameter-based version).
@@ -2484,6 +2565,9 @@ def process_html_files_param(
         large_dataset_threshold: Threshold for switching to batch processing
         batch_size_optimal: Optimal batch size for large datasets
         enable_performance_monitoring: Whether to enable memory monitoring
+        run_context: Per-run settings; built from config/context when omitted
+        finalize: Finalize the conversation files afterwards (False when more
+            sources will be merged into the same conversations)
         
     Returns:
         Dictionary with processing statistics
@@ -2504,18 +2588,20 @@ def process_html_files_param(
     else:
         logger.warning("⚠️  Could not extract own number from Phones.vcf")
         own_number = None
+
+    if run_context is None:
+        run_context = build_run_context(
+            config,
+            context,
+            processing_dir=processing_dir,
+            src_filename_map=src_filename_map,
+            phone_lookup_manager=phone_lookup_manager,
+        )
+    run_context = run_context.with_own_number(own_number)
     
-    # Memory monitoring for file processing
+    # Tag background resource samples with the current stage
     if enable_performance_monitoring:
-        try:
-            from utils.memory_monitor import monitor_memory_usage
-            monitor_memory_usage("html_processing_start", {
-                "src_filename_map_size": len(src_filename_map),
-                "processing_mode": "batch"
-            })
-        except Exception as e:
-            logger.warning(f"Memory monitoring for HTML processing start failed: {e}")
-            logger.info("Performance monitoring disabled for this HTML processing batch")
+        mark_phase("html_processing")
 
     # Get HTML files from the Calls subdirectory
     calls_directory = processing_dir / "Calls"
@@ -2543,6 +2629,9 @@ def process_html_files_param(
         logger.error(f"No HTML files found in Calls directory: {calls_directory}")
         return stats
 
+    # Drop files entirely outside the date window before parsing them
+    html_files_list, _ = prefilter_files_by_date(html_files_list, run_context)
+
     # Process all files, not just SMS/MMS files
     all_files = html_files_list
     filtered_files = len(all_files)
@@ -2557,7 +2646,9 @@ def process_html_files_param(
             f"Using batch processing for large dataset ({filtered_files} files)"
         )
         stats = process_html_files_batch(
-            all_files, src_filename_map, batch_size=batch_size_optimal, config=config, context=context, own_number=own_number
+            all_files, src_filename_map, batch_size=batch_size_optimal, config=config, context=context,
+            own_number=own_number, run_context=run_context,
+            conversation_manager=conversation_manager, phone_lookup_manager=phone_lookup_manager,
         )
     else:
         # Process files individually for smaller datasets
@@ -2576,6 +2667,7 @@ def process_html_files_param(
                     phone_lookup_manager,
                     config,
                     context=context,
+                    run_context=run_context,
                 )
 
                 # Update statistics
@@ -2632,23 +2724,185 @@ def process_html_files_param(
     )
     
     # Finalize conversation files using provided manager
-    if conversation_manager:
+    if conversation_manager and finalize:
         logger.info("Finalizing conversation files...")
+        if enable_performance_monitoring:
+            mark_phase("finalize_conversations")
         conversation_manager.finalize_conversation_files(config=config)
     
-    # Memory monitoring for file processing completion
-    if enable_performance_monitoring:
+    return stats
+
+
+def process_merge_source(
+    source_dir: Path,
+    config: Optional["ProcessingConfig"],
+    context: "ProcessingContext",
+    deduplicator: "MessageDeduplicator",
+    run_context: Optional[RunContext] = None,
+) -> Dict[str, int]:
+    """
+    Map, copy and process one additional Takeout directory of a merged run.
+
+    Messages go to the same ConversationManager as the primary processing
+    directory; the deduplicator attached to it drops those already written
+    from an earlier source. Conversations are not finalized here.
+
+    Args:
+        source_dir: Takeout directory (containing Calls/ and Phones.vcf)
+        config: Processing configuration
+        context: Processing context of the run
+        deduplicator: Fingerprint set shared by all sources
+        run_context: Settings of the run; the source gets a copy with its own
+            processing directory and attachment index
+
+    Returns:
+        Dictionary with processing statistics for this source (before
+        duplicates are subtracted)
+    """
+    from core.performance_optimizations import build_attachment_mapping_optimized
+
+    source_dir = Path(source_dir)
+    logger.info(f"🔀 Merging source: {source_dir}")
+    deduplicator.begin_source(source_dir)
+
+    src_filename_map = build_attachment_mapping_optimized(source_dir, use_cache=True)
+    copy_mapped_attachments(src_filename_map, context.path_manager)
+
+    if run_context is None:
+        run_context = build_run_context(
+            config,
+            context,
+            processing_dir=source_dir,
+            src_filename_map=src_filename_map,
+            phone_lookup_manager=context.phone_lookup_manager,
+        )
+    else:
+        run_context = replace(run_context, processing_dir=source_dir).with_attachment_index(src_filename_map)
+    return process_html_files_param(
+        processing_dir=source_dir,
+        src_filename_map=src_filename_map,
+        conversation_manager=context.conversation_manager,
+        phone_lookup_manager=context.phone_lookup_manager,
+        config=config,
+        context=context,
+        run_context=run_context,
+        finalize=False,
+    )
+
+
+def run_incremental_update(
+    update_from: Path,
+    config: Optional["ProcessingConfig"],
+    context: "ProcessingContext",
+    start_time: float,
+    run_context: Optional[RunContext] = None,
+) -> Dict[str, int]:
+    """
+    Update an earlier output with the new or changed files of the processing directory.
+
+    Files are compared with the source file record of the earlier output and
+    only those that differ are mapped, copied and parsed. Their messages are
+    merged into the existing conversation pages, dropping messages a page
+    already shows, and index.html is patched rather than rebuilt. In test
+    mode only the limited files are compared, and the record keeps the
+    entries of the others.
+
+    Args:
+        update_from: Output directory of the earlier run
+        config: Processing configuration
+        context: Processing context of the run
+        start_time: time.time() when the run started
+        run_context: Settings of the run (built from config and context if omitted)
+
+    Returns:
+        Dictionary with statistics of the messages added
+    """
+    from core.incremental_update import (
+        PriorOutput,
+        diff_source_files,
+        list_source_files,
+        load_source_manifest,
+        scan_source_files,
+        seed_output,
+        source_config_fingerprint,
+        write_source_manifest,
+    )
+
+    if getattr(config, "merge_sources", None):
+        raise ValueError("--update-from cannot be combined with --merge-source")
+
+    if run_context is None:
+        run_context = build_run_context(config, context, phone_lookup_manager=context.phone_lookup_manager)
+    output_dir = context.output_dir
+    if Path(update_from).resolve() != Path(output_dir).resolve():
+        seed_output(Path(update_from), output_dir)
+
+    previous = load_source_manifest(output_dir)
+    if previous is None:
+        logger.warning(
+            f"⚠️  {output_dir} has no source file record; every file will be parsed "
+            f"(messages already on a page are still dropped)"
+        )
+        previous = {"files": {}, "config": None}
+    elif previous.get("config") != source_config_fingerprint(config):
+        logger.warning("⚠️  Filtering options differ from the run that wrote this output; pages may mix both")
+
+    scan_start = time.time()
+    files = context.limited_html_files if context.test_mode else list_source_files(context.processing_dir)
+    current = scan_source_files(context.processing_dir, files or [], previous["files"])
+    changed, removed = diff_source_files(previous["files"], current)
+    logger.info(
+        f"🔄 Updating {output_dir}: {len(changed):,} of {len(current):,} files new or changed, "
+        f"{0 if context.test_mode else len(removed):,} no longer present "
+        f"(scanned in {time.time() - scan_start:.2f}s)"
+    )
+    if context.test_mode:
+        # Only a sample was scanned: keep the record of the files outside it
+        current = {**previous["files"], **current}
+
+    stats = {"num_sms": 0, "num_img": 0, "num_vcf": 0, "num_calls": 0, "num_voicemails": 0}
+    manager = context.conversation_manager
+    prior_output = PriorOutput(output_dir)
+    if changed:
+        from core.performance_optimizations import build_attachment_mapping_optimized
+
+        changed_files = [context.processing_dir / key for key in changed]
+        mark_phase("attachment_mapping")
+        # Only the changed files' references; not cached, as the mapping is partial
+        src_filename_map = build_attachment_mapping_optimized(
+            context.processing_dir, sample_files=[str(f) for f in changed_files], use_cache=False
+        )
+        mark_phase("attachment_copying")
+        context.path_manager.ensure_output_directories()
+        copy_mapped_attachments(src_filename_map, context.path_manager)
+
+        manager.prior_output = prior_output
         try:
-            from utils.memory_monitor import monitor_memory_usage
-            monitor_memory_usage("html_processing_complete", {
-                "processed_files": filtered_files,
-                "final_stats": stats,
-                "processing_mode": "batch"
-            })
-        except Exception as e:
-            logger.warning(f"Memory monitoring for HTML processing completion failed: {e}")
-            logger.info("Performance monitoring summary incomplete for this batch")
-    
+            stats = process_html_files_param(
+                processing_dir=context.processing_dir,
+                src_filename_map=src_filename_map,
+                conversation_manager=manager,
+                phone_lookup_manager=context.phone_lookup_manager,
+                config=config,
+                context=context,
+                limited_files=changed_files,
+                run_context=run_context.with_attachment_index(src_filename_map),
+            )
+        finally:
+            manager.prior_output = None
+        prior_output.adjust_stats(stats)
+
+    elapsed_time = time.time() - start_time
+    mark_phase("index_generation")
+    if not manager.update_index_html(stats, elapsed_time, sorted(prior_output.rewritten)):
+        manager.generate_index_html(stats, elapsed_time)
+
+    write_source_manifest(output_dir, current, config)
+    logger.info(
+        f"✅ Rewrote {len(prior_output.rewritten):,} conversations; "
+        f"{prior_output.already_on_page:,} parsed messages were already on their pages"
+    )
+    display_results(stats, time.time() - start_time, output_dir)
     return stats
 
 
@@ -2941,16 +3195,19 @@ def check_conversation_continuity(participant: str, files: List[str]) -> Dict[st
     }
 
 
-def generate_export_health_summary() -> Dict[str, Any]:
+def generate_export_health_summary(processing_dir: Optional[Path] = None) -> Dict[str, Any]:
     """
     Generate a comprehensive summary of export health based on processed files.
     
+    Args:
+        processing_dir: Export directory to assess (default: PROCESSING_DIRECTORY)
+
     Returns:
         Dictionary containing export health assessment
     """
     try:
         # Get list of HTML files from the Calls directory
-        calls_directory = PROCESSING_DIRECTORY / "Calls"
+        calls_directory = Path(processing_dir or PROCESSING_DIRECTORY) / "Calls"
         if not calls_directory.exists():
             return {"error": "Calls directory not found"}
         
@@ -3059,6 +3316,7 @@ def process_sms_mms_file(
     phone_lookup_manager: "PhoneLookupManager",
     config: Optional["ProcessingConfig"] = None,
     context: Optional["ProcessingContext"] = None,
+    run_context: Optional[RunContext] = None,
 ) -> Dict[str, Union[int, str]]:
     """Process SMS/MMS files and return statistics."""
     
@@ -3293,6 +3551,7 @@ def process_sms_mms_file(
         soup=soup,
         config=config,
         context=context,
+        run_context=run_context,
     )
 
     # NOTE: MMS messages with attachments are forwarded from write_sms_messages
@@ -3397,6 +3656,7 @@ def write_sms_messages(
     soup: Optional[BeautifulSoup] = None,
     config: Optional["ProcessingConfig"] = None,
     context: Optional["ProcessingContext"] = None,
+    run_context: Optional[RunContext] = None,
 ):
     """
     Write SMS messages to conversation files.
@@ -3406,7 +3666,10 @@ def write_sms_messages(
         messages_raw: List of message elements from HTML
         own_number: User's phone number
         src_filename_map: Mapping of src elements to filenames
+        run_context: Per-run paths and filter settings; module settings are used when omitted
     """
+    processing_dir = run_context.processing_dir if run_context else PROCESSING_DIRECTORY
+    filter_non_phone = run_context.filter_non_phone_numbers if run_context else FILTER_NON_PHONE_NUMBERS
     try:
         # Normalize own_number at the start for consistent comparisons throughout
         if own_number:
@@ -3421,7 +3684,9 @@ def write_sms_messages(
         fallback_number = extract_fallback_number(file)
 
         # Check if file should be skipped based on filename patterns
-        if should_skip_file(file):
+        if should_skip_file(
+            file, include_service_codes=run_context.include_service_codes if run_context else None
+        ):
             logger.info(f"Skipping file with invalid phone number pattern: {file}")
             return
 
@@ -3433,7 +3698,7 @@ def write_sms_messages(
         try:
             # First, check page-level participants for group conversation markers
             if page_participants_raw:
-                participants, aliases = get_participant_phone_numbers_and_aliases(page_participants_raw)
+                participants, aliases = get_participant_phone_numbers_and_aliases(page_participants_raw, phone_lookup_manager)
                 if participants and len(participants) > 1:
                     # This is likely a group conversation
                     is_group = True
@@ -3511,7 +3776,7 @@ def write_sms_messages(
         # Search for fallback numbers in similarly named files if needed
         if phone_number == 0:
             logger.debug(f"[{file}] Phone number is 0, searching fallback files...")
-            phone_number = search_fallback_numbers(file, fallback_number, own_number)
+            phone_number = search_fallback_numbers(file, fallback_number, own_number, processing_dir=processing_dir)
             logger.debug(f"[{file}] search_fallback_numbers() returned: {phone_number}")
 
         # Skip processing if we still can't get a valid phone number
@@ -3522,7 +3787,7 @@ def write_sms_messages(
                     (
                         participants,
                         _aliases,
-                    ) = get_participant_phone_numbers_and_aliases(page_participants_raw)
+                    ) = get_participant_phone_numbers_and_aliases(page_participants_raw, phone_lookup_manager)
                     # Prefer a participant that is not own_number
                     for p in participants:
                         if not own_number or p != own_number:
@@ -3537,7 +3802,7 @@ def write_sms_messages(
             if not is_valid_phone_number(phone_number):
                 logger.debug(f"[{file}] Fallback 2: Scanning current file for tel: links...")
                 try:
-                    html_path = PROCESSING_DIRECTORY / "Calls" / file
+                    html_path = processing_dir / "Calls" / file
                     if html_path.exists():
                         with open(html_path, "r", encoding="utf-8") as f:
                             soup_all = BeautifulSoup(f.read(), HTML_PARSER)
@@ -3617,7 +3882,7 @@ def write_sms_messages(
                                         continue
                     else:
                         # Fallback to scanning HTML files
-                        html_files = list(PROCESSING_DIRECTORY.rglob("*.html"))
+                        html_files = list(processing_dir.rglob("*.html"))
                         for html_file in html_files:
                             if html_file.name == file:
                                 with open(html_file, "r", encoding="utf-8") as f:
@@ -3705,20 +3970,9 @@ def write_sms_messages(
                 f"Medium file detected ({total_messages} messages) - processing in progress"
             )
 
-        # Calculate progress reporting thresholds
-        # Defensive check: ensure total_messages is valid for division
-        if not total_messages or total_messages <= 0:
-            progress_interval = 1  # Default to reporting every message
-            logger.warning(
-                f"Invalid total_messages value ({total_messages}) for progress interval calculation in {file}"
-            )
-        else:
-            progress_interval = max(
-                1, min(50, total_messages // 10)
-            )  # Every 10% or 50 messages, whichever is smaller
-        last_reported_progress = 0
         processed_count = 0
         skipped_count = 0
+        queued_messages = []
 
         # Initialize participants_context for all SMS messages
         # This ensures group conversation detection works for all message types
@@ -3755,6 +4009,7 @@ def write_sms_messages(
                         soup=None,  # No soup available in SMS context
                         conversation_id=conversation_id,  # Pass the conversation ID for consistency
                         config=config,
+                        run_context=run_context,
                     )
                     processed_count += 1  # Count as processed, not skipped
                     continue
@@ -3795,7 +4050,7 @@ def write_sms_messages(
 
                 # NON-PHONE FILTERING: Skip toll-free and non-US numbers if
                 # filtering is enabled
-                if FILTER_NON_PHONE_NUMBERS:
+                if filter_non_phone:
                     if not is_valid_phone_number(
                         str(phone_number), filter_non_phone=True
                     ):
@@ -3854,42 +4109,16 @@ def write_sms_messages(
                     # Use existing logic for individual conversations
                     sender_display = "Me" if sms_values.get("type") == 2 else alias
                 
-                conversation_manager.write_message_with_content(
-                    conversation_id=conversation_id,
-                    timestamp=sms_values["time"],
-                    sender=sender_display,
-                    message=message_text,
-                    message_type="sms",
-                    config=config,  # Pass config for date filtering
-                )
-                # Update latest timestamp for this conversation
-                conversation_manager.update_latest_timestamp(conversation_id, sms_values["time"])
+                # Queued and written in one write_batch() call after the loop
+                queued_messages.append(QueuedMessage(sms_values["time"], sender_display, message_text))
 
                 processed_count += 1
 
-                # Report progress
-                current_progress = i + 1
-                if (
-                    current_progress % progress_interval == 0
-                    or current_progress == total_messages
-                    or current_progress - last_reported_progress >= 50
-                ):
-
-                    # Defensive check: ensure total_messages is valid for
-                    # division
-                    if not total_messages or total_messages <= 0:
-                        percentage = 0.0
-                        logger.warning(
-                            f"Invalid total_messages value ({total_messages}) for progress calculation in {file}"
-                        )
-                    else:
-                        percentage = (current_progress / total_messages) * 100
-
-                    logger.info(
-                        f"SMS processing progress in {file}: {current_progress}/{total_messages} messages processed ({percentage:.1f}%) - "
-                        f"Processed: {processed_count}, Skipped: {skipped_count}"
-                    )
-                    last_reported_progress = current_progress
+                # Report progress (at most one line per interval per worker)
+                _message_progress.report(
+                    "SMS processing progress in %s: %d/%d messages processed - Processed: %d, Skipped: %d",
+                    file, i + 1, total_messages, processed_count, skipped_count,
+                )
 
             except Exception as e:
                 import traceback
@@ -3898,6 +4127,9 @@ def write_sms_messages(
                 skipped_count += 1
                 continue
 
+        if queued_messages:
+            conversation_manager.write_batch(conversation_id, queued_messages, config=config)
+
         logger.info(
             f"Completed SMS processing for {file}. Processed: {processed_count}, Skipped: {skipped_count}"
         )
@@ -4045,12 +4277,13 @@ def is_legitimate_google_voice_export(filename: str) -> bool:
     return False
 
 
-def should_skip_file(filename: str) -> bool:
+def should_skip_file(filename: str, include_service_codes: Optional[bool] = None) -> bool:
     """
     Determine if a file should be skipped based on filename patterns and filtering settings.
 
     Args:
         filename: Filename to check
+        include_service_codes: Keep numeric service-code files; defaults to INCLUDE_SERVICE_CODES
 
     Returns:
         bool: True if file should be skipped, False otherwise
@@ -4157,7 +4390,9 @@ def should_skip_file(filename: str) -> bool:
 
     # SERVICE CODE FILTERING: Skip numeric service codes unless explicitly
     # enabled
-    if not INCLUDE_SERVICE_CODES:
+    if include_service_codes is None:
+        include_service_codes = INCLUDE_SERVICE_CODES
+    if not include_service_codes:
         # Pattern: "262966 - Text - ..." or "12345 - Text - ..."
         numeric_code_match = re.match(r"^(\d{4,7})\s*-\s*", filename)
         if numeric_code_match:
@@ -4423,7 +4658,10 @@ def search_fallback_numbers_cached(file: str, fallback_number: str) -> str:
 
 
 def search_fallback_numbers(
-    file: str, fallback_number: Union[str, int], own_number: Optional[str] = None
+    file: str,
+    fallback_number: Union[str, int],
+    own_number: Optional[str] = None,
+    processing_dir: Optional[Path] = None,
 ) -> Union[str, int]:
     """
     Search for fallback numbers in similarly named files.
@@ -4432,6 +4670,7 @@ def search_fallback_numbers(
         file: Filename to search for fallback numbers
         fallback_number: Fallback number to search for
         own_number: User's own phone number to skip when searching
+        processing_dir: Export directory to search; defaults to PROCESSING_DIRECTORY
 
     Returns:
         Union[str, int]: Found fallback number or 0
@@ -4456,7 +4695,9 @@ def search_fallback_numbers(
         
         # Search for ALL files with similar names in the Calls directory
         # This finds all files for the same person (e.g., all "Ed Harbur" files)
-        search_pattern = str(PROCESSING_DIRECTORY / "Calls" / f"{name_part} - *.html")
+        if processing_dir is None:
+            processing_dir = PROCESSING_DIRECTORY
+        search_pattern = str(Path(processing_dir) / "Calls" / f"{name_part} - *.html")
         similar_files = glob.glob(search_pattern)
         
         logger.debug(f"[{file}] Fallback search pattern: {search_pattern}")
@@ -4567,6 +4808,7 @@ def write_mms_messages(
     conversation_id: Optional[str] = None,
     config: Optional["ProcessingConfig"] = None,
     context: Optional["ProcessingContext"] = None,
+    run_context: Optional[RunContext] = None,
 ):
     """
     Write MMS messages to the backup file.
@@ -4578,7 +4820,9 @@ def write_mms_messages(
         own_number: User's phone number
         src_filename_map: Mapping of src elements to filenames
         conversation_id: Optional conversation ID to use (for group conversations)
+        run_context: Per-run filter settings; module settings are used when omitted
     """
+    filter_non_phone = run_context.filter_non_phone_numbers if run_context else FILTER_NON_PHONE_NUMBERS
     try:
         # Get total message count for progress tracking
         total_messages = len(messages_raw)
@@ -4588,20 +4832,9 @@ def write_mms_messages(
 
         logger.info(f"Processing {total_messages} MMS messages from {file}")
 
-        # Calculate progress reporting thresholds
-        # Defensive check: ensure total_messages is valid for division
-        if not total_messages or total_messages <= 0:
-            progress_interval = 1  # Default to reporting every message
-            logger.warning(
-                f"Invalid total_messages value ({total_messages}) for progress interval calculation in {file}"
-            )
-        else:
-            progress_interval = max(
-                1, min(50, total_messages // 10)
-            )  # Every 10% or 50 messages, whichever is smaller
-        last_reported_progress = 0
         processed_count = 0
         skipped_count = 0
+        queued_messages = {}  # conversation_id -> [QueuedMessage]
 
         # EARLY GROUP CONVERSATION DETECTION - Do this before processing individual messages
         is_group = False
@@ -4610,7 +4843,7 @@ def write_mms_messages(
         try:
             # First, check page-level participants for group conversation markers
             if participants_raw:
-                participants, aliases = get_participant_phone_numbers_and_aliases(participants_raw)
+                participants, aliases = get_participant_phone_numbers_and_aliases(participants_raw, phone_lookup_manager)
                 if participants and len(participants) > 1:
                     # This is likely a group conversation
                     is_group = True
@@ -4670,7 +4903,7 @@ def write_mms_messages(
         (
             participants,
             participant_aliases,
-        ) = get_participant_phone_numbers_and_aliases(participants_raw)
+        ) = get_participant_phone_numbers_and_aliases(participants_raw, phone_lookup_manager)
         if not participants:
             # Try to extract participants from the messages themselves as
             # fallback
@@ -5010,7 +5243,7 @@ def write_mms_messages(
 
                 # NON-PHONE FILTERING: Skip toll-free and non-US numbers if
                 # filtering is enabled
-                if FILTER_NON_PHONE_NUMBERS:
+                if filter_non_phone:
                     should_skip = False
                     for phone in participants:
                         if not is_valid_phone_number(str(phone), filter_non_phone=True):
@@ -5113,43 +5346,19 @@ def write_mms_messages(
                             )
                     except Exception:
                         pass
-                    conversation_manager.write_message_with_content(
-                        conversation_id=conversation_id,
-                        timestamp=get_time_unix(message),
-                        sender=sender_display,
-                        message=message_text,
-                        attachments=attachments,
-                        message_type="sms",  # MMS messages are still SMS type
-                        config=config,  # Pass config for date filtering
+                    # Queued per conversation and written with write_batch() after the loop
+                    # (MMS messages are still SMS type)
+                    queued_messages.setdefault(conversation_id, []).append(
+                        QueuedMessage(get_time_unix(message), sender_display, message_text, attachments)
                     )
-                    # Update latest timestamp for this conversation
-                    conversation_manager.update_latest_timestamp(conversation_id, get_time_unix(message))
 
                 processed_count += 1
 
-                # Report progress
-                current_progress = i + 1
-                if (
-                    current_progress % progress_interval == 0
-                    or current_progress == total_messages
-                    or current_progress - last_reported_progress >= 50
-                ):
-
-                    # Defensive check: ensure total_messages is valid for
-                    # division
-                    if not total_messages or total_messages <= 0:
-                        percentage = 0.0
-                        logger.warning(
-                            f"Invalid total_messages value ({total_messages}) for progress calculation in {file}"
-                        )
-                    else:
-                        percentage = (current_progress / total_messages) * 100
-
-                    logger.info(
-                        f"MMS processing progress in {file}: {current_progress}/{total_messages} messages processed ({percentage:.1f}%) - "
-                        f"Processed: {processed_count}, Skipped: {skipped_count}"
-                    )
-                    last_reported_progress = current_progress
+                # Report progress (at most one line per interval per worker)
+                _message_progress.report(
+                    "MMS processing progress in %s: %d/%d messages processed - Processed: %d, Skipped: %d",
+                    file, i + 1, total_messages, processed_count, skipped_count,
+                )
 
             except Exception as e:
                 # Provide more detailed error information for debugging
@@ -5164,6 +5373,9 @@ def write_mms_messages(
                 skipped_count += 1
                 continue
 
+        for queued_conversation_id, queued in queued_messages.items():
+            conversation_manager.write_batch(queued_conversation_id, queued, config=config)
+
         logger.info(
             f"Completed MMS processing for {file}. Processed: {processed_count}, Skipped: {skipped_count}"
         )
@@ -6034,6 +6246,7 @@ def get_participant_phone_numbers_cached(
 
 def get_participant_phone_numbers_and_aliases(
     participants_raw: List,
+    phone_lookup_manager: Optional["PhoneLookupManager"] = None,
 ) -> Tuple[List[str], List[str]]:
     """
     Extract phone numbers and aliases from participant elements.
@@ -6041,6 +6254,7 @@ def get_participant_phone_numbers_and_aliases(
 
     Args:
         participants_raw: List of participant elements from HTML
+        phone_lookup_manager: Manager whose aliases take precedence; defaults to PHONE_LOOKUP_MANAGER
 
     Returns:
         tuple: (List of participant phone numbers, List of participant aliases)
@@ -6050,6 +6264,8 @@ def get_participant_phone_numbers_and_aliases(
     """
     participants = []
     aliases = []
+    if phone_lookup_manager is None:
+        phone_lookup_manager = PHONE_LOOKUP_MANAGER
 
     try:
         for participant_raw in participants_raw:
@@ -6077,7 +6293,7 @@ def get_participant_phone_numbers_and_aliases(
                                     (
                                         phone,
                                         html_alias,
-                                    ) = extract_phone_and_alias_from_cite(cite_element, PHONE_LOOKUP_MANAGER)
+                                    ) = extract_phone_and_alias_from_cite(cite_element, phone_lookup_manager)
                                     if phone:
                                         participants.append(phone)
                                         aliases.append(html_alias)
@@ -6092,7 +6308,7 @@ def get_participant_phone_numbers_and_aliases(
                                     (
                                         phone,
                                         html_alias,
-                                    ) = extract_phone_and_alias_from_cite(cite_element, PHONE_LOOKUP_MANAGER)
+                                    ) = extract_phone_and_alias_from_cite(cite_element, phone_lookup_manager)
                                     if phone and phone not in seen_phones:
                                         participants.append(phone)
                                         aliases.append(html_alias)
@@ -6119,7 +6335,7 @@ def get_participant_phone_numbers_and_aliases(
                                 (
                                     phone,
                                     html_alias,
-                                ) = extract_phone_and_alias_from_cite(cite_element, PHONE_LOOKUP_MANAGER)
+                                ) = extract_phone_and_alias_from_cite(cite_element, phone_lookup_manager)
                                 if phone:
                                     participants.append(phone)
                                     aliases.append(html_alias)
@@ -6134,7 +6350,7 @@ def get_participant_phone_numbers_and_aliases(
                                 (
                                     phone,
                                     html_alias,
-                                ) = extract_phone_and_alias_from_cite(cite_element, PHONE_LOOKUP_MANAGER)
+                                ) = extract_phone_and_alias_from_cite(cite_element, phone_lookup_manager)
                                 if phone and phone not in seen_phones:
                                     participants.append(phone)
                                     aliases.append(html_alias)
@@ -6307,76 +6523,27 @@ def get_time_unix(message: BeautifulSoup, filename: str = "unknown") -> int:
     Returns:
         int: Unix timestamp in milliseconds
     """
+    timestamp_decoder = get_timestamp_decoder()
     try:
         # PERFORMANCE OPTIMIZED STRATEGY ORDER: Most likely to succeed first
 
         # Strategy 1: Extract timestamp from filename patterns (FAST, RELIABLE)
-        # This catches various filename patterns with timestamps
+        # Fixed-layout decode memoized per filename; dateutil only as fallback
         if filename:
-            try:
-                # Pattern 1: "Name - Text - 2025-08-13T12_08_52Z.html"
-                if " - Text -" in filename:
-                    timestamp_part = filename.split(" - Text -")[1]
-                # Pattern 2: "Phone - Date.html" like "+13479774102 -
-                # 2014-10-25T22_10_03Z.html"
-                elif " - " in filename and "T" in filename and "Z" in filename:
-                    timestamp_part = filename.split(" - ", 1)[1]
-                # Pattern 3: "Name - Voicemail - Date.html"
-                elif " - Voicemail -" in filename:
-                    timestamp_part = filename.split(" - Voicemail -")[1]
-                # Pattern 4: "Name - Received - Date.html" or "Name - Placed -
-                # Date.html"
-                elif any(
-                    x in filename
-                    for x in [" - Received -", " - Placed -", " - Missed -"]
-                ):
-                    for pattern in [
-                        " - Received -",
-                        " - Placed -",
-                        " - Missed -",
-                    ]:
-                        if pattern in filename:
-                            timestamp_part = filename.split(pattern)[1]
-                            break
-                else:
-                    timestamp_part = None
-
-                if timestamp_part:
-                    if timestamp_part.endswith(".html"):
-                        timestamp_part = timestamp_part[:-5]  # Remove .html extension
-
-                    # Convert underscore to colon for proper ISO parsing
-                    timestamp_part = timestamp_part.replace("_", ":")
-
-                    # Try to parse the timestamp from filename
-                    time_obj = dateutil.parser.parse(timestamp_part, fuzzy=True)
-                    timestamp_ms = int(
-                        time.mktime(time_obj.timetuple()) * 1000
-                        + time_obj.microsecond // 1000
-                    )
-
-                    logger.debug(
-                        f"Extracted timestamp from filename '{filename}': {timestamp_part} -> {timestamp_ms}"
-                    )
-                    return timestamp_ms
-
-            except Exception as e:
+            timestamp_ms = timestamp_decoder.decode_filename(filename)
+            if timestamp_ms is not None:
                 logger.debug(
-                    f"Failed to parse timestamp from filename '{filename}': {e}"
+                    f"Extracted timestamp from filename '{filename}' -> {timestamp_ms}"
                 )
-                # Continue to next strategy
+                return timestamp_ms
 
         # Strategy 2: Look for elements with class "dt" and title attribute
         # (MOST SPECIFIC)
         time_raw = message.find(class_="dt")
         if time_raw and "title" in time_raw.attrs:
             ymdhms = time_raw["title"]
-            # Use cached timestamp parsing for better performance
-            time_obj = parse_timestamp_cached(ymdhms)
             # Convert to Unix milliseconds (including microseconds)
-            return int(
-                time.mktime(time_obj.timetuple()) * 1000 + time_obj.microsecond // 1000
-            )
+            return timestamp_decoder.decode_iso(ymdhms)
 
         # Strategy 3: Look for time elements with datetime attribute (HTML5
         # STANDARD)
@@ -6384,11 +6551,7 @@ def get_time_unix(message: BeautifulSoup, filename: str = "unknown") -> int:
         if time_raw:
             ymdhms = time_raw["datetime"]
             try:
-                time_obj = parse_timestamp_cached(ymdhms)
-                return int(
-                    time.mktime(time_obj.timetuple()) * 1000
-                    + time_obj.microsecond // 1000
-                )
+                return timestamp_decoder.decode_iso(ymdhms)
             except Exception as e:
                 logger.debug(f"Failed to parse timestamp from time datetime: {e}")
 
@@ -6398,11 +6561,7 @@ def get_time_unix(message: BeautifulSoup, filename: str = "unknown") -> int:
         if time_raw:
             ymdhms = time_raw["title"]
             try:
-                time_obj = parse_timestamp_cached(ymdhms)
-                return int(
-                    time.mktime(time_obj.timetuple()) * 1000
-                    + time_obj.microsecond // 1000
-                )
+                return timestamp_decoder.decode_iso(ymdhms)
             except Exception as e:
                 logger.debug(f"Failed to parse timestamp from abbr title: {e}")
 
@@ -6411,11 +6570,7 @@ def get_time_unix(message: BeautifulSoup, filename: str = "unknown") -> int:
         if time_raw:
             ymdhms = time_raw["datetime"]
             try:
-                time_obj = parse_timestamp_cached(ymdhms)
-                return int(
-                    time.mktime(time_obj.timetuple()) * 1000
-                    + time_obj.microsecond // 1000
-                )
+                return timestamp_decoder.decode_iso(ymdhms)
             except Exception as e:
                 logger.debug(f"Failed to parse timestamp from datetime attribute: {e}")
 
@@ -6492,11 +6647,7 @@ def get_time_unix(message: BeautifulSoup, filename: str = "unknown") -> int:
                 if match:
                     ymdhms = match.group(1)
                     try:
-                        time_obj = parse_timestamp_cached(ymdhms)
-                        return int(
-                            time.mktime(time_obj.timetuple()) * 1000
-                            + time_obj.microsecond // 1000
-                        )
+                        return timestamp_decoder.decode_iso(ymdhms)
                     except Exception as e:
                         logger.debug(
                             f"Failed to parse timestamp from text pattern: {e}"
@@ -7125,6 +7276,9 @@ def process_html_files_batch(
     config: Optional["ProcessingConfig"] = None,
     context: Optional["ProcessingContext"] = None,
     own_number: Optional[str] = None,
+    run_context: Optional[RunContext] = None,
+    conversation_manager: Optional["ConversationManager"] = None,
+    phone_lookup_manager: Optional["PhoneLookupManager"] = None,
 ) -> Dict[str, int]:
     """
     Process HTML files in batches for better memory management.
@@ -7136,6 +7290,9 @@ def process_html_files_batch(
         config: Processing configuration object
         context: Processing context object
         own_number: User's own phone number (extracted from Phones.vcf) to skip when identifying participants
+        run_context: Per-run settings
+        conversation_manager: Manager for this run; defaults to the context's, then the global one
+        phone_lookup_manager: Manager for this run; defaults to the context's, then the global one
         
     Returns:
         Dictionary with processing statistics
@@ -7151,9 +7308,20 @@ def process_html_files_batch(
     total_files = len(html_files)
     logger.info(f"Processing {total_files} files in batches of {batch_size}")
 
+    # PERFORMANCE OPTIMIZATION: Resolve managers once instead of per file
+    if conversation_manager is None:
+        conversation_manager = context.conversation_manager if context else CONVERSATION_MANAGER
+    if phone_lookup_manager is None:
+        phone_lookup_manager = context.phone_lookup_manager if context else PHONE_LOOKUP_MANAGER
+
     # Use parallel processing for large datasets
     if total_files > MEMORY_EFFICIENT_THRESHOLD:
-        return process_html_files_parallel(html_files, src_filename_map, batch_size, config, context, own_number)
+        return process_html_files_parallel(
+            html_files, src_filename_map, batch_size, config, context, own_number,
+            run_context=run_context,
+            conversation_manager=conversation_manager,
+            phone_lookup_manager=phone_lookup_manager,
+        )
 
     # Sequential batch processing for smaller datasets - use generator for
     # memory efficiency
@@ -7181,10 +7349,6 @@ def process_html_files_batch(
         if batch_number % 10 == 0 and 'validate_runtime_paths' in globals():
             validate_runtime_paths()
 
-        # PERFORMANCE OPTIMIZATION: Get managers once per batch instead of per file
-        conversation_manager = CONVERSATION_MANAGER
-        phone_lookup_manager = PHONE_LOOKUP_MANAGER
-        
         for html_file in batch_files:
             try:
                 # No locks needed since we're single-threaded now
@@ -7196,6 +7360,7 @@ def process_html_files_batch(
                     phone_lookup_manager,
                     config,
                     context=context,
+                    run_context=run_context,
                 )
 
                 # Update statistics
@@ -7242,6 +7407,9 @@ def process_html_files_parallel(
     config: Optional["ProcessingConfig"] = None,
     context: Optional["ProcessingContext"] = None,
     own_number: Optional[str] = None,
+    run_context: Optional[RunContext] = None,
+    conversation_manager: Optional["ConversationManager"] = None,
+    phone_lookup_manager: Optional["PhoneLookupManager"] = None,
 ) -> Dict[str, int]:
     """
     Process HTML files using parallel processing for large datasets.
@@ -7253,6 +7421,9 @@ def process_html_files_parallel(
         config: Processing configuration object
         context: Processing context object
         own_number: User's own phone number (extracted from Phones.vcf) to skip when identifying participants
+        run_context: Per-run settings
+        conversation_manager: Manager for this run; defaults to the context's
+        phone_lookup_manager: Manager for this run; defaults to the context's
         
     Returns:
         Dictionary with processing statistics
@@ -7262,19 +7433,9 @@ def process_html_files_parallel(
         f"Using parallel processing for {total_files} files with {MAX_WORKERS} workers"
     )
     
-    # Memory monitoring for parallel processing start
+    # Tag background resource samples with the current stage
     if ENABLE_PERFORMANCE_MONITORING:
-        try:
-            from utils.memory_monitor import monitor_memory_usage
-            monitor_memory_usage("parallel_processing_start", {
-                "total_files": total_files,
-                "max_workers": MAX_WORKERS,
-                "chunk_size": CHUNK_SIZE_OPTIMAL,
-                "batch_size": batch_size
-            })
-        except Exception as e:
-            logger.warning(f"Memory monitoring for parallel processing start failed: {e}")
-            logger.info("Performance monitoring disabled for parallel processing")
+        mark_phase("html_processing_parallel")
 
     # Split files into chunks for parallel processing - use generator for
     # memory efficiency
@@ -7296,7 +7457,10 @@ def process_html_files_parallel(
     with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
         # Submit chunk processing tasks
         future_to_chunk = {
-            executor.submit(process_chunk_parallel, chunk, src_filename_map, config, context, own_number): chunk
+            executor.submit(
+                process_chunk_parallel, chunk, src_filename_map, config, context, own_number,
+                run_context, conversation_manager, phone_lookup_manager,
+            ): chunk
             for chunk in chunks
         }
 
@@ -7319,23 +7483,12 @@ def process_html_files_parallel(
                 continue
     
     # After parallel processing, get total stats from the conversation manager
-    if CONVERSATION_MANAGER:
-        total_stats = CONVERSATION_MANAGER.get_total_stats()
+    if conversation_manager is None:
+        conversation_manager = context.conversation_manager if context else CONVERSATION_MANAGER
+    if conversation_manager:
+        total_stats = conversation_manager.get_total_stats()
         stats.update(total_stats)
 
-    # Memory monitoring for parallel processing completion
-    if ENABLE_PERFORMANCE_MONITORING:
-        try:
-            from utils.memory_monitor import monitor_memory_usage
-            monitor_memory_usage("parallel_processing_complete", {
-                "total_files": total_files,
-                "final_stats": stats,
-                "chunks_processed": len(chunks)
-            })
-        except Exception as e:
-            logger.warning(f"Memory monitoring for parallel processing completion failed: {e}")
-            logger.info("Performance monitoring summary incomplete for parallel processing")
-
     return stats
 
 
@@ -7344,7 +7497,10 @@ def process_chunk_parallel(
     src_filename_map: Dict[str, str], 
     config: Optional["ProcessingConfig"] = None, 
     context: Optional["ProcessingContext"] = None,
-    own_number: Optional[str] = None
+    own_number: Optional[str] = None,
+    run_context: Optional[RunContext] = None,
+    conversation_manager: Optional["ConversationManager"] = None,
+    phone_lookup_manager: Optional["PhoneLookupManager"] = None,
 ) -> Dict[str, int]:
     """
     Process a chunk of HTML files for parallel processing.
@@ -7355,6 +7511,9 @@ def process_chunk_parallel(
         config: Processing configuration object
         context: Processing context object
         own_number: User's own phone number (extracted from Phones.vcf) to skip when identifying participants
+        run_context: Per-run settings
+        conversation_manager: Manager for this run; defaults to the context's
+        phone_lookup_manager: Manager for this run; defaults to the context's
         
     Returns:
         Dictionary with processing statistics
@@ -7376,9 +7535,11 @@ def process_chunk_parallel(
         "num_voicemails": 0,
     }
 
-    # Use the global conversation manager from the context
-    conversation_manager = context.conversation_manager if context else None
-    phone_lookup_manager = context.phone_lookup_manager if context else None
+    # Use the run's managers, falling back to the ones in the context
+    if conversation_manager is None:
+        conversation_manager = context.conversation_manager if context else None
+    if phone_lookup_manager is None:
+        phone_lookup_manager = context.phone_lookup_manager if context else None
     
     if not conversation_manager:
         # Use print instead of logger for critical errors in parallel chunks
@@ -7395,6 +7556,7 @@ def process_chunk_parallel(
                 phone_lookup_manager,
                 config,
                 context=context,
+                run_context=run_context,
             )
 
             # Aggregate statistics for the chunk
@@ -7541,9 +7703,25 @@ def process_voicemail_file(
 
 
 def extract_call_info(
-    filename: str, soup: BeautifulSoup, config: Optional["ProcessingConfig"] = None
+    filename: str,
+    soup: BeautifulSoup,
+    config: Optional["ProcessingConfig"] = None,
+    run_context: Optional[RunContext] = None,
+    phone_lookup_manager: Optional["PhoneLookupManager"] = None,
 ) -> Optional[Dict[str, Union[str, int]]]:
-    """Extract call information from HTML content."""
+    """
+    Extract call information from HTML content.
+
+    Returns None for calls removed by the date, phone or non-phone filters.
+    The date and phone filters use ``config``, or ``run_context.config`` when
+    no config is passed: since process_call_file passes its run context,
+    phone filtering (filter_numbers_without_aliases, service codes,
+    exclusions) applies to calls as it does to messages.
+    """
+    phone_manager = phone_lookup_manager or PHONE_LOOKUP_MANAGER
+    filter_non_phone = run_context.filter_non_phone_numbers if run_context else FILTER_NON_PHONE_NUMBERS
+    if config is None and run_context is not None:
+        config = run_context.config
     try:
         # Determine call type from filename
         filename_lower = filename.lower()
@@ -7661,14 +7839,14 @@ def extract_call_info(
             # PHONE FILTERING: Skip numbers without aliases if filtering is
             # enabled
             # Convert to str to handle integer phone numbers from fallback extraction
-            if config and PHONE_LOOKUP_MANAGER and should_skip_message_by_phone_param(str(phone_number), PHONE_LOOKUP_MANAGER, config):
+            if config and phone_manager and should_skip_message_by_phone_param(str(phone_number), phone_manager, config):
                 logger.debug(
                     f"Skipping call from {phone_number} - phone filtering criteria met"
                 )
                 return None
 
-                if PHONE_LOOKUP_MANAGER.is_excluded(str(phone_number)):
-                    exclusion_reason = PHONE_LOOKUP_MANAGER.get_exclusion_reason(
+                if phone_manager.is_excluded(str(phone_number)):
+                    exclusion_reason = phone_manager.get_exclusion_reason(
                         str(phone_number)
                     )
                     logger.debug(
@@ -7678,7 +7856,7 @@ def extract_call_info(
 
             # NON-PHONE FILTERING: Skip toll-free and non-US numbers if
             # filtering is enabled
-            if FILTER_NON_PHONE_NUMBERS:
+            if filter_non_phone:
                 if not is_valid_phone_number(str(phone_number), filter_non_phone=True):
                     logger.debug(
                         f"Skipping call from {phone_number} - toll-free or non-US number filtered out"
@@ -7718,7 +7896,7 @@ def extract_call_info(
                 f"Creating placeholder call entry for {filename} due to extraction failure"
             )
             # Generate a unique placeholder phone number
-            placeholder_phone = generate_unknown_number_hash(f"call_{filename}")
+            placeholder_phone = generate_unknown_number_hash(f"call_{Path(filename).name}")
             return {
                 "type": call_type,
                 "phone_number": placeholder_phone,
@@ -7735,9 +7913,25 @@ def extract_call_info(
 
 
 def extract_voicemail_info(
-    filename: str, soup: BeautifulSoup, config: Optional["ProcessingConfig"] = None
+    filename: str,
+    soup: BeautifulSoup,
+    config: Optional["ProcessingConfig"] = None,
+    run_context: Optional[RunContext] = None,
+    phone_lookup_manager: Optional["PhoneLookupManager"] = None,
 ) -> Optional[Dict[str, Union[str, int]]]:
-    """Extract voicemail information from HTML content."""
+    """
+    Extract voicemail information from HTML content.
+
+    Returns None for voicemails removed by the date, phone or non-phone filters.
+    The date and phone filters use ``config``, or ``run_context.config`` when
+    no config is passed: since process_voicemail_file passes its run context,
+    phone filtering (filter_numbers_without_aliases, service codes,
+    exclusions) applies to voicemails as it does to messages.
+    """
+    phone_manager = phone_lookup_manager or PHONE_LOOKUP_MANAGER
+    filter_non_phone = run_context.filter_non_phone_numbers if run_context else FILTER_NON_PHONE_NUMBERS
+    if config is None and run_context is not None:
+        config = run_context.config
     try:
         # Extract phone number/participant
         phone_number = extract_phone_from_call(
@@ -7818,14 +8012,14 @@ def extract_voicemail_info(
             # PHONE FILTERING: Skip numbers without aliases if filtering is
             # enabled
             # Convert to str to handle integer phone numbers from fallback extraction
-            if config and PHONE_LOOKUP_MANAGER and should_skip_message_by_phone_param(str(phone_number), PHONE_LOOKUP_MANAGER, config):
+            if config and phone_manager and should_skip_message_by_phone_param(str(phone_number), phone_manager, config):
                 logger.debug(
                     f"Skipping voicemail from {phone_number} - phone filtering criteria met"
                 )
                 return None
 
-                if PHONE_LOOKUP_MANAGER.is_excluded(str(phone_number)):
-                    exclusion_reason = PHONE_LOOKUP_MANAGER.get_exclusion_reason(
+                if phone_manager.is_excluded(str(phone_number)):
+                    exclusion_reason = phone_manager.get_exclusion_reason(
                         str(phone_number)
                     )
                     logger.debug(
@@ -7835,7 +8029,7 @@ def extract_voicemail_info(
 
             # NON-PHONE FILTERING: Skip toll-free and non-US numbers if
             # filtering is enabled
-            if FILTER_NON_PHONE_NUMBERS:
+            if filter_non_phone:
                 if not is_valid_phone_number(str(phone_number), filter_non_phone=True):
                     logger.debug(
                         f"Skipping voicemail from {phone_number} - toll-free or non-US number filtered out"
@@ -7909,7 +8103,7 @@ def extract_voicemail_info(
             logger.error(f"  - HTML content preview: {str(soup)[:300]}...")
             
             # Generate a unique placeholder phone number
-            placeholder_phone = generate_unknown_number_hash(f"voicemail_{filename}")
+            placeholder_phone = generate_unknown_number_hash(f"voicemail_{Path(filename).name}")
             return {
                 "phone_number": placeholder_phone,
                 "timestamp": timestamp or int(time.time() * 1000),
@@ -8117,6 +8311,9 @@ def extract_phone_from_call(soup: BeautifulSoup, filename: str = None) -> Option
 
         # ENHANCED: Try to extract phone number from filename if provided
         if filename:
+            # Callers may pass a full path; only the name is the same in every
+            # copy of an export, so the hash-based IDs below use it alone
+            filename = Path(filename).name
             logger.debug(f"Attempting filename-based phone number extraction for: {filename}")
             
             # Look for phone number patterns in filename using comprehensive patterns
@@ -8358,8 +8555,13 @@ def write_call_entry(
     conversation_manager: Optional["ConversationManager"] = None,
     phone_lookup_manager: Optional["PhoneLookupManager"] = None,
     config: Optional["ProcessingConfig"] = None,
+    run_context: Optional[RunContext] = None,
 ):
     """Write a call entry to the conversation."""
+    if run_context is not None:
+        calls_dir = run_context.calls_dir
+    else:
+        calls_dir = PROCESSING_DIRECTORY / "Calls" if PROCESSING_DIRECTORY else None
     try:
         # DEFENSIVE PROGRAMMING: Validate managers before use with comprehensive fallbacks
         effective_phone_manager = (
@@ -8411,7 +8613,7 @@ def write_call_entry(
             call_details = extract_call_details_from_soup(soup)
         else:
             # Fallback to file-based extraction (should be rare)
-            call_details = extract_call_details(filename)
+            call_details = extract_call_details(filename, calls_dir=calls_dir)
 
         # Use the rich call details from the HTML file
         message_text = call_details["message_text"]
@@ -8427,7 +8629,7 @@ def write_call_entry(
                 try:
                     file_path = Path(filename)
                     if not file_path.is_absolute():
-                        file_path = PROCESSING_DIRECTORY / "Calls" / file_path.name
+                        file_path = calls_dir / file_path.name
                     with open(file_path, "r", encoding="utf-8") as f:
                         soup2 = BeautifulSoup(f.read(), "html.parser")
                     call_ts = extract_timestamp_from_call(soup2)
@@ -8439,7 +8641,7 @@ def write_call_entry(
                 try:
                     file_path = Path(filename)
                     if not file_path.is_absolute():
-                        file_path = PROCESSING_DIRECTORY / "Calls" / file_path.name
+                        file_path = calls_dir / file_path.name
                     call_ts = int(file_path.stat().st_mtime * 1000)
                 except Exception:
                     # If all else fails, use current time
@@ -8456,20 +8658,13 @@ def write_call_entry(
         # For HTML output, use the rich call details
         message_text = call_details["message_text"]
         attachments = []
-        effective_conversation_manager.write_message_with_content(
-            conversation_id=conversation_id,
-            timestamp=call_ts,
-            sender=alias,
-            message=message_text,
-            message_type="call",
+        # Message, latest timestamp and conversation statistics in one locked call
+        effective_conversation_manager.write_batch(
+            conversation_id,
+            [QueuedMessage(call_ts, alias, message_text, message_type="call")],
             config=config or (context.config if context else None),  # Pass config for date filtering and content tracking
+            stats={"num_calls": 1},
         )
-        
-        # Update latest timestamp for this conversation
-        effective_conversation_manager.update_latest_timestamp(conversation_id, call_ts)
-
-        # Update conversation statistics
-        effective_conversation_manager.update_stats(conversation_id, {"num_calls": 1})
 
         logger.info(f"Added call entry: {message_text}")
 
@@ -8564,7 +8759,7 @@ def extract_call_details_from_soup(soup: BeautifulSoup) -> Dict[str, str]:
         }
 
 
-def extract_call_details(filename: str) -> Dict[str, str]:
+def extract_call_details(filename: str, calls_dir: Optional[Path] = None) -> Dict[str, str]:
     """Extract detailed call information from the HTML file."""
     try:
         logger.debug(f"Extracting call details from: {filename}")
@@ -8572,7 +8767,7 @@ def extract_call_details(filename: str) -> Dict[str, str]:
         # needed)
         file_path = Path(filename)
         if not file_path.is_absolute():
-            file_path = PROCESSING_DIRECTORY / "Calls" / file_path.name
+            file_path = (calls_dir or PROCESSING_DIRECTORY / "Calls") / file_path.name
         with open(file_path, "r", encoding="utf-8") as f:
             content = f.read()
 
@@ -8694,8 +8889,13 @@ def write_voicemail_entry(
     conversation_manager: Optional["ConversationManager"] = None,
     phone_lookup_manager: Optional["PhoneLookupManager"] = None,
     config: Optional["ProcessingConfig"] = None,
+    run_context: Optional[RunContext] = None,
 ):
     """Write a voicemail entry to the conversation."""
+    if run_context is not None:
+        calls_dir = run_context.calls_dir
+    else:
+        calls_dir = PROCESSING_DIRECTORY / "Calls" if PROCESSING_DIRECTORY else None
     try:
         # DEFENSIVE PROGRAMMING: Validate managers before use with comprehensive fallbacks
         effective_phone_manager = (
@@ -8761,7 +8961,7 @@ def write_voicemail_entry(
                 try:
                     file_path = Path(filename)
                     if not file_path.is_absolute():
-                        file_path = PROCESSING_DIRECTORY / "Calls" / file_path.name
+                        file_path = calls_dir / file_path.name
                     with open(file_path, "r", encoding="utf-8") as f:
                         soup2 = BeautifulSoup(f.read(), "html.parser")
                     vm_ts = extract_timestamp_from_call(soup2)
@@ -8786,20 +8986,13 @@ def write_voicemail_entry(
         if not message_text or message_text.strip() == "":
             message_text = "[Voicemail entry]"
         attachments = []
-        effective_conversation_manager.write_message_with_content(
-            conversation_id=conversation_id,
-            timestamp=vm_ts,
-            sender=alias,
-            message=message_text,
-            message_type="voicemail",
+        # Message, latest timestamp and conversation statistics in one locked call
+        effective_conversation_manager.write_batch(
+            conversation_id,
+            [QueuedMessage(vm_ts, alias, message_text, message_type="voicemail")],
             config=config,  # Pass config for date filtering
+            stats={"num_voicemails": 1},
         )
-        
-        # Update latest timestamp for this conversation
-        effective_conversation_manager.update_latest_timestamp(conversation_id, vm_ts)
-
-        # Update conversation statistics
-        effective_conversation_manager.update_stats(conversation_id, {"num_voicemails": 1})
 
         logger.info(f"Added voicemail entry: {message_text[:50]}...")
 
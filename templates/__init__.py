@@ -1,17 +1,23 @@
 """Template package for Google Voice SMS Takeout HTML Converter."""
 
 from .loader import (
+    CompiledTemplate,
     TemplateLoader,
     get_template_loader,
     format_index_template,
     format_conversation_template,
+    render_index_template_to,
+    render_conversation_template_to,
 )
 
 # XML template imports removed - only HTML output supported
 
 __all__ = [
+    "CompiledTemplate",
     "TemplateLoader",
     "get_template_loader",
     "format_index_template",
     "format_conversation_template",
+    "render_index_template_to",
+    "render_conversation_template_to",
 ]
@@ -1,7 +1,124 @@
 """Template loader utility for Google Voice SMS Takeout XML Converter."""
 
+import io
 from pathlib import Path
-from typing import Dict, Any
+from string import Formatter
+from typing import Dict, Iterator, List, Optional, TextIO, Tuple
+
+# Chunks of an iterable slot joined per write() in CompiledTemplate.render_to
+STREAM_BATCH_CHUNKS = 512
+
+
+class CompiledTemplate:
+    """A str.format template split once into literal segments and named slots.
+
+    render_to() writes the literals and slot values straight to a file
+    object, so large slots (message or conversation rows) can be passed as
+    iterators of strings (e.g. generators) and streamed without building
+    the full page.
+    """
+
+    def __init__(self, text: str):
+        """Compile template text.
+
+        Args:
+            text: Template in str.format syntax ("{{"/"}}" are literal braces)
+
+        Raises:
+            ValueError: If a field is not a plain name (e.g. "{0}" or "{a.b}")
+        """
+        self.segments: List[Tuple[str, Optional[str], str, Optional[str]]] = []
+        for literal, name, format_spec, conversion in Formatter().parse(text):
+            if name is not None and not name.isidentifier():
+                raise ValueError(f"Unsupported template field '{{{name}}}'")
+            self.segments.append((literal, name, format_spec or "", conversion))
+        self.slots = frozenset(name for _, name, _, _ in self.segments if name is not None)
+
+    def render_to(self, fileobj: TextIO, **slots) -> None:
+        """Write the template to a text file object.
+
+        Args:
+            fileobj: Object with a write(str) method
+            **slots: Slot values. Iterators (e.g. generators) are written in
+                bounded batches of their items, with no separator added;
+                everything else, lists and tuples included, is formatted
+                as str.format would.
+
+        Raises:
+            KeyError: If a slot used by the template is missing
+        """
+        write = fileobj.write
+        for literal, name, format_spec, conversion in self.segments:
+            if literal:
+                write(literal)
+            if name is None:
+                continue
+            value = slots[name]
+            if isinstance(value, str) and not format_spec and conversion is None:
+                write(value)
+            elif isinstance(value, Iterator):
+                # Join small chunks into bounded batches to cut per-write overhead
+                batch: List[str] = []
+                for chunk in value:
+                    batch.append(chunk)
+                    if len(batch) >= STREAM_BATCH_CHUNKS:
+                        write("".join(batch))
+                        batch.clear()
+                if batch:
+                    write("".join(batch))
+            else:
+                if conversion == "r":
+                    value = repr(value)
+                elif conversion == "s":
+                    value = str(value)
+                elif conversion == "a":
+                    value = ascii(value)
+                write(format(value, format_spec))
+
+    def render(self, **slots) -> str:
+        """Render the template to a string (same result as str.format)."""
+        buffer = io.StringIO()
+        self.render_to(buffer, **slots)
+        return buffer.getvalue()
+
+    def parse(self, text: str) -> Dict[str, str]:
+        """Recover slot values from text rendered with this template.
+
+        A slot's value is the text up to the first occurrence of the literal
+        that follows it, so values must not contain that literal (true for
+        the escaped message and conversation rows).
+
+        Args:
+            text: Output of render() or render_to()
+
+        Returns:
+            Dictionary of slot name to rendered value
+
+        Raises:
+            ValueError: If the text was not rendered from this template
+        """
+        values: Dict[str, str] = {}
+        position = 0
+        pending: Optional[str] = None
+        for literal, name, _, _ in self.segments:
+            if literal:
+                if pending is None:
+                    start = position if text.startswith(literal, position) else -1
+                else:
+                    start = text.find(literal, position)
+                if start < 0:
+                    raise ValueError("Text does not match the template")
+                if pending is not None:
+                    values[pending] = text[position:start]
+                position = start + len(literal)
+            elif pending is not None:
+                raise ValueError(f"Adjacent slots '{pending}' and '{name}' cannot be separated")
+            pending = name
+        if pending is not None:
+            values[pending] = text[position:]
+        elif position != len(text):
+            raise ValueError("Text does not match the template")
+        return values
 
 
 class TemplateLoader:
@@ -17,6 +134,7 @@ class TemplateLoader:
             templates_dir = Path(__file__).parent
         self.templates_dir = templates_dir
         self._templates = {}
+        self._compiled: Dict[str, CompiledTemplate] = {}
         self._load_templates()
 
     def _load_templates(self):
@@ -24,6 +142,8 @@ class TemplateLoader:
         template_files = {
             "index": "index.html",
             "conversation": "conversation.html",
+            "conversation_page": "conversation_page.html",
+            "conversation_contents": "conversation_contents.html",
         }
 
         for name, filename in template_files.items():
@@ -58,8 +178,34 @@ class TemplateLoader:
         Returns:
             Formatted template string
         """
-        template = self.get_template(name)
-        return template.format(**kwargs)
+        return self.get_compiled_template(name).render(**kwargs)
+
+    def get_compiled_template(self, name: str) -> CompiledTemplate:
+        """Get a template by name, compiled on first use.
+
+        Args:
+            name: Template name
+
+        Returns:
+            CompiledTemplate
+
+        Raises:
+            KeyError: If template not found
+        """
+        compiled = self._compiled.get(name)
+        if compiled is None:
+            compiled = self._compiled[name] = CompiledTemplate(self.get_template(name))
+        return compiled
+
+    def render_to(self, name: str, fileobj: TextIO, **slots) -> None:
+        """Stream a template into a file object.
+
+        Args:
+            name: Template name
+            fileobj: Text file object to write to
+            **slots: Slot values; iterables of strings are streamed
+        """
+        self.get_compiled_template(name).render_to(fileobj, **slots)
 
     def format_index_template(self, **kwargs) -> str:
         """Format the index template with conversation data.
@@ -106,3 +252,23 @@ def format_index_template(**kwargs) -> str:
 def format_conversation_template(**kwargs) -> str:
     """Format the conversation template using the global loader."""
     return get_template_loader().format_conversation_template(**kwargs)
+
+
+def render_index_template_to(fileobj: TextIO, **slots) -> None:
+    """Stream the index template into fileobj using the global loader."""
+    get_template_loader().render_to("index", fileobj, **slots)
+
+
+def render_conversation_template_to(fileobj: TextIO, **slots) -> None:
+    """Stream the conversation template into fileobj using the global loader."""
+    get_template_loader().render_to("conversation", fileobj, **slots)
+
+
+def render_conversation_page_to(fileobj: TextIO, **slots) -> None:
+    """Stream one page of a paginated conversation into fileobj using the global loader."""
+    get_template_loader().render_to("conversation_page", fileobj, **slots)
+
+
+def render_conversation_contents_to(fileobj: TextIO, **slots) -> None:
+    """Stream the table of contents of a paginated conversation into fileobj using the global loader."""
+    get_template_loader().render_to("conversation_contents", fileobj, **slots)
@@ -0,0 +1,130 @@
+"""
+Unit tests for the content-addressed attachment store and its use by
+AttachmentCopyingStage.
+"""
+
+import json
+from unittest.mock import patch
+
+from core.attachment_store import (
+    HASH_CACHE_FILENAME,
+    PREHASH_CHUNK,
+    AttachmentStore,
+    cached_hashes,
+    compute_sha256,
+)
+from core.pipeline.base import PipelineContext
+from core.pipeline.stages.attachment_copying import AttachmentCopyingStage
+
+
+def write_mapping(output_dir, sources):
+    mapping_file = output_dir / "attachment_mapping.json"
+    mapping_file.write_text(json.dumps({
+        "metadata": {"total_mappings": len(sources)},
+        "mappings": {
+            source.name: {"filename": f"Calls/{source.name}", "source_path": str(source)}
+            for source in sources
+        }
+    }))
+    return mapping_file
+
+
+class TestAttachmentStore:
+    """Test the two-step hashing and linking."""
+
+    def test_duplicates_are_linked_to_one_object(self, tmp_path):
+        """Identical files share one object; unique files are only pre-hashed."""
+        attachments = tmp_path / "attachments"
+        attachments.mkdir()
+        store = AttachmentStore(attachments)
+        data = b"x" * (3 * PREHASH_CHUNK)
+        sources = []
+        for name, content in [("a.jpg", data), ("b.jpg", data), ("c.jpg", b"unique")]:
+            path = tmp_path / name
+            path.write_bytes(content)
+            sources.append(path)
+
+        actions = [store.place(src, attachments / src.name, cached_hashes(src, None)) for src in sources]
+
+        assert actions == ["copied", "linked", "copied"]
+        objects = list(store.objects_dir.iterdir())
+        assert len(objects) == 1
+        assert (attachments / "a.jpg").stat().st_ino == objects[0].stat().st_ino
+        assert (attachments / "b.jpg").read_bytes() == data
+        assert store.bytes_saved == len(data)
+        assert store.full_hashes == 2  # the unique file was never fully hashed
+
+    def test_prehash_collision_with_different_content(self, tmp_path):
+        """Files equal in size, head and tail but different in the middle stay separate."""
+        attachments = tmp_path / "attachments"
+        attachments.mkdir()
+        store = AttachmentStore(attachments)
+        head = b"h" * PREHASH_CHUNK
+        tail = b"t" * PREHASH_CHUNK
+        first = tmp_path / "first.mp4"
+        first.write_bytes(head + b"A" * 10 + tail)
+        second = tmp_path / "second.mp4"
+        second.write_bytes(head + b"B" * 10 + tail)
+
+        store.place(first, attachments / "first.mp4", cached_hashes(first, None))
+        action = store.place(second, attachments / "second.mp4", cached_hashes(second, None))
+
+        assert action == "copied"
+        assert store.bytes_saved == 0
+        assert (attachments / "second.mp4").read_bytes() == second.read_bytes()
+
+    def test_symlink_fallback(self, tmp_path):
+        """Without hardlink support, duplicates become relative symlinks into the store."""
+        attachments = tmp_path / "attachments"
+        attachments.mkdir()
+        store = AttachmentStore(attachments)
+        for name in ("a.jpg", "b.jpg"):
+            (tmp_path / name).write_bytes(b"same photo")
+
+        with patch("core.attachment_store.os.link", side_effect=OSError("EXDEV")):
+            for name in ("a.jpg", "b.jpg"):
+                store.place(tmp_path / name, attachments / name, cached_hashes(tmp_path / name, None))
+
+        link = attachments / "b.jpg"
+        assert link.is_symlink()
+        assert not link.readlink().is_absolute()
+        assert (attachments / "a.jpg").read_bytes() == b"same photo"
+
+
+class TestAttachmentCopyingDedup:
+    """Test deduplication and hash caching in the copying stage."""
+
+    def test_stage_reports_bytes_saved_and_caches_hashes(self, tmp_path):
+        """A rerun with a new duplicate reuses the recorded hashes instead of re-reading files."""
+        processing_dir = tmp_path / "processing"
+        output_dir = processing_dir / "conversations"
+        output_dir.mkdir(parents=True)
+        sources = []
+        for name in ("one.jpg", "two.jpg"):
+            path = processing_dir / name
+            path.write_bytes(b"forwarded photo")
+            sources.append(path)
+        mapping_file = write_mapping(output_dir, sources)
+        mapping_before = mapping_file.read_bytes()
+        context = PipelineContext(processing_dir=processing_dir, output_dir=output_dir)
+
+        result = AttachmentCopyingStage().execute(context)
+
+        assert result.metadata['total_linked'] == 1
+        assert result.metadata['bytes_saved'] == len(b"forwarded photo")
+        # The mapping stage's fingerprinted output is left alone; hashes go to the sidecar
+        assert mapping_file.read_bytes() == mapping_before
+        recorded = json.loads((output_dir / HASH_CACHE_FILENAME).read_text())
+        assert sorted(recorded) == ["Calls/one.jpg", "Calls/two.jpg"]
+        assert all(info.get("sha256") for info in recorded.values())
+
+        # Rerun after a third copy appears: existing files are not hashed again
+        third = processing_dir / "three.jpg"
+        third.write_bytes(b"forwarded photo")
+        write_mapping(output_dir, sources + [third])
+
+        with patch("core.attachment_store.compute_sha256", wraps=compute_sha256) as full_hash:
+            result = AttachmentCopyingStage().execute(context)
+
+        assert result.metadata['total_linked'] == 1
+        assert full_hash.call_count == 1  # only the new file
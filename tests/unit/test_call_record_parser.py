@@ -0,0 +1,184 @@
+"""
+Unit tests for the single-pass call and voicemail parser.
+"""
+
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from bs4 import BeautifulSoup
+
+import sms
+from core.conversation_manager import ConversationManager
+from core.phone_lookup import PhoneLookupManager
+from processors.call_record_parser import format_iso_duration, parse_call_record
+from processors.file_processor import process_single_html_file
+
+CALL_TEMPLATE = """<?xml version="1.0" ?>
+<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
+<title>{title}</title>
+</head>
+<body>
+<div class="haudio">
+<span class="fn">{title}</span>
+<div class="contributor vcard">{title_prefix}
+<a class="tel" href="tel:+15551234567"><span class="fn">{name}</span></a></div>
+<abbr class="published" title="2021-06-01T12:30:45.000-04:00">Jun 1, 2021, 12:30:45 PM Eastern Time</abbr>
+{duration}
+{body}
+</div>
+</body>
+</html>"""
+
+
+def make_call(title="Missed call from Alice O&#39;Neil", name="Alice O&#39;Neil",
+              duration='<abbr class="duration" title="PT1M5S">(00:01:05)</abbr>', body=""):
+    return CALL_TEMPLATE.format(
+        title=title, title_prefix=title.rsplit(" ", 2)[0], name=name, duration=duration, body=body
+    )
+
+
+class TestCallRecordParser(unittest.TestCase):
+    """Test that the single-pass parser agrees with the BeautifulSoup extractors."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        path = self.dir / name
+        path.write_text(content, encoding="utf-8")
+        return path
+
+    def test_call_matches_soup_extractors(self):
+        """Test phone, timestamp and message text against the sms.py soup path."""
+        for title, duration in [
+            ("Missed call from Alice O&#39;Neil", ""),
+            ("Placed call to Alice O&#39;Neil", '<abbr class="duration" title="PT1H2M3S">(01:02:03)</abbr>'),
+            ("Received call from Alice O&#39;Neil", '<abbr class="duration" title="PT4S">(00:00:04)</abbr>'),
+        ]:
+            content = make_call(title=title, duration=duration)
+            path = self.write("Alice - Missed - 2021-06-01T16_30_45Z.html", content)
+            soup = BeautifulSoup(content, "html.parser")
+
+            record = parse_call_record(path, "call")
+
+            self.assertEqual(record.phone_number, sms.extract_phone_from_call(soup, path.name))
+            self.assertEqual(record.timestamp, sms.extract_timestamp_from_call(soup))
+            self.assertEqual(
+                record.message_text("ignored"), sms.extract_call_details_from_soup(soup)["message_text"]
+            )
+
+    def test_voicemail_record(self):
+        """Test transcription, duration and message text of a voicemail."""
+        content = make_call(
+            title="Voicemail from Alice",
+            name="Alice",
+            duration='<abbr class="duration" title="PT25S">(00:00:25)</abbr>',
+            body='<span class="description"><span class="full-text">Call me &amp; bring the keys</span></span>',
+        )
+        path = self.write("Alice - Voicemail - 2021-06-01T16_30_45Z.html", content)
+
+        record = parse_call_record(path, "voicemail")
+
+        self.assertEqual(record.transcription, "Call me & bring the keys")
+        self.assertEqual(
+            record.message_text("Alice"),
+            "🎙️ Voicemail from Alice (Duration: 25s)\n\nTranscription:\nCall me & bring the keys",
+        )
+
+    def test_nonstandard_layout_returns_none(self):
+        """Test that files without the standard layout fall back to BeautifulSoup."""
+        path = self.write("odd - Missed - 2021.html", "<html><body><a href='tel:+15551234567'>x</a></body></html>")
+        self.assertIsNone(parse_call_record(path, "call"))
+
+        no_number = make_call().replace('href="tel:+15551234567"', 'href="tel:"')
+        self.assertIsNone(parse_call_record(self.write("empty.html", no_number), "call"))
+
+    def test_soup_path_applies_run_context_phone_filter(self):
+        """Test that extract_call_info filters by phone with the run context's config."""
+        from core.processing_config import ProcessingConfig
+        from core.run_context import build_run_context
+
+        content = make_call()
+        soup = BeautifulSoup(content, "html.parser")
+        lookup = PhoneLookupManager(self.dir / "phone_lookup.txt", enable_prompts=False)
+        filtered = build_run_context(ProcessingConfig(
+            processing_dir=self.dir, filter_non_phone_numbers=False, filter_numbers_without_aliases=True
+        ))
+        unfiltered = build_run_context(ProcessingConfig(processing_dir=self.dir, filter_non_phone_numbers=False))
+
+        def extract(run_context):
+            return sms.extract_call_info("Alice - Missed - 2021-06-01T16_30_45Z.html", soup,
+                                         run_context=run_context, phone_lookup_manager=lookup)
+
+        self.assertIsNone(extract(filtered))
+        self.assertIsNotNone(extract(unfiltered))
+        lookup.add_alias("+15551234567", "Alice")
+        self.assertIsNotNone(extract(filtered))
+
+    def test_format_iso_duration(self):
+        """Test the duration formatting shared with sms.parse_iso_duration."""
+        for value in ["PT4S", "PT9M16S", "PT1H0M5S", "PT0S"]:
+            self.assertEqual(format_iso_duration(value), sms.parse_iso_duration(value))
+
+
+class TestCallRecordProcessing(unittest.TestCase):
+    """Test that process_single_html_file uses the record path end to end."""
+
+    def test_call_file_is_written_without_beautifulsoup(self):
+        """Test the written entry, alias and stats for a standard call file."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            call_file = temp_path / "Alice - Missed - 2021-06-01T16_30_45Z.html"
+            call_file.write_text(make_call(), encoding="utf-8")
+            conversation_manager = ConversationManager(temp_path / "conversations")
+            phone_lookup_manager = PhoneLookupManager(temp_path / "phone_lookup.txt", enable_prompts=False)
+
+            with patch("processors.file_processor.parse_html_file") as mock_parse:
+                stats = process_single_html_file(
+                    call_file, {}, None, conversation_manager, phone_lookup_manager
+                )
+
+            mock_parse.assert_not_called()
+            self.assertEqual(stats["num_calls"], 1)
+            self.assertEqual(phone_lookup_manager.get_alias("+15551234567"), "Alice_ONeil")
+            conversation_manager.finalize_conversation_files()
+            content = (temp_path / "conversations" / "Alice_ONeil.html").read_text(encoding="utf-8")
+            self.assertIn("Missed call from Alice O&#x27;Neil (Duration: 01:05)", content)
+
+    def test_numbers_without_aliases_are_filtered(self):
+        """Test that filter_numbers_without_aliases applies to the record path too."""
+        from core.processing_config import ProcessingConfig
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            temp_path = Path(temp_dir)
+            call_file = temp_path / "Alice - Missed - 2021-06-01T16_30_45Z.html"
+            call_file.write_text(make_call(), encoding="utf-8")
+            conversation_manager = ConversationManager(temp_path / "conversations")
+            phone_lookup_manager = PhoneLookupManager(temp_path / "phone_lookup.txt", enable_prompts=False)
+            config = ProcessingConfig(processing_dir=temp_path, filter_numbers_without_aliases=True)
+
+            stats = process_single_html_file(
+                call_file, {}, None, conversation_manager, phone_lookup_manager, config=config
+            )
+
+            self.assertEqual(stats["num_calls"], 0)
+            self.assertFalse(phone_lookup_manager.has_alias("+15551234567"))
+            self.assertEqual(conversation_manager.conversation_files, {})
+
+            phone_lookup_manager.add_alias("+15551234567", "Alice")
+            stats = process_single_html_file(
+                call_file, {}, None, conversation_manager, phone_lookup_manager, config=config
+            )
+            self.assertEqual(stats["num_calls"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
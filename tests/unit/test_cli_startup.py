@@ -0,0 +1,100 @@
+"""
+Import-time regression tests for CLI startup.
+
+Runs a fresh interpreter with ``python -X importtime`` and checks that heavy
+modules stay out of the import graph of cli.py and of individual pipeline
+stages, so --help and lightweight commands keep starting fast.
+"""
+
+import subprocess
+import sys
+import unittest
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+# Modules that only the commands doing real work should load
+HEAVY_MODULES = {"sms", "bs4", "dateutil", "phonenumbers", "pydantic", "tarfile"}
+
+
+def import_profile(statement):
+    """
+    Run a statement under -X importtime in a fresh interpreter.
+
+    Returns:
+        Dict mapping imported module name to cumulative import time in microseconds
+    """
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    if completed.returncode != 0:
+        raise AssertionError(f"{statement!r} failed:\n{completed.stderr}")
+
+    profile = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        # "import time:  self [us] | cumulative | <indent>module"
+        _, cumulative, name = line.split("|")
+        profile[name.strip()] = int(cumulative)
+    return profile
+
+
+def loaded_modules(statement):
+    """Run a statement in a fresh interpreter and return the names in sys.modules."""
+    completed = subprocess.run(
+        [sys.executable, "-c", f"{statement}\nimport sys\nprint('\\n'.join(sys.modules))"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+    if completed.returncode != 0:
+        raise AssertionError(f"{statement!r} failed:\n{completed.stderr}")
+    return set(completed.stdout.split())
+
+
+class TestCliStartup(unittest.TestCase):
+    """Test that importing the CLI avoids heavy dependencies."""
+
+    def test_cli_import_avoids_heavy_modules(self):
+        """Test that cli.py imports no heavy module at import time."""
+        profile = import_profile("import cli")
+
+        loaded = {name.split(".")[0] for name in profile}
+        self.assertFalse(HEAVY_MODULES & loaded, f"Heavy modules imported: {HEAVY_MODULES & loaded}")
+        self.assertFalse([n for n in profile if n.startswith("core.pipeline")])
+
+    def test_cli_import_time_budget(self):
+        """Test that cli.py imports within a generous time budget."""
+        profile = import_profile("import cli")
+
+        # Well under 200 ms on a laptop; the bound leaves headroom for slow CI
+        self.assertLess(profile["cli"], 150_000)
+
+    def test_single_stage_import_is_isolated(self):
+        """Test that importing one stage does not load the other stages."""
+        # Lazily resolved submodules bypass -X importtime, so inspect sys.modules
+        modules = loaded_modules("from core.pipeline.stages import IndexGenerationStage")
+
+        self.assertIn("core.pipeline.stages.index_generation", modules)
+        self.assertNotIn("core.pipeline.stages.file_discovery", modules)
+        self.assertNotIn("bs4", modules)
+
+    def test_lazy_stage_registry_resolves_all_stages(self):
+        """Test that every name in __all__ resolves to a stage class."""
+        import core.pipeline.stages as stages
+        from core.pipeline.base import PipelineStage
+
+        for name in stages.__all__:
+            self.assertTrue(issubclass(getattr(stages, name), PipelineStage), name)
+        with self.assertRaises(AttributeError):
+            stages.NoSuchStage
+
+
+if __name__ == '__main__':
+    unittest.main()
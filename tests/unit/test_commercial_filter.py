@@ -16,8 +16,11 @@ Author: Claude Code
 Date: 2025-10-21
 """
 
+import random
+
 import pytest
 from core.commercial_filter import (
+    CommercialClassifier,
     is_unsubscribe_word,
     is_confirmation_message,
     is_commercial_conversation,
@@ -468,3 +471,45 @@ class TestConfirmationPatternsConstant:
         patterns_lower = [p.lower() for p in CONFIRMATION_PATTERNS]
         # At least one pattern should match "unsubscribe"
         assert any("unsubscrib" in p for p in patterns_lower)
+
+
+class TestCommercialClassifier:
+    """Test the incremental classifier against is_commercial_conversation()."""
+
+    TEXTS = ["Sale!", "STOP", " stop ", "Stop by later", "You have been unsubscribed",
+             "Unsubscribed", "Why?", "", None]
+
+    def classify(self, messages, my_identifier="Me"):
+        classifier = CommercialClassifier(my_identifier)
+        for msg in messages:
+            classifier.feed(msg["timestamp"], msg["sender"], msg["text"])
+        return classifier.is_commercial
+
+    def test_matches_batch_function(self):
+        """Random conversations, in random order and with tied timestamps, get the same verdict."""
+        rng = random.Random(42)
+        commercial = 0
+        for _ in range(5000):
+            messages = [
+                {
+                    "timestamp": rng.randint(1, 6) * 1000,
+                    "sender": rng.choice(["Me", "+15551234567", "+15551234567"]),
+                    "text": rng.choice(self.TEXTS),
+                }
+                for _ in range(rng.randint(0, 6))
+            ]
+            expected = is_commercial_conversation(messages, my_identifier="Me")
+            commercial += expected
+            assert self.classify(messages) is expected, messages
+        assert commercial > 50  # the sample covers both verdicts
+
+    def test_excluded_after_real_reply(self):
+        """Once the user replies for real, the verdict is settled."""
+        classifier = CommercialClassifier("Me")
+        classifier.feed(1000, "+15551234567", "Sale!")
+        classifier.feed(2000, "Me", "STOP")
+        assert classifier.is_commercial is True
+        classifier.feed(3000, "Me", "Actually, tell me more")
+        assert classifier.excluded is True
+        classifier.feed(4000, "+15551234567", "Unsubscribed")
+        assert classifier.is_commercial is False
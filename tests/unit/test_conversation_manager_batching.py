@@ -0,0 +1,109 @@
+"""
+Unit tests for ConversationManager lock sharding and write_batch().
+"""
+
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from core.conversation_manager import ConversationManager, QueuedMessage
+from core.processing_config import ProcessingConfig
+
+
+class TestWriteBatch(unittest.TestCase):
+    """Test that write_batch() matches the per-message calls it replaces."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.config = ProcessingConfig(processing_dir=self.root)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_batch_matches_individual_writes(self):
+        """Test messages, stats and latest timestamp against the three-call sequence."""
+        messages = [
+            QueuedMessage(1_600_000_000_000, "Me", "hello"),
+            QueuedMessage(1_600_000_300_000, "Alice", "call me", message_type="call"),
+            QueuedMessage(1_600_000_100_000, "Alice", "photo", attachments=["a.jpg"]),
+        ]
+
+        individual = ConversationManager(self.root / "individual")
+        for queued in messages:
+            individual.write_message_with_content(
+                conversation_id="Alice",
+                timestamp=queued.timestamp,
+                sender=queued.sender,
+                message=queued.message,
+                attachments=queued.attachments,
+                message_type=queued.message_type,
+                config=self.config,
+            )
+            individual.update_latest_timestamp("Alice", queued.timestamp)
+        individual.update_stats("Alice", {"num_calls": 1})
+
+        batched = ConversationManager(self.root / "batched")
+        written = batched.write_batch("Alice", messages, config=self.config, stats={"num_calls": 1})
+
+        self.assertEqual(written, 3)
+        self.assertEqual(
+            batched.conversation_files["Alice"]["messages"],
+            individual.conversation_files["Alice"]["messages"],
+        )
+        self.assertEqual(batched.conversation_stats, individual.conversation_stats)
+        self.assertEqual(batched.conversation_content_types, individual.conversation_content_types)
+
+    def test_filtered_messages_are_not_counted(self):
+        """Test that date-filtered messages are skipped and not reported as written."""
+        config = ProcessingConfig(processing_dir=self.root, exclude_older_than=datetime(2020, 6, 1))
+        manager = ConversationManager(self.root / "conversations")
+
+        written = manager.write_batch(
+            "Alice",
+            [QueuedMessage(1_500_000_000_000, "Alice", "old"), QueuedMessage(1_600_000_000_000, "Alice", "new")],
+            config=config,
+        )
+
+        self.assertEqual(written, 1)
+        self.assertEqual(len(manager.conversation_files["Alice"]["messages"]), 1)
+
+
+class TestLockSharding(unittest.TestCase):
+    """Test concurrent writers on a sharded manager."""
+
+    def test_concurrent_writers_lose_no_messages(self):
+        """Test per-conversation counts after many threads write interleaved conversations."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            manager = ConversationManager(Path(temp_dir), lock_shards=4)
+            conversations = [f"contact_{i}" for i in range(10)]
+
+            def writer(worker):
+                for n in range(200):
+                    conversation_id = conversations[(worker + n) % len(conversations)]
+                    if n % 2:
+                        manager.write_batch(conversation_id, [QueuedMessage(n, "Me", f"{worker}-{n}")])
+                    else:
+                        manager.write_message_with_content(conversation_id, n, "Me", f"{worker}-{n}")
+
+            threads = [threading.Thread(target=writer, args=(worker,)) for worker in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            total = sum(len(info["messages"]) for info in manager.conversation_files.values())
+            self.assertEqual(total, 8 * 200)
+            self.assertEqual(manager.get_total_stats()["num_sms"], 8 * 200)
+
+    def test_invalid_shard_count(self):
+        """Test that lock_shards must be a positive integer."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            with self.assertRaises(ValueError):
+                ConversationManager(Path(temp_dir), lock_shards=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,233 @@
+"""
+Unit tests for conversations.manifest.jsonl and its consumers.
+"""
+
+import hashlib
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from click.testing import CliRunner
+
+from core.conversation_manager import ConversationManager
+from core.conversation_manifest import (
+    MANIFEST_FILENAME,
+    get_valid_record,
+    load_manifest,
+    manifest_digest,
+    write_manifest,
+)
+from core.pipeline.stages.index_generation import IndexGenerationStage
+
+# 2022-01-01 00:00:00 UTC and a day later, in milliseconds
+TS_1 = 1640995200000
+TS_2 = 1641081600000
+
+
+def write_conversations(output_dir):
+    """Write two conversations through ConversationManager and finalize them."""
+    manager = ConversationManager(output_dir)
+    manager.write_message_with_content("Alice", TS_2, "Alice", "Hi there")
+    manager.write_message_with_content(
+        "Alice", TS_1, "Me", "Photo", attachments=[{"filename": "attachments/photo.jpg"}]
+    )
+    manager.write_message_with_content("Alice", TS_2 + 1000, "Alice", "Missed call", message_type="call")
+    manager.write_message_with_content("Bob", TS_1, "Bob", "Voicemail text", message_type="voicemail")
+    manager.finalize_conversation_files()
+    return manager
+
+
+class TestConversationManifest(unittest.TestCase):
+    """Test the manifest written by finalize_conversation_files."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name) / "conversations"
+        self.output_dir.mkdir()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_finalize_writes_one_record_per_conversation(self):
+        """Test that finalize records counts, dates, participants and attachments."""
+        write_conversations(self.output_dir)
+
+        lines = (self.output_dir / MANIFEST_FILENAME).read_text().splitlines()
+        self.assertEqual(len(lines), 2)
+
+        alice = load_manifest(self.output_dir)["Alice"]
+        self.assertEqual(alice["message_count"], 3)
+        self.assertEqual((alice["sms_count"], alice["call_count"], alice["voicemail_count"]), (2, 1, 0))
+        self.assertEqual(alice["attachment_count"], 1)
+        self.assertEqual(alice["attachments"], ["attachments/photo.jpg"])
+        self.assertEqual(alice["participants"], ["Alice"])
+        self.assertEqual((alice["first_timestamp"], alice["last_timestamp"]), (TS_1, TS_2 + 1000))
+
+    def test_record_matches_file_bytes(self):
+        """Test that byte size and content hash describe the written file."""
+        write_conversations(self.output_dir)
+
+        content = (self.output_dir / "Bob.html").read_bytes()
+        record = load_manifest(self.output_dir)["Bob"]
+        self.assertEqual(record["bytes"], len(content))
+        self.assertEqual(record["sha256"], hashlib.sha256(content).hexdigest())
+        self.assertEqual(get_valid_record(load_manifest(self.output_dir), self.output_dir / "Bob.html"), record)
+
+    def test_modified_file_invalidates_record(self):
+        """Test that a record is ignored once the file size changes."""
+        write_conversations(self.output_dir)
+        with open(self.output_dir / "Bob.html", "a", encoding="utf-8") as f:
+            f.write("<!-- edited -->")
+
+        self.assertIsNone(get_valid_record(load_manifest(self.output_dir), self.output_dir / "Bob.html"))
+
+    def test_later_run_merges_and_drops_missing_files(self):
+        """Test that incremental runs keep earlier records whose files still exist."""
+        write_conversations(self.output_dir)
+        (self.output_dir / "Bob.html").rename(self.output_dir / "Bob.archived.html")
+
+        manager = ConversationManager(self.output_dir)
+        manager.write_message_with_content("Carol", TS_1, "Carol", "Hello")
+        manager.finalize_conversation_files()
+
+        self.assertEqual(sorted(load_manifest(self.output_dir)), ["Alice", "Carol"])
+
+    def test_stats_fallback_reads_manifest_instead_of_html(self):
+        """Test that _extract_conversation_stats uses the manifest before parsing."""
+        write_conversations(self.output_dir)
+        manager = ConversationManager(self.output_dir)
+
+        with patch.object(ConversationManager, "_parse_file_for_stats") as mock_parse:
+            stats = manager._extract_conversation_stats(self.output_dir / "Alice.html")
+
+        mock_parse.assert_not_called()
+        self.assertEqual(stats["sms_count"], 2)
+        self.assertEqual(stats["calls_count"], 1)
+
+    def test_malformed_lines_are_skipped(self):
+        """Test that a corrupt line does not discard the rest of the manifest."""
+        write_manifest(self.output_dir, {"A": {"v": 1, "conversation_id": "A"}}, merge=False)
+        with open(self.output_dir / MANIFEST_FILENAME, "a", encoding="utf-8") as f:
+            f.write("{not json\n")
+
+        self.assertEqual(list(load_manifest(self.output_dir)), ["A"])
+
+
+class TestManifestConsumers(unittest.TestCase):
+    """Test that index generation and the tarball command use the manifest."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.processing_dir = Path(self.temp_dir.name)
+        self.output_dir = self.processing_dir / "conversations"
+        self.output_dir.mkdir()
+        write_conversations(self.output_dir)
+        self.conv_files = sorted(self.output_dir.glob("*.html"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_index_metadata_uses_manifest_counts(self):
+        """Test that index metadata is filled from the manifest, not zeros."""
+        stage = IndexGenerationStage()
+        manifest = load_manifest(self.output_dir)
+
+        meta = stage._extract_file_metadata(self.output_dir / "Alice.html", manifest)
+
+        self.assertEqual(meta["sms_count"], 2)
+        self.assertEqual(meta["call_count"], 1)
+        self.assertEqual(meta["attachment_count"], 1)
+
+    def test_index_files_hash_uses_content_hashes(self):
+        """Test that the change-detection hash comes from the manifest."""
+        stage = IndexGenerationStage()
+        manifest = load_manifest(self.output_dir)
+
+        self.assertEqual(
+            stage._compute_files_hash(self.conv_files, manifest),
+            manifest_digest(manifest, self.conv_files),
+        )
+        # Files the manifest does not know about fall back to mtime hashing
+        extra = self.output_dir / "Legacy.html"
+        extra.write_text("<html></html>")
+        self.assertNotEqual(
+            stage._compute_files_hash(self.conv_files + [extra], manifest),
+            manifest_digest(manifest, self.conv_files),
+        )
+
+    def test_tarball_reads_attachments_from_manifest(self):
+        """Test that create-distribution-tarball does not re-parse conversations."""
+        from cli import cli
+
+        (self.output_dir / "attachments").mkdir()
+        (self.output_dir / "attachments" / "photo.jpg").write_bytes(b"jpeg")
+        (self.output_dir / "index.html").write_text(
+            "<a href='Alice.html'>Alice</a><a href='Bob.html'>Bob</a>"
+        )
+        output = self.processing_dir / "dist.tar.gz"
+
+        with patch("cli._extract_attachments_from_conversation") as mock_parse:
+            result = CliRunner().invoke(cli, [
+                '--processing-dir', str(self.processing_dir),
+                'create-distribution-tarball', '--output', str(output), '--no-verify',
+            ])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        mock_parse.assert_not_called()
+        with tarfile.open(output, 'r:gz') as tar:
+            self.assertIn("conversations/attachments/photo.jpg", tar.getnames())
+
+    def test_tarball_includes_mms_attachments(self):
+        """Test that MMS attachments, passed as <a href> strings by sms.py, reach the tarball."""
+        from cli import cli
+
+        manager = ConversationManager(self.output_dir)
+        manager.write_message_with_content(
+            "Carol", TS_1, "Carol", "Look",
+            attachments=["<a href='attachments/Calls/mms.jpg' target='_blank'>📷 Image</a>", "📇 vCard"],
+        )
+        manager.finalize_conversation_files()
+        self.assertEqual(load_manifest(self.output_dir)["Carol"]["attachments"], ["attachments/Calls/mms.jpg"])
+
+        (self.output_dir / "attachments" / "Calls").mkdir(parents=True)
+        (self.output_dir / "attachments" / "Calls" / "mms.jpg").write_bytes(b"jpeg")
+        (self.output_dir / "index.html").write_text("<a href='Carol.html'>Carol</a>")
+        output = self.processing_dir / "dist.tar.gz"
+
+        result = CliRunner().invoke(cli, [
+            '--processing-dir', str(self.processing_dir),
+            'create-distribution-tarball', '--output', str(output), '--no-verify',
+        ])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        with tarfile.open(output, 'r:gz') as tar:
+            self.assertIn("conversations/attachments/Calls/mms.jpg", tar.getnames())
+
+    def test_tarball_includes_thumbnails_of_attachments(self):
+        """Test that previews of packaged attachments are packaged too."""
+        from cli import cli
+        from core.thumbnails import save_thumbnail_entries
+
+        (self.output_dir / "attachments").mkdir()
+        (self.output_dir / "attachments" / "photo.jpg").write_bytes(b"jpeg")
+        thumbnail = "attachments/.thumbnails/ab/abc.webp"
+        (self.output_dir / thumbnail).parent.mkdir(parents=True)
+        (self.output_dir / thumbnail).write_bytes(b"webp")
+        save_thumbnail_entries(self.output_dir, {"attachments/photo.jpg": {"thumbnail": thumbnail}})
+        (self.output_dir / "index.html").write_text("<a href='Alice.html'>Alice</a>")
+        output = self.processing_dir / "dist.tar.gz"
+
+        result = CliRunner().invoke(cli, [
+            '--processing-dir', str(self.processing_dir),
+            'create-distribution-tarball', '--output', str(output), '--no-verify',
+        ])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        with tarfile.open(output, 'r:gz') as tar:
+            self.assertIn(f"conversations/{thumbnail}", tar.getnames())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+"""
+Unit tests for pagination of very large conversations.
+"""
+
+import re
+import tarfile
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from core.conversation_manager import ConversationManager
+from core.conversation_manifest import MANIFEST_FILENAME, load_manifest
+from core.conversation_pages import page_links, plan_pages
+from core.processing_config import ProcessingConfig
+
+
+def local_ms(year, day=0):
+    """Unix milliseconds of noon on the given day of a year (local time, as pages show it)."""
+    return int((datetime(year, 3, 1, 12) + timedelta(days=day)).timestamp() * 1000)
+
+
+def times(year, count):
+    return [f"{year}-03-{day + 1:02d} 12:00:00" for day in range(count)]
+
+
+class TestPlanPages(unittest.TestCase):
+    """Test how a conversation is split into pages."""
+
+    def test_one_page_per_year(self):
+        """Test that years become pages and years over the limit are split into parts."""
+        plans = plan_pages(times(2019, 3) + times(2020, 5) + times(2021, 1), "year", max_messages=4)
+
+        self.assertEqual([p.name for p in plans], ["2019", "2020-1", "2020-2", "2021"])
+        self.assertEqual([p.count for p in plans], [3, 4, 1, 1])
+        self.assertEqual([p.start for p in plans], [0, 3, 7, 8])
+        self.assertEqual(plans[1].label, "2020, part 1 of 2")
+        self.assertEqual(plans[0].date_range, "2019-03-01 to 2019-03-03")
+        self.assertEqual(plans[3].date_range, "2021-03-01")
+
+    def test_fixed_size_pages(self):
+        """Test message and byte limits of fixed-size pages."""
+        plans = plan_pages(times(2019, 5) + times(2020, 2), "size", max_messages=3)
+        self.assertEqual([(p.name, p.count) for p in plans], [("page-1", 3), ("page-2", 3), ("page-3", 1)])
+        self.assertEqual(plans[2].label, "Page 3 of 3")
+
+        plans = plan_pages(times(2019, 4), "size", max_messages=0, max_bytes=250, sizes=[100, 100, 100, 300])
+        self.assertEqual([p.count for p in plans], [2, 1, 1])
+
+        with self.assertRaises(ValueError):
+            plan_pages(times(2019, 1), "month")
+
+
+class TestPaginatedConversation(unittest.TestCase):
+    """Test finalize writing a table of contents and linked pages."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name) / "conversations"
+        self.output_dir.mkdir()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def config(self, **options):
+        return ProcessingConfig(processing_dir=Path(self.temp_dir.name), **options)
+
+    def write(self, config, messages_per_year):
+        manager = ConversationManager(self.output_dir)
+        for year, count in messages_per_year.items():
+            for day in range(count):
+                sender = "Me" if day % 2 else "Alice"
+                manager.write_message_with_content("Alice", local_ms(year, day), sender, f"{year} #{day}")
+        manager.write_message_with_content("Alice", local_ms(2020), "Alice", "Photo", [{"filename": "attachments/a.jpg"}])
+        manager.write_message_with_content("Bob", local_ms(2020), "Bob", "short thread")
+        manager.finalize_conversation_files(config)
+        return manager
+
+    def test_large_conversation_is_paginated(self):
+        """Test the table of contents, page navigation, manifest and index rows."""
+        manager = self.write(self.config(paginate_messages=4), {2019: 3, 2020: 5})
+
+        contents = (self.output_dir / "Alice.html").read_text()
+        links = page_links(contents)
+        self.assertEqual(links, ["pages/Alice/2019.html", "pages/Alice/2020-1.html", "pages/Alice/2020-2.html"])
+        self.assertIn("Total Messages: 9", contents)
+        self.assertIn("Split into 3 pages", contents)
+        self.assertEqual(sorted(p.name for p in (self.output_dir / "pages" / "Alice").iterdir()),
+                         ["2019.html", "2020-1.html", "2020-2.html"])
+        self.assertFalse(list((self.output_dir / "pages").glob("*.partial")))
+
+        # Every message on exactly one page, in time order, with attachments resolving from the base
+        texts = []
+        for link in links:
+            page = (self.output_dir / link).read_text()
+            self.assertIn("<base href='../../'>", page)
+            self.assertIn("<a href='Alice.html'>Contents</a>", page)
+            texts += re.findall(r'<td class="message">([^<]*)</td>', page)
+        self.assertEqual(texts[:3], ["2019 #0", "2019 #1", "2019 #2"])
+        self.assertEqual(len(texts), 9)
+        self.assertIn('href="attachments/a.jpg"', (self.output_dir / links[1]).read_text())
+
+        first, middle, last = ((self.output_dir / link).read_text() for link in links)
+        self.assertIn("<span class='disabled'>← Previous</span>", first)
+        self.assertIn("<a href='pages/Alice/2020-1.html' rel='next'>", first)
+        self.assertIn("<a href='pages/Alice/2019.html' rel='prev'>", middle)
+        self.assertIn("<span class='disabled'>Next →</span>", last)
+
+        # Bob stays a single page
+        self.assertEqual(page_links((self.output_dir / "Bob.html").read_text()), [])
+        self.assertFalse((self.output_dir / "pages" / "Bob").exists())
+
+        record = load_manifest(self.output_dir)["Alice"]
+        self.assertEqual(record["pages"], links)
+        self.assertEqual(record["message_count"], 9)
+        self.assertEqual(record["attachment_count"], 1)
+        self.assertNotIn("pages", load_manifest(self.output_dir)["Bob"])
+
+        self.assertEqual(manager._get_conversation_stats_accurate("Alice")["sms_count"], 9)
+        manager.generate_index_html({"num_sms": 10}, 1.0)
+        index = (self.output_dir / "index.html").read_text()
+        self.assertIn("<a href='Alice.html' class='file-link'>Alice</a>", index)
+        self.assertNotIn("pages/", index)
+        self.assertIn("<td>9</td>", index)
+
+    def test_stats_parsed_from_pages(self):
+        """Test the parsing fallback counting messages across pages."""
+        manager = self.write(self.config(paginate_messages=4), {2019: 3, 2020: 5})
+
+        stats = ConversationManager(self.output_dir)._parse_file_for_stats(self.output_dir / "Alice.html")
+
+        self.assertEqual(stats["sms_count"], manager._get_conversation_stats_accurate("Alice")["sms_count"])
+
+    def test_pages_removed_when_no_longer_paginated(self):
+        """Test that pages of an earlier run are replaced or removed."""
+        self.write(self.config(paginate_messages=4, paginate_by="size"), {2019: 3, 2020: 5})
+        self.assertEqual(len(list((self.output_dir / "pages" / "Alice").iterdir())), 3)
+
+        self.write(self.config(paginate_messages=5, paginate_by="size"), {2019: 3, 2020: 5})
+        self.assertEqual(sorted(p.name for p in (self.output_dir / "pages" / "Alice").iterdir()),
+                         ["page-1.html", "page-2.html"])
+
+        self.write(self.config(paginate_messages=0), {2019: 3, 2020: 5})
+        self.assertFalse((self.output_dir / "pages" / "Alice").exists())
+        self.assertNotIn("pages", load_manifest(self.output_dir)["Alice"])
+        self.assertIn("Total Messages: 9", (self.output_dir / "Alice.html").read_text())
+
+    def test_byte_threshold(self):
+        """Test that a byte threshold alone paginates a conversation."""
+        self.write(self.config(paginate_messages=0, paginate_bytes=1500, paginate_by="size"), {2019: 8})
+
+        links = page_links((self.output_dir / "Alice.html").read_text())
+        self.assertGreater(len(links), 1)
+        self.assertEqual(page_links((self.output_dir / "Bob.html").read_text()), [])
+
+    def test_tarball_includes_pages(self):
+        """Test that create-distribution-tarball packages the pages behind a table of contents."""
+        from cli import cli
+
+        manager = self.write(self.config(paginate_messages=4), {2019: 3, 2020: 5})
+        manager.generate_index_html({}, 1.0)
+        (self.output_dir / "attachments").mkdir()
+        (self.output_dir / "attachments" / "a.jpg").write_bytes(b"jpeg")
+
+        for with_manifest in (True, False):
+            with self.subTest(with_manifest=with_manifest):
+                if not with_manifest:
+                    (self.output_dir / MANIFEST_FILENAME).unlink()
+                output = Path(self.temp_dir.name) / f"dist-{with_manifest}.tar.gz"
+                result = CliRunner().invoke(cli, [
+                    '--processing-dir', self.temp_dir.name,
+                    'create-distribution-tarball', '--output', str(output), '--no-verify',
+                ])
+
+                self.assertEqual(result.exit_code, 0, result.output)
+                with tarfile.open(output, 'r:gz') as tar:
+                    members = tar.getnames()
+                self.assertIn("conversations/Alice.html", members)
+                self.assertIn("conversations/pages/Alice/2020-2.html", members)
+                self.assertIn("conversations/attachments/a.jpg", members)
+
+
+if __name__ == '__main__':
+    unittest.main()
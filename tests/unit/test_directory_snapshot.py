@@ -0,0 +1,152 @@
+"""
+Unit tests for the shared directory snapshot cache.
+"""
+
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from core.directory_snapshot import (
+    SNAPSHOT_CACHE_DIR,
+    SNAPSHOT_FILENAME,
+    DirectorySnapshot,
+    clear_snapshot_memo,
+    get_directory_snapshot,
+)
+from core.performance_optimizations import build_attachment_mapping_optimized
+
+
+class TestDirectorySnapshot(unittest.TestCase):
+    """Test DirectorySnapshot refresh, digest and persistence."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name).resolve()
+        (self.root / "Calls").mkdir()
+        (self.root / "Calls" / "a.html").write_text("a")
+        (self.root / "Calls" / "photo.jpg").write_text("img")
+        (self.root / "Voicemails").mkdir()
+        clear_snapshot_memo()
+
+    def tearDown(self):
+        clear_snapshot_memo()
+        self.temp_dir.cleanup()
+
+    def test_snapshot_lists_tree(self):
+        """Test that the snapshot records files, subdirectories and counts."""
+        snapshot = DirectorySnapshot(self.root)
+        snapshot.refresh()
+
+        self.assertEqual(sorted(snapshot.iter_files()), ["Calls/a.html", "Calls/photo.jpg"])
+        self.assertEqual(snapshot.directories[""].subdirs, ["Calls", "Voicemails"])
+        self.assertEqual(snapshot.directories["Calls"].entry_count, 2)
+        self.assertEqual(snapshot.file_count(".html"), 1)
+
+    def test_unchanged_tree_only_stats_directories(self):
+        """Test that revalidation does not re-list unchanged directories."""
+        snapshot = DirectorySnapshot(self.root)
+        snapshot.refresh()
+
+        with patch("core.directory_snapshot._list_directory") as mock_list:
+            self.assertEqual(snapshot.refresh(), set())
+        mock_list.assert_not_called()
+
+    def test_only_changed_directory_is_relisted(self):
+        """Test that adding a file re-lists just its directory and changes the digest."""
+        snapshot = DirectorySnapshot(self.root)
+        snapshot.refresh()
+        before = snapshot.digest()
+
+        new_file = self.root / "Voicemails" / "vm.mp3"
+        new_file.write_text("audio")
+        # Guarantee an mtime change even on coarse-grained filesystems
+        stat = os.stat(self.root / "Voicemails")
+        os.utime(self.root / "Voicemails", ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        from core import directory_snapshot
+        real_list = directory_snapshot._list_directory
+        with patch("core.directory_snapshot._list_directory", side_effect=real_list) as mock_list:
+            changed = snapshot.refresh()
+
+        self.assertEqual(changed, {"Voicemails"})
+        self.assertEqual([c.args[0] for c in mock_list.call_args_list], [self.root / "Voicemails"])
+        self.assertNotEqual(before, snapshot.digest())
+
+    def test_touch_without_listing_change_keeps_digest(self):
+        """Test that hidden cache files and mtime-only changes do not invalidate."""
+        snapshot = DirectorySnapshot(self.root)
+        snapshot.refresh()
+        before = snapshot.digest()
+
+        (self.root / ".attachment_cache.json").write_text("{}")
+        stat = os.stat(self.root)
+        os.utime(self.root, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        self.assertEqual(snapshot.refresh(), set())
+        self.assertEqual(before, snapshot.digest())
+
+    def test_removed_directory_is_dropped(self):
+        """Test that deleted directories leave the snapshot."""
+        snapshot = DirectorySnapshot(self.root)
+        snapshot.refresh()
+
+        (self.root / "Voicemails").rmdir()
+        changed = snapshot.refresh()
+
+        self.assertIn("Voicemails", changed)
+        self.assertNotIn("Voicemails", snapshot.directories)
+
+    def test_output_directory_is_excluded(self):
+        """Test that the default conversations output directory is not scanned."""
+        (self.root / "conversations").mkdir()
+        (self.root / "conversations" / "index.html").write_text("index")
+
+        snapshot = DirectorySnapshot(self.root)
+        snapshot.refresh()
+
+        self.assertNotIn("conversations/index.html", set(snapshot.iter_files()))
+
+    def test_snapshot_is_persisted_and_reloaded(self):
+        """Test that a new process reuses the on-disk snapshot."""
+        digest = get_directory_snapshot(self.root).digest()
+        cache_file = self.root / SNAPSHOT_CACHE_DIR / SNAPSHOT_FILENAME
+        self.assertTrue(cache_file.exists())
+        self.assertEqual(json.loads(cache_file.read_text())["directories"]["Calls"]["entry_count"], 2)
+
+        clear_snapshot_memo()
+        with patch("core.directory_snapshot._list_directory") as mock_list:
+            reloaded = get_directory_snapshot(self.root)
+
+        self.assertEqual(reloaded.digest(), digest)
+        mock_list.assert_not_called()
+
+
+class TestAttachmentMappingCacheUsesSnapshot(unittest.TestCase):
+    """Test that the attachment mapping cache validates via the snapshot."""
+
+    def test_cached_mapping_does_not_stat_each_path(self):
+        """Test that loading a valid cached mapping skips per-file exists() checks."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            processing_dir = Path(temp_dir)
+            calls_dir = processing_dir / "Calls"
+            calls_dir.mkdir()
+            (calls_dir / "photo.jpg").write_text("img")
+            (calls_dir / "conv.html").write_text('<img src="photo.jpg">')
+            clear_snapshot_memo()
+
+            first = build_attachment_mapping_optimized(processing_dir)
+            with patch.object(Path, "exists", autospec=True, side_effect=Path.exists) as mock_exists:
+                second = build_attachment_mapping_optimized(processing_dir)
+
+            self.assertEqual(first, second)
+            self.assertEqual(second["photo.jpg"][0], "Calls/photo.jpg")
+            checked = [str(c.args[0]) for c in mock_exists.call_args_list]
+            self.assertNotIn(str(processing_dir / "Calls/photo.jpg"), checked)
+            clear_snapshot_memo()
+
+
+if __name__ == '__main__':
+    unittest.main()
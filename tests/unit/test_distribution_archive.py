@@ -0,0 +1,115 @@
+"""
+Unit tests for the parallel distribution tarball writer.
+"""
+
+import gzip
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.distribution_archive import (
+    ParallelGzipWriter,
+    is_incompressible,
+    write_distribution_tarball,
+)
+
+
+class TestParallelGzipWriter(unittest.TestCase):
+    """Test the multi-member gzip stream."""
+
+    def test_members_decompress_in_order(self):
+        """Test that blocks compressed in parallel are written in order."""
+        data = b"".join(f"line {i}\n".encode() for i in range(50000))
+        output = io.BytesIO()
+        writer = ParallelGzipWriter(output, block_size=4096, workers=4)
+        for start in range(0, len(data), 1000):
+            writer.write(data[start:start + 1000])
+        self.assertEqual(writer.tell(), len(data))
+        writer.close()
+
+        self.assertGreater(writer.members, 10)
+        self.assertEqual(gzip.decompress(output.getvalue()), data)
+
+    def test_level_zero_stores_data(self):
+        """Test that level 0 members are stored and counted."""
+        payload = os.urandom(100000)
+        output = io.BytesIO()
+        writer = ParallelGzipWriter(output, workers=2)
+        writer.write(b"a" * 100000)
+        writer.set_level(0)
+        writer.write(payload)
+        writer.close()
+
+        self.assertEqual(writer.members, 2)
+        self.assertEqual(writer.bytes_stored, len(payload))
+        self.assertEqual(gzip.decompress(output.getvalue()), b"a" * 100000 + payload)
+
+    def test_empty_stream_is_valid_gzip(self):
+        """Test that closing without writing still produces valid gzip."""
+        output = io.BytesIO()
+        ParallelGzipWriter(output).close()
+        self.assertEqual(gzip.decompress(output.getvalue()), b"")
+
+
+class TestWriteDistributionTarball(unittest.TestCase):
+    """Test tarballs written through the parallel writer."""
+
+    def test_tarball_round_trip(self):
+        """Test that tarfile reads the archive and media is stored, not recompressed."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            html = root / "conv.html"
+            html.write_text("<html>" + "hello " * 50000 + "</html>")
+            photo = root / "photo.JPG"
+            photo.write_bytes(os.urandom(300000))
+            output = root / "dist.tar.gz"
+
+            stats = write_distribution_tarball(
+                output,
+                [(html, "conversations/conv.html"), (photo, "conversations/attachments/photo.JPG")],
+                workers=3,
+                block_size=64 * 1024,
+            )
+
+            with tarfile.open(output, "r:gz") as tar:
+                self.assertEqual(
+                    tar.getnames(), ["conversations/conv.html", "conversations/attachments/photo.JPG"]
+                )
+                self.assertEqual(
+                    tar.extractfile("conversations/attachments/photo.JPG").read(), photo.read_bytes()
+                )
+
+        self.assertEqual(stats["files"], 2)
+        self.assertGreaterEqual(stats["bytes_stored"], 300000)
+        self.assertLess(stats["bytes_out"], stats["bytes_in"])
+
+    def test_symlinked_attachments_are_stored_as_files(self):
+        """Test that links into the attachment object store are dereferenced."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "attachments" / ".objects").mkdir(parents=True)
+            obj = root / "attachments" / ".objects" / "abc.jpg"
+            obj.write_bytes(b"jpeg")
+            link = root / "attachments" / "photo.jpg"
+            link.symlink_to(os.path.relpath(obj, link.parent))
+            output = root / "dist.tar.gz"
+
+            write_distribution_tarball(output, [(link, "conversations/attachments/photo.jpg")], workers=1)
+
+            with tarfile.open(output, "r:gz") as tar:
+                member = tar.getmember("conversations/attachments/photo.jpg")
+                self.assertTrue(member.isfile())
+                self.assertEqual(tar.extractfile(member).read(), b"jpeg")
+
+    def test_incompressible_suffixes(self):
+        """Test media type detection."""
+        self.assertTrue(is_incompressible(Path("a/b/IMG_1.JPEG")))
+        self.assertTrue(is_incompressible(Path("voicemail.amr")))
+        self.assertFalse(is_incompressible(Path("contact.vcf")))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Unit tests for the discovery-time date pre-filter.
+"""
+
+import tempfile
+import unittest
+from datetime import datetime, timezone
+from pathlib import Path
+
+from core.file_date_prefilter import file_time_span, filename_timestamp, prefilter_files_by_date
+from core.processing_config import ProcessingConfig
+from core.run_context import RunContext
+
+
+def conversation_html(*titles):
+    messages = "".join(
+        f'<div class="message"><abbr class="dt" title="{title}">x</abbr><q>hi</q></div>\n'
+        for title in titles
+    )
+    return f"<html><body>{messages}</body></html>"
+
+
+def utc_ms(*parts):
+    return int(datetime(*parts, tzinfo=timezone.utc).timestamp() * 1000)
+
+
+class TestFileDatePrefilter(unittest.TestCase):
+    """Test filename parsing, tail reading and the skip decision."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write(self, name, content):
+        path = self.root / name
+        path.write_text(content, encoding="utf-8")
+        return path
+
+    def test_filename_timestamp_is_strict(self):
+        """Test that only the Takeout timestamp layout is accepted."""
+        self.assertEqual(
+            filename_timestamp("Alice - Text - 2019-03-04T10_11_12Z.html"),
+            utc_ms(2019, 3, 4, 10, 11, 12),
+        )
+        self.assertIsNotNone(filename_timestamp("Group Conversation - 2019-03-04T10_11_12Z-2.html"))
+        self.assertIsNone(filename_timestamp("Alice - Text - 2019-03-04.html"))
+        self.assertIsNone(filename_timestamp("Alice - Text - 2019-13-04T10_11_12Z.html"))
+
+    def test_span_uses_filename_and_last_message(self):
+        """Test the span of a text file and of a single-event call file."""
+        text = self.write(
+            "Alice - Text - 2019-03-04T10_11_12Z.html",
+            conversation_html("2019-03-04T10:11:12.000-00:00", "2020-05-06T07:08:09.000+00:00"),
+        )
+        self.assertEqual(
+            file_time_span(text, text.stat().st_size),
+            (utc_ms(2019, 3, 4, 10, 11, 12), utc_ms(2020, 5, 6, 7, 8, 9)),
+        )
+
+        call = self.write("Alice - Missed - 2018-01-01T00_00_00Z.html", "<html></html>")
+        oldest, newest = file_time_span(call, call.stat().st_size)
+        self.assertEqual(oldest, newest)
+
+        unknown = self.write("Alice - Text - 2019-03-04T10_11_12Z-1.html", "<html>no messages</html>")
+        self.assertIsNone(file_time_span(unknown, unknown.stat().st_size))
+
+    def test_prefilter_drops_only_files_fully_outside_window(self):
+        """Test skipped counts with both filters and files spanning a boundary."""
+        old_text = self.write(
+            "Old - Text - 2015-01-01T00_00_00Z.html",
+            conversation_html("2015-01-01T00:00:00Z", "2015-06-01T00:00:00Z"),
+        )
+        spanning = self.write(
+            "Span - Text - 2015-01-01T00_00_00Z.html",
+            conversation_html("2015-01-01T00:00:00Z", "2021-06-01T00:00:00Z"),
+        )
+        new_call = self.write("New - Placed - 2024-01-01T00_00_00Z.html", "<html></html>")
+        undetermined = self.write("notes.html", "<html></html>")
+        config = ProcessingConfig(
+            processing_dir=self.root,
+            exclude_older_than=datetime(2020, 1, 1),
+            exclude_newer_than=datetime(2023, 1, 1),
+        )
+
+        kept, stats = prefilter_files_by_date([old_text, spanning, new_call, undetermined], config)
+
+        self.assertEqual(kept, [spanning, undetermined])
+        self.assertEqual(stats["skipped_files"], 2)
+        self.assertEqual(stats["skipped_bytes"], old_text.stat().st_size + new_call.stat().st_size)
+        self.assertEqual(stats["undetermined"], 1)
+
+        # No date filters: nothing is read or dropped
+        kept, stats = prefilter_files_by_date([old_text], ProcessingConfig(processing_dir=self.root))
+        self.assertEqual(kept, [old_text])
+        self.assertEqual(stats["skipped_files"], 0)
+
+    def test_prefilter_reads_window_from_run_context(self):
+        """Test that a RunContext's dates apply even without a ProcessingConfig."""
+        old_text = self.write(
+            "Old - Text - 2015-01-01T00_00_00Z.html",
+            conversation_html("2015-01-01T00:00:00Z"),
+        )
+        run_context = RunContext(
+            processing_dir=self.root, output_dir=self.root, exclude_older_than=datetime(2020, 1, 1)
+        )
+
+        kept, stats = prefilter_files_by_date([old_text], run_context)
+
+        self.assertEqual(kept, [])
+        self.assertEqual(stats["skipped_files"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for the hot-path logging helpers.
+"""
+
+import logging
+import sys
+import threading
+import unittest
+
+from utils.hot_path_logging import CounterRegistry, Lazy, LazyLogger, ProgressReporter
+
+
+class TestLazyLogger(unittest.TestCase):
+    """Test that disabled records cost no formatting."""
+
+    def test_lazy_argument_only_computed_when_enabled(self):
+        """Test that Lazy arguments run only if the record is emitted."""
+        logger = logging.getLogger("test_hot_path_lazy")
+        calls = []
+        lazy = Lazy(lambda: calls.append(1) or "value")
+
+        logger.setLevel(logging.INFO)
+        LazyLogger(logger).debug("value=%s", lazy)
+        self.assertEqual(calls, [])
+
+        logger.setLevel(logging.DEBUG)
+        with self.assertLogs(logger, level="DEBUG") as logs:
+            LazyLogger(logger).debug("value=%s", lazy)
+        self.assertEqual(calls, [1])
+        self.assertEqual(logs.records[0].getMessage(), "value=value")
+
+    def test_records_report_the_caller(self):
+        """Test that records carry the calling function and line, not the wrapper's."""
+        logger = logging.getLogger("test_hot_path_caller")
+        logger.setLevel(logging.DEBUG)
+        lazy = LazyLogger(logger)
+        reporter = ProgressReporter(logger, interval=5.0)
+
+        with self.assertLogs(logger, level="DEBUG") as logs:
+            first_line = sys._getframe().f_lineno + 1
+            lazy.debug("debug")
+            lazy.info("info")
+            lazy.log(logging.WARNING, "log")
+            reporter.report("progress")
+
+        self.assertEqual(
+            [(r.filename, r.funcName, r.lineno) for r in logs.records],
+            [("test_hot_path_logging.py", "test_records_report_the_caller", first_line + i) for i in range(4)],
+        )
+
+
+class TestProgressReporter(unittest.TestCase):
+    """Test the per-thread rate limiting."""
+
+    def test_one_line_per_interval_per_thread(self):
+        """Test that lines are dropped until the interval elapses, separately per thread."""
+        logger = logging.getLogger("test_hot_path_progress")
+        logger.setLevel(logging.INFO)
+        now = [100.0]
+        reporter = ProgressReporter(logger, interval=5.0, clock=lambda: now[0])
+
+        with self.assertLogs(logger, level="INFO") as logs:
+            self.assertTrue(reporter.report("progress %d", 1))
+            self.assertFalse(reporter.report("progress %d", 2))
+            now[0] += 5.0
+            self.assertTrue(reporter.report("progress %d", 3))
+
+            other = []
+            thread = threading.Thread(target=lambda: other.append(reporter.report("worker")))
+            thread.start()
+            thread.join()
+
+        self.assertEqual(other, [True])
+        self.assertEqual([r.getMessage() for r in logs.records], ["progress 1", "progress 3", "worker"])
+
+
+class TestCounterRegistry(unittest.TestCase):
+    """Test counters merged across threads and their summary."""
+
+    def test_counts_from_threads_are_merged(self):
+        """Test snapshot totals, the summary line and reset."""
+        registry = CounterRegistry()
+
+        def work():
+            for _ in range(1000):
+                registry.increment("events.sms")
+            registry.increment("events.call", 2)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(registry.snapshot(), {"events.call": 8, "events.sms": 4000})
+
+        logger = logging.getLogger("test_hot_path_counters")
+        logger.setLevel(logging.DEBUG)
+        with self.assertLogs(logger, level="DEBUG") as logs:
+            registry.log_summary(logger, "Events", prefix="events.sms")
+        self.assertIn("events.sms=4,000", logs.output[0])
+        self.assertNotIn("events.call", logs.output[0])
+
+        registry.reset()
+        self.assertEqual(registry.snapshot(), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
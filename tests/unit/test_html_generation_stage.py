@@ -13,6 +13,7 @@ Phase 3a Focus:
 """
 
 import json
+import os
 import pytest
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock, call
@@ -683,3 +684,90 @@ class TestStateFileFormat:
         assert isinstance(state['files_processed'], list)
         assert isinstance(state['stats'], dict)
         assert 'num_sms' in state['stats']
+
+
+class TestRenderInputInvalidation:
+    """Test that changing the rendering inputs re-renders every conversation."""
+
+    def test_changed_filter_option_rerenders(self, tmp_path):
+        """Files processed under other options or phone lookups are processed again."""
+        from core.conversation_manifest import write_manifest
+        from core.pipeline.state import StateManager
+        from core.processing_config import ProcessingConfig
+
+        stage = HtmlGenerationStage()
+        processing_dir = tmp_path / "processing"
+        processing_dir.mkdir()
+        output_dir = processing_dir / "conversations"
+        output_dir.mkdir()
+        (output_dir / "attachment_mapping.json").write_text(json.dumps({"metadata": {}, "mappings": {}}))
+        (output_dir / "attachments").mkdir()
+        calls_dir = processing_dir / "Calls"
+        calls_dir.mkdir()
+        call_file = calls_dir / "file1.html"
+        call_file.write_text("<html></html>")
+        state_manager = StateManager(tmp_path / "state")
+
+        def run(config):
+            context = PipelineContext(processing_dir=processing_dir, output_dir=output_dir,
+                                      config=config, state_manager=state_manager)
+            with patch('sms.process_html_files_param') as mock_process:
+                mock_process.return_value = {'num_sms': 1}
+                with patch('core.conversation_manager.ConversationManager'):
+                    result = stage.execute(context)
+            assert result.success is True
+            if not mock_process.called:
+                return []
+            return [str(f) for f in mock_process.call_args.kwargs['limited_files']]
+
+        config = ProcessingConfig(processing_dir=processing_dir)
+        assert run(config) == [str(call_file)]
+        assert run(config) == []
+
+        # A conversation written under the old options is removed, not left stale
+        (output_dir / "Stale.html").write_text("<html></html>")
+        write_manifest(output_dir, {"Stale": {"v": 1, "conversation_id": "Stale"}}, merge=False)
+
+        filtered = ProcessingConfig(processing_dir=processing_dir, filter_numbers_without_aliases=True)
+        assert run(filtered) == [str(call_file)]
+        assert not (output_dir / "Stale.html").exists()
+        assert run(filtered) == []
+
+        (processing_dir / "phone_lookup.txt").write_text("+15551234567|Alice\n")
+        assert run(filtered) == [str(call_file)]
+
+        # New previews from thumbnail_generation are shown on the re-rendered pages
+        from core.thumbnails import save_thumbnail_entries
+        save_thumbnail_entries(output_dir, {"attachments/Calls/a.jpg": {"thumbnail": "attachments/.thumbnails/a.webp"}})
+        assert run(filtered) == [str(call_file)]
+        assert run(filtered) == []
+        assert state_manager.get_recorded_items(stage.name) == {str(call_file)}
+
+    def test_resaved_phone_lookup_is_not_a_change(self, tmp_path):
+        """A second run with unchanged inputs processes nothing, although phone_lookup.txt is saved again."""
+        from core.phone_lookup import PhoneLookupManager
+        from core.processing_config import ProcessingConfig
+
+        processing_dir = tmp_path / "processing"
+        output_dir = processing_dir / "conversations"
+        (output_dir / "attachments").mkdir(parents=True)
+        (output_dir / "attachment_mapping.json").write_text(json.dumps({"metadata": {}, "mappings": {}}))
+        (processing_dir / "Calls").mkdir()
+        (processing_dir / "Calls" / "file1.html").write_text("<html></html>")
+        lookup_file = processing_dir / "phone_lookup.txt"  # created by the first run
+        context = PipelineContext(processing_dir=processing_dir, output_dir=output_dir,
+                                  config=ProcessingConfig(processing_dir=processing_dir))
+
+        def run():
+            with patch('sms.process_html_files_param', return_value={'num_sms': 1}) as mock_process, \
+                    patch('core.conversation_manager.ConversationManager'):
+                result = HtmlGenerationStage().execute(context)
+            assert result.success is True
+            return mock_process.call_count
+
+        assert run() == 1
+        assert lookup_file.exists()
+        # What the PhoneLookupManager's exit handler does after every run
+        PhoneLookupManager(lookup_file, enable_prompts=False).force_save_aliases()
+        os.utime(lookup_file, ns=(1, 1))
+        assert run() == 0
@@ -0,0 +1,193 @@
+"""
+Unit tests for updating an existing output from a newer Takeout drop.
+"""
+
+import time
+from unittest.mock import patch
+
+from core.conversation_manager import ConversationManager
+from core.conversation_manifest import load_manifest
+from core.incremental_update import (
+    diff_source_files,
+    list_source_files,
+    load_source_manifest,
+    merge_rows,
+    scan_source_files,
+    write_source_manifest,
+)
+from core.path_manager import PathManager
+from core.phone_lookup import PhoneLookupManager
+from core.processing_config import ProcessingConfig
+from core.processing_context import ProcessingContext
+from sms import process_html_files_param, run_incremental_update
+from templates.loader import get_template_loader
+
+from tests.unit.test_message_dedup import write_conversation
+
+ALICE = ("Alice", "+15551110001")
+BOB = ("Bob", "+15552220002")
+CAROL = ("Carol", "+15553330003")
+
+
+def make_context(processing_dir, output_dir, **options):
+    config = ProcessingConfig(
+        processing_dir=processing_dir, output_dir=output_dir, filter_non_phone_numbers=False, **options
+    )
+    context = ProcessingContext(
+        conversation_manager=ConversationManager(output_dir),
+        phone_lookup_manager=PhoneLookupManager(output_dir / "phone_lookup.txt", enable_prompts=False),
+        path_manager=PathManager(processing_dir=processing_dir, output_dir=output_dir),
+        config=config,
+        processing_dir=processing_dir,
+        output_dir=output_dir,
+        log_filename="gvoice_converter.log",
+        test_mode=False,
+        test_limit=0,
+        limited_html_files=None,
+    )
+    return config, context
+
+
+def full_run(processing_dir, output_dir, **options):
+    """What convert writes: pages, manifest, index.html and the source file record."""
+    config, context = make_context(processing_dir, output_dir, **options)
+    stats = process_html_files_param(
+        processing_dir, {}, context.conversation_manager, context.phone_lookup_manager,
+        config=config, context=context, enable_performance_monitoring=False,
+    )
+    context.conversation_manager.generate_index_html(stats, 1.0)
+    write_source_manifest(output_dir, scan_source_files(processing_dir, list_source_files(processing_dir)), config)
+
+
+def page_with(output_dir, text):
+    """The conversation page showing a message text."""
+    return next(page for page in output_dir.glob("*.html") if f">{text}<" in page.read_text())
+
+
+def index_slots(output_dir):
+    slots = get_template_loader().get_compiled_template("index").parse((output_dir / "index.html").read_text())
+    del slots["elapsed_time"], slots["timestamp"]
+    return slots
+
+
+class TestSourceFiles:
+    """Test source file fingerprints and row merging."""
+
+    def test_scan_and_diff(self, tmp_path):
+        write_conversation(tmp_path, *ALICE, [("2020-01-01T10:00:00", "hi")])
+        write_conversation(tmp_path, *BOB, [("2020-01-02T10:00:00", "yo")])
+        before = scan_source_files(tmp_path, list_source_files(tmp_path))
+
+        write_conversation(tmp_path, *BOB, [("2020-01-02T10:00:00", "yo"), ("2020-01-03T10:00:00", "again")])
+        write_conversation(tmp_path, *CAROL, [("2020-01-04T10:00:00", "new")])
+        with patch("core.incremental_update.file_checksum", wraps=__import__(
+            "core.pipeline.fingerprint", fromlist=["file_checksum"]).file_checksum) as checksum:
+            after = scan_source_files(tmp_path, list_source_files(tmp_path), before)
+
+        assert checksum.call_count == 2  # Alice's size and mtime are unchanged
+        changed, removed = diff_source_files(before, after)
+        assert [key.split(" - ")[0] for key in changed] == ["Calls/Bob", "Calls/Carol"]
+        assert removed == []
+
+    def test_merge_rows_keeps_existing_rows_first_on_ties(self):
+        def row(when, text):
+            return f'\n    <tr>\n        <td class="timestamp">{when}</td><td>{text}</td>\n    </tr>'
+
+        existing = [row("2020-01-01 10:00:00", "a"), row("2020-01-03 10:00:00", "c")]
+        new = [row("2020-01-02 10:00:00", "b"), row("2020-01-03 10:00:00", "d")]
+
+        assert "".join(merge_rows(existing, new)) == "\n".join(
+            [existing[0], new[0], existing[1], new[1]]
+        )
+
+
+class TestIncrementalUpdate:
+    """An update run over a newer drop matches a full run over it."""
+
+    def test_update_matches_full_run(self, tmp_path):
+        alice_old = [("2020-01-01T10:00:00", "first"), ("2020-01-02T10:00:00", "second")]
+        alice_new = alice_old + [("2020-01-01T12:00:00", "late reply"), ("2020-03-01T10:00:00", "third")]
+        bob = [("2020-02-01T10:00:00", "hey")]
+        for drop, alice in (("old", alice_old), ("new", alice_new)):
+            write_conversation(tmp_path / drop, *ALICE, alice)
+            write_conversation(tmp_path / drop, *BOB, bob)
+        write_conversation(tmp_path / "new", *CAROL, [("2020-03-02T10:00:00", "hello")])
+
+        full_run(tmp_path / "old", tmp_path / "updated")
+        full_run(tmp_path / "new", tmp_path / "full")
+        bob_page = page_with(tmp_path / "updated", "hey")
+        bob_mtime = bob_page.stat().st_mtime_ns
+
+        config, context = make_context(tmp_path / "new", tmp_path / "updated")
+        with patch("sms.process_single_html_file", wraps=__import__("sms").process_single_html_file) as parse:
+            stats = run_incremental_update(tmp_path / "updated", config, context, time.time())
+
+        assert parse.call_count == 2  # Alice's changed file and Carol's new one
+        assert stats["num_sms"] == 3  # the two old Alice messages were already on the page
+        assert bob_page.stat().st_mtime_ns == bob_mtime
+
+        pages = sorted(p.name for p in (tmp_path / "full").glob("*.html") if p.name != "index.html")
+        assert pages == sorted(p.name for p in (tmp_path / "updated").glob("*.html") if p.name != "index.html")
+        for name in pages:
+            assert (tmp_path / "updated" / name).read_text() == (tmp_path / "full" / name).read_text(), name
+        assert not list((tmp_path / "updated").glob("*.partial"))
+
+        assert index_slots(tmp_path / "updated") == index_slots(tmp_path / "full")
+        updated_manifest = load_manifest(tmp_path / "updated")
+        full_manifest = load_manifest(tmp_path / "full")
+        assert len(updated_manifest) == len(full_manifest) == 3
+        for conversation_id in full_manifest:
+            for key in ("message_count", "sms_count", "first_timestamp", "last_timestamp", "sha256"):
+                assert updated_manifest[conversation_id][key] == full_manifest[conversation_id][key]
+
+    def test_unchanged_drop_parses_nothing(self, tmp_path):
+        write_conversation(tmp_path / "drop", *ALICE, [("2020-01-01T10:00:00", "hi")])
+        full_run(tmp_path / "drop", tmp_path / "out")
+        page = page_with(tmp_path / "out", "hi")
+
+        config, context = make_context(tmp_path / "drop", tmp_path / "copy")
+        with patch("sms.process_html_files_param") as process:
+            stats = run_incremental_update(tmp_path / "out", config, context, time.time())
+
+        process.assert_not_called()
+        assert stats["num_sms"] == 0
+        assert (tmp_path / "copy" / page.name).read_text() == page.read_text()
+        assert index_slots(tmp_path / "copy") == index_slots(tmp_path / "out")
+
+    def test_test_mode_keeps_record_of_unscanned_files(self, tmp_path):
+        write_conversation(tmp_path / "drop", *ALICE, [("2020-01-01T10:00:00", "hi")])
+        write_conversation(tmp_path / "drop", *BOB, [("2020-02-01T10:00:00", "hey")])
+        full_run(tmp_path / "drop", tmp_path / "out")
+        recorded = load_source_manifest(tmp_path / "out")["files"]
+        assert len(recorded) == 2
+
+        config, context = make_context(tmp_path / "drop", tmp_path / "out")
+        context.test_mode = True
+        context.limited_html_files = list_source_files(tmp_path / "drop")[:1]
+        run_incremental_update(tmp_path / "out", config, context, time.time())
+
+        assert load_source_manifest(tmp_path / "out")["files"] == recorded
+
+    def test_update_repaginates_paginated_conversation(self, tmp_path):
+        alice_old = [("2019-05-01T10:00:00", "a"), ("2019-06-01T10:00:00", "b"), ("2020-05-01T10:00:00", "c")]
+        alice_new = alice_old + [("2019-07-01T10:00:00", "d"), ("2021-05-01T10:00:00", "e")]
+        write_conversation(tmp_path / "old", *ALICE, alice_old)
+        write_conversation(tmp_path / "new", *ALICE, alice_new)
+
+        full_run(tmp_path / "old", tmp_path / "updated", paginate_messages=2)
+        full_run(tmp_path / "new", tmp_path / "full", paginate_messages=2)
+        assert len(list((tmp_path / "updated" / "pages").glob("*/*.html"))) == 2
+
+        config, context = make_context(tmp_path / "new", tmp_path / "updated", paginate_messages=2)
+        stats = run_incremental_update(tmp_path / "updated", config, context, time.time())
+
+        assert stats["num_sms"] == 2
+        full_pages = sorted(p.relative_to(tmp_path / "full") for p in (tmp_path / "full").rglob("*.html"))
+        assert full_pages == sorted(p.relative_to(tmp_path / "updated") for p in (tmp_path / "updated").rglob("*.html"))
+        for name in full_pages:
+            if name.name != "index.html":
+                assert (tmp_path / "updated" / name).read_text() == (tmp_path / "full" / name).read_text(), name
+        assert index_slots(tmp_path / "updated") == index_slots(tmp_path / "full")
+        record = next(iter(load_manifest(tmp_path / "updated").values()))
+        assert record["message_count"] == 5
+        assert record["pages"] == next(iter(load_manifest(tmp_path / "full").values()))["pages"]
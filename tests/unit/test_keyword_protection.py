@@ -490,3 +490,82 @@ class TestEdgeCases:
         # Test no match
         is_protected, keyword = protection.test_keyword("Hello")
         assert is_protected is False
+
+
+class TestCompiledMatcher:
+    """Test that the compiled matcher keeps the per-keyword semantics."""
+
+    def test_matches_previous_scan(self, tmp_path):
+        """Compare against a plain per-keyword scan over the joined text."""
+        import re
+
+        keywords = ["incident", "Ed Harbur", "ed", "cat", "C++ dev", "harbur"]
+        messages_sets = [
+            [{"text": "Talked to Ed Harbur about the incident"}],
+            [{"text": "the category is new"}],
+            [{"text": "need a c++ dev asap"}],
+            [{"text": "edited"}, {"text": "  "}, {"text": "Harbur called"}],
+            [{"text": "nothing here"}],
+        ]
+        for match_partial in (True, False):
+            keywords_file = tmp_path / f"keywords_{match_partial}.json"
+            keywords_file.write_text(json.dumps({
+                "case_sensitive": False,
+                "match_partial": match_partial,
+                "keywords": {"mixed": keywords},
+                "regex_patterns": []
+            }))
+            protection = KeywordProtection(keywords_file)
+
+            for messages in messages_sets:
+                full_text = " ".join(m["text"] for m in messages).lower()
+                expected = None
+                for keyword in keywords:
+                    if match_partial:
+                        found = keyword.lower() in full_text
+                    else:
+                        found = re.search(r'\b' + re.escape(keyword.lower()) + r'\b', full_text)
+                    if found:
+                        expected = keyword
+                        break
+                assert protection.is_protected(messages) == (expected is not None, expected)
+
+    def test_regex_scans_joined_text(self, tmp_path):
+        """Anchors apply to the joined conversation text and patterns report in file order."""
+        keywords_file = tmp_path / "keywords.json"
+        keywords_file.write_text(json.dumps({
+            "keywords": {},
+            "regex_patterns": [r"^Invoice", r"paid$", r"\d{4}", r"(ref)-\1"]
+        }))
+        protection = KeywordProtection(keywords_file)
+
+        # ^ and $ anchor at the start and end of the whole text, not of each message
+        assert protection.is_protected([{"text": "Hi"}, {"text": "Invoice attached"}]) == (False, None)
+        assert protection.is_protected([{"text": "paid"}], conversation_id="Acme_Co") == (False, None)
+        assert protection.is_protected([{"text": "invoice 12"}, {"text": "all paid"}]) == (
+            True, "^Invoice (matched: 'invoice')"
+        )
+        # The first pattern in file order wins, even when a later one matches an earlier message
+        assert protection.is_protected([{"text": "code 2024"}, {"text": "now paid"}]) == (
+            True, "paid$ (matched: 'paid')"
+        )
+        assert protection.is_protected([{"text": "ref-ref"}]) == (True, "(ref)-\\1 (matched: 'ref-ref')")
+
+    def test_unicode_case_folding(self, tmp_path):
+        """Lowercasing that changes length (e.g. 'İ') behaves as in the per-keyword check."""
+        # Partial matching compares lowercased strings ('İ' -> 'i̇'); exact matching
+        # uses IGNORECASE on the original text, where 'İ' matches 'i' but not 'i̇'
+        expected_for_capital = {True: "İstanbul", False: "istanbul"}
+        for match_partial in (True, False):
+            keywords_file = tmp_path / f"keywords_{match_partial}.json"
+            keywords_file.write_text(json.dumps({
+                "match_partial": match_partial,
+                "keywords": {"places": ["İstanbul", "istanbul"]},
+                "regex_patterns": []
+            }))
+            protection = KeywordProtection(keywords_file)
+
+            assert protection.is_protected([{"text": "Trip to İSTANBUL"}]) == (
+                True, expected_for_capital[match_partial]
+            )
+            assert protection.is_protected([{"text": "Trip to Istanbul"}]) == (True, "istanbul")
@@ -16,10 +16,16 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 from utils.memory_monitor import (
     MemoryMonitor,
     MemorySnapshot,
+    ResourceSample,
+    ResourceSampler,
     get_memory_monitor,
     monitor_memory_usage,
     get_memory_summary,
-    generate_memory_recommendations
+    generate_memory_recommendations,
+    start_resource_sampler,
+    stop_resource_sampler,
+    get_resource_sampler,
+    mark_phase,
 )
 
 
@@ -339,5 +345,108 @@ class TestMemoryMonitorFunctions(unittest.TestCase):
         self.assertEqual(result, ["rec1", "rec2"])
 
 
+class TestResourceSampler(unittest.TestCase):
+    """Test background resource sampling and phase tagging."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        import utils.memory_monitor
+        stop_resource_sampler()
+        utils.memory_monitor._resource_sampler = None
+        self.sampler = ResourceSampler(interval=0.01, capacity=5)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.sampler.stop()
+        import utils.memory_monitor
+        if utils.memory_monitor._resource_sampler is not None:
+            utils.memory_monitor._resource_sampler.stop()
+            utils.memory_monitor._resource_sampler = None
+
+    def _sample(self, rss_mb, cpu, phase):
+        return ResourceSample(time.time(), rss_mb, cpu, 2, 3, phase)
+
+    def test_invalid_configuration(self):
+        """Test that non-positive interval or capacity is rejected."""
+        with self.assertRaises(ValueError):
+            ResourceSampler(interval=0)
+        with self.assertRaises(ValueError):
+            ResourceSampler(capacity=0)
+
+    def test_ring_buffer_is_bounded(self):
+        """Test that the ring buffer keeps only the most recent samples."""
+        for i in range(12):
+            self.sampler.record_sample(self._sample(float(i), 1.0, "startup"))
+
+        self.assertEqual(len(self.sampler.samples), 5)
+        self.assertEqual(self.sampler.samples[0].rss_mb, 7.0)
+        self.assertEqual(self.sampler.samples[-1].rss_mb, 11.0)
+
+    def test_sample_now_tags_current_phase(self):
+        """Test that samples carry the phase set by mark_phase."""
+        self.sampler.mark_phase("html_processing")
+        sample = self.sampler.sample_now()
+
+        self.assertIsNotNone(sample)
+        self.assertEqual(sample.phase, "html_processing")
+        self.assertGreater(sample.rss_mb, 0)
+        self.assertGreaterEqual(sample.open_fds, 0)
+
+    def test_phase_report_aggregates_peaks(self):
+        """Test per-phase peak RSS and CPU aggregation."""
+        self.sampler.mark_phase("mapping")
+        self.sampler.record_sample(self._sample(100.0, 10.0, "mapping"))
+        self.sampler.record_sample(self._sample(150.0, 30.0, "mapping"))
+        self.sampler.mark_phase("processing")
+        self.sampler.record_sample(self._sample(120.0, 90.0, "processing"))
+
+        report = {entry["phase"]: entry for entry in self.sampler.get_phase_report()}
+
+        self.assertEqual([e["phase"] for e in self.sampler.get_phase_report()],
+                         ["startup", "mapping", "processing"])
+        self.assertEqual(report["mapping"]["samples"], 2)
+        self.assertEqual(report["mapping"]["peak_rss_mb"], 150.0)
+        self.assertEqual(report["mapping"]["peak_cpu_percent"], 30.0)
+        self.assertEqual(report["mapping"]["avg_cpu_percent"], 20.0)
+        self.assertEqual(report["processing"]["peak_rss_mb"], 120.0)
+        self.assertEqual(report["startup"]["samples"], 0)
+
+    def test_phase_totals_survive_buffer_wraparound(self):
+        """Test that phase aggregates are not lost when old samples are evicted."""
+        for i in range(20):
+            self.sampler.record_sample(self._sample(float(i), 1.0, "startup"))
+
+        report = self.sampler.get_phase_report()
+        self.assertEqual(report[0]["samples"], 20)
+        self.assertEqual(report[0]["peak_rss_mb"], 19.0)
+
+    def test_background_thread_collects_samples(self):
+        """Test that start() samples in the background and stop() joins the thread."""
+        self.sampler.start()
+        self.assertTrue(self.sampler.is_running)
+        deadline = time.time() + 2.0
+        while not self.sampler.samples and time.time() < deadline:
+            time.sleep(0.01)
+        self.sampler.stop()
+
+        self.assertFalse(self.sampler.is_running)
+        self.assertGreater(len(self.sampler.samples), 0)
+
+    def test_global_sampler_functions(self):
+        """Test start/mark/stop convenience functions."""
+        mark_phase("ignored")  # No-op before the sampler is started
+        self.assertIsNone(get_resource_sampler())
+
+        sampler = start_resource_sampler(interval=0.01, capacity=10)
+        self.assertIs(get_resource_sampler(), sampler)
+        mark_phase("finalize_conversations")
+        self.assertEqual(sampler.current_phase, "finalize_conversations")
+
+        report = stop_resource_sampler()
+        phases = [entry["phase"] for entry in report]
+        self.assertIn("finalize_conversations", phases)
+        self.assertNotIn("ignored", phases)
+
+
 if __name__ == "__main__":
     unittest.main()
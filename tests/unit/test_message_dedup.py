@@ -0,0 +1,152 @@
+"""
+Unit tests for cross-export message fingerprints and merged runs.
+"""
+
+import re
+import shutil
+from pathlib import Path
+
+import pytest
+
+import sms
+from core.conversation_manager import ConversationManager
+from core.message_dedup import FINGERPRINT_DB_FILENAME, MessageDeduplicator, message_fingerprint
+from core.phone_lookup import PhoneLookupManager
+from core.processing_config import ProcessingConfig
+from core.processing_context import create_processing_context
+from sms import process_html_files_param
+
+TEST_DATA = Path(__file__).resolve().parents[1] / "data" / "test_data"
+
+
+def write_conversation(root, name, phone, messages):
+    """Write one Takeout text conversation file with (iso time, text) messages."""
+    calls = root / "Calls"
+    calls.mkdir(parents=True, exist_ok=True)
+    rows = "".join(
+        f"""<div class="message">
+        <abbr class="dt" title="{when}.000-00:00">x</abbr>
+        <cite class="sender vcard"><a class="tel" href="tel:{phone}"><span class="fn">{name}</span></a></cite>
+        <q>{text}</q>
+        </div>"""
+        for when, text in messages
+    )
+    first = messages[0][0].replace(":", "_")
+    (calls / f"{name} - Text - {first}Z.html").write_text(f"<html><body>{rows}</body></html>")
+
+
+class TestMessageFingerprint:
+    """Test which message details the fingerprint depends on."""
+
+    def test_normalization(self):
+        base = message_fingerprint("Alice", 1000, "Alice", "see  you\nsoon", ["<a href='attachments/Calls/a.jpg'>📷</a>"])
+
+        assert base == message_fingerprint(" alice ", 1000, "ALICE", "see you soon", [{"filename": "Calls/a.jpg"}])
+        assert base != message_fingerprint("Alice", 1001, "Alice", "see you soon", [{"filename": "a.jpg"}])
+        assert base != message_fingerprint("Alice", 1000, "Alice", "see you soon", [])
+        assert base != message_fingerprint("Alice", 1000, "Alice", "see you soon", ["b.jpg"], message_type="call")
+        assert len(base) == 16
+
+
+class TestMessageDeduplicator:
+    """Test the on-disk set, per-source counts and stats adjustment."""
+
+    def test_drops_only_repeats_from_earlier_sources(self, tmp_path):
+        dedup = MessageDeduplicator(tmp_path / FINGERPRINT_DB_FILENAME)
+        photo = ["<a href='attachments/x.jpg'>📷 Image</a>"]
+        dedup.begin_source("old")
+        assert not dedup.is_duplicate("Alice", 1, "Alice", "hi", photo)
+        assert not dedup.is_duplicate("Alice", 1, "Alice", "hi", photo)  # repeated within one export: kept
+        dedup.begin_source("new")
+        assert dedup.is_duplicate("Alice", 1, "Alice", "hi", photo)
+        assert not dedup.is_duplicate("Alice", 2, "Alice", "hello")
+
+        report = dedup.source_report()
+        assert [(r["source"], r["messages"], r["duplicates"]) for r in report] == [("old", 2, 0), ("new", 2, 1)]
+        assert report[1]["duplicate_rate"] == 0.5
+        assert dedup.add_merged_stats({"num_sms": 2, "num_img": 1}) == {"num_sms": 3, "num_img": 1}
+        assert dedup.adjust_stats({"num_sms": 4, "num_img": 1, "num_calls": 0}) == {
+            "num_sms": 3, "num_img": 0, "num_calls": 0,
+        }
+        dedup.close()
+
+        # Reopened without reset, earlier fingerprints belong to earlier sources
+        dedup = MessageDeduplicator(tmp_path / FINGERPRINT_DB_FILENAME, reset=False)
+        dedup.begin_source("newest")
+        assert dedup.is_duplicate("Alice", 2, "Alice", "hello")
+        dedup.close()
+
+
+class TestMergedRun:
+    """A merged run over overlapping exports matches a run over their union."""
+
+    def convert(self, sources, output_dir, merge):
+        config = ProcessingConfig(processing_dir=sources[0], output_dir=output_dir, filter_non_phone_numbers=False)
+        manager = ConversationManager(output_dir)
+        lookup = PhoneLookupManager(output_dir / "phone_lookup.txt", enable_prompts=False)
+        if merge:
+            manager.deduplicator = MessageDeduplicator(output_dir / FINGERPRINT_DB_FILENAME)
+        stats = {}
+        for source in sources:
+            if merge:
+                manager.deduplicator.begin_source(source)
+            source_stats = process_html_files_param(
+                source, {}, manager, lookup, config=config, enable_performance_monitoring=False, finalize=False,
+            )
+            for key, value in source_stats.items():
+                stats[key] = stats.get(key, 0) + value
+        if merge:
+            manager.deduplicator.adjust_stats(stats)
+            report = manager.deduplicator.source_report()
+            manager.deduplicator.close()
+            manager.deduplicator = None
+        else:
+            report = None
+        manager.finalize_conversation_files(config=config)
+        return stats, report
+
+    def test_merge_matches_single_export(self, tmp_path):
+        old_messages = [("2020-01-01T10:00:00", "first"), ("2020-01-02T10:00:00", "second")]
+        new_messages = old_messages + [("2020-03-01T10:00:00", "third")]
+        write_conversation(tmp_path / "old", "Alice", "+15551110001", old_messages)
+        write_conversation(tmp_path / "new", "Alice", "+15551110001", new_messages)
+        write_conversation(tmp_path / "new", "Bob", "+15552220002", [("2020-03-02T10:00:00", "hey")])
+
+        merged_stats, report = self.convert([tmp_path / "old", tmp_path / "new"], tmp_path / "merged", merge=True)
+        single_stats, _ = self.convert([tmp_path / "new"], tmp_path / "single", merge=False)
+
+        assert merged_stats["num_sms"] == single_stats["num_sms"] == 4
+        assert [(r["messages"], r["duplicates"]) for r in report] == [(2, 0), (4, 2)]
+        merged_pages = sorted(p.name for p in (tmp_path / "merged").glob("*.html"))
+        assert merged_pages == sorted(p.name for p in (tmp_path / "single").glob("*.html"))
+        for name in merged_pages:
+            assert (tmp_path / "merged" / name).read_text() == (tmp_path / "single" / name).read_text()
+
+    @pytest.mark.skipif(not TEST_DATA.is_dir(), reason="tests/data/test_data not available")
+    def test_merging_an_export_with_itself_gives_the_single_run_output(self, tmp_path, monkeypatch):
+        """The copy adds nothing: same pages, and an index with the same counts."""
+        monkeypatch.setattr(sms, "ENABLE_PERFORMANCE_MONITORING", False)
+        for name in ("single", "merged", "copy"):
+            shutil.copytree(TEST_DATA, tmp_path / name)
+        options = dict(
+            filter_non_phone_numbers=False,
+            filter_numbers_without_aliases=False,
+            skip_filtered_contacts=False,
+            include_call_only_conversations=True,
+        )
+
+        for name, merge_sources in (("single", ()), ("merged", (tmp_path / "copy",))):
+            config = ProcessingConfig(processing_dir=tmp_path / name, merge_sources=merge_sources, **options)
+            sms.main(config, create_processing_context(config))
+
+        single, merged = tmp_path / "single" / "conversations", tmp_path / "merged" / "conversations"
+        pages = sorted(p.name for p in single.glob("*.html"))
+        assert len(pages) > 1
+        assert sorted(p.name for p in merged.glob("*.html")) == pages
+        for name in pages:
+            if name != "index.html":
+                assert (merged / name).read_text() == (single / name).read_text()
+        timing = re.compile(r"Process(?:ing completed in [0-9.]+ seconds|ed on [0-9: -]+)")
+        assert timing.sub("", (merged / "index.html").read_text()) == timing.sub(
+            "", (single / "index.html").read_text()
+        )
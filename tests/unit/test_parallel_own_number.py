@@ -155,8 +155,8 @@ class TestParallelOwnNumber(unittest.TestCase):
         # Verify conversation was written (with hash-based ID)
         # The filename "Ed Harbur - Text - ..." generates a hash like "UN_..."
         # which is now used directly as a valid conversation ID
-        self.assertTrue(mock_conv_mgr.write_message_with_content.called or
-                       mock_conv_mgr.add_message.called,
+        # Messages of a file are handed over in one write_batch() call
+        self.assertTrue(mock_conv_mgr.write_batch.called,
                        "Conversation should be written with hash-based ID")
 
 
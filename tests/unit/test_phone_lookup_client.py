@@ -0,0 +1,277 @@
+"""
+Unit tests for the concurrent phone lookup client.
+
+Runs the client against a local stub HTTP server so retries, rate limiting,
+concurrency bounds and the response cache can be exercised without
+touching a real provider.
+"""
+
+import asyncio
+import json
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from core.phone_lookup_client import (
+    LookupResponseCache,
+    PhoneLookupClient,
+    TokenBucket,
+    fetch_known_numbers,
+)
+from core.pipeline.stages import PhoneLookupStage
+
+
+class StubProviderHandler(BaseHTTPRequestHandler):
+    """Returns a JSON lookup for /<key>/<number>; numbers ending in 429 fail once."""
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append(self.path)
+            server.in_flight += 1
+            server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            time.sleep(server.response_delay)
+            number = self.path.rstrip("/").split("/")[-1]
+            with server.lock:
+                first_attempt = number not in server.seen
+                server.seen.add(number)
+            if number.endswith("429") and first_attempt:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            if number.endswith("404"):
+                self.send_response(404)
+                self.end_headers()
+                return
+            body = json.dumps({"success": True, "fraud_score": 80, "carrier": "Stub", "line_type": "VOIP"})
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.end_headers()
+            self.wfile.write(body.encode("utf-8"))
+        finally:
+            with server.lock:
+                server.in_flight -= 1
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubProviderTestCase(unittest.TestCase):
+    """Starts a stub provider on an ephemeral port for each test."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubProviderHandler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.server.seen = set()
+        self.server.in_flight = 0
+        self.server.max_in_flight = 0
+        self.server.response_delay = 0.0
+        self.server_thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+        self.server_thread.start()
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}/api"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def make_client(self, **kwargs):
+        options = dict(
+            provider="stub",
+            url_builder=lambda number: f"{self.base_url}/KEY/{number.lstrip('+')}",
+            requests_per_minute=60000,
+            max_concurrency=4,
+            backoff_base=0.01,
+            timeout=5,
+        )
+        options.update(kwargs)
+        return PhoneLookupClient(**options)
+
+
+class TestPhoneLookupClient(StubProviderTestCase):
+    """Test PhoneLookupClient against the stub provider."""
+
+    def test_lookup_many_returns_outcomes_in_input_order(self):
+        """Test that every number gets an outcome and duplicates are collapsed."""
+        numbers = ["+15550000001", "+15550000002", "+15550000001"]
+        outcomes = self.make_client().lookup_many(numbers)
+
+        self.assertEqual(list(outcomes), ["+15550000001", "+15550000002"])
+        self.assertTrue(all(o.success for o in outcomes.values()))
+        self.assertEqual(outcomes["+15550000001"].response["carrier"], "Stub")
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_retries_rate_limited_response(self):
+        """Test that HTTP 429 is retried and then succeeds."""
+        client = self.make_client()
+        outcomes = client.lookup_many(["+15550000429"])
+
+        outcome = outcomes["+15550000429"]
+        self.assertTrue(outcome.success)
+        self.assertEqual(outcome.attempts, 2)
+        self.assertEqual(client.stats["retries"], 1)
+
+    def test_non_retryable_error_fails_fast(self):
+        """Test that HTTP 404 is not retried."""
+        client = self.make_client()
+        outcome = client.lookup_many(["+15550000404"])["+15550000404"]
+
+        self.assertFalse(outcome.success)
+        self.assertIn("404", outcome.error)
+        self.assertEqual(outcome.attempts, 1)
+        self.assertEqual(client.stats["failures"], 1)
+
+    def test_concurrency_is_bounded(self):
+        """Test that no more than max_concurrency requests are in flight."""
+        self.server.response_delay = 0.05
+        numbers = [f"+1555000{i:04d}" for i in range(12)]
+
+        outcomes = self.make_client(max_concurrency=3).lookup_many(numbers)
+
+        self.assertEqual(len(outcomes), 12)
+        self.assertLessEqual(self.server.max_in_flight, 3)
+        self.assertGreater(self.server.max_in_flight, 1)
+
+    def test_cache_avoids_repeat_requests(self):
+        """Test that a second run is served from the on-disk cache."""
+        cache_path = self.temp_path / "cache.sqlite"
+        numbers = ["+15550000001", "+15550000002"]
+
+        cache = LookupResponseCache(cache_path)
+        self.make_client(cache=cache).lookup_many(numbers)
+        cache.close()
+        self.assertEqual(len(self.server.requests), 2)
+
+        cache = LookupResponseCache(cache_path)
+        client = self.make_client(cache=cache)
+        outcomes = client.lookup_many(numbers)
+        cache.close()
+
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertEqual(client.stats["cache_hits"], 2)
+        self.assertTrue(all(o.from_cache for o in outcomes.values()))
+
+    def test_expired_cache_entries_are_refetched(self):
+        """Test that entries older than the TTL are ignored and purged."""
+        cache = LookupResponseCache(self.temp_path / "cache.sqlite", ttl_seconds=0.01)
+        cache.put("stub", "+15550000001", {"success": True})
+        time.sleep(0.02)
+
+        self.assertEqual(cache.get_many("stub", ["+15550000001"]), {})
+        self.assertEqual(cache.purge_expired(), 1)
+        cache.close()
+
+    def test_on_request_runs_before_each_request(self):
+        """Test that on_request sees each uncached number once, before its request is sent."""
+        cache = LookupResponseCache(self.temp_path / "cache.sqlite")
+        cache.put("stub", "+15550000001", {"success": True})
+        started = []
+
+        def on_request(number):
+            with self.server.lock:
+                started.append((number, any(path.endswith(number.lstrip("+")) for path in self.server.requests)))
+
+        self.make_client(cache=cache, on_request=on_request).lookup_many(
+            ["+15550000001", "+15550000002", "+15550000429"]
+        )
+        cache.close()
+
+        self.assertEqual(sorted(started), [("+15550000002", False), ("+15550000429", False)])
+        self.assertEqual(len(self.server.requests), 3)  # the 429 retry is not reported again
+
+    def test_uncacheable_responses_are_not_stored(self):
+        """Test that the is_cacheable predicate keeps responses out of the cache."""
+        cache = LookupResponseCache(self.temp_path / "cache.sqlite")
+        self.make_client(cache=cache, is_cacheable=lambda data: False).lookup_many(["+15550000001"])
+
+        self.assertEqual(cache.get_many("stub", ["+15550000001"]), {})
+        cache.close()
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test the async token bucket."""
+
+    def test_rate_is_enforced(self):
+        """Test that acquiring beyond capacity waits for refill."""
+        bucket = TokenBucket(rate=50.0, capacity=1)
+
+        async def acquire_many():
+            for _ in range(6):
+                await bucket.acquire()
+
+        start = time.monotonic()
+        asyncio.run(acquire_many())
+        elapsed = time.monotonic() - start
+
+        # First token is free, the next five need 1/50s each
+        self.assertGreaterEqual(elapsed, 0.09)
+
+    def test_invalid_parameters(self):
+        """Test that invalid rate or capacity is rejected."""
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=1, capacity=0)
+
+
+class TestFetchKnownNumbers(unittest.TestCase):
+    """Test the bulk phone_directory membership query."""
+
+    def test_returns_only_known_numbers(self):
+        """Test bulk lookup across more numbers than one IN chunk."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = Path(temp_dir) / "phone_directory.sqlite"
+            PhoneLookupStage(api_provider="manual")._init_phone_directory(db_path)
+            with sqlite3.connect(db_path) as conn:
+                conn.executemany(
+                    "INSERT INTO phone_directory (phone_number, source) VALUES (?, 'api')",
+                    [(f"+1555{i:07d}",) for i in range(0, 1200, 2)],
+                )
+
+            numbers = [f"+1555{i:07d}" for i in range(1200)]
+            known = fetch_known_numbers(db_path, numbers)
+
+        self.assertEqual(len(known), 600)
+        self.assertIn("+15550000000", known)
+        self.assertNotIn("+15550000001", known)
+
+    def test_missing_database_returns_empty_set(self):
+        """Test that a missing database means nothing is known."""
+        self.assertEqual(fetch_known_numbers(Path("/nonexistent/db.sqlite"), ["+1"]), set())
+
+
+class TestPhoneLookupStageApi(StubProviderTestCase):
+    """Test PhoneLookupStage API lookups against the stub provider."""
+
+    def test_perform_api_lookups_skips_known_numbers(self):
+        """Test that known numbers are skipped and new ones are looked up concurrently."""
+        stage = PhoneLookupStage(api_provider="ipqualityscore", api_key="KEY", base_url=self.base_url)
+        db_path = self.temp_path / "phone_directory.sqlite"
+        stage._init_phone_directory(db_path)
+        stage._update_phone_directory(db_path, [{
+            "phone_number": "+15550000001", "source": "manual", "lookup_date": "2024-01-01"
+        }])
+
+        results = stage._perform_api_lookups(["+15550000001", "+15550000002", "+15550000003"], db_path)
+
+        self.assertEqual(sorted(r["phone_number"] for r in results), ["+15550000002", "+15550000003"])
+        self.assertTrue(all(r["is_spam"] for r in results))
+        self.assertEqual(results[0]["line_type"], "voip")
+        self.assertEqual(len(self.server.requests), 2)
+        self.assertTrue((self.temp_path / "phone_lookup_cache.sqlite").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
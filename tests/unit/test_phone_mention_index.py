@@ -0,0 +1,135 @@
+"""
+Unit tests for the inverted phone-number index used by the analysis tools.
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.conversation_manager import ConversationManager
+from core.phone_mention_index import (
+    PHONE_INDEX_FILENAME,
+    PhoneMentionIndex,
+    normalize_phone_number,
+    scan_conversation_file,
+)
+
+# 2022-01-01 00:00:00 UTC and a day later, in milliseconds
+TS_1 = 1640995200000
+TS_2 = 1641081600000
+
+
+class TestPhoneNumberScanning(unittest.TestCase):
+    """Test number normalization and single-file scanning."""
+
+    def test_normalize_phone_number(self):
+        """Test that common formats normalize to the same key."""
+        for text in ["+15559876543", "(555) 987-6543", "555.987.6543", "1-555-987-6543", "+1 555 987 6543"]:
+            self.assertEqual(normalize_phone_number(text), "+15559876543", text)
+        self.assertEqual(normalize_phone_number("+442071234567"), "+442071234567")
+        self.assertIsNone(normalize_phone_number("12345"))
+
+    def test_scan_attributes_mentions_to_message_times(self):
+        """Test counts and first/last message times per number."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            html_file = Path(temp_dir) / "Alice.html"
+            html_file.write_text(
+                '<td class="timestamp">2022-01-01 10:00:00</td><td>Call (555) 987-6543</td>'
+                '<td class="timestamp">2022-03-05 08:00:00</td><td>or +1 555 987 6543, +442071234567</td>'
+                '<td>ts 1640995200000 is not a number</td>',
+                encoding="utf-8",
+            )
+
+            mentions = scan_conversation_file(html_file)
+
+        self.assertEqual(mentions["+15559876543"], [2, "2022-01-01 10:00:00", "2022-03-05 08:00:00"])
+        self.assertEqual(mentions["+442071234567"], [1, "2022-03-05 08:00:00", "2022-03-05 08:00:00"])
+        self.assertEqual(len(mentions), 2)
+
+
+class TestPhoneMentionIndex(unittest.TestCase):
+    """Test building, querying and refreshing the index."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name) / "conversations"
+        self.output_dir.mkdir()
+        manager = ConversationManager(self.output_dir)
+        manager.write_message_with_content("+15551234567", TS_1, "+15551234567", "Text Bob at 555-987-6543")
+        manager.write_message_with_content("+15551234567", TS_2, "Me", "Thanks")
+        manager.write_message_with_content("Alice", TS_2, "Alice", "Bob is (555) 987-6543")
+        manager.finalize_conversation_files()
+        (self.output_dir / "index.html").write_text("+15550000000", encoding="utf-8")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_lookup_returns_conversations_per_number(self):
+        """Test the number -> conversations mapping, keyed by the caller's spelling."""
+        index = PhoneMentionIndex.for_conversations(self.output_dir)
+        try:
+            results = index.lookup(["+15559876543", "+15551234567", "+15550000000", "+15557777777"])
+        finally:
+            index.close()
+
+        self.assertTrue((self.output_dir / PHONE_INDEX_FILENAME).exists())
+        self.assertEqual(sorted(results), ["+15551234567", "+15559876543"])
+        self.assertEqual(
+            [mention.file for mention in results["+15559876543"]],
+            ["+15551234567.html", "Alice.html"],
+        )
+        conversation = results["+15551234567"][0]
+        self.assertEqual(conversation.conversation_id, "+15551234567")
+        self.assertGreaterEqual(conversation.count, 2)
+
+    def test_update_rescans_only_changed_files(self):
+        """Test that unchanged files are skipped and deleted files are dropped."""
+        index = PhoneMentionIndex.for_conversations(self.output_dir)
+        try:
+            self.assertEqual(index.update(self.output_dir), {"scanned": 0, "unchanged": 2, "removed": 0})
+
+            alice = self.output_dir / "Alice.html"
+            alice.write_text(alice.read_text() + "<!-- +442071234567 -->", encoding="utf-8")
+            os.utime(alice, ns=(0, 0))
+            (self.output_dir / "+15551234567.html").unlink()
+
+            self.assertEqual(index.update(self.output_dir), {"scanned": 1, "unchanged": 0, "removed": 1})
+            self.assertEqual(
+                [mention.conversation_id for mention in index.conversations_for("(555) 987-6543")],
+                ["Alice"],
+            )
+            self.assertEqual(
+                [mention.number for mention in index.numbers_in("Alice")],
+                ["+15559876543", "+442071234567"],
+            )
+        finally:
+            index.close()
+
+    def test_paginated_conversation_is_scanned_across_pages(self):
+        """Test that numbers on the pages behind a table of contents are indexed."""
+        from core.processing_config import ProcessingConfig
+
+        manager = ConversationManager(self.output_dir)
+        for day in range(3):
+            manager.write_message_with_content("Carol", TS_1 + day * 86400000, "Carol", f"Day {day}: 555-222-000{day}")
+        manager.finalize_conversation_files(ProcessingConfig(processing_dir=Path(self.temp_dir.name),
+                                                             paginate_messages=1, paginate_by="size"))
+        self.assertTrue((self.output_dir / "pages" / "Carol").is_dir())
+
+        index = PhoneMentionIndex.for_conversations(self.output_dir)
+        try:
+            self.assertEqual([m.number for m in index.numbers_in("Carol")],
+                             ["+15552220000", "+15552220001", "+15552220002"])
+
+            # A changed page is picked up even though the contents page is untouched
+            page = self.output_dir / "pages" / "Carol" / "page-2.html"
+            page.write_text(page.read_text() + "<!-- +442071234567 -->", encoding="utf-8")
+            self.assertEqual(index.update(self.output_dir)["scanned"], 1)
+            self.assertIn("+442071234567", [m.number for m in index.numbers_in("Carol")])
+        finally:
+            index.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
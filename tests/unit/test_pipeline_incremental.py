@@ -0,0 +1,216 @@
+"""
+Unit tests for content-addressed stage skipping.
+
+Uses small in-memory stages that count their executions so tests can assert
+exactly which stages re-ran after an input changed.
+"""
+
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.pipeline import PipelineContext, PipelineManager, PipelineStage, StageResult
+from core.pipeline.fingerprint import (
+    combine_fingerprint,
+    fingerprint_config,
+    fingerprint_directory,
+)
+
+
+class FileCopyStage(PipelineStage):
+    """Copies a source file to an output file, fingerprinting the source."""
+
+    def __init__(self, name, source, target, dependencies=()):
+        super().__init__(name)
+        self.source = source
+        self.target = target
+        self.dependencies = list(dependencies)
+        self.runs = 0
+
+    def execute(self, context: PipelineContext) -> StageResult:
+        self.runs += 1
+        self.target.write_text(self.source.read_text().upper())
+        return StageResult(success=True, execution_time=0.0, records_processed=1,
+                           output_files=[self.target])
+
+    def get_input_fingerprint(self, context):
+        return {'source': fingerprint_directory(self.source.parent, self.source.name)}
+
+    def get_dependencies(self):
+        return self.dependencies
+
+
+class UpstreamOnlyStage(PipelineStage):
+    """Depends only on upstream outputs."""
+
+    def __init__(self, name, target, dependencies):
+        super().__init__(name)
+        self.target = target
+        self.dependencies = dependencies
+        self.runs = 0
+
+    def execute(self, context: PipelineContext) -> StageResult:
+        self.runs += 1
+        self.target.write_text(f"run {self.runs}")
+        return StageResult(success=True, execution_time=0.0, records_processed=1,
+                           output_files=[self.target])
+
+    def get_input_fingerprint(self, context):
+        return {}
+
+    def get_dependencies(self):
+        return self.dependencies
+
+
+class LegacyStage(PipelineStage):
+    """Declares no fingerprint, so the default can_skip() applies."""
+
+    def __init__(self):
+        super().__init__("legacy")
+        self.runs = 0
+
+    def execute(self, context: PipelineContext) -> StageResult:
+        self.runs += 1
+        return StageResult(success=True, execution_time=0.0, records_processed=0)
+
+
+class TestIncrementalPipeline(unittest.TestCase):
+    """Test PipelineManager fingerprint-based skipping and invalidation."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.temp_path = Path(self.temp_dir.name)
+        self.processing_dir = self.temp_path / "processing"
+        self.output_dir = self.temp_path / "output"
+        self.processing_dir.mkdir()
+        self.output_dir.mkdir()
+
+        self.source_a = self.processing_dir / "a.txt"
+        self.source_b = self.processing_dir / "b.txt"
+        self.source_a.write_text("alpha")
+        self.source_b.write_text("beta")
+
+        self.stage_a = FileCopyStage("stage_a", self.source_a, self.output_dir / "a.out")
+        self.stage_b = FileCopyStage("stage_b", self.source_b, self.output_dir / "b.out")
+        self.stage_c = UpstreamOnlyStage("stage_c", self.output_dir / "c.out", ["stage_a"])
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_manager(self):
+        manager = PipelineManager(self.processing_dir, self.output_dir)
+        manager.register_stages([self.stage_a, self.stage_b, self.stage_c])
+        return manager
+
+    def runs(self):
+        return (self.stage_a.runs, self.stage_b.runs, self.stage_c.runs)
+
+    def test_unchanged_inputs_skip_all_stages(self):
+        """Test that a second run with identical inputs executes nothing."""
+        self.make_manager().execute_pipeline()
+        results = self.make_manager().execute_pipeline()
+
+        self.assertEqual(self.runs(), (1, 1, 1))
+        self.assertTrue(all(r.metadata.get('reason') == 'inputs_unchanged' for r in results.values()))
+
+    def test_changed_input_invalidates_downstream_only(self):
+        """Test that a changed source re-runs its stage and dependents, not siblings."""
+        self.make_manager().execute_pipeline()
+        self.source_a.write_text("alpha, edited")
+        self.make_manager().execute_pipeline()
+
+        self.assertEqual(self.runs(), (2, 1, 2))
+
+    def test_upstream_rerun_with_identical_output_does_not_invalidate(self):
+        """Test that downstream stages key on upstream output checksums."""
+        self.make_manager().execute_pipeline()
+        # Same content, new mtime: stage_a re-runs but writes identical output
+        self.source_a.write_text("alpha")
+        manager = self.make_manager()
+        manager.execute_stage("stage_a", manager.create_context(), force=True)
+        manager.execute_pipeline()
+
+        self.assertEqual(self.runs(), (2, 1, 1))
+
+    def test_modified_output_forces_rerun(self):
+        """Test that a tampered output file is rebuilt."""
+        self.make_manager().execute_pipeline()
+        (self.output_dir / "b.out").write_text("tampered")
+        self.make_manager().execute_pipeline()
+
+        self.assertEqual(self.stage_b.runs, 2)
+        self.assertEqual((self.output_dir / "b.out").read_text(), "BETA")
+
+    def test_output_checksums_are_recorded(self):
+        """Test that stage_outputs.checksum is populated."""
+        manager = self.make_manager()
+        manager.execute_pipeline()
+
+        with sqlite3.connect(manager.state_manager.db_path) as conn:
+            checksums = [row[0] for row in conn.execute("SELECT checksum FROM stage_outputs")]
+        self.assertEqual(len(checksums), 3)
+        self.assertTrue(all(c and len(c) == 64 for c in checksums))
+
+    def test_stage_without_fingerprint_uses_can_skip(self):
+        """Test that stages without a fingerprint keep the completed-stage skip."""
+        legacy = LegacyStage()
+        for _ in range(2):
+            manager = PipelineManager(self.processing_dir, self.output_dir)
+            manager.register_stage(legacy)
+            manager.execute_pipeline()
+
+        self.assertEqual(legacy.runs, 1)
+
+    def test_existing_database_is_migrated(self):
+        """Test that a state database without input_fingerprint gains the column."""
+        state_dir = self.output_dir / "pipeline_state"
+        state_dir.mkdir()
+        with sqlite3.connect(state_dir / "pipeline_state.db") as conn:
+            conn.execute("""
+                CREATE TABLE stage_executions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT, stage_name TEXT NOT NULL,
+                    execution_start TIMESTAMP, execution_end TIMESTAMP, success BOOLEAN,
+                    records_processed INTEGER, execution_time REAL, error_count INTEGER,
+                    metadata TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+        self.make_manager().execute_pipeline()
+        self.assertEqual(self.runs(), (1, 1, 1))
+
+
+class TestFingerprintHelpers(unittest.TestCase):
+    """Test fingerprint helper functions."""
+
+    def test_combine_fingerprint_is_order_independent(self):
+        """Test that dictionary ordering does not change the digest."""
+        self.assertEqual(combine_fingerprint({'a': 1, 'b': [1, 2]}),
+                         combine_fingerprint({'b': [1, 2], 'a': 1}))
+        self.assertNotEqual(combine_fingerprint({'a': 1}), combine_fingerprint({'a': 2}))
+
+    def test_fingerprint_config_subset(self):
+        """Test config subset extraction from objects and dicts."""
+        class Config:
+            test_mode = True
+            exclude_older_than = Path("/x")
+
+        subset = fingerprint_config(Config(), ['test_mode', 'exclude_older_than', 'missing'])
+        self.assertEqual(subset, {'test_mode': True, 'exclude_older_than': '/x', 'missing': None})
+        self.assertEqual(fingerprint_config({'test_mode': False}, ['test_mode']), {'test_mode': False})
+
+    def test_fingerprint_directory_detects_additions(self):
+        """Test that adding a file changes the directory fingerprint."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            root = Path(temp_dir)
+            (root / "one.html").write_text("1")
+            before = fingerprint_directory(root)
+            (root / "sub").mkdir()
+            (root / "sub" / "two.html").write_text("2")
+
+            self.assertNotEqual(before, fingerprint_directory(root))
+            self.assertEqual(fingerprint_directory(root / "missing"), "missing")
+
+
+if __name__ == '__main__':
+    unittest.main()
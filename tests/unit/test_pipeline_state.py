@@ -0,0 +1,117 @@
+"""
+Unit tests for the pipeline StateManager connection handling and per-item
+progress log.
+"""
+
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from core.pipeline import PipelineContext, StateManager
+from core.pipeline.stages import ContentExtractionStage
+from core.pipeline.stages.content_extraction import PARTIAL_OUTPUT_FILENAME
+
+
+class TestStateManagerConnections(unittest.TestCase):
+    """Test the shared WAL connection and batched item recording."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_manager = StateManager(Path(self.temp_dir.name) / "state")
+
+    def tearDown(self):
+        self.state_manager.close()
+        self.temp_dir.cleanup()
+
+    def test_connection_is_reused_per_thread_in_wal_mode(self):
+        """Test one WAL connection per thread with synchronous=NORMAL."""
+        db = self.state_manager.db
+        conn = db.connection()
+
+        self.state_manager.record_stage_start("stage_a")
+        self.assertIs(db.connection(), conn)
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)  # NORMAL
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], conn)
+
+    def test_record_items_in_batches(self):
+        """Test that items are committed in transactions of batch_size rows."""
+        items = [f"Calls/file{i}.html" for i in range(1050)]
+
+        with patch.object(self.state_manager.db, "transaction", wraps=self.state_manager.db.transaction) as tx:
+            recorded = self.state_manager.record_items("html_generation", items, batch_size=500)
+
+        self.assertEqual(recorded, 1050)
+        self.assertEqual(tx.call_count, 3)
+        self.assertEqual(self.state_manager.get_recorded_items("html_generation"), set(items))
+
+        # Re-recording replaces the status
+        self.state_manager.record_items("html_generation", items[:10], status="failed")
+        self.assertEqual(len(self.state_manager.get_recorded_items("html_generation")), 1040)
+        self.assertEqual(len(self.state_manager.get_recorded_items("html_generation", status=None)), 1050)
+
+        self.state_manager.clear_stage_state("html_generation")
+        self.assertEqual(self.state_manager.get_recorded_items("html_generation", status=None), set())
+
+
+class TestContentExtractionResume(unittest.TestCase):
+    """Test that an interrupted content extraction resumes per file."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        root = Path(self.temp_dir.name)
+        self.output_dir = root / "output"
+        self.output_dir.mkdir()
+        self.state_manager = StateManager(self.output_dir / "pipeline_state")
+
+        files = []
+        for i in range(5):
+            path = root / f"Contact{i} - Text - 2024-01-0{i + 1}T10_00_00Z.html"
+            path.write_text(f'<html><head><title>Contact {i}</title></head>'
+                            f'<body><div class="message">hello number {i}</div></body></html>')
+            files.append({"path": str(path), "type": "sms_mms", "size_bytes": path.stat().st_size})
+        (self.output_dir / "file_inventory.json").write_text(json.dumps({"files": files}))
+        self.context = PipelineContext(
+            processing_dir=root, output_dir=self.output_dir, state_manager=self.state_manager
+        )
+
+    def tearDown(self):
+        self.state_manager.close()
+        self.temp_dir.cleanup()
+
+    def test_resume_skips_extracted_files(self):
+        stage = ContentExtractionStage(progress_batch_size=2)
+        extract = stage._extract_sms_mms_content
+        calls = []
+
+        def crash_on_fifth(file_path, file_info):
+            calls.append(file_path)
+            if len(calls) == 5:
+                raise KeyboardInterrupt
+            return extract(file_path, file_info)
+
+        with patch.object(stage, "_extract_sms_mms_content", side_effect=crash_on_fifth):
+            with self.assertRaises(KeyboardInterrupt):
+                stage.execute(self.context)
+        self.assertEqual(len(self.state_manager.get_recorded_items(stage.name)), 4)
+
+        with patch.object(stage, "_extract_sms_mms_content", wraps=extract) as resumed_extract:
+            result = stage.execute(self.context)
+
+        self.assertTrue(result.success)
+        self.assertEqual(resumed_extract.call_count, 1)
+        self.assertEqual(result.metadata["conversations_extracted"], 5)
+        self.assertFalse((self.output_dir / PARTIAL_OUTPUT_FILENAME).exists())
+        self.assertEqual(self.state_manager.get_recorded_items(stage.name), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+"""
+Unit tests for precompressed page siblings and the static file server.
+"""
+
+import gzip
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from core.precompress import MANIFEST_FILENAME, _compress_file, precompress_directory
+from core.static_server import accepted_encodings, create_server, parse_range
+
+PAGE = ("<tr><td>2024-01-01</td><td>Alice</td><td>See you at dinner</td></tr>\n" * 200).encode()
+
+
+class TestPrecompress(unittest.TestCase):
+    """Test writing, skipping and removing .gz siblings."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        (self.root / "Alice.html").write_bytes(PAGE)
+        (self.root / "index.html").write_bytes(PAGE[:5000])
+        (self.root / "tiny.html").write_bytes(b"<html></html>")
+        (self.root / "attachments").mkdir()
+        (self.root / "attachments" / "photo.jpg").write_bytes(b"jpeg" * 1000)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_writes_gzip_siblings_with_source_mtime(self):
+        stats = precompress_directory(self.root, workers=2, use_brotli=False)
+
+        self.assertEqual(stats["compressed"], 2)
+        self.assertEqual(gzip.decompress((self.root / "Alice.html.gz").read_bytes()), PAGE)
+        self.assertEqual((self.root / "Alice.html.gz").stat().st_mtime_ns,
+                         (self.root / "Alice.html").stat().st_mtime_ns)
+        self.assertFalse((self.root / "tiny.html.gz").exists())
+        self.assertFalse((self.root / "attachments" / "photo.jpg.gz").exists())
+        self.assertLess(stats["bytes_gzip"], stats["bytes_in"] / 10)
+
+    def test_unchanged_pages_are_skipped_and_deleted_pages_cleaned_up(self):
+        precompress_directory(self.root, use_brotli=False)
+        (self.root / "index.html").write_bytes(PAGE[:6000])
+        (self.root / "Alice.html").unlink()
+
+        with patch("core.precompress._compress_file", wraps=_compress_file) as compress:
+            stats = precompress_directory(self.root, use_brotli=False)
+
+        self.assertEqual(compress.call_count, 1)
+        self.assertEqual(stats["removed"], 1)
+        self.assertFalse((self.root / "Alice.html.gz").exists())
+        self.assertEqual(gzip.decompress((self.root / "index.html.gz").read_bytes()), PAGE[:6000])
+        self.assertTrue((self.root / MANIFEST_FILENAME).exists())
+
+
+class TestStaticServer(unittest.TestCase):
+    """Test content negotiation, ETags and range requests over HTTP."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        (self.root / "index.html").write_bytes(PAGE)
+        (self.root / "attachments").mkdir()
+        (self.root / "attachments" / "clip.mp3").write_bytes(bytes(range(256)) * 4)
+        precompress_directory(self.root, use_brotli=False)
+
+        self.server = create_server(self.root, port=0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.conn = http.client.HTTPConnection(*self.server.server_address[:2], timeout=5)
+
+    def tearDown(self):
+        self.conn.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.temp_dir.cleanup()
+
+    def request(self, path, **headers):
+        self.conn.request("GET", path, headers=headers)
+        response = self.conn.getresponse()
+        return response, response.read()
+
+    def test_serves_gzip_variant_only_when_accepted(self):
+        response, body = self.request("/", **{"Accept-Encoding": "br;q=0, gzip"})
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+        self.assertEqual(response.getheader("Content-Type"), "text/html")
+        self.assertEqual(response.getheader("Vary"), "Accept-Encoding")
+        self.assertEqual(gzip.decompress(body), PAGE)
+
+        response, body = self.request("/index.html")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, PAGE)
+
+    def test_stale_variant_is_not_served(self):
+        page = self.root / "index.html"
+        page.write_bytes(PAGE + b"<p>new</p>")
+        os.utime(page, ns=(page.stat().st_atime_ns, page.stat().st_mtime_ns + 10**9))
+
+        response, body = self.request("/index.html", **{"Accept-Encoding": "gzip"})
+
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertTrue(body.endswith(b"<p>new</p>"))
+
+    def test_etag_revalidation(self):
+        response, _ = self.request("/index.html", **{"Accept-Encoding": "gzip"})
+        etag = response.getheader("ETag")
+
+        response, body = self.request("/index.html", **{"Accept-Encoding": "gzip", "If-None-Match": etag})
+        self.assertEqual(response.status, 304)
+        self.assertEqual(body, b"")
+
+        # The identity representation has a different tag
+        response, _ = self.request("/index.html", **{"If-None-Match": etag})
+        self.assertEqual(response.status, 200)
+
+    def test_range_requests(self):
+        data = (self.root / "attachments" / "clip.mp3").read_bytes()
+
+        response, body = self.request("/attachments/clip.mp3", Range="bytes=10-19")
+        self.assertEqual(response.status, 206)
+        self.assertEqual(response.getheader("Content-Range"), f"bytes 10-19/{len(data)}")
+        self.assertEqual(body, data[10:20])
+
+        response, body = self.request("/attachments/clip.mp3", Range="bytes=-4")
+        self.assertEqual(body, data[-4:])
+
+        response, _ = self.request("/attachments/clip.mp3", Range=f"bytes={len(data)}-")
+        self.assertEqual(response.status, 416)
+
+    def test_header_parsing(self):
+        self.assertEqual(accepted_encodings("gzip, deflate, br;q=0"), {"gzip", "deflate"})
+        self.assertEqual(parse_range("bytes=5-", 10), (5, 9))
+        self.assertEqual(parse_range("bytes=0-99", 10), (0, 9))
+        self.assertIsNone(parse_range("bytes=0-1,4-5", 10))
+        self.assertIsNone(parse_range(None, 10))
+
+
+if __name__ == '__main__':
+    unittest.main()
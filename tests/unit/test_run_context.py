@@ -0,0 +1,154 @@
+"""
+Unit tests for the immutable run context passed through sms.py.
+"""
+
+import dataclasses
+import pickle
+import threading
+from datetime import datetime
+
+import pytest
+
+import sms
+from core.processing_config import ProcessingConfig
+from core.processing_context import create_processing_context
+from core.run_context import FrozenMapping, RunContext, build_run_context
+from sms import process_html_files_param
+
+
+def make_export(root, name, phone, when):
+    """Write a one-message Takeout export with a text conversation."""
+    calls = root / "Calls"
+    calls.mkdir(parents=True)
+    (calls / f"{name} - Text - {when.replace(':', '_')}Z.html").write_text(
+        f"""<html><body><div class="message">
+        <abbr class="dt" title="{when}.000-00:00">x</abbr>
+        <cite class="sender vcard"><a class="tel" href="tel:{phone}"><span class="fn">{name}</span></a></cite>
+        <q>hello from {name}</q>
+        </div></body></html>"""
+    )
+
+
+class TestRunContext:
+    """Test building, freezing and pickling the run context."""
+
+    def test_built_from_config_and_picklable(self, tmp_path):
+        """Settings are copied from the config and survive a pickle round-trip."""
+        config = ProcessingConfig(
+            processing_dir=tmp_path,
+            include_service_codes=True,
+            exclude_older_than=datetime(2020, 1, 1),
+        )
+        context = build_run_context(config, src_filename_map={"a.jpg": "Calls/a.jpg"}).with_own_number("+15550001111")
+
+        assert context.output_dir == tmp_path / "conversations"
+        assert context.calls_dir == tmp_path / "Calls"
+        assert context.include_service_codes is True
+        assert context.exclude_older_than == datetime(2020, 1, 1)
+        assert context.own_number == "+15550001111"
+
+        restored = pickle.loads(pickle.dumps(context))
+        assert restored == context
+        assert restored.attachment_index["a.jpg"] == "Calls/a.jpg"
+
+    def test_is_immutable(self, tmp_path):
+        """Neither the context nor its snapshots can be changed after building."""
+        context = RunContext(processing_dir=tmp_path, output_dir=tmp_path, phone_aliases=FrozenMapping({"+1": "A"}))
+
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            context.filter_non_phone_numbers = True
+        with pytest.raises(TypeError):
+            context.phone_aliases["+1"] = "B"
+
+    def test_create_managers_seeds_alias_snapshot(self, tmp_path):
+        """Managers created from the context alone see the snapshotted aliases."""
+        context = RunContext(
+            processing_dir=tmp_path,
+            output_dir=tmp_path / "conversations",
+            phone_aliases=FrozenMapping({"+15551110001": "Alice"}),
+        )
+
+        conversation_manager, phone_lookup_manager = context.create_managers()
+
+        assert conversation_manager.output_dir == tmp_path / "conversations"
+        assert phone_lookup_manager.get_alias("+15551110001", None) == "Alice"
+
+
+class TestConcurrentConversions:
+    """Two conversions in one interpreter must not see each other's settings."""
+
+    def test_two_isolated_conversions(self, tmp_path):
+        make_export(tmp_path / "a", "Alice", "+15551110001", "2020-01-01T10:00:00")
+        make_export(tmp_path / "b", "Bob", "+15552220002", "2020-01-01T10:00:00")
+        configs = {
+            "a": ProcessingConfig(processing_dir=tmp_path / "a", filter_non_phone_numbers=False),
+            # Same message date, but this run excludes everything before 2021
+            "b": ProcessingConfig(
+                processing_dir=tmp_path / "b", filter_non_phone_numbers=False, exclude_older_than=datetime(2021, 1, 1)
+            ),
+        }
+        results = {}
+        barrier = threading.Barrier(len(configs))
+
+        def convert(name):
+            config = configs[name]
+            run_context = build_run_context(config)
+            conversation_manager, phone_lookup_manager = run_context.create_managers()
+            barrier.wait()
+            results[name] = process_html_files_param(
+                run_context.processing_dir, {}, conversation_manager, phone_lookup_manager,
+                config=config, enable_performance_monitoring=False, run_context=run_context,
+            )
+            conversation_manager.finalize_conversation_files(config=config)
+
+        threads = [threading.Thread(target=convert, args=(name,)) for name in configs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert results["a"]["num_sms"] == 1
+        assert results["b"]["num_sms"] == 0
+        pages_a = list((tmp_path / "a" / "conversations").glob("*.html"))
+        assert len(pages_a) == 1
+        assert "hello from Alice" in pages_a[0].read_text()
+        assert not list((tmp_path / "b" / "conversations").glob("*.html"))
+
+    def test_two_conversions_through_main(self, tmp_path, monkeypatch):
+        """sms.main runs from its contexts alone and leaves the module globals untouched."""
+        monkeypatch.setattr(sms, "ENABLE_PERFORMANCE_MONITORING", False)
+        make_export(tmp_path / "a", "Alice", "+15551110001", "2020-01-01T10:00:00")
+        make_export(tmp_path / "b", "Bob", "+15552220002", "2020-01-01T10:00:00")
+        configs = {
+            "a": ProcessingConfig(processing_dir=tmp_path / "a", filter_non_phone_numbers=False),
+            "b": ProcessingConfig(
+                processing_dir=tmp_path / "b", filter_non_phone_numbers=False, exclude_older_than=datetime(2021, 1, 1)
+            ),
+        }
+        globals_before = (sms.PROCESSING_DIRECTORY, sms.OUTPUT_DIRECTORY, sms.CONVERSATION_MANAGER, sms.PATH_MANAGER)
+        contexts = {name: create_processing_context(config) for name, config in configs.items()}
+        errors = []
+        barrier = threading.Barrier(len(configs))
+
+        def convert(name):
+            try:
+                context = contexts[name]
+                run_context = build_run_context(configs[name], context)
+                barrier.wait()
+                sms.main(configs[name], context, run_context)
+            except BaseException as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=convert, args=(name,)) for name in configs]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert contexts["a"].conversation_manager is not contexts["b"].conversation_manager
+        pages_a = [p for p in (tmp_path / "a" / "conversations").glob("*.html") if p.name != "index.html"]
+        assert len(pages_a) == 1
+        assert "hello from Alice" in pages_a[0].read_text()
+        assert [p.name for p in (tmp_path / "b" / "conversations").glob("*.html")] == ["index.html"]
+        assert (sms.PROCESSING_DIRECTORY, sms.OUTPUT_DIRECTORY, sms.CONVERSATION_MANAGER, sms.PATH_MANAGER) == globals_before
@@ -0,0 +1,169 @@
+"""
+Unit tests for the SQLite FTS5 search index and the search command.
+"""
+
+import tempfile
+import time
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+from click.testing import CliRunner
+
+from core.conversation_manager import ConversationManager
+from core.search_index import (
+    SEARCH_INDEX_FILENAME,
+    SearchIndex,
+    build_match_expression,
+    date_to_unix_ms,
+)
+
+
+def ms(date_string):
+    return date_to_unix_ms(datetime.strptime(date_string, "%Y-%m-%d %H:%M"))
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test indexing and querying."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.index = SearchIndex(Path(self.temp_dir.name) / SEARCH_INDEX_FILENAME, batch_size=2)
+        self.index.add_message("Alice", "Alice", ms("2021-03-01 10:00"), "Dinner at the new restaurant?")
+        self.index.add_message("Alice", "Me", ms("2021-03-01 10:05"), "See you soon at dinner")
+        self.index.add_message("Bob", "Bob", ms("2023-07-04 18:00"), "Fireworks and dinner tonight")
+        self.index.add_message("Alice_Bob", "Bob", ms("2023-08-01 09:00"), "soon, see you")
+
+    def tearDown(self):
+        self.index.close()
+        self.temp_dir.cleanup()
+
+    def conversations(self, **kwargs):
+        return sorted(hit.conversation_id for hit in self.index.search(**kwargs))
+
+    def test_term_query_requires_all_words(self):
+        """Test that plain queries AND their words together."""
+        self.assertEqual(self.conversations(query="dinner"), ["Alice", "Alice", "Bob"])
+        self.assertEqual(self.conversations(query="dinner fireworks"), ["Bob"])
+
+    def test_phrase_query_respects_word_order(self):
+        """Test that --phrase matches only the exact phrase."""
+        self.assertEqual(self.conversations(query="see you soon", phrase=True), ["Alice"])
+        self.assertEqual(self.conversations(query="see you soon"), ["Alice", "Alice_Bob"])
+
+    def test_prefix_query(self):
+        """Test prefix matching."""
+        self.assertEqual(self.conversations(query="resta"), [])
+        self.assertEqual(self.conversations(query="resta", prefix=True), ["Alice"])
+
+    def test_date_range_filter(self):
+        """Test since/until bounds."""
+        self.assertEqual(
+            self.conversations(query="dinner", since=datetime(2022, 1, 1)), ["Bob"]
+        )
+        self.assertEqual(
+            self.conversations(query="dinner", until=datetime(2021, 3, 1, 10, 1)), ["Alice"]
+        )
+
+    def test_participant_filter_matches_conversation_or_sender(self):
+        """Test that --participant matches conversation IDs and senders, case-insensitively."""
+        self.assertEqual(self.conversations(query="soon", participant="bob"), ["Alice_Bob"])
+        self.assertEqual(self.conversations(query="dinner", participant="ALICE"), ["Alice", "Alice"])
+
+    def test_operators_in_input_are_literal(self):
+        """Test that FTS5 syntax in user input cannot break the query."""
+        self.assertEqual(build_match_expression('a" OR b'), '"a""" "OR" "b"')
+        self.assertEqual(self.conversations(query='dinner" NOT'), [])
+        with self.assertRaises(ValueError):
+            self.index.search("   ")
+
+    def test_duplicates_are_ignored_and_removal_works(self):
+        """Test that re-indexed messages are not duplicated and conversations can be dropped."""
+        self.index.add_message("Bob", "Bob", ms("2023-07-04 18:00"), "Fireworks and dinner tonight")
+        self.index.flush()
+        self.assertEqual(self.index.count(), 4)
+        self.assertEqual(self.index.messages_added, 4)
+
+        self.index.remove_conversation("Alice")
+        self.assertEqual(self.conversations(query="dinner"), ["Bob"])
+
+    def test_order_by_date(self):
+        """Test newest-first ordering."""
+        hits = self.index.search("dinner", order_by_date=True)
+        self.assertEqual([hit.conversation_id for hit in hits], ["Bob", "Alice", "Alice"])
+        self.assertIn("[dinner]", hits[0].snippet.lower())
+
+
+class TestSearchIndexIntegration(unittest.TestCase):
+    """Test that ConversationManager feeds the index and the CLI queries it."""
+
+    def test_conversation_manager_feeds_index_and_cli_searches(self):
+        """Test the path from write_message_with_content to 'cli.py search'."""
+        from cli import cli
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            processing_dir = Path(temp_dir)
+            output_dir = processing_dir / "conversations"
+            index = SearchIndex(output_dir / SEARCH_INDEX_FILENAME)
+
+            manager = ConversationManager(output_dir)
+            manager.search_index = index
+            manager.write_message_with_content("Alice", int(time.time() * 1000), "Alice", "Meet at the lighthouse")
+            manager.finalize_conversation_files()
+            index.close()
+
+            result = CliRunner().invoke(cli, [
+                '--processing-dir', str(processing_dir), 'search', 'lighthouse',
+            ])
+
+            self.assertEqual(result.exit_code, 0, result.output)
+            self.assertIn("Alice.html", result.output)
+            self.assertIn("[lighthouse]", result.output)
+
+    def test_convert_builds_index_when_enabled(self):
+        """Test that sms.main (the convert command) feeds and closes the index."""
+        from unittest import mock
+
+        import sms
+        from cli import cli
+        from core.processing_config import ProcessingConfig
+        from core.processing_context import create_processing_context
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            processing_dir = Path(temp_dir)
+            (processing_dir / "Calls").mkdir()
+            (processing_dir / "Calls" / "Alice - Text - 2021-03-01T10_00_00Z.html").write_text(
+                """<html><body><div class="message">
+                <abbr class="dt" title="2021-03-01T10:00:00.000-00:00">x</abbr>
+                <cite class="sender vcard"><a class="tel" href="tel:+15551110001"><span class="fn">Alice</span></a></cite>
+                <q>Meet at the lighthouse</q>
+                </div></body></html>"""
+            )
+            config = ProcessingConfig(
+                processing_dir=processing_dir, filter_non_phone_numbers=False, build_search_index=True
+            )
+            context = create_processing_context(config)
+            with mock.patch.object(sms, "ENABLE_PERFORMANCE_MONITORING", False):
+                sms.main(config, context)
+
+            self.assertIsNone(context.conversation_manager.search_index)
+            result = CliRunner().invoke(cli, [
+                '--processing-dir', str(processing_dir), 'search', 'lighthouse',
+            ])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertIn("[lighthouse]", result.output)
+
+    def test_cli_reports_missing_index(self):
+        """Test that search explains how to build a missing index."""
+        from cli import cli
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            result = CliRunner().invoke(cli, ['--processing-dir', temp_dir, 'search', 'anything'])
+
+        self.assertEqual(result.exit_code, 1)
+        self.assertIn("--build-search-index", result.output)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for the compiled, streaming template engine.
+"""
+
+import io
+import unittest
+
+from templates.loader import STREAM_BATCH_CHUNKS, CompiledTemplate, TemplateLoader
+
+CONVERSATION_SLOTS = {
+    "conversation_id": "Alice",
+    "total_messages": 2,
+    "date_range": "2024-01-01 to 2024-01-02",
+    "message_rows": "<tr><td>one</td></tr>\n<tr><td>two</td></tr>",
+}
+INDEX_SLOTS = {
+    "elapsed_time": "1.50",
+    "total_conversations": 1,
+    "num_sms": 2,
+    "num_calls": 0,
+    "num_voicemails": 0,
+    "num_img": 0,
+    "num_vcf": 0,
+    "total_messages": 2,
+    "conversation_rows": "<tr><td>Alice</td></tr>",
+    "timestamp": "2024-01-02 00:00:00",
+}
+
+
+class CountingWriter:
+    """File-like object recording each write."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, text):
+        self.chunks.append(text)
+        return len(text)
+
+
+class TestCompiledTemplate(unittest.TestCase):
+    """Test compilation, rendering and streaming."""
+
+    def setUp(self):
+        self.loader = TemplateLoader()
+
+    def test_render_matches_str_format(self):
+        """Test that the shipped templates render exactly as str.format did."""
+        for name, slots in (("conversation", CONVERSATION_SLOTS), ("index", INDEX_SLOTS)):
+            with self.subTest(template=name):
+                self.assertEqual(
+                    self.loader.format_template(name, **slots),
+                    self.loader.get_template(name).format(**slots),
+                )
+
+    def test_format_specs_and_escaped_braces(self):
+        """Test conversions, format specs and literal braces."""
+        template = CompiledTemplate("{{x}} {value:>5} {name!r} {ratio:.1%}")
+        self.assertEqual(
+            template.render(value=42, name="a", ratio=0.25),
+            "{{x}} {value:>5} {name!r} {ratio:.1%}".format(value=42, name="a", ratio=0.25),
+        )
+        self.assertEqual(template.slots, {"value", "name", "ratio"})
+
+    def test_iterable_slots_are_streamed(self):
+        """Test that iterable slots are written in bounded batches, never joined whole."""
+        rows = [f"<tr>{i}</tr>" for i in range(3 * STREAM_BATCH_CHUNKS)]
+        streamed = CountingWriter()
+
+        self.loader.render_to("conversation", streamed, **{**CONVERSATION_SLOTS, "message_rows": iter(rows)})
+
+        self.assertEqual(
+            "".join(streamed.chunks),
+            self.loader.format_template("conversation", **{**CONVERSATION_SLOTS, "message_rows": "".join(rows)}),
+        )
+        row_writes = [chunk for chunk in streamed.chunks if chunk.startswith("<tr>")]
+        self.assertEqual(len(row_writes), 3)
+
+    def test_sequence_slots_are_formatted_like_str_format(self):
+        """Test that only iterators are streamed; lists and tuples render via str()."""
+        template = CompiledTemplate("<p>{items}</p><p>{pair}</p>")
+        slots = {"items": ["a", "b"], "pair": (1, 2)}
+
+        self.assertEqual(template.render(**slots), "<p>{items}</p><p>{pair}</p>".format(**slots))
+        self.assertEqual(template.render(items=(c for c in "ab"), pair=iter(["1", "2"])), "<p>ab</p><p>12</p>")
+
+    def test_parse_recovers_slots(self):
+        """Test that rendered pages can be read back into their slot values."""
+        for name, slots in (("conversation", CONVERSATION_SLOTS), ("index", INDEX_SLOTS)):
+            with self.subTest(template=name):
+                template = self.loader.get_compiled_template(name)
+                parsed = template.parse(template.render(**slots))
+                self.assertEqual(parsed, {key: str(value) for key, value in slots.items()})
+
+        with self.assertRaises(ValueError):
+            self.loader.get_compiled_template("conversation").parse("<html>not a page</html>")
+        with self.assertRaises(ValueError):
+            CompiledTemplate("{a}{b}").parse("xy")
+
+    def test_errors(self):
+        """Test a missing slot and an unsupported field."""
+        with self.assertRaises(KeyError):
+            CompiledTemplate("<p>{missing}</p>").render_to(io.StringIO())
+        with self.assertRaises(ValueError):
+            CompiledTemplate("{0} {a.b}")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+"""
+Unit tests for the optional thumbnail generation stage and preview links.
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from core.attachment_store import compute_sha256
+from core.conversation_manager import ConversationManager
+from core.pipeline import PipelineContext
+from core.pipeline.stages import ThumbnailGenerationStage
+from core.thumbnails import load_thumbnail_entries, load_thumbnail_map
+
+STAGE_MODULE = "core.pipeline.stages.thumbnail_generation"
+
+
+def fake_make_thumbnail(source, dest, max_size, fmt, quality):
+    """Stand-in for the Pillow resize: writes a small file."""
+    Path(dest).parent.mkdir(parents=True, exist_ok=True)
+    Path(dest).write_bytes(b"thumb")
+    return source, 5
+
+
+class TestThumbnailGenerationStage(unittest.TestCase):
+    """Test preview generation, deduplication and incremental runs."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name) / "conversations"
+        attachments = self.output_dir / "attachments"
+        (attachments / "Calls").mkdir(parents=True)
+        (attachments / ".objects").mkdir()
+        (attachments / "Calls" / "a.jpg").write_bytes(b"x" * 1000)
+        (attachments / "Calls" / "copy.jpg").write_bytes(b"x" * 1000)
+        (attachments / "Calls" / "b.png").write_bytes(b"y" * 2000)
+        (attachments / "Calls" / "card.vcf").write_text("BEGIN:VCARD")
+        (attachments / ".objects" / "stored.jpg").write_bytes(b"z")
+        self.context = PipelineContext(processing_dir=Path(self.temp_dir.name), output_dir=self.output_dir)
+        self.stage = ThumbnailGenerationStage(workers=1)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _execute(self):
+        with patch(f"{STAGE_MODULE}.pillow_available", return_value=True), \
+                patch(f"{STAGE_MODULE}.preferred_format", return_value="webp"), \
+                patch(f"{STAGE_MODULE}.make_thumbnail", side_effect=fake_make_thumbnail) as make:
+            return self.stage.execute(self.context), make
+
+    def test_without_pillow_is_a_no_op(self):
+        with patch(f"{STAGE_MODULE}.pillow_available", return_value=False):
+            result = self.stage.execute(self.context)
+
+        self.assertTrue(result.success)
+        self.assertFalse(result.metadata["pillow_available"])
+        self.assertFalse((self.output_dir / "attachments" / ".thumbnails").exists())
+
+    def test_generates_one_preview_per_content(self):
+        result, make = self._execute()
+
+        self.assertTrue(result.success)
+        self.assertEqual(make.call_count, 2)  # a.jpg and copy.jpg share content
+        self.assertEqual(result.metadata["total_generated"], 2)
+        self.assertEqual(result.metadata["bytes_saved"], (1000 - 5) * 2 + (2000 - 5))
+        self.assertIn("images_per_second", result.metadata)
+
+        thumbnails = load_thumbnail_map(self.output_dir)
+        self.assertEqual(set(thumbnails), {
+            "attachments/Calls/a.jpg", "attachments/Calls/copy.jpg", "attachments/Calls/b.png"
+        })
+        self.assertEqual(thumbnails["attachments/Calls/a.jpg"], thumbnails["attachments/Calls/copy.jpg"])
+        self.assertTrue(thumbnails["attachments/Calls/b.png"].startswith("attachments/.thumbnails/"))
+
+    def test_rerun_only_processes_changed_files(self):
+        self._execute()
+        changed = self.output_dir / "attachments" / "Calls" / "b.png"
+        changed.write_bytes(b"w" * 3000)
+        os.utime(changed, ns=(1, 1))
+
+        with patch(f"{STAGE_MODULE}.compute_sha256", wraps=compute_sha256) as sha:
+            result, make = self._execute()
+
+        self.assertEqual(sha.call_count, 1)
+        self.assertEqual(make.call_count, 1)
+        self.assertEqual(result.metadata["total_skipped"], 2)
+        self.assertEqual(load_thumbnail_entries(self.output_dir)["attachments/Calls/b.png"]["size"], 3000)
+
+    def test_changed_size_or_quality_regenerates(self):
+        self._execute()
+        first = load_thumbnail_map(self.output_dir)
+
+        for stage in (ThumbnailGenerationStage(max_size=640, workers=1),
+                      ThumbnailGenerationStage(max_size=640, workers=1, quality=90)):
+            self.stage = stage
+            result, make = self._execute()
+
+            self.assertEqual(make.call_count, 2)
+            self.assertEqual(result.metadata["total_skipped"], 0)
+            thumbnails = load_thumbnail_map(self.output_dir)
+            self.assertTrue(thumbnails["attachments/Calls/a.jpg"].endswith(
+                f"-{result.metadata['max_size']}q{result.metadata['quality']}.webp"))
+            self.assertNotEqual(thumbnails["attachments/Calls/a.jpg"], first["attachments/Calls/a.jpg"])
+
+        # A stage without explicit settings (as html-generation runs it) keeps the last ones
+        self.stage = ThumbnailGenerationStage(workers=1)
+        result, make = self._execute()
+        make.assert_not_called()
+        self.assertEqual((result.metadata["max_size"], result.metadata["quality"]), (640, 90))
+
+    def test_runs_before_html_generation_when_registered(self):
+        from core.pipeline import PipelineManager
+        from core.pipeline.stages import AttachmentCopyingStage, AttachmentMappingStage, HtmlGenerationStage
+
+        manager = PipelineManager(Path(self.temp_dir.name), self.output_dir, Path(self.temp_dir.name) / "state")
+        manager.register_stages([AttachmentMappingStage(), AttachmentCopyingStage(),
+                                 self.stage, HtmlGenerationStage()])
+
+        order = manager.get_execution_order()
+        self.assertLess(order.index("thumbnail_generation"), order.index("html_generation"))
+
+
+class TestAttachmentPreviews(unittest.TestCase):
+    """Test that conversation pages use generated previews."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.temp_dir.name)
+        (self.output_dir / "attachments" / "Calls").mkdir(parents=True)
+        (self.output_dir / "attachments" / "Calls" / "photo.jpg").write_bytes(b"x" * 100)
+        with patch(f"{STAGE_MODULE}.pillow_available", return_value=True), \
+                patch(f"{STAGE_MODULE}.preferred_format", return_value="webp"), \
+                patch(f"{STAGE_MODULE}.make_thumbnail", side_effect=fake_make_thumbnail):
+            ThumbnailGenerationStage(workers=1).execute(
+                PipelineContext(processing_dir=self.output_dir, output_dir=self.output_dir)
+            )
+        self.manager = ConversationManager(self.output_dir)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_mms_link_uses_lazy_preview(self):
+        attachment = "<a href='attachments/Calls/photo.jpg' target='_blank'>📷 Image</a>"
+        html = self.manager._build_attachments_html([attachment])
+
+        self.assertIn('<img loading="lazy" src="attachments/.thumbnails/', html)
+        self.assertIn('href="attachments/Calls/photo.jpg"', html)
+
+    def test_attachments_without_preview_keep_plain_links(self):
+        html = self.manager._build_attachments_html([
+            {"filename": "attachments/Calls/other.jpg"}, "<a href='attachments/Calls/card.vcf'>📇</a>"
+        ])
+
+        self.assertNotIn("<img", html)
+        self.assertIn('class="attachment">📎 attachments/Calls/other.jpg</a>', html)
+
+
+if __name__ == '__main__':
+    unittest.main()
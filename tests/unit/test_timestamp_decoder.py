@@ -0,0 +1,120 @@
+"""
+Unit tests for the fast timestamp decoder used by get_time_unix.
+"""
+
+import time
+import unittest
+
+import dateutil.parser
+
+from core.timestamp_decoder import TimestampDecoder, extract_filename_timestamp_part
+
+
+def legacy_filename_ms(filename):
+    """The dateutil-based filename strategy get_time_unix used before the decoder."""
+    part = extract_filename_timestamp_part(filename)
+    dt = dateutil.parser.parse(part, fuzzy=True)
+    return int(time.mktime(dt.timetuple()) * 1000 + dt.microsecond // 1000)
+
+
+def legacy_iso_ms(value):
+    """The isoparse-based strategy get_time_unix used for abbr.dt titles."""
+    dt = dateutil.parser.isoparse(value)
+    return int(time.mktime(dt.timetuple()) * 1000 + dt.microsecond // 1000)
+
+
+class TestTimestampDecoder(unittest.TestCase):
+    """Test the fast paths against the dateutil results they replace."""
+
+    FILENAMES = [
+        "Susan Nowak Tang - Text - 2025-08-13T12_08_52Z.html",
+        "+13479774102 - 2014-10-25T22_10_03Z.html",
+        "Mike Daddio - Voicemail - 2013-07-25T19_51_06Z.html",
+        "Charles Tang - Received - 2020-03-08T06_59_59Z.html",
+        "Charles Tang - Placed - 2021-11-07T05_30_00Z.html",
+        "+15551234567 - Missed - 2019-12-31T23_59_59Z.html",
+        "Group Conversation - 2024-02-29T00_00_00Z.html",
+    ]
+
+    ISO_VALUES = [
+        "2014-10-25T18:10:03.123-04:00",
+        "2020-03-08T02:30:00.000-05:00",
+        "2021-11-07T01:30:00.999999+00:00",
+        "2011-05-01T12:00:00Z",
+        "2011-05-01T12:00:00",
+        "2011-05-01T12:00:00.5-04:00",
+        "2011-05-01",
+    ]
+
+    def setUp(self):
+        self.decoder = TimestampDecoder()
+
+    def test_filename_fast_path_matches_dateutil(self):
+        """Test that fixed-layout filenames decode exactly as dateutil did."""
+        for filename in self.FILENAMES:
+            with self.subTest(filename=filename):
+                self.assertEqual(self.decoder.decode_filename(filename), legacy_filename_ms(filename))
+
+        self.assertEqual(self.decoder.stats["filename_fast"], len(self.FILENAMES))
+        self.assertEqual(self.decoder.stats["fuzzy_fallbacks"], 0)
+
+    def test_iso_values_match_isoparse(self):
+        """Test that ISO titles decode exactly as isoparse did, fast or not."""
+        for value in self.ISO_VALUES:
+            with self.subTest(value=value):
+                self.assertEqual(self.decoder.decode_iso(value), legacy_iso_ms(value))
+
+        # One-digit fractions and date-only values take the dateutil fallback
+        self.assertEqual(self.decoder.stats["iso_fast"], len(self.ISO_VALUES) - 2)
+        self.assertEqual(self.decoder.stats["fuzzy_fallbacks"], 2)
+
+    def test_filename_results_are_memoized(self):
+        """Test that repeated filenames hit the memo."""
+        filename = self.FILENAMES[0]
+        first = self.decoder.decode_filename(filename)
+        for _ in range(5):
+            self.assertEqual(self.decoder.decode_filename(filename), first)
+
+        self.assertEqual(self.decoder.stats["filename_fast"], 1)
+        self.assertEqual(self.decoder.stats["filename_memo_hits"], 5)
+
+    def test_unusual_filename_uses_counted_fallback(self):
+        """Test that non-standard filename timestamps still parse via dateutil."""
+        filename = "Alice - Text - 2025-08-13 12_08_52.html"
+
+        self.assertEqual(self.decoder.decode_filename(filename), legacy_filename_ms(filename))
+        self.assertEqual(self.decoder.stats["fuzzy_fallbacks"], 1)
+
+    def test_unparseable_filenames_return_none(self):
+        """Test that filenames without a usable timestamp return None."""
+        self.assertIsNone(self.decoder.decode_filename("unknown"))
+        self.assertIsNone(self.decoder.decode_filename("Alice - Text - .html"))
+        self.assertIsNone(self.decoder.decode_filename("Alice - Text - not a date.html"))
+        self.assertEqual(self.decoder.stats["failures"], 2)
+
+    def test_invalid_iso_raises_value_error(self):
+        """Test that invalid ISO values raise like isoparse did."""
+        with self.assertRaises(ValueError):
+            self.decoder.decode_iso("2014-13-25T18:10:03.123-04:00")
+        with self.assertRaises(ValueError):
+            self.decoder.decode_iso("yesterday")
+
+    def test_memo_is_bounded(self):
+        """Test that the memo is reset once it reaches max_memo_size."""
+        decoder = TimestampDecoder(max_memo_size=3)
+        for filename in self.FILENAMES:
+            decoder.decode_filename(filename)
+
+        self.assertLessEqual(len(decoder._filename_memo), 3)
+
+    def test_clear_resets_memo_and_stats(self):
+        """Test that clear() drops memoized results and counters."""
+        self.decoder.decode_filename(self.FILENAMES[0])
+        self.decoder.clear()
+
+        self.assertEqual(self.decoder._filename_memo, {})
+        self.assertEqual(set(self.decoder.stats.values()), {0})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -8,11 +8,16 @@ Also validates number format integrity in unknown_numbers.csv.
 import csv
 import json
 import re
+import sys
 from pathlib import Path
 from collections import defaultdict, Counter
 from datetime import datetime
 import time
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.phone_mention_index import PhoneMentionIndex
+
 class NoConversationAnalyzer:
     def __init__(self, data_dir="../gvoice-convert"):
         self.data_dir = Path(data_dir)
@@ -186,18 +191,6 @@ class NoConversationAnalyzer:
         """Analyze why numbers have no conversations."""
         print("🔍 Analyzing numbers without conversations...")
         
-        # Load the clean analysis results
-        try:
-            with open("clean_phone_analysis_results.json", 'r') as f:
-                clean_results = json.load(f)
-        except FileNotFoundError:
-            print("❌ Clean analysis results not found. Run clean_phone_analysis.py first.")
-            return None
-        
-        # Get numbers without conversations
-        detailed_data = clean_results['frequency_analysis']['detailed_data']
-        numbers_with_conversations = set(detailed_data.keys())
-        
         # Load all unknown numbers
         all_unknown_numbers = []
         with open(self.unknown_csv, 'r', encoding='utf-8') as f:
@@ -207,6 +200,13 @@ class NoConversationAnalyzer:
                 if phone:
                     all_unknown_numbers.append(phone)
         
+        # Query the phone index instead of relying on a previous tool's JSON output
+        index = PhoneMentionIndex.for_conversations(self.conversations_dir)
+        try:
+            numbers_with_conversations = set(index.lookup(all_unknown_numbers))
+        finally:
+            index.close()
+        
         # Find numbers without conversations
         numbers_without_conversations = []
         for phone in all_unknown_numbers:
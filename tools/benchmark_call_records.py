@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Call Record Parser Benchmark
+Generates synthetic Google Voice call and voicemail files and compares the
+single-pass processors.call_record_parser against the BeautifulSoup path
+(parse_html_file + extract_call_info + extract_call_details_from_soup).
+
+Usage:
+    python tools/benchmark_call_records.py [--files 100000] [--baseline-limit 10000]
+"""
+
+import argparse
+import logging
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from processors.call_record_parser import parse_call_record  # noqa: E402
+from processors.html_processor import get_file_type  # noqa: E402
+
+TEMPLATE = """<?xml version="1.0" ?>
+<!DOCTYPE html PUBLIC "-//W3C//DTD XHTML 1.0 Strict//EN" "http://www.w3.org/TR/xhtml1/DTD/xhtml1-strict.dtd">
+<html xmlns="http://www.w3.org/1999/xhtml">
+<head><meta http-equiv="Content-Type" content="text/html; charset=UTF-8" />
+<title>{title}</title>
+</head>
+<body>
+<div class="haudio">
+<span class="fn">{title}</span>
+<div class="contributor vcard">{prefix}
+<a class="tel" href="tel:{phone}"><span class="fn">{name}</span></a></div>
+<abbr class="published" title="{published}">{published}</abbr>
+<abbr class="duration" title="PT{minutes}M{seconds}S">(00:{minutes:02d}:{seconds:02d})</abbr>
+{body}
+<div class="tags">Labels: <a rel="tag" href="http://www.google.com/voice#{label}">{label}</a></div>
+</div>
+</body>
+</html>"""
+
+KINDS = [
+    ("Missed", "Missed call from", ""),
+    ("Placed", "Placed call to", ""),
+    ("Received", "Received call from", ""),
+    ("Voicemail", "Voicemail from",
+     '<span class="description"><span class="full-text">Hey it is me, call me back when you can</span></span>'),
+]
+
+
+def generate_files(directory, count, seed=11):
+    rng = random.Random(seed)
+    start = datetime(2012, 1, 1)
+    files = []
+    for i in range(count):
+        label, prefix, body = rng.choice(KINDS)
+        name = f"Contact {rng.randint(1, 3000)}"
+        when = start + timedelta(seconds=rng.randrange(400_000_000))
+        path = directory / f"{name} - {label} - {when.strftime('%Y-%m-%dT%H_%M_%S')}Z-{i}.html"
+        path.write_text(TEMPLATE.format(
+            title=f"{prefix} {name}", prefix=prefix, name=name, label=label, body=body,
+            phone=f"+1555{rng.randint(1000000, 9999999)}",
+            published=when.strftime("%Y-%m-%dT%H:%M:%S.000-05:00"),
+            minutes=rng.randint(0, 59), seconds=rng.randint(0, 59),
+        ), encoding="utf-8")
+        files.append(path)
+    return files
+
+
+def run_single_pass(files):
+    parsed = 0
+    for path in files:
+        if parse_call_record(path, get_file_type(path.name)) is not None:
+            parsed += 1
+    return parsed
+
+
+def run_beautifulsoup(files):
+    import sms
+    from processors.html_processor import parse_html_file
+
+    parsed = 0
+    for path in files:
+        soup = parse_html_file(path)
+        if get_file_type(path.name) == "voicemail":
+            info = sms.extract_voicemail_info(path.name, soup)
+        else:
+            info = sms.extract_call_info(path.name, soup)
+            sms.extract_call_details_from_soup(soup)
+        if info:
+            parsed += 1
+    return parsed
+
+
+def report(label, files, func):
+    start = time.perf_counter()
+    parsed = func(files)
+    elapsed = time.perf_counter() - start
+    per_file_us = elapsed / len(files) * 1e6
+    print(f"   {label:<24} {elapsed:8.2f}s  {per_file_us:8.1f} µs/file  ({parsed:,} parsed)")
+    return per_file_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--files", type=int, default=100_000, help="Synthetic call/voicemail files")
+    parser.add_argument("--baseline-limit", type=int, default=10_000,
+                        help="Files run through the BeautifulSoup path (it is slow)")
+    args = parser.parse_args()
+
+    # The soup path logs at INFO for every file
+    logging.disable(logging.CRITICAL)
+
+    print("📞 CALL RECORD PARSER BENCHMARK")
+    print("=" * 50)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        print(f"🏗️  Generating {args.files:,} call/voicemail files...")
+        files = generate_files(Path(temp_dir), args.files)
+
+        print("⏱️  Parsing")
+        fast = report("single-pass", files, run_single_pass)
+        baseline_files = files[:args.baseline_limit]
+        slow = report(f"beautifulsoup ({len(baseline_files):,})", baseline_files, run_beautifulsoup)
+
+    print(f"🚀 Speedup: {slow / fast:.1f}x per file")
+    print("✅ Benchmark complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Conversation Manager Contention Benchmark
+Runs 1, 4 and 16 writer threads against ConversationManager and compares:
+
+- global lock: lock_shards=1 with the three per-message calls
+  (write_message_with_content, update_latest_timestamp, update_stats)
+- sharded: the same calls with the default lock_shards
+- sharded + write_batch: one write_batch() call per simulated file
+
+Usage:
+    python tools/benchmark_conversation_manager_contention.py [--messages 200000] [--conversations 2000]
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.conversation_manager import DEFAULT_LOCK_SHARDS, ConversationManager, QueuedMessage  # noqa: E402
+
+FILE_SIZE = 25  # Messages per simulated Takeout file
+
+
+def make_files(total_messages, conversations):
+    files = []
+    for start in range(0, total_messages, FILE_SIZE):
+        conversation_id = f"contact_{(start // FILE_SIZE) % conversations}"
+        files.append((conversation_id, [
+            QueuedMessage(1_600_000_000_000 + n * 1000, "Me", f"message {n}")
+            for n in range(start, min(start + FILE_SIZE, total_messages))
+        ]))
+    return files
+
+
+def write_per_message(manager, files):
+    for conversation_id, messages in files:
+        for queued in messages:
+            manager.write_message_with_content(conversation_id, queued.timestamp, queued.sender, queued.message)
+            manager.update_latest_timestamp(conversation_id, queued.timestamp)
+        manager.update_stats(conversation_id, {"num_sms": len(messages)})
+
+
+def write_batched(manager, files):
+    for conversation_id, messages in files:
+        manager.write_batch(conversation_id, messages, stats={"num_sms": len(messages)})
+
+
+def run(threads, files, lock_shards, func):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager = ConversationManager(Path(temp_dir), lock_shards=lock_shards)
+        workers = [threading.Thread(target=func, args=(manager, files[i::threads])) for i in range(threads)]
+        start = time.perf_counter()
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200_000, help="Messages written per run")
+    parser.add_argument("--conversations", type=int, default=2_000, help="Distinct conversations")
+    args = parser.parse_args()
+
+    # Keep per-message debug output out of the measurement
+    logging.disable(logging.CRITICAL)
+
+    files = make_files(args.messages, args.conversations)
+    variants = [
+        ("global lock", 1, write_per_message),
+        (f"{DEFAULT_LOCK_SHARDS} shards", DEFAULT_LOCK_SHARDS, write_per_message),
+        (f"{DEFAULT_LOCK_SHARDS} shards + batch", DEFAULT_LOCK_SHARDS, write_batched),
+    ]
+
+    print("🔒 CONVERSATION MANAGER CONTENTION BENCHMARK")
+    print("=" * 60)
+    print(f"   {args.messages:,} messages, {len(files):,} files, {args.conversations:,} conversations")
+    for threads in (1, 4, 16):
+        print(f"🧵 {threads} writer thread(s)")
+        baseline = None
+        for label, lock_shards, func in variants:
+            elapsed = run(threads, files, lock_shards, func)
+            baseline = baseline or elapsed
+            rate = args.messages / elapsed
+            print(f"   {label:<22} {elapsed:7.2f}s  {rate:12,.0f} msg/s  {baseline / elapsed:5.2f}x")
+
+    print("✅ Benchmark complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
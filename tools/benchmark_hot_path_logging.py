@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Hot-Path Logging Benchmark
+Measures the per-message cost of the logging done while writing messages, with
+debug logging off: the previous eager f-string style (CALL-ONLY debug lines,
+alias lookup dumps, every-50-messages progress) against utils.hot_path_logging
+(guarded lazy records, counters, rate-limited progress).
+
+Usage:
+    python tools/benchmark_hot_path_logging.py [--messages 1000000] [--aliases 5000]
+"""
+
+import argparse
+import io
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.hot_path_logging import CounterRegistry, LazyLogger, ProgressReporter  # noqa: E402
+
+
+def make_logger():
+    logger = logging.getLogger("benchmark_hot_path_logging")
+    logger.handlers[:] = [logging.StreamHandler(io.StringIO())]
+    logger.propagate = False
+    logger.setLevel(logging.INFO)  # debug off, as in a normal run
+    return logger
+
+
+def run_eager(logger, messages, aliases, content):
+    total = len(messages)
+    for i, (conversation_id, phone_number) in enumerate(messages):
+        logger.debug(f"Looking up alias for phone number: '{phone_number}'")
+        logger.debug(f"Available aliases: {list(aliases.keys())}")
+        logger.debug(f"🔍 CALL-ONLY DEBUG: Tracking content for {conversation_id}, type=sms")
+        logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} marked as SMS (has_calls_only=False)")
+        logger.debug(f"🔍 CALL-ONLY DEBUG: {conversation_id} analysis: {content} -> is_call_only=False")
+        current = i + 1
+        if current % 50 == 0 or current == total:
+            logger.info(f"SMS processing progress: {current}/{total} messages processed ({current / total * 100:.1f}%)")
+
+
+def run_hot_path(logger, messages, aliases, content):
+    hot_log = LazyLogger(logger)
+    counters = CounterRegistry()
+    progress = ProgressReporter(logger)
+    total = len(messages)
+    for i, (conversation_id, phone_number) in enumerate(messages):
+        hot_log.debug("No alias for %s among %d aliases", phone_number, len(aliases))
+        counters.increment("content_tracking.sms")
+        hot_log.debug("🔍 CALL-ONLY DEBUG: %s analysis: %s -> is_call_only=%s", conversation_id, content, False)
+        progress.report("SMS processing progress: %d/%d messages processed", i + 1, total)
+    counters.log_summary(logger, "Conversation content tracking")
+
+
+def report(label, func, *args):
+    start = time.perf_counter()
+    func(*args)
+    elapsed = time.perf_counter() - start
+    per_message_ns = elapsed / len(args[1]) * 1e9
+    print(f"   {label:<12} {elapsed:8.2f}s  {per_message_ns:10.0f} ns/message")
+    return per_message_ns
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1_000_000, help="Messages to simulate")
+    parser.add_argument("--aliases", type=int, default=5_000, help="Entries in the alias table")
+    args = parser.parse_args()
+
+    logger = make_logger()
+    aliases = {f"+1555{i:07d}": f"Contact_{i}" for i in range(args.aliases)}
+    messages = [(f"Contact_{i % 3000}", f"+1555{i % 10_000_000:07d}") for i in range(args.messages)]
+    content = {"has_sms": True, "has_mms": False, "call_count": 0, "total_messages": 12}
+
+    print("🪵 HOT-PATH LOGGING BENCHMARK (debug off)")
+    print("=" * 50)
+    print(f"   {args.messages:,} messages, {args.aliases:,} aliases")
+    # Dumping the alias table per message dominates; keep the eager run bounded
+    eager_messages = messages[: max(1, min(len(messages), 2_000_000 // max(args.aliases, 1)))]
+    slow = report("eager", run_eager, logger, eager_messages, aliases, content)
+    fast = report("hot-path", run_hot_path, logger, messages, aliases, content)
+
+    print(f"🚀 Speedup: {slow / fast:.1f}x per message")
+    print("✅ Benchmark complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
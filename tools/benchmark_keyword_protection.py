@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Keyword Protection Benchmark
+Checks synthetic conversations against a large protected-keyword list and
+compares the compiled matcher in core.keyword_protection with the previous
+per-keyword scan over the joined conversation text.
+
+Usage:
+    python tools/benchmark_keyword_protection.py [--keywords 1000] [--conversations 50000] [--baseline-limit 2000]
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.keyword_protection import KeywordProtection  # noqa: E402
+
+WORDS = (
+    "hey call me later tomorrow dinner thanks meeting office pick up kids "
+    "running late see you soon love it great idea sounds good where are you"
+).split()
+
+
+def legacy_is_protected(protection, messages, conversation_id=None):
+    """The previous algorithm: join all text, then test every keyword in turn."""
+    full_text = " ".join(str(msg.get("text") or "") for msg in messages)
+    if conversation_id:
+        full_text = f"{full_text} {conversation_id.replace('_', ' ')}"
+    if not full_text.strip():
+        return False, None
+    for keyword in protection.keywords:
+        if protection.match_partial:
+            search_text = full_text if protection.case_sensitive else full_text.lower()
+            search_keyword = keyword if protection.case_sensitive else keyword.lower()
+            if search_keyword in search_text:
+                return True, keyword
+        else:
+            flags = 0 if protection.case_sensitive else re.IGNORECASE
+            search_keyword = keyword if protection.case_sensitive else keyword.lower()
+            if re.compile(r'\b' + re.escape(search_keyword) + r'\b', flags).search(full_text):
+                return True, keyword
+    for pattern in protection.regex_patterns:
+        match = pattern.search(full_text)
+        if match:
+            return True, f"{pattern.pattern} (matched: '{match.group(0)}')"
+    return False, None
+
+
+def make_protection(directory, keyword_count, match_partial, rng):
+    keywords = [f"Contact{i} {rng.choice(['Smith', 'Lee', 'Garcia', 'Chen'])}" for i in range(keyword_count)]
+    path = directory / f"keywords_{match_partial}.json"
+    path.write_text(json.dumps({
+        "case_sensitive": False,
+        "match_partial": match_partial,
+        "keywords": {"people": keywords},
+        "regex_patterns": ["INV\\d{5,}", "PO-\\d{4,}", "case #\\d+"],
+    }))
+    return KeywordProtection(path)
+
+
+def make_conversations(count, keyword_count, rng):
+    conversations = []
+    for i in range(count):
+        messages = [{"text": " ".join(rng.choices(WORDS, k=rng.randint(3, 15)))} for _ in range(rng.randint(2, 20))]
+        if i % 20 == 0:
+            # About 5% of conversations mention a protected keyword
+            messages[-1]["text"] += f" ask contact{rng.randrange(keyword_count)} smith"
+        conversations.append((f"+1555{i:07d}", messages))
+    return conversations
+
+
+def report(label, conversations, func):
+    start = time.perf_counter()
+    protected = sum(1 for conversation_id, messages in conversations if func(messages, conversation_id)[0])
+    elapsed = time.perf_counter() - start
+    per_conversation_us = elapsed / len(conversations) * 1e6
+    print(f"   {label:<28} {elapsed:8.2f}s  {per_conversation_us:9.1f} µs/conversation  ({protected:,} protected)")
+    return per_conversation_us
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--keywords", type=int, default=1_000, help="Protected keywords")
+    parser.add_argument("--conversations", type=int, default=50_000, help="Conversations to check")
+    parser.add_argument("--baseline-limit", type=int, default=2_000,
+                        help="Conversations run through the previous algorithm (it is slow)")
+    args = parser.parse_args()
+
+    rng = random.Random(5)
+    print("🛡️  KEYWORD PROTECTION BENCHMARK")
+    print("=" * 60)
+    print(f"   {args.keywords:,} keywords, {args.conversations:,} conversations")
+    conversations = make_conversations(args.conversations, args.keywords, rng)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for match_partial in (True, False):
+            mode = "partial" if match_partial else "whole-word"
+            protection = make_protection(Path(temp_dir), args.keywords, match_partial, rng)
+            print(f"🔍 {mode} matching")
+            fast = report("compiled", conversations, protection.is_protected)
+            baseline = conversations[:args.baseline_limit]
+            slow = report(
+                f"previous ({len(baseline):,})",
+                baseline,
+                lambda messages, conversation_id: legacy_is_protected(protection, messages, conversation_id),
+            )
+            print(f"   🚀 Speedup: {slow / fast:.1f}x per conversation")
+
+    print("✅ Benchmark complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Precompressed Serving Benchmark
+Generates synthetic conversation pages, precompresses them and fetches every
+page from the built-in server as plain HTML and as each precompressed
+encoding, reporting bytes transferred and request latency.
+
+Localhost hides transfer time, so the estimated time on a slower link
+(--link-mbps) is reported alongside the measured latency.
+
+Usage:
+    python tools/benchmark_precompressed_serving.py [--pages 50] [--messages 5000]
+"""
+
+import argparse
+import http.client
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.conversation_manager import ConversationManager  # noqa: E402
+from core.precompress import brotli_available, precompress_directory  # noqa: E402
+from core.static_server import create_server  # noqa: E402
+
+
+def make_messages(count, seed):
+    base = 1_600_000_000_000 + seed * 10_000_000
+    return [
+        (base + i * 60_000, {
+            "text": f"message {i} from conversation {seed} about dinner plans & the <usual> place",
+            "sender": "Me" if i % 3 else f"Contact {seed}",
+            "formatted_time": f"2020-09-13 12:{i % 60:02d}:00",
+            "attachments": [],
+        })
+        for i in range(count)
+    ]
+
+
+def write_pages(output_dir, page_count, message_count):
+    manager = ConversationManager(output_dir, output_format="html")
+    for page in range(page_count):
+        conversation_id = f"Contact{page}"
+        path = output_dir / f"{conversation_id}.html"
+        file_info = {"file": open(path, "w", encoding="utf-8", buffering=manager.write_buffer_size)}
+        manager._finalize_html_file(file_info, make_messages(message_count, page), conversation_id)
+    return sorted(output_dir.glob("*.html"))
+
+
+def fetch_all(address, paths, encoding, rounds):
+    """Fetch every page `rounds` times over one keep-alive connection."""
+    conn = http.client.HTTPConnection(*address, timeout=30)
+    headers = {"Accept-Encoding": encoding} if encoding else {}
+    latencies = []
+    transferred = 0
+    try:
+        for _ in range(rounds):
+            for path in paths:
+                start = time.perf_counter()
+                conn.request("GET", path, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                latencies.append(time.perf_counter() - start)
+                if response.status != 200:
+                    raise RuntimeError(f"{path}: HTTP {response.status}")
+                if encoding and response.getheader("Content-Encoding") != encoding:
+                    raise RuntimeError(f"{path}: {encoding} variant not served")
+                transferred += len(body)
+    finally:
+        conn.close()
+    return transferred // rounds, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pages", type=int, default=50, help="Conversation pages to generate")
+    parser.add_argument("--messages", type=int, default=5000, help="Messages per page")
+    parser.add_argument("--rounds", type=int, default=3, help="Times each page is fetched per encoding")
+    parser.add_argument("--link-mbps", type=float, default=20.0, help="Link speed for the transfer estimate")
+    args = parser.parse_args()
+
+    print("🌐 PRECOMPRESSED SERVING BENCHMARK")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir)
+        pages = write_pages(output_dir, args.pages, args.messages)
+        print(f"   {len(pages)} pages, {sum(p.stat().st_size for p in pages) / (1024 * 1024):.1f} MB of HTML")
+
+        start = time.perf_counter()
+        stats = precompress_directory(output_dir)
+        print(f"   Precompressed in {time.perf_counter() - start:.2f}s "
+              f"({'gzip + brotli' if brotli_available() else 'gzip only; pip install brotli for .br'})")
+
+        start = time.perf_counter()
+        rerun = precompress_directory(output_dir)
+        print(f"   Unchanged rerun: {time.perf_counter() - start:.2f}s ({rerun['skipped']} skipped)")
+
+        server = create_server(output_dir, port=0)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            paths = [f"/{page.name}" for page in pages]
+            encodings = [None, "gzip"] + (["br"] if stats["bytes_br"] else [])
+            baseline = None
+            print()
+            for encoding in encodings:
+                transferred, latencies = fetch_all(server.server_address[:2], paths, encoding, args.rounds)
+                baseline = baseline or transferred
+                link_seconds = transferred * 8 / (args.link_mbps * 1_000_000)
+                print(f"   {encoding or 'identity':<9} {transferred / (1024 * 1024):8.2f} MB "
+                      f"({transferred / baseline:5.1%})  "
+                      f"median {statistics.median(latencies) * 1000:6.2f} ms  "
+                      f"p95 {sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000:6.2f} ms  "
+                      f"~{link_seconds:6.2f}s at {args.link_mbps:g} Mbps")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print("✅ Benchmark complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
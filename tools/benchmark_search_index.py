@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Search Index Benchmark
+Builds a core.search_index database from synthetic messages and reports build
+throughput, database size and query latency (term, phrase, prefix, date range,
+participant).
+
+Usage:
+    python tools/benchmark_search_index.py [--messages 1000000] [--queries 50]
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.search_index import SEARCH_INDEX_FILENAME, SearchIndex  # noqa: E402
+
+WORDS = (
+    "hey are you coming dinner tonight see soon running late call me back thanks "
+    "love the photo happy birthday meeting tomorrow morning lunch restaurant pick up "
+    "kids school traffic airport flight landed home weekend plans movie game score "
+    "doctor appointment reminder payment sent address apartment keys garage weather"
+).split()
+
+
+def generate_messages(count, conversations, seed=7):
+    rng = random.Random(seed)
+    names = [f"+1555{rng.randint(1000000, 9999999)}" for _ in range(conversations)]
+    start = int(datetime(2012, 1, 1).timestamp() * 1000)
+    span = int(datetime(2025, 1, 1).timestamp() * 1000) - start
+    for _ in range(count):
+        conversation = rng.choice(names)
+        sender = "Me" if rng.random() < 0.5 else conversation
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 18)))
+        yield conversation, sender, start + rng.randrange(span), text
+    return names
+
+
+def measure(index, label, repeats, **kwargs):
+    latencies = []
+    hits = 0
+    for _ in range(repeats):
+        start = time.perf_counter()
+        hits = len(index.search(**kwargs))
+        latencies.append((time.perf_counter() - start) * 1000)
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(f"   {label:<34} p50 {statistics.median(latencies):7.2f} ms   p95 {p95:7.2f} ms   ({hits} hits)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=1_000_000, help="Messages to index")
+    parser.add_argument("--conversations", type=int, default=5_000, help="Distinct conversations")
+    parser.add_argument("--queries", type=int, default=50, help="Repetitions per query type")
+    args = parser.parse_args()
+
+    print("🔎 SEARCH INDEX BENCHMARK")
+    print("=" * 50)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir) / SEARCH_INDEX_FILENAME
+        index = SearchIndex(db_path)
+
+        print(f"🏗️  Building index: {args.messages:,} messages in {args.conversations:,} conversations")
+        participant = None
+        start = time.perf_counter()
+        for conversation, sender, timestamp, text in generate_messages(args.messages, args.conversations):
+            participant = participant or conversation
+            index.add_message(conversation, sender, timestamp, text)
+        index.flush()
+        build_time = time.perf_counter() - start
+        index.optimize()
+        optimize_time = time.perf_counter() - start - build_time
+
+        size_mb = sum(f.stat().st_size for f in Path(temp_dir).iterdir()) / (1024 * 1024)
+        print(f"   build      {build_time:8.2f}s  ({args.messages / build_time:,.0f} messages/s)")
+        print(f"   optimize   {optimize_time:8.2f}s")
+        print(f"   size       {size_mb:8.1f} MB ({index.count():,} rows)")
+
+        print(f"⏱️  Query latency ({args.queries} runs each, limit 50)")
+        measure(index, "term: dinner", args.queries, query="dinner")
+        measure(index, "terms: dinner restaurant tonight", args.queries, query="dinner restaurant tonight")
+        measure(index, "phrase: see you soon", args.queries, query="see you soon", phrase=True)
+        measure(index, "prefix: resta*", args.queries, query="resta", prefix=True)
+        measure(index, "term + date range (2019)", args.queries, query="dinner",
+                since=datetime(2019, 1, 1), until=datetime(2020, 1, 1))
+        measure(index, "term + participant", args.queries, query="dinner", participant=participant)
+        measure(index, "term, newest first", args.queries, query="dinner", order_by_date=True)
+        index.close()
+
+    print("✅ Benchmark complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Conversation Page Rendering Benchmark
+Finalizes one synthetic conversation with many messages and compares the
+streaming template path (CompiledTemplate.render_to with row iterables) with
+the previous approach of joining all rows and calling str.format on the page.
+
+Each mode runs in its own subprocess so peak RSS is measured independently.
+
+Usage:
+    python tools/benchmark_template_rendering.py [--messages 200000]
+"""
+
+import argparse
+import hashlib
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+MODES = ("previous", "streaming")
+
+
+def current_rss_mb():
+    """Resident set size of this process right now, in MB (Linux)."""
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * resource.getpagesize() / (1024 * 1024)
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process, in MB (ru_maxrss is KB on Linux)."""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def make_messages(count):
+    base = 1_600_000_000_000
+    return [
+        (base + i * 60_000, {
+            "text": f"message {i} about dinner plans & the <usual> place",
+            "sender": "Me" if i % 3 else "Alice",
+            "formatted_time": f"2020-09-13 12:{i % 60:02d}:00",
+            "attachments": [{"filename": f"attachments/photo{i}.jpg"}] if i % 50 == 0 else [],
+        })
+        for i in range(count)
+    ]
+
+
+def render_previous(manager, messages, conversation_id, path):
+    """The previous finalize: build every row, join, format the page, write it."""
+    from templates.loader import get_template_loader
+
+    rows = []
+    for timestamp, message_data in messages:
+        formatted_time = message_data.get("formatted_time", manager._format_timestamp(timestamp))
+        attachments_html = manager._build_attachments_html(message_data.get("attachments", []))
+        rows.append(manager._build_message_row(
+            formatted_time, message_data.get("sender", "Unknown"), message_data.get("text", ""), attachments_html
+        ))
+    html_content = get_template_loader().get_template("conversation").format(
+        conversation_id=conversation_id,
+        total_messages=len(messages),
+        message_rows="\n".join(rows),
+        date_range=manager._get_conversation_date_range(messages),
+    )
+    with open(path, "w", encoding="utf-8", buffering=manager.write_buffer_size) as f:
+        f.write(html_content)
+    return hashlib.sha256(html_content.encode("utf-8")).hexdigest()
+
+
+def run_mode(mode, message_count):
+    """Render one page in this process and print a JSON result line."""
+    from core.conversation_manager import ConversationManager
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        manager = ConversationManager(Path(temp_dir), output_format="html")
+        messages = make_messages(message_count)
+        conversation_id = "Alice"
+        path = Path(temp_dir) / f"{conversation_id}.html"
+        rss_before = current_rss_mb()
+
+        start = time.perf_counter()
+        if mode == "streaming":
+            file_info = {"file": open(path, "w", encoding="utf-8", buffering=manager.write_buffer_size)}
+            record = manager._finalize_html_file(file_info, messages, conversation_id)
+            digest = record["sha256"]
+        else:
+            digest = render_previous(manager, messages, conversation_id, path)
+        elapsed = time.perf_counter() - start
+
+        print(json.dumps({
+            "mode": mode,
+            "seconds": elapsed,
+            "rss_before_mb": rss_before,
+            "peak_rss_mb": peak_rss_mb(),
+            "bytes": path.stat().st_size,
+            "sha256": digest,
+        }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=200_000, help="Messages in the conversation")
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        run_mode(args.mode, args.messages)
+        return 0
+
+    print("📄 CONVERSATION PAGE RENDERING BENCHMARK")
+    print("=" * 60)
+    print(f"   {args.messages:,} messages in one conversation")
+    results = {}
+    for mode in MODES:
+        output = subprocess.run(
+            [sys.executable, __file__, "--mode", mode, "--messages", str(args.messages)],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        results[mode] = result
+        growth = result["peak_rss_mb"] - result["rss_before_mb"]
+        print(f"   {mode:<10} {result['seconds']:7.2f}s  peak RSS {result['peak_rss_mb']:7.1f} MB "
+              f"(+{growth:6.1f} MB while rendering)  {result['bytes'] / (1024 * 1024):.1f} MB page")
+
+    previous, streaming = results["previous"], results["streaming"]
+    if previous["sha256"] != streaming["sha256"]:
+        print("❌ Outputs differ")
+        return 1
+    saved = (previous["peak_rss_mb"] - previous["rss_before_mb"]) - (
+        streaming["peak_rss_mb"] - streaming["rss_before_mb"])
+    print(f"   💾 Rendering memory saved: {saved:.1f} MB, identical output")
+    print("✅ Benchmark complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
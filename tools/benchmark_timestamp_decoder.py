@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Timestamp Decoder Benchmark
+Compares core.timestamp_decoder against the dateutil path get_time_unix used
+before, on a synthetic Takeout workload, and checks that results match.
+
+Usage:
+    python tools/benchmark_timestamp_decoder.py [--decodes 2000000] [--files 5000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import dateutil.parser
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.timestamp_decoder import TimestampDecoder, extract_filename_timestamp_part  # noqa: E402
+
+
+def legacy_filename_ms(filename):
+    part = extract_filename_timestamp_part(filename)
+    dt = dateutil.parser.parse(part, fuzzy=True)
+    return int(time.mktime(dt.timetuple()) * 1000 + dt.microsecond // 1000)
+
+
+def legacy_iso_ms(value):
+    dt = dateutil.parser.isoparse(value)
+    return int(time.mktime(dt.timetuple()) * 1000 + dt.microsecond // 1000)
+
+
+def build_workload(decodes, files, seed=42):
+    """Build filenames (each decoded once per message) and abbr.dt titles."""
+    rng = random.Random(seed)
+    kinds = ["Text", "Voicemail", "Received", "Placed", "Missed"]
+    filenames = []
+    for i in range(files):
+        stamp = (f"{rng.randint(2010, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+                 f"T{rng.randint(0, 23):02d}_{rng.randint(0, 59):02d}_{rng.randint(0, 59):02d}Z")
+        filenames.append(f"Contact {i} - {rng.choice(kinds)} - {stamp}.html")
+    titles = [
+        f"{rng.randint(2010, 2025)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+        f"T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}"
+        f".{rng.randint(0, 999):03d}-0{rng.choice([4, 5])}:00"
+        for _ in range(files)
+    ]
+    return [rng.choice(filenames) for _ in range(decodes)], titles
+
+
+def timed(label, func, items):
+    start = time.perf_counter()
+    results = [func(item) for item in items]
+    elapsed = time.perf_counter() - start
+    print(f"   {label:<28} {elapsed:8.3f}s  ({len(items) / elapsed:,.0f}/s)")
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--decodes", type=int, default=2_000_000, help="Filename decodes to run")
+    parser.add_argument("--files", type=int, default=5_000, help="Distinct filenames/titles")
+    parser.add_argument("--legacy-sample", type=int, default=100_000,
+                        help="Decodes to time on the slow dateutil path (extrapolated)")
+    args = parser.parse_args()
+
+    print("⏱️  TIMESTAMP DECODER BENCHMARK")
+    print("=" * 50)
+    filename_calls, titles = build_workload(args.decodes, args.files)
+    sample = filename_calls[:args.legacy_sample]
+
+    print(f"📁 Filename strategy: {args.decodes:,} decodes over {args.files:,} files")
+    decoder = TimestampDecoder()
+    fast, fast_time = timed("decoder (memoized)", decoder.decode_filename, filename_calls)
+    legacy, legacy_time = timed(f"dateutil fuzzy ({len(sample):,})", legacy_filename_ms, sample)
+    if fast[:len(sample)] != legacy:
+        print("❌ Filename results differ from dateutil")
+        return 1
+    projected = legacy_time * args.decodes / len(sample)
+    print(f"   projected dateutil total      {projected:8.3f}s  -> {projected / fast_time:,.0f}x faster")
+
+    print(f"🏷️  abbr.dt titles: {len(titles):,} decodes")
+    iso_decoder = TimestampDecoder()
+    fast_iso, fast_iso_time = timed("decoder fast path", iso_decoder.decode_iso, titles)
+    legacy_iso, legacy_iso_time = timed("dateutil isoparse", legacy_iso_ms, titles)
+    if fast_iso != legacy_iso:
+        print("❌ ISO results differ from isoparse")
+        return 1
+    print(f"   speedup                       {legacy_iso_time / fast_iso_time:8.1f}x")
+
+    print(f"📊 Decoder stats: {decoder.stats} / {iso_decoder.stats}")
+    print("✅ Results identical to the dateutil path")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
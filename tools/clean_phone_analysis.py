@@ -7,11 +7,16 @@ Performs comprehensive analysis on the corrected unknown_numbers.csv dataset.
 import csv
 import json
 import re
+import sys
 from pathlib import Path
-from collections import defaultdict, Counter
+from collections import Counter
 from datetime import datetime
 import time
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.phone_mention_index import PhoneMentionIndex
+
 class CleanPhoneAnalyzer:
     def __init__(self, data_dir="../gvoice-convert"):
         self.data_dir = Path(data_dir)
@@ -67,46 +72,28 @@ class CleanPhoneAnalyzer:
         """Analyze how frequently each unknown number appears in conversations."""
         print("📊 Analyzing conversation frequency for unknown numbers...")
         
-        # Create a set for fast lookup
-        unknown_set = set(unknown_numbers)
+        # One scan of the (new or changed) conversation files, then indexed lookups
+        print(f"  📇 Updating phone index for {len(conversation_files)} conversation files...")
+        index = PhoneMentionIndex.for_conversations(self.conversations_dir)
+        try:
+            mentions_by_number = index.lookup(unknown_numbers)
+        finally:
+            index.close()
         
         # Track frequency and file counts
-        frequency_data = defaultdict(lambda: {'conversation_count': 0, 'files': []})
-        
-        # Process each conversation file
-        total_files = len(conversation_files)
-        processed = 0
-        
-        for html_file in conversation_files:
-            processed += 1
-            if processed % 1000 == 0:
-                print(f"  📄 Processed {processed}/{total_files} files...")
-            
-            try:
-                with open(html_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                # Extract phone numbers from filename (format: +1234567890.html)
-                filename_stem = html_file.stem
-                if filename_stem in unknown_set:
-                    frequency_data[filename_stem]['conversation_count'] += 1
-                    frequency_data[filename_stem]['files'].append(html_file.name)
-                
-                # Also search within file content for additional references
-                for phone in unknown_set:
-                    if phone in content:
-                        if phone not in frequency_data:
-                            frequency_data[phone]['conversation_count'] = 0
-                            frequency_data[phone]['files'] = []
-                        if html_file.name not in frequency_data[phone]['files']:
-                            frequency_data[phone]['conversation_count'] += 1
-                            frequency_data[phone]['files'].append(html_file.name)
-                            
-            except Exception as e:
-                print(f"  ⚠️ Error processing {html_file}: {e}")
-                continue
+        frequency_data = {}
+        for phone, mentions in mentions_by_number.items():
+            first_seen = [mention.first_seen for mention in mentions if mention.first_seen]
+            last_seen = [mention.last_seen for mention in mentions if mention.last_seen]
+            frequency_data[phone] = {
+                'conversation_count': len(mentions),
+                'files': [mention.file for mention in mentions],
+                'mention_count': sum(mention.count for mention in mentions),
+                'first_seen': min(first_seen) if first_seen else None,
+                'last_seen': max(last_seen) if last_seen else None
+            }
         
-        # Convert to regular dict and calculate statistics
+        # Calculate statistics
         frequency_stats = {
             'numbers_with_conversations': 0,
             'numbers_without_conversations': 0,
@@ -120,7 +107,10 @@ class CleanPhoneAnalyzer:
             frequency_stats['detailed_data'][phone] = {
                 'conversation_count': conv_count,
                 'file_count': len(data['files']),
-                'sample_files': data['files'][:5]  # First 5 files as examples
+                'sample_files': data['files'][:5],  # First 5 files as examples
+                'mention_count': data['mention_count'],
+                'first_seen': data['first_seen'],
+                'last_seen': data['last_seen']
             }
             
             if conv_count > 0:
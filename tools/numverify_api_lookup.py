@@ -6,12 +6,17 @@ Looks up phone numbers using NumVerify API to identify commercial/spam numbers.
 
 import csv
 import json
-import requests
-import time
+import sys
+import urllib.parse
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 
+# Make the project root importable when run as `python tools/numverify_api_lookup.py`
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.phone_lookup_client import LookupResponseCache, PhoneLookupClient
+
 class NumVerifyAPI:
     def __init__(self, api_key: str):
         self.api_key = api_key
@@ -31,83 +36,55 @@ class NumVerifyAPI:
             'detailed_results': []
         }
     
-    def lookup_phone(self, phone_number: str) -> Optional[Dict]:
-        """
-        Look up a single phone number using NumVerify API.
-        
-        Args:
-            phone_number: Phone number to look up (e.g., +12025551234)
-            
-        Returns:
-            Dict with lookup results or None if failed
-        """
-        try:
-            # Remove + for NumVerify API
-            clean_phone = phone_number.replace('+', '')
-            
-            params = {
-                'access_key': self.api_key,
-                'number': clean_phone,
-                'country_code': '',
-                'format': 1
-            }
-            
-            # Increased timeout for free tier (can be slower)
-            response = requests.get(self.base_url, params=params, timeout=30)
-            response.raise_for_status()
-            
-            data = response.json()
-            
-            # Debug: Print API response for troubleshooting
-            print(f"   📊 API Response: {data}")
-            
-            # Check if we have valid data (some responses don't have 'success' field but have valid data)
-            if data.get('success', False) or (data.get('valid') is not None and data.get('number')):
-                return {
-                    'phone_number': phone_number,
-                    'valid': data.get('valid', False),
-                    'number': data.get('number', ''),
-                    'local_format': data.get('local_format', ''),
-                    'international_format': data.get('international_format', ''),
-                    'country_prefix': data.get('country_prefix', ''),
-                    'country_code': data.get('country_code', ''),
-                    'country_name': data.get('country_name', ''),
-                    'location': data.get('location', ''),
-                    'carrier': data.get('carrier', ''),
-                    'line_type': data.get('line_type', ''),
-                    'raw_response': data
-                }
-            else:
-                # Check if there's an actual error message
-                error_info = data.get('error', {})
-                if isinstance(error_info, dict) and error_info.get('info'):
-                    error_message = error_info.get('info')
-                elif isinstance(error_info, str) and error_info:
-                    error_message = error_info
-                else:
-                    # If no clear error but no valid data, it might be a rate limit or other issue
-                    error_message = f"No valid data returned: {data}"
-                
-                print(f"   ❌ API Error: {error_message}")
-                return {
-                    'phone_number': phone_number,
-                    'error': error_message,
-                    'raw_response': data
-                }
-                
-        except requests.exceptions.RequestException as e:
-            print(f"   ❌ Network Error: {str(e)}")
+    def _request_url(self, phone_number: str) -> str:
+        """Build the NumVerify request URL for a phone number."""
+        params = {
+            'access_key': self.api_key,
+            'number': phone_number.replace('+', ''),
+            'country_code': '',
+            'format': 1
+        }
+        return f"{self.base_url}?{urllib.parse.urlencode(params)}"
+    
+    @staticmethod
+    def _is_cacheable(data: Dict) -> bool:
+        """Only cache real lookups, not quota/auth errors returned with HTTP 200."""
+        return not data.get('error')
+    
+    def _parse_response(self, phone_number: str, data: Dict) -> Dict:
+        """Convert a decoded NumVerify response into a lookup result."""
+        # Check if we have valid data (some responses don't have 'success' field but have valid data)
+        if data.get('success', False) or (data.get('valid') is not None and data.get('number')):
             return {
                 'phone_number': phone_number,
-                'error': f'API request failed: {str(e)}',
-                'raw_response': None
+                'valid': data.get('valid', False),
+                'number': data.get('number', ''),
+                'local_format': data.get('local_format', ''),
+                'international_format': data.get('international_format', ''),
+                'country_prefix': data.get('country_prefix', ''),
+                'country_code': data.get('country_code', ''),
+                'country_name': data.get('country_name', ''),
+                'location': data.get('location', ''),
+                'carrier': data.get('carrier', ''),
+                'line_type': data.get('line_type', ''),
+                'raw_response': data
             }
-        except Exception as e:
-            print(f"   ❌ Unexpected Error: {str(e)}")
+        else:
+            # Check if there's an actual error message
+            error_info = data.get('error', {})
+            if isinstance(error_info, dict) and error_info.get('info'):
+                error_message = error_info.get('info')
+            elif isinstance(error_info, str) and error_info:
+                error_message = error_info
+            else:
+                # If no clear error but no valid data, it might be a rate limit or other issue
+                error_message = f"No valid data returned: {data}"
+
+            print(f"   ❌ API Error: {error_message}")
             return {
                 'phone_number': phone_number,
-                'error': f'Unexpected error: {str(e)}',
-                'raw_response': None
+                'error': error_message,
+                'raw_response': data
             }
     
     def log_run_details(self, start_time: datetime, end_time: datetime, total_numbers: int, successful: int, failed: int):
@@ -127,18 +104,21 @@ class NumVerifyAPI:
         
         return log_entry
     
-    def process_numbers(self, input_file: str, output_file: str, delay: float = 2.0):
+    def process_numbers(self, input_file: str, output_file: str, delay: float = 2.0,
+                        max_concurrency: int = 4, cache_path: Optional[str] = None):
         """
         Process all numbers from input CSV file and collect raw NumVerify data.
         
         Args:
             input_file: Path to CSV file with phone numbers
             output_file: Path to output JSON file
-            delay: Delay between API calls (seconds)
+            delay: Minimum average spacing between API calls (seconds)
+            max_concurrency: Maximum number of requests in flight
+            cache_path: SQLite response cache (default: next to output_file)
         """
         start_time = datetime.now()
         print(f"🚀 Starting NumVerify API raw data collection for {input_file}")
-        print(f"⏱️  Delay between calls: {delay}s")
+        print(f"⏱️  Rate limit: 1 call per {delay}s, {max_concurrency} concurrent")
         print(f"📊 Mode: Raw data collection (no classification)")
         
         # Load input numbers
@@ -160,13 +140,47 @@ class NumVerifyAPI:
         print(f"📊 Processing {len(numbers_to_process)} phone numbers...")
         print(f"💰 Estimated cost: ${len(numbers_to_process) * 0.01:.2f}")
         
+        # Look up all numbers concurrently under the provider rate limit;
+        # previously fetched responses come from the on-disk cache
+        if cache_path is None:
+            cache_path = str(Path(output_file).with_name("numverify_cache.sqlite"))
+        cache = LookupResponseCache(Path(cache_path))
+        positions = {}
+        for i, number_info in enumerate(numbers_to_process, 1):
+            positions.setdefault(number_info['phone_number'], i)
+        try:
+            client = PhoneLookupClient(
+                provider="numverify",
+                url_builder=self._request_url,
+                requests_per_minute=60.0 / delay if delay > 0 else 600.0,
+                max_concurrency=max_concurrency,
+                timeout=30,  # Free tier can be slow
+                cache=cache,
+                is_cacheable=self._is_cacheable,
+                on_request=lambda phone: print(
+                    f"🔍 [{positions[phone]}/{len(numbers_to_process)}] Looking up: {phone}"
+                ),
+            )
+            outcomes = client.lookup_many(n['phone_number'] for n in numbers_to_process)
+        finally:
+            cache.close()
+        print(f"📦 Cache hits: {client.stats['cache_hits']}, API requests: {client.stats['requests']}")
+        
         # Process each number
         for i, number_info in enumerate(numbers_to_process, 1):
             phone = number_info['phone_number']
-            print(f"🔍 [{i}/{len(numbers_to_process)}] Looking up: {phone}")
+            print(f"📋 [{i}/{len(numbers_to_process)}] {phone}")
             
-            # API lookup
-            lookup_result = self.lookup_phone(phone)
+            outcome = outcomes[phone]
+            if outcome.success:
+                lookup_result = self._parse_response(phone, outcome.response)
+            else:
+                print(f"   ❌ Network Error: {outcome.error}")
+                lookup_result = {
+                    'phone_number': phone,
+                    'error': f'API request failed: {outcome.error}',
+                    'raw_response': None
+                }
             
             if lookup_result and 'error' not in lookup_result:
                 self.results['successful_lookups'] += 1
@@ -215,10 +229,6 @@ class NumVerifyAPI:
                 }
             
             self.results['detailed_results'].append(detailed_result)
-            
-            # Delay between calls to respect rate limits
-            if i < len(numbers_to_process):
-                time.sleep(delay)
         
         # Calculate final statistics
         end_time = datetime.now()
@@ -7,10 +7,15 @@ Actually checks the dates in conversation files to determine which numbers are w
 import csv
 import json
 import re
+import sys
 from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from core.conversation_manifest import get_valid_record, load_manifest
+
 class ProperDateRangeFiltering:
     def __init__(self):
         self.date_range_start = datetime(2022, 8, 1)
@@ -58,12 +63,24 @@ class ProperDateRangeFiltering:
         
         html_files = list(conversation_dir.glob("*.html"))
         print(f"Found {len(html_files)} HTML files")
+
+        # Date ranges recorded at conversion time save re-reading every file
+        manifest = load_manifest(conversation_dir)
+        if manifest:
+            print(f"Using conversations.manifest.jsonl ({len(manifest)} conversations)")
         
         for i, html_file in enumerate(html_files):
             if i % 100 == 0:
                 print(f"  Processing file {i+1}/{len(html_files)}: {html_file.name}")
             
-            dates = self.extract_dates_from_html(html_file)
+            record = get_valid_record(manifest, html_file)
+            if record and record.get('first_timestamp') is not None:
+                dates = [
+                    datetime.fromtimestamp(record[key] / 1000).replace(hour=0, minute=0, second=0, microsecond=0)
+                    for key in ('first_timestamp', 'last_timestamp')
+                ]
+            else:
+                dates = self.extract_dates_from_html(html_file)
             if dates:
                 min_date = min(dates)
                 max_date = max(dates)
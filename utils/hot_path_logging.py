@@ -0,0 +1,189 @@
+"""
+Low-overhead logging helpers for per-message hot paths.
+
+Built on utils.thread_safe_logging. With debug logging off, an f-string in
+``logger.debug(f"...")`` is still formatted for every message, and
+arguments such as ``list(self.phone_aliases.keys())`` are still built. This
+module provides three pieces that keep disabled logging close to free:
+
+- LazyLogger: isEnabledFor-guarded records with %-style arguments; wrap an
+  expensive argument in Lazy() to compute it only if the record is emitted
+- ProgressReporter: progress lines rate-limited per worker thread (at most
+  one line every ``interval`` seconds per thread)
+- CounterRegistry: thread-safe event counters that replace per-event log
+  lines with a single summary
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+from utils.thread_safe_logging import get_thread_safe_logger
+
+DEFAULT_PROGRESS_INTERVAL = 5.0  # Seconds between progress lines per worker
+
+
+class Lazy:
+    """
+    Argument computed only when a log record is formatted.
+
+    Example:
+        log.debug("Aliases: %s", Lazy(lambda: sorted(aliases)))
+    """
+
+    __slots__ = ("_func",)
+
+    def __init__(self, func: Callable[[], Any]):
+        self._func = func
+
+    def __str__(self) -> str:
+        return str(self._func())
+
+    def __repr__(self) -> str:
+        return repr(self._func())
+
+
+class LazyLogger:
+    """
+    Logger wrapper whose level check runs before anything else.
+
+    Messages use %-style arguments, which logging formats only when the
+    record is emitted. Records report the caller's function and line.
+    """
+
+    __slots__ = ("logger",)
+
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+
+    def debug_enabled(self) -> bool:
+        return self.logger.isEnabledFor(logging.DEBUG)
+
+    def log(self, level: int, msg: str, *args) -> None:
+        if self.logger.isEnabledFor(level):
+            self.logger.log(level, msg, *args, stacklevel=2)
+
+    def debug(self, msg: str, *args) -> None:
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(msg, *args, stacklevel=2)
+
+    def info(self, msg: str, *args) -> None:
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(msg, *args, stacklevel=2)
+
+
+def get_lazy_logger(name: str) -> LazyLogger:
+    """Get a LazyLogger for ``name`` (see get_thread_safe_logger)."""
+    return LazyLogger(get_thread_safe_logger(name))
+
+
+class ProgressReporter:
+    """
+    Rate-limited progress lines, tracked separately for each worker thread.
+
+    Each thread emits at most one line per ``interval`` seconds, so the log
+    volume depends on run time and worker count, not on message count.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        interval: float = DEFAULT_PROGRESS_INTERVAL,
+        level: int = logging.INFO,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Args:
+            logger: Logger receiving the progress lines
+            interval: Minimum seconds between lines from the same thread
+            level: Level of the progress lines
+            clock: Time source (injectable for tests)
+        """
+        self.logger = logger
+        self.interval = interval
+        self.level = level
+        self._clock = clock
+        self._local = threading.local()
+
+    def due(self) -> bool:
+        """Return True if this thread may emit a progress line now."""
+        if not self.logger.isEnabledFor(self.level):
+            return False
+        now = self._clock()
+        last = getattr(self._local, "last", None)
+        if last is not None and now - last < self.interval:
+            return False
+        self._local.last = now
+        return True
+
+    def report(self, msg: str, *args) -> bool:
+        """
+        Emit a progress line if this thread's interval has elapsed.
+
+        Returns:
+            True if the line was emitted
+        """
+        if not self.due():
+            return False
+        self.logger.log(self.level, msg, *args, stacklevel=2)
+        return True
+
+
+class CounterRegistry:
+    """
+    Thread-safe named event counters.
+
+    Each thread increments its own dictionary, so the hot path takes no
+    lock; snapshot() merges them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._thread_counters = []
+
+    def _counters(self) -> Dict[str, int]:
+        counters = getattr(self._local, "counters", None)
+        if counters is None:
+            counters = {}
+            self._local.counters = counters
+            with self._lock:
+                self._thread_counters.append(counters)
+        return counters
+
+    def increment(self, name: str, amount: int = 1) -> None:
+        counters = self._counters()
+        counters[name] = counters.get(name, 0) + amount
+
+    def snapshot(self) -> Dict[str, int]:
+        """Return the merged counts, sorted by name."""
+        totals: Dict[str, int] = {}
+        with self._lock:
+            for counters in self._thread_counters:
+                # Copy first: the owning thread may be adding keys
+                for name, count in list(counters.items()):
+                    totals[name] = totals.get(name, 0) + count
+        return dict(sorted(totals.items()))
+
+    def reset(self) -> None:
+        with self._lock:
+            for counters in self._thread_counters:
+                counters.clear()
+
+    def log_summary(
+        self, logger: logging.Logger, title: str, level: int = logging.DEBUG, prefix: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Log all counters (optionally only those starting with ``prefix``) on one line.
+
+        Returns:
+            The counts that were logged
+        """
+        counts = self.snapshot()
+        if prefix:
+            counts = {name: count for name, count in counts.items() if name.startswith(prefix)}
+        if counts and logger.isEnabledFor(level):
+            summary = ", ".join(f"{name}={count:,}" for name, count in counts.items())
+            logger.log(level, f"📊 {title}: {summary}")
+        return counts
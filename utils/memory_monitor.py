@@ -3,19 +3,61 @@ Memory monitoring and profiling utilities for Google Voice SMS Converter.
 
 This module provides comprehensive memory usage tracking, leak detection,
 and memory optimization recommendations.
+
+Two collection modes are available:
+- MemoryMonitor.take_snapshot(): synchronous, on-demand snapshots
+- ResourceSampler: a background thread that samples at a fixed interval into
+  a bounded ring buffer. Callers only mark the current phase, so the hot path
+  pays for a single attribute assignment.
 """
 
 import os
 import time
 import threading
 import psutil
-from typing import Dict, List, Optional, Tuple, Any
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def _count_open_fds(process: psutil.Process) -> int:
+    """
+    Count open file descriptors cheaply.
+
+    psutil.Process.open_files() resolves every descriptor to a path, which is
+    expensive on Linux when many files are open. num_fds() only lists
+    /proc/<pid>/fd, and num_handles() is the Windows equivalent.
+    """
+    try:
+        if hasattr(process, "num_fds"):
+            return process.num_fds()
+        if hasattr(process, "num_handles"):
+            return process.num_handles()
+    except (psutil.Error, OSError):
+        pass
+    return 0
+
+
+def _linear_slope(x_values: List[float], y_values: List[float]) -> float:
+    """Calculate the slope of a least-squares regression line."""
+    if len(x_values) != len(y_values) or len(x_values) < 2:
+        return 0.0
+
+    n = len(x_values)
+    sum_x = sum(x_values)
+    sum_y = sum(y_values)
+    sum_xy = sum(x * y for x, y in zip(x_values, y_values))
+    sum_x2 = sum(x * x for x in x_values)
+
+    try:
+        return (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
+    except ZeroDivisionError:
+        return 0.0
+
 @dataclass
 class MemorySnapshot:
     """Snapshot of memory usage at a point in time."""
@@ -37,16 +79,19 @@ class MemoryMonitor:
     and provides optimization recommendations.
     """
     
-    def __init__(self, enable_monitoring: bool = True, threshold_mb: float = 1000.0):
+    def __init__(self, enable_monitoring: bool = True, threshold_mb: float = 1000.0,
+                 max_snapshots: int = 1000):
         """
         Initialize the memory monitor.
         
         Args:
             enable_monitoring: Whether to enable memory monitoring
             threshold_mb: Memory threshold in MB for warnings
+            max_snapshots: Number of snapshots retained by take_snapshot()
         """
         self.enable_monitoring = enable_monitoring
         self.threshold_mb = threshold_mb
+        self.max_snapshots = max_snapshots
         self.snapshots: List[MemorySnapshot] = []
         self.monitoring_lock = threading.Lock()
         self.start_time = time.time()
@@ -87,7 +132,7 @@ class MemoryMonitor:
                 memory_mb=memory_info.rss / 1024 / 1024,
                 memory_percent=self.process.memory_percent(),
                 virtual_memory_mb=virtual_memory.used / 1024 / 1024,
-                open_files=len(self.process.open_files()),
+                open_files=_count_open_fds(self.process),
                 threads=self.process.num_threads(),
                 cpu_percent=self.process.cpu_percent(),
                 operation_name=operation_name,
@@ -96,6 +141,10 @@ class MemoryMonitor:
             
             with self.monitoring_lock:
                 self.snapshots.append(snapshot)
+                # Trim in bulk so the list stays bounded without an O(n)
+                # delete on every snapshot
+                if len(self.snapshots) > 2 * self.max_snapshots:
+                    del self.snapshots[:-self.max_snapshots]
                 
                 # Track peak memory
                 if snapshot.memory_mb > self.peak_memory:
@@ -151,20 +200,7 @@ class MemoryMonitor:
     
     def _calculate_slope(self, x_values: List[int], y_values: List[float]) -> float:
         """Calculate the slope of a linear regression line."""
-        if len(x_values) != len(y_values) or len(x_values) < 2:
-            return 0.0
-        
-        n = len(x_values)
-        sum_x = sum(x_values)
-        sum_y = sum(y_values)
-        sum_xy = sum(x * y for x, y in zip(x_values, y_values))
-        sum_x2 = sum(x * x for x in x_values)
-        
-        try:
-            slope = (n * sum_xy - sum_x * sum_y) / (n * sum_x2 - sum_x * sum_x)
-            return slope
-        except ZeroDivisionError:
-            return 0.0
+        return _linear_slope(x_values, y_values)
     
     def get_memory_summary(self) -> Dict[str, Any]:
         """
@@ -280,9 +316,269 @@ class MemoryMonitor:
             self.start_time = time.time()
             logger.info("Memory monitoring data reset")
 
+@dataclass
+class ResourceSample:
+    """Single background sample of process resource usage."""
+    timestamp: float
+    rss_mb: float
+    cpu_percent: float
+    threads: int
+    open_fds: int
+    phase: str
+
+
+@dataclass
+class PhaseStats:
+    """Aggregated resource usage for one processing phase."""
+    phase: str
+    started_at: float
+    ended_at: Optional[float] = None
+    samples: int = 0
+    peak_rss_mb: float = 0.0
+    peak_cpu_percent: float = 0.0
+    cpu_percent_total: float = 0.0
+    peak_threads: int = 0
+
+    @property
+    def duration_seconds(self) -> float:
+        end = self.ended_at if self.ended_at is not None else time.monotonic()
+        return max(0.0, end - self.started_at)
+
+    @property
+    def avg_cpu_percent(self) -> float:
+        return self.cpu_percent_total / self.samples if self.samples else 0.0
+
+
+class ResourceSampler:
+    """
+    Background resource sampler with phase tagging.
+
+    A daemon thread samples RSS, CPU, thread count and fd count every
+    ``interval`` seconds into a fixed-size ring buffer. Processing code calls
+    mark_phase() at stage boundaries; each sample is tagged with the phase
+    that was current when it was taken and folded into per-phase aggregates,
+    so the hot path never touches psutil or takes a lock.
+    """
+
+    def __init__(self, interval: float = 0.5, capacity: int = 7200,
+                 threshold_mb: float = 1000.0, leak_window: int = 10,
+                 leak_threshold: float = 0.1):
+        """
+        Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+            capacity: Maximum number of samples kept in the ring buffer
+            threshold_mb: RSS threshold in MB for warnings
+            leak_window: Number of recent samples used for leak detection
+            leak_threshold: Slope (MB per sample) above which a leak is reported
+        """
+        if interval <= 0:
+            raise ValueError(f"Sampling interval must be positive, got {interval}")
+        if capacity <= 0:
+            raise ValueError(f"Ring buffer capacity must be positive, got {capacity}")
+
+        self.interval = interval
+        self.threshold_mb = threshold_mb
+        self.leak_window = leak_window
+        self.leak_threshold = leak_threshold
+        self.samples: Deque[ResourceSample] = deque(maxlen=capacity)
+        self.process = psutil.Process()
+
+        # Phase bookkeeping. _current_phase is read by the sampler thread and
+        # written by mark_phase(); a plain attribute assignment is atomic.
+        self._current_phase = "startup"
+        self._phases: Dict[str, PhaseStats] = {}
+        self._phase_order: List[str] = []
+        self._lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._threshold_warned = False
+        self._leak_warned_phases: set = set()
+        self._samples_since_leak_check = 0
+
+        self._open_phase(self._current_phase, time.monotonic())
+
+    @property
+    def current_phase(self) -> str:
+        return self._current_phase
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the background sampling thread (no-op if already running)."""
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        # Prime cpu_percent so the first real sample has a baseline
+        try:
+            self.process.cpu_percent(None)
+        except psutil.Error:
+            pass
+        self._thread = threading.Thread(
+            target=self._run, name="ResourceSampler", daemon=True
+        )
+        self._thread.start()
+        logger.debug(f"Resource sampler started (interval: {self.interval:.2f}s)")
+
+    def stop(self) -> None:
+        """Stop the sampling thread, take a final sample and close the current phase."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=max(1.0, self.interval * 2))
+            self._thread = None
+        self.sample_now()
+        with self._lock:
+            stats = self._phases.get(self._current_phase)
+            if stats is not None and stats.ended_at is None:
+                stats.ended_at = time.monotonic()
+
+    def mark_phase(self, phase: str) -> None:
+        """
+        Tag subsequent samples with ``phase``.
+
+        This is the only call made from processing code and is cheap enough
+        to use on hot paths.
+        """
+        if phase == self._current_phase:
+            return
+        now = time.monotonic()
+        with self._lock:
+            previous = self._phases.get(self._current_phase)
+            if previous is not None and previous.ended_at is None:
+                previous.ended_at = now
+            self._open_phase(phase, now)
+            self._current_phase = phase
+
+    def _open_phase(self, phase: str, now: float) -> None:
+        stats = self._phases.get(phase)
+        if stats is None:
+            self._phases[phase] = PhaseStats(phase=phase, started_at=now)
+            self._phase_order.append(phase)
+        else:
+            # Re-entering a phase extends it rather than resetting its peaks
+            stats.started_at = now - stats.duration_seconds
+            stats.ended_at = None
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.sample_now()
+
+    def sample_now(self) -> Optional[ResourceSample]:
+        """Take one sample immediately and fold it into the current phase."""
+        try:
+            with self.process.oneshot():
+                sample = ResourceSample(
+                    timestamp=time.time(),
+                    rss_mb=self.process.memory_info().rss / 1024 / 1024,
+                    cpu_percent=self.process.cpu_percent(None),
+                    threads=self.process.num_threads(),
+                    open_fds=_count_open_fds(self.process),
+                    phase=self._current_phase,
+                )
+        except Exception as e:
+            logger.debug(f"Resource sample failed: {e}")
+            return None
+
+        self.record_sample(sample)
+        return sample
+
+    def record_sample(self, sample: ResourceSample) -> None:
+        """Append a sample to the ring buffer and update phase aggregates."""
+        with self._lock:
+            self.samples.append(sample)
+            stats = self._phases.get(sample.phase)
+            if stats is None:
+                stats = PhaseStats(phase=sample.phase, started_at=time.monotonic())
+                self._phases[sample.phase] = stats
+                self._phase_order.append(sample.phase)
+            stats.samples += 1
+            stats.cpu_percent_total += sample.cpu_percent
+            stats.peak_rss_mb = max(stats.peak_rss_mb, sample.rss_mb)
+            stats.peak_cpu_percent = max(stats.peak_cpu_percent, sample.cpu_percent)
+            stats.peak_threads = max(stats.peak_threads, sample.threads)
+            self._samples_since_leak_check += 1
+            run_leak_check = self._samples_since_leak_check >= self.leak_window
+
+        if sample.rss_mb > self.threshold_mb and not self._threshold_warned:
+            self._threshold_warned = True
+            logger.warning(
+                f"⚠️  Memory usage ({sample.rss_mb:.1f}MB) exceeds threshold "
+                f"({self.threshold_mb:.1f}MB) during phase '{sample.phase}'"
+            )
+
+        if run_leak_check:
+            self._check_for_memory_leaks()
+
+    def _check_for_memory_leaks(self) -> None:
+        """Warn when RSS has grown steadily over the last leak_window samples."""
+        with self._lock:
+            self._samples_since_leak_check = 0
+            recent = list(self.samples)[-self.leak_window:]
+        if len(recent) < self.leak_window:
+            return
+        phase = recent[-1].phase
+        if phase in self._leak_warned_phases:
+            return
+        slope = _linear_slope(list(range(len(recent))), [s.rss_mb for s in recent])
+        if slope > self.leak_threshold:
+            self._leak_warned_phases.add(phase)
+            logger.warning(
+                f"⚠️  Potential memory leak detected: memory growing at {slope:.2f}MB "
+                f"per sample during phase '{phase}'"
+            )
+
+    def get_phase_report(self) -> List[Dict[str, Any]]:
+        """
+        Get per-phase resource usage in the order phases were first entered.
+
+        Returns:
+            List of dictionaries with duration, sample count, peak RSS and CPU
+        """
+        with self._lock:
+            return [
+                {
+                    "phase": name,
+                    "duration_seconds": self._phases[name].duration_seconds,
+                    "samples": self._phases[name].samples,
+                    "peak_rss_mb": self._phases[name].peak_rss_mb,
+                    "peak_cpu_percent": self._phases[name].peak_cpu_percent,
+                    "avg_cpu_percent": self._phases[name].avg_cpu_percent,
+                    "peak_threads": self._phases[name].peak_threads,
+                }
+                for name in self._phase_order
+            ]
+
+    def log_phase_report(self) -> None:
+        """Log the per-phase report in a compact table."""
+        report = self.get_phase_report()
+        if not report:
+            return
+        logger.info("Per-Phase Resource Usage:")
+        for entry in report:
+            if entry["samples"] == 0:
+                logger.info(
+                    f"  {entry['phase']}: {entry['duration_seconds']:.2f}s (no samples)"
+                )
+                continue
+            logger.info(
+                f"  {entry['phase']}: {entry['duration_seconds']:.2f}s, "
+                f"peak RSS {entry['peak_rss_mb']:.1f}MB, "
+                f"peak CPU {entry['peak_cpu_percent']:.0f}%, "
+                f"avg CPU {entry['avg_cpu_percent']:.0f}% "
+                f"({entry['samples']} samples)"
+            )
+
+
 # Global memory monitor instance
 _memory_monitor: Optional[MemoryMonitor] = None
 
+# Global background sampler instance
+_resource_sampler: Optional[ResourceSampler] = None
+
 def get_memory_monitor() -> MemoryMonitor:
     """Get the global memory monitor instance."""
     global _memory_monitor
@@ -322,3 +618,54 @@ def generate_memory_recommendations() -> List[str]:
     """Generate memory optimization recommendations."""
     monitor = get_memory_monitor()
     return monitor.generate_optimization_recommendations()
+
+
+def start_resource_sampler(interval: float = 0.5, capacity: int = 7200,
+                           threshold_mb: float = 1000.0) -> ResourceSampler:
+    """
+    Start the global background resource sampler.
+
+    Any previously running sampler is stopped and replaced.
+
+    Args:
+        interval: Seconds between samples
+        capacity: Ring buffer size in samples
+        threshold_mb: RSS threshold in MB for warnings
+
+    Returns:
+        The running ResourceSampler
+    """
+    global _resource_sampler
+    if _resource_sampler is not None:
+        _resource_sampler.stop()
+    _resource_sampler = ResourceSampler(
+        interval=interval, capacity=capacity, threshold_mb=threshold_mb
+    )
+    _resource_sampler.start()
+    return _resource_sampler
+
+
+def get_resource_sampler() -> Optional[ResourceSampler]:
+    """Get the global resource sampler, or None if sampling was never started."""
+    return _resource_sampler
+
+
+def mark_phase(phase: str) -> None:
+    """Tag future background samples with ``phase``. No-op when sampling is off."""
+    sampler = _resource_sampler
+    if sampler is not None:
+        sampler.mark_phase(phase)
+
+
+def stop_resource_sampler() -> List[Dict[str, Any]]:
+    """
+    Stop the global resource sampler.
+
+    Returns:
+        Per-phase report (empty if sampling was never started)
+    """
+    sampler = _resource_sampler
+    if sampler is None:
+        return []
+    sampler.stop()
+    return sampler.get_phase_report()